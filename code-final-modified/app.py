@@ -1,5 +1,5 @@
 
-from flask import Flask, request, jsonify, send_file, render_template, session, redirect, url_for
+from flask import Flask, request, jsonify, send_file, render_template, session, redirect, url_for, copy_current_request_context, Response, stream_with_context, g
 from flask_cors import CORS
 import oracledb
 import os
@@ -10,10 +10,13 @@ from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
 from openpyxl.utils import get_column_letter
 from datetime import datetime, timedelta
 import io
+import time
+from concurrent.futures import ThreadPoolExecutor
 from openpyxl import load_workbook
 import requests
 import json
 import urllib3
+from functools import wraps
 
 # Disable SSL warnings (for environments with SSL certificate issues)
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -21,6 +24,23 @@ urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 # Import rate limiter for AI API calls
 from rate_limiter import check_rate_limit, record_api_call, get_rate_limit_status
 
+# Import connection pooling for database sessions
+from connection_pool import PoolManager, ConnectionPool, OracleSessionPool, PoolTimeoutError, credential_fingerprint
+from dual_connections import DualConnectionRegistry, AsyncConnector, RegistryFullError, LoginQueueFullError
+from connection_broker import BrokerRegistry, BrokerAsyncConnector
+from catalog_batch import fetch_catalog_batch, fetch_row_counts, fetch_ddl_versions, fetch_schema_tables, fetch_estimated_counts
+from metadata_cache import MetadataCache
+from sampling import choose_sample_percent, sampled_row_count, sampled_column_profile
+from databricks_metadata import describe_table, describe_detail
+from snowflake_metadata import schema_metadata
+from probe_timeout import ProbeTimeout
+from jobs import JobManager, JobQueueFullError
+from oracle_partitions import table_partitions, partition_page
+from schema_compare import SCHEMA_COMPARE_CATEGORIES, SchemaSide, compare_schema_sides, diff_structure, diff_indexes, diff_constraints
+from compare_store import FingerprintStore, SnapshotStore
+from query_diff import column_differences, parse_key_columns, execute_ordered, merge_diff
+from reconcile import ReconcileSide, reconcile_tables
+
 app = Flask(__name__)
 app.secret_key = 'your-secret-key-change-this-in-production-12345'  # Change this in production
 
@@ -100,6 +120,69 @@ BACKUP_DIR = r"C:\Users\jadhabhi\Downloads\poc_genai"
 # When True, uses thin mode (no Oracle Instant Client needed)
 IS_CLOUD_DEPLOYMENT = os.getenv('IS_CLOUD_DEPLOYMENT', 'false').lower() == 'true'
 
+# Connection pool settings (per credential set, per worker process)
+DB_POOL_MIN_SIZE = int(os.getenv('DB_POOL_MIN_SIZE', '1'))
+DB_POOL_MAX_SIZE = int(os.getenv('DB_POOL_MAX_SIZE', '4'))
+DB_POOL_CHECKOUT_TIMEOUT = float(os.getenv('DB_POOL_CHECKOUT_TIMEOUT', '30'))  # seconds to wait for a free connection
+DB_POOL_IDLE_TIMEOUT = int(os.getenv('DB_POOL_IDLE_TIMEOUT', '300'))  # close connections idle this long
+DB_POOL_MAX_LIFETIME = int(os.getenv('DB_POOL_MAX_LIFETIME', '3600'))  # recycle connections older than this
+DB_LIVENESS_WINDOW = float(os.getenv('DB_LIVENESS_WINDOW', '30'))  # skip liveness probe if used this recently (0 = always probe)
+
+# Dual-login (source/target) connection limits per worker process
+DUAL_CONNECTION_IDLE_TTL = int(os.getenv('DUAL_CONNECTION_IDLE_TTL', '1800'))  # close dual connections idle this long
+DUAL_CONNECTION_MAX = int(os.getenv('DUAL_CONNECTION_MAX', '50'))
+DUAL_CONNECTION_MAX_PER_USER = int(os.getenv('DUAL_CONNECTION_MAX_PER_USER', '6'))
+DUAL_LOGIN_WORKERS = int(os.getenv('DUAL_LOGIN_WORKERS', '4'))  # background threads for async dual-login
+DUAL_LOGIN_MAX_QUEUED = int(os.getenv('DUAL_LOGIN_MAX_QUEUED', '20'))  # pending async logins before 503
+
+# Per-table analysis fan-out for metadata that cannot be batched (each thread borrows its own pooled connection)
+ANALYZE_WORKERS = int(os.getenv('ANALYZE_WORKERS', '4'))
+ANALYZE_STREAM_CHUNK = int(os.getenv('ANALYZE_STREAM_CHUNK', '50'))  # tables per batch in whole-schema mode
+
+# Table metadata cache, validated against LAST_DDL_TIME / LAST_ALTERED / Delta lastModified
+METADATA_CACHE_MAX_ENTRIES = int(os.getenv('METADATA_CACHE_MAX_ENTRIES', '5000'))
+METADATA_CACHE_MAX_BYTES = int(os.getenv('METADATA_CACHE_MAX_MB', '64')) * 1024 * 1024
+METADATA_CACHE_TTL = int(os.getenv('METADATA_CACHE_TTL', '3600'))  # seconds, safety net for changes that keep the version
+
+# Row counts: count_mode "auto" runs SELECT COUNT(*) only when statistics put the table below this size
+COUNT_AUTO_EXACT_MAX_ROWS = int(os.getenv('COUNT_AUTO_EXACT_MAX_ROWS', '10000000'))
+COUNT_MODES = ('exact', 'estimated', 'sampled', 'auto')
+
+# Per-statement limits for /api/analyze probes (0 = no limit); timed-out probes are reported, not fatal
+PROBE_TIMEOUT_SECONDS = float(os.getenv('PROBE_TIMEOUT_SECONDS', '60'))
+COUNT_TIMEOUT_SECONDS = float(os.getenv('COUNT_TIMEOUT_SECONDS', '300'))
+
+# Sampled counts/profiles (sampling.py): rows a sample aims for, rate when the size is unknown, interval level
+SAMPLE_TARGET_ROWS = int(os.getenv('SAMPLE_TARGET_ROWS', '100000'))
+SAMPLE_DEFAULT_PERCENT = float(os.getenv('SAMPLE_DEFAULT_PERCENT', '1'))
+SAMPLE_CONFIDENCE = float(os.getenv('SAMPLE_CONFIDENCE', '0.95'))
+
+# /api/partitions page size (default and maximum); analysis results list only the first partitions
+PARTITION_PAGE_SIZE = int(os.getenv('PARTITION_PAGE_SIZE', '200'))
+PARTITION_PAGE_MAX = int(os.getenv('PARTITION_PAGE_MAX', '1000'))
+
+# Cross-worker connection broker (see connection_broker.py / gunicorn.conf.py)
+# When set, dual connections live in the broker so any worker can serve a session_id
+DB_BROKER_SOCKET = os.getenv('DB_BROKER_SOCKET', '')
+DB_BROKER_AUTHKEY = os.getenv('DB_BROKER_AUTHKEY', '')
+
+# Background jobs ("async": true or POST /api/jobs): runner threads per worker, queue limit, SQLite store shared by workers
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', '2'))
+JOB_MAX_QUEUED = int(os.getenv('JOB_MAX_QUEUED', '20'))
+JOB_RETENTION_HOURS = int(os.getenv('JOB_RETENTION_HOURS', '24'))  # finished jobs are kept this long
+JOBS_DB_PATH = os.getenv('JOBS_DB_PATH', os.path.join(BACKUP_DIR, 'jobs.sqlite3'))
+
+# Schema compare fingerprints and per-side snapshots (compare_store.py), valid while a table's DDL is unchanged
+COMPARE_STORE_PATH = os.getenv('COMPARE_STORE_PATH', os.path.join(BACKUP_DIR, 'compare_store.sqlite3'))
+
+# Key-ordered query compares (query_diff.py): rows per fetch on each side, differences listed per category
+QUERY_DIFF_BATCH_SIZE = int(os.getenv('QUERY_DIFF_BATCH_SIZE', '5000'))
+QUERY_DIFF_SAMPLE_LIMIT = int(os.getenv('QUERY_DIFF_SAMPLE_LIMIT', '100'))
+
+# Hash reconciliation (reconcile.py): buckets per split, largest differing bucket whose rows are fetched
+RECONCILE_BUCKETS = int(os.getenv('RECONCILE_BUCKETS', '64'))
+RECONCILE_LEAF_ROWS = int(os.getenv('RECONCILE_LEAF_ROWS', '1000'))
+
 # ============================================================================
 
 # Initialize Oracle Client in thick mode with explicit path (only for local development)
@@ -157,16 +240,182 @@ def display_startup_banner():
 
 display_startup_banner()
 
-# Connection cache to prevent re-authentication (especially for Databricks Azure AD)
-_connection_cache = {}
+# Connection pools keyed by credential fingerprint (SSO/Azure AD pools are also keyed by session_id
+# so their browser-authenticated connection is never shared or re-authenticated)
+_pool_manager = PoolManager(pool_idle_timeout=app.config['PERMANENT_SESSION_LIFETIME'].total_seconds())
+
+def open_db_connection(db_type: str, connect_kwargs: Dict[str, Any]):
+    """
+    Open a new physical connection with the driver for db_type.
+    
+    Args:
+        db_type: Database type (oracle, databricks, snowflake)
+        connect_kwargs: Keyword arguments passed to the driver's connect()
+    
+    Returns:
+        Connection: A new DB-API connection
+    """
+    if db_type == 'oracle':
+        return oracledb.connect(**connect_kwargs)
+    
+    elif db_type == 'databricks':
+        if not DATABRICKS_AVAILABLE:
+            raise Exception("Databricks connector not installed. Install with: pip install databricks-sql-connector")
+        return databricks_sql.connect(**connect_kwargs)
+    
+    elif db_type == 'snowflake':
+        if not SNOWFLAKE_AVAILABLE:
+            raise Exception("Snowflake connector not installed. Install with: pip install snowflake-connector-python")
+        logger.info(f"Connecting to Snowflake with authenticator: {connect_kwargs.get('authenticator', 'password')}")
+        return snowflake.connector.connect(**connect_kwargs)
+    
+    raise Exception(f"Unsupported database type: {db_type}")
+
+def get_session_connect_params() -> tuple:
+    """
+    Build driver connect() arguments from the credentials stored in the Flask session.
+    
+    Returns:
+        tuple: (db_type, connect_kwargs, interactive) where interactive is True for
+               SSO/Azure AD logins that cannot re-authenticate without a browser
+    
+    Raises:
+        Exception: If database credentials or db_type are not found in the session,
+            or if the database type is not supported.
+    """
+    # Check if session has required credentials
+    if 'db_type' not in session:
+        raise Exception("No database type in session. Please login first.")
+    
+    db_type = session['db_type']
+    
+    # Oracle Database Connection
+    if db_type == 'oracle':
+        if 'db_user' not in session or 'db_password' not in session or 'db_dsn' not in session:
+            raise Exception("Missing Oracle credentials in session. Please login first.")
+        
+        return db_type, {
+            'user': session['db_user'],
+            'password': session['db_password'],
+            'dsn': session['db_dsn']
+        }, False
+    
+    # Databricks Connection
+    elif db_type == 'databricks':
+        if 'db_server_hostname' not in session or 'db_http_path' not in session:
+            raise Exception("Missing Databricks server information in session. Please login first.")
+        
+        conn_params = {
+            'server_hostname': session['db_server_hostname'],
+            'http_path': session['db_http_path']
+        }
+        
+        # Support multiple authentication methods
+        if session.get('db_authenticator') == 'azuread':
+            # Method 1: Azure AD / Entra ID authentication
+            conn_params['auth_type'] = 'azure-ad'
+            return db_type, conn_params, True
+        elif 'db_access_token' in session and session['db_access_token']:
+            # Method 2: Token-based authentication
+            conn_params['access_token'] = session['db_access_token']
+        elif 'db_user' in session and 'db_password' in session:
+            # Method 3: Username/Password authentication
+            conn_params['username'] = session['db_user']
+            conn_params['password'] = session['db_password']
+        else:
+            raise Exception("Missing Databricks authentication. Provide Access Token, Username/Password, or use Azure AD.")
+        
+        return db_type, conn_params, False
+    
+    # Snowflake Connection
+    elif db_type == 'snowflake':
+        if 'db_user' not in session or 'db_account' not in session:
+            raise Exception("Missing Snowflake credentials in session. Please login first.")
+        
+        # Build connection parameters
+        conn_params = {
+            'user': session['db_user'],
+            'account': session['db_account']
+        }
+        
+        # Add optional parameters
+        if session.get('db_warehouse'):
+            conn_params['warehouse'] = session['db_warehouse']
+        if session.get('db_database'):
+            conn_params['database'] = session['db_database']
+        if session.get('db_schema'):
+            conn_params['schema'] = session['db_schema']
+        
+        # Support multiple authentication methods
+        if session.get('db_authenticator') == 'externalbrowser':
+            # SSO/Browser-based authentication
+            conn_params['authenticator'] = 'externalbrowser'
+            conn_params['login_timeout'] = 120  # 2 minutes timeout for browser login
+            return db_type, conn_params, True
+        elif session.get('db_password'):
+            # Standard username/password authentication
+            conn_params['password'] = session['db_password']
+        else:
+            raise Exception("Missing Snowflake authentication. Provide either password or use SSO.")
+        
+        return db_type, conn_params, False
+    
+    else:
+        raise Exception(f"Unsupported database type: {db_type}")
+
+def get_session_pool_key(db_type: str, connect_kwargs: Dict[str, Any], interactive: bool) -> str:
+    """Pool key for the current session: credential fingerprint, plus session_id for SSO/Azure AD"""
+    if interactive:
+        if not session.get('session_id'):
+            import uuid
+            session['session_id'] = str(uuid.uuid4())
+        return credential_fingerprint(db_type, dict(connect_kwargs, session_id=session['session_id']))
+    return credential_fingerprint(db_type, connect_kwargs)
+
+def create_connection_pool(db_type: str, connect_kwargs: Dict[str, Any], interactive: bool = False):
+    """
+    Create a connection pool for one credential set.
+    Oracle uses oracledb.create_pool; Snowflake and Databricks use a queue-based pool.
+    SSO/Azure AD pools hold a single connection because each new one needs a browser login.
+    """
+    if db_type == 'oracle':
+        return OracleSessionPool(
+            user=connect_kwargs['user'],
+            password=connect_kwargs['password'],
+            dsn=connect_kwargs['dsn'],
+            min_size=DB_POOL_MIN_SIZE,
+            max_size=DB_POOL_MAX_SIZE,
+            checkout_timeout=DB_POOL_CHECKOUT_TIMEOUT,
+            idle_timeout=DB_POOL_IDLE_TIMEOUT,
+            max_lifetime=DB_POOL_MAX_LIFETIME,
+            name=f"oracle:{connect_kwargs['user']}@{connect_kwargs['dsn']}",
+            liveness_window=DB_LIVENESS_WINDOW
+        )
+    
+    target = connect_kwargs.get('server_hostname') or connect_kwargs.get('account')
+    return ConnectionPool(
+        connect=lambda: open_db_connection(db_type, connect_kwargs),
+        min_size=0 if interactive else DB_POOL_MIN_SIZE,
+        max_size=1 if interactive else DB_POOL_MAX_SIZE,
+        checkout_timeout=DB_POOL_CHECKOUT_TIMEOUT,
+        idle_timeout=None if interactive else DB_POOL_IDLE_TIMEOUT,
+        max_lifetime=None if interactive else DB_POOL_MAX_LIFETIME,
+        name=f"{db_type}:{target}",
+        db_type=db_type,
+        liveness_window=DB_LIVENESS_WINDOW
+    )
 
 def get_db_connection():
     """
-    Establish database connection using session credentials.
+    Borrow a database connection for the current session from its connection pool.
     Supports Oracle, Databricks, and Snowflake databases.
     
-    This function retrieves database credentials from the Flask session and creates
-    a connection to the appropriate database based on the db_type stored in session.
+    Pools are keyed by a fingerprint of the session credentials, so every request
+    for the same credentials reuses warm connections instead of paying a full
+    TLS and authentication handshake. Reused connections are only probed for
+    liveness (ping or a dialect-specific query) when they have been idle longer
+    than DB_LIVENESS_WINDOW. Return the connection with release_db_connection()
+    when done.
     
     Returns:
         Connection: An active database connection object (Oracle/Databricks/Snowflake)
@@ -175,129 +424,70 @@ def get_db_connection():
     Raises:
         Exception: If database credentials or db_type are not found in the session,
             or if the database type is not supported.
+        PoolTimeoutError: If no pooled connection frees up within DB_POOL_CHECKOUT_TIMEOUT.
         DatabaseError: If there is an error establishing the database connection.
     
     Example:
         >>> connection = get_db_connection()
-        >>> cursor = connection.cursor()
-        >>> # ... perform database operations
-        >>> connection.close()
+        >>> try:
+        ...     cursor = connection.cursor()
+        ...     # ... perform database operations
+        ... finally:
+        ...     release_db_connection(connection)
     """
     try:
-        # Check for cached connection first (prevents re-auth for Azure AD/SSO)
-        session_id = session.get('session_id')
-        if session_id and session_id in _connection_cache:
-            cached_conn = _connection_cache[session_id]
-            try:
-                # Test if connection is still valid
-                cursor = cached_conn.cursor()
-                cursor.execute("SELECT 1")
-                cursor.close()
-                logger.info("Reusing cached database connection")
-                return cached_conn
-            except:
-                # Connection is dead, remove from cache
-                logger.warning("Cached connection is dead, creating new connection")
-                del _connection_cache[session_id]
-        
-        # Check if session has required credentials
-        if 'db_type' not in session:
-            raise Exception("No database type in session. Please login first.")
-        
-        db_type = session['db_type']
+        db_type, connect_kwargs, interactive = get_session_connect_params()
+        pool_key = get_session_pool_key(db_type, connect_kwargs, interactive)
+        acquire_started = time.time()
+        connection = _pool_manager.acquire(
+            pool_key,
+            lambda: create_connection_pool(db_type, connect_kwargs, interactive)
+        )
         
-        # Oracle Database Connection
-        if db_type == 'oracle':
-            if 'db_user' not in session or 'db_password' not in session or 'db_dsn' not in session:
-                raise Exception("Missing Oracle credentials in session. Please login first.")
-            
-            connection = oracledb.connect(
-                user=session['db_user'],
-                password=session['db_password'],
-                dsn=session['db_dsn']
+        # Measure how much the warm login connection saved on the first request
+        if session.pop('first_query_pending', False):
+            acquire_ms = (time.time() - acquire_started) * 1000
+            logger.info(
+                f"First request after {db_type} login got a connection in {acquire_ms:.0f} ms "
+                f"(login handshake took {session.get('login_connect_ms', 0):.0f} ms)"
             )
-            return connection
-        
-        # Databricks Connection
-        elif db_type == 'databricks':
-            if not DATABRICKS_AVAILABLE:
-                raise Exception("Databricks connector not installed. Install with: pip install databricks-sql-connector")
-            
-            if 'db_server_hostname' not in session or 'db_http_path' not in session:
-                raise Exception("Missing Databricks server information in session. Please login first.")
-            
-            # Support multiple authentication methods
-            if session.get('db_authenticator') == 'azuread':
-                # Method 1: Azure AD / Entra ID authentication
-                connection = databricks_sql.connect(
-                    server_hostname=session['db_server_hostname'],
-                    http_path=session['db_http_path'],
-                    auth_type='azure-ad'
-                )
-            elif 'db_access_token' in session and session['db_access_token']:
-                # Method 2: Token-based authentication
-                connection = databricks_sql.connect(
-                    server_hostname=session['db_server_hostname'],
-                    http_path=session['db_http_path'],
-                    access_token=session['db_access_token']
-                )
-            elif 'db_user' in session and 'db_password' in session:
-                # Method 3: Username/Password authentication
-                connection = databricks_sql.connect(
-                    server_hostname=session['db_server_hostname'],
-                    http_path=session['db_http_path'],
-                    username=session['db_user'],
-                    password=session['db_password']
-                )
-            else:
-                raise Exception("Missing Databricks authentication. Provide Access Token, Username/Password, or use Azure AD.")
-            
-            return connection
-        
-        # Snowflake Connection
-        elif db_type == 'snowflake':
-            if not SNOWFLAKE_AVAILABLE:
-                raise Exception("Snowflake connector not installed. Install with: pip install snowflake-connector-python")
-            
-            if 'db_user' not in session or 'db_account' not in session:
-                raise Exception("Missing Snowflake credentials in session. Please login first.")
-            
-            # Build connection parameters
-            conn_params = {
-                'user': session['db_user'],
-                'account': session['db_account']
-            }
-            
-            # Add optional parameters
-            if session.get('db_warehouse'):
-                conn_params['warehouse'] = session['db_warehouse']
-            if session.get('db_database'):
-                conn_params['database'] = session['db_database']
-            if session.get('db_schema'):
-                conn_params['schema'] = session['db_schema']
-            
-            # Support multiple authentication methods
-            if session.get('db_authenticator') == 'externalbrowser':
-                # SSO/Browser-based authentication
-                conn_params['authenticator'] = 'externalbrowser'
-                conn_params['login_timeout'] = 120  # 2 minutes timeout for browser login
-            elif session.get('db_password'):
-                # Standard username/password authentication
-                conn_params['password'] = session['db_password']
-            else:
-                raise Exception("Missing Snowflake authentication. Provide either password or use SSO.")
-            
-            logger.info(f"Connecting to Snowflake with authenticator: {conn_params.get('authenticator', 'password')}")
-            connection = snowflake.connector.connect(**conn_params)
-            return connection
         
-        else:
-            raise Exception(f"Unsupported database type: {db_type}")
-            
+        return connection
     except Exception as error:
         logger.error(f"Database connection error: {error}")
         raise
 
+def release_db_connection(connection, discard: bool = False):
+    """
+    Return a connection obtained from get_db_connection() to its pool.
+    
+    Args:
+        connection: Connection to return
+        discard: Close the connection instead of reusing it (e.g. after a network error)
+    """
+    _pool_manager.release(connection, discard=discard)
+
+def record_login_timing(login_connect_ms: float):
+    """Remember the login handshake time so the first request can log what the warm connection saved"""
+    session['login_connect_ms'] = round(login_connect_ms, 1)
+    session['first_query_pending'] = True
+
+def adopt_session_connection(connection) -> bool:
+    """
+    Hand a connection opened at login to the current session's pool so the next
+    request reuses it. Call after the session credentials have been stored.
+    
+    Returns:
+        bool: True if the pool kept the connection
+    """
+    db_type, connect_kwargs, interactive = get_session_connect_params()
+    pool_key = get_session_pool_key(db_type, connect_kwargs, interactive)
+    return _pool_manager.adopt(
+        pool_key,
+        lambda: create_connection_pool(db_type, connect_kwargs, interactive),
+        connection
+    )
+
 def get_db_type():
     """Get the current database type from session"""
     return session.get('db_type', 'oracle')
@@ -348,7 +538,102 @@ def parse_table_input(table_input: str) -> tuple:
         logger.warning(f"Invalid table name format: {table_input}. Treating as table name only.")
         return None, None, table_input.upper()
 
-def get_table_count(cursor, table_name: str, schema: str = None, catalog_or_db: str = None) -> Dict[str, Any]:
+def choose_count_method(count_mode: str, estimate: Dict[str, Any] = None) -> str:
+    """
+    Decide how to count a table for a count_mode: 'exact', 'estimated' or 'sampled'.
+    
+    exact always scans; sampled always samples; estimated uses statistics and
+    samples only when there are none; auto uses fresh statistics at or above
+    COUNT_AUTO_EXACT_MAX_ROWS, samples when statistics are missing or stale,
+    and scans small tables.
+    """
+    if count_mode in ('exact', 'sampled'):
+        return count_mode
+    if count_mode == 'estimated':
+        return 'estimated' if estimate is not None else 'sampled'
+    if count_mode == 'auto':
+        if estimate is None or estimate.get('stale'):
+            return 'sampled'
+        return 'estimated' if (estimate.get('row_count') or 0) >= COUNT_AUTO_EXACT_MAX_ROWS else 'exact'
+    return 'exact'
+
+def make_count_info(table_name: str, schema: str = None, catalog_or_db: str = None,
+                    row_count: int = None, estimate: Dict[str, Any] = None) -> Dict[str, Any]:
+    """Build the count dict returned by get_table_count() for an exact count, a statistics estimate or a sample"""
+    count_info = {
+        'table_name': table_name,
+        'schema': schema,
+        'catalog_or_db': catalog_or_db,
+        'owner': schema,  # For backward compatibility
+        'row_count': row_count,
+        'count_type': 'exact'
+    }
+    if estimate is not None:
+        count_info.update(estimate)
+    return count_info
+
+def count_interval(count_info: Dict[str, Any]) -> List[int]:
+    """[ci_low, ci_high] of a sampled count, None for exact and estimated counts"""
+    if count_info.get('count_type') != 'sampled':
+        return None
+    return [count_info.get('ci_low'), count_info.get('ci_high')]
+
+def row_counts_differ(source_count: Dict[str, Any], target_count: Dict[str, Any]) -> bool:
+    """Compare two count dicts; sampled counts only differ when their confidence intervals do not overlap"""
+    source_rows = source_count.get('row_count')
+    target_rows = target_count.get('row_count')
+    if source_rows == target_rows:
+        return False
+    source_range = count_interval(source_count) or [source_rows, source_rows]
+    target_range = count_interval(target_count) or [target_rows, target_rows]
+    if None in source_range + target_range:
+        return True
+    return source_range[1] < target_range[0] or target_range[1] < source_range[0]
+
+def sample_table_count(cursor, db_type: str, full_table_name: str, estimate: Dict[str, Any] = None,
+                       sample_percent: float = None) -> Dict[str, Any]:
+    """
+    Estimate a row count from a table sample (see sampling.py).
+    
+    The rate is sample_percent when given, otherwise sized from the (possibly
+    stale) statistics to read about SAMPLE_TARGET_ROWS rows.
+    
+    Returns:
+        sampled_row_count() result, or None when the table is small enough to count exactly
+    """
+    percent = sample_percent or choose_sample_percent(estimate.get('row_count') if estimate else None,
+                                                      SAMPLE_TARGET_ROWS, SAMPLE_DEFAULT_PERCENT)
+    if percent >= 100:
+        return None
+    return sampled_row_count(cursor, db_type, full_table_name, percent, SAMPLE_CONFIDENCE)
+
+def count_table_rows(cursor, db_type: str, key: tuple, full_table_name: str, default_database: str = None,
+                     count_mode: str = 'exact', sample_percent: float = None, memo: Dict = None) -> Dict[str, Any]:
+    """
+    Count one (catalog_or_db, schema, table_name) with the method count_mode selects.
+    
+    In auto mode a sample whose upper bound is below COUNT_AUTO_EXACT_MAX_ROWS is
+    followed by an exact count, since scanning such a table is cheap.
+    """
+    catalog_or_db, schema, table_name = key
+    
+    estimate = None
+    if count_mode != 'exact' and not (count_mode == 'sampled' and sample_percent):
+        estimate = fetch_estimated_counts(cursor, db_type, [key], default_database, {key: full_table_name}, memo).get(key)
+    
+    method = choose_count_method(count_mode, estimate)
+    if method == 'estimated':
+        return make_count_info(table_name, schema, catalog_or_db, estimate=estimate)
+    if method == 'sampled':
+        sampled = sample_table_count(cursor, db_type, full_table_name, estimate, sample_percent)
+        if sampled is not None and not (count_mode == 'auto' and sampled['ci_high'] < COUNT_AUTO_EXACT_MAX_ROWS):
+            return make_count_info(table_name, schema, catalog_or_db, estimate=sampled)
+    
+    cursor.execute(f"SELECT COUNT(*) FROM {full_table_name}")
+    return make_count_info(table_name, schema, catalog_or_db, row_count=cursor.fetchone()[0])
+
+def get_table_count(cursor, table_name: str, schema: str = None, catalog_or_db: str = None,
+                    count_mode: str = 'exact', sample_percent: float = None) -> Dict[str, Any]:
     """
     Get row count for a table.
     
@@ -357,25 +642,22 @@ def get_table_count(cursor, table_name: str, schema: str = None, catalog_or_db:
         table_name: Table name
         schema: Schema/owner name (optional)
         catalog_or_db: Catalog (Databricks) or Database (Snowflake) name (optional)
+        count_mode: 'exact' (SELECT COUNT(*)), 'estimated' (optimizer statistics),
+                    'sampled' (SAMPLE / TABLESAMPLE with a confidence interval)
+                    or 'auto' (see choose_count_method)
+        sample_percent: Fixed sample rate for sampled counts (optional, sized from statistics otherwise)
     
     Returns:
-        Dict with table_name, schema, catalog_or_db, row_count, and optional error
+        Dict with table_name, schema, catalog_or_db, row_count, count_type and optional error.
+        Estimated counts also carry count_source, stats_as_of, stats_age_seconds and stale;
+        sampled counts carry sample_percent, sampled_rows, confidence_level, ci_low and ci_high.
     """
     try:
         db_type = get_db_type()
         full_table_name = build_full_table_name(table_name, schema, catalog_or_db, db_type)
         
-        query = f"SELECT COUNT(*) FROM {full_table_name}"
-        cursor.execute(query)
-        count = cursor.fetchone()[0]
-        
-        return {
-            'table_name': table_name,
-            'schema': schema,
-            'catalog_or_db': catalog_or_db,
-            'owner': schema,  # For backward compatibility
-            'row_count': count
-        }
+        return count_table_rows(cursor, db_type, (catalog_or_db, schema, table_name), full_table_name,
+                                session.get('db_database'), count_mode, sample_percent, request_metadata_memo())
     except Exception as error:
         logger.error(f"Error getting count for {full_table_name if 'full_table_name' in locals() else table_name}: {error}")
         return {
@@ -387,6 +669,18 @@ def get_table_count(cursor, table_name: str, schema: str = None, catalog_or_db:
             'error': str(error)
         }
 
+def get_dual_table_count(cursor, db_type: str, table_name: str, schema: str = None,
+                         count_mode: str = 'exact', sample_percent: float = None) -> Dict[str, Any]:
+    """
+    Row count on a dual-login connection, where db_type comes from the connection
+    rather than the session. Same count_mode semantics and result as get_table_count().
+    """
+    full_name = f"{schema + '.' if schema else ''}{table_name}"
+    key = (None, schema.upper() if schema else None, table_name.upper())
+    count_info = count_table_rows(cursor, db_type, key, full_name, None, count_mode, sample_percent)
+    count_info.update({'table_name': table_name, 'schema': schema, 'owner': schema})
+    return count_info
+
 def build_full_table_name(table_name: str, schema: str = None, catalog_or_db: str = None, db_type: str = None) -> str:
     """
     Build fully qualified table name based on database type.
@@ -438,6 +732,31 @@ def build_full_table_name(table_name: str, schema: str = None, catalog_or_db: st
             return f"{schema}.{table_name}"
         return table_name
 
+def request_metadata_memo() -> Dict:
+    """
+    Per-request memo for databricks_metadata and snowflake_metadata, so the
+    probes of a request share one DESCRIBE TABLE EXTENDED per Databricks table
+    and one SHOW ... IN SCHEMA per Snowflake schema.
+    """
+    if 'metadata_memo' not in g:
+        g.metadata_memo = {}
+    return g.metadata_memo
+
+def snowflake_schema_probe(cursor, category: str, table_name: str, schema: str = None, catalog_or_db: str = None):
+    """
+    Probe result ('structure', 'indexes', 'primary_key' or 'foreign_keys') from the
+    request's SHOW ... IN SCHEMA index, or None to fall back to INFORMATION_SCHEMA
+    (unqualified table, or the SHOW failed or was truncated).
+    """
+    if not schema:
+        return None
+    try:
+        metadata = schema_metadata(catalog_or_db or session.get('db_database'), schema, request_metadata_memo())
+        return getattr(metadata, category)(cursor, table_name)
+    except Exception as error:
+        logger.debug(f"SHOW metadata unavailable for {schema}.{table_name}, using INFORMATION_SCHEMA: {error}")
+        return None
+
 def get_table_structure(cursor, table_name: str, schema: str = None, catalog_or_db: str = None) -> List[Dict[str, Any]]:
     """Get table structure (columns) - Multi-database support"""
     try:
@@ -482,27 +801,26 @@ def get_table_structure(cursor, table_name: str, schema: str = None, catalog_or_
                 })
         
         elif db_type == 'databricks':
-            # Databricks query using DESCRIBE TABLE
+            # Databricks - columns from the shared DESCRIBE TABLE EXTENDED (partition section excluded)
             full_table = build_full_table_name(table_name, schema, catalog_or_db, db_type)
-            query = f"DESCRIBE TABLE {full_table}"
-            
-            cursor.execute(query)
-            columns = cursor.fetchall()
+            columns = describe_table(cursor, full_table, request_metadata_memo())['columns']
             
             for col in columns:
-                # Databricks DESCRIBE returns: col_name, data_type, comment
-                if col[0] and not col[0].startswith('#'):  # Skip partition info and comments
-                    structure.append({
-                        'column_name': col[0],
-                        'data_type': col[1],
-                        'data_length': None,
-                        'data_precision': None,
-                        'data_scale': None,
-                        'nullable': 'Y',  # Databricks doesn't expose this easily
-                        'default_value': None
-                    })
+                structure.append({
+                    'column_name': col['column_name'],
+                    'data_type': col['data_type'],
+                    'data_length': None,
+                    'data_precision': None,
+                    'data_scale': None,
+                    'nullable': 'Y',  # Databricks doesn't expose this easily
+                    'default_value': None
+                })
         
         elif db_type == 'snowflake':
+            shown = snowflake_schema_probe(cursor, 'structure', table_name, schema, catalog_or_db)
+            if shown is not None:
+                return shown
+            
             # Snowflake query using INFORMATION_SCHEMA
             # Qualify INFORMATION_SCHEMA with database name to avoid "no current database" error
             db_qualifier = catalog_or_db if catalog_or_db else session.get('db_database')
@@ -630,6 +948,10 @@ def get_table_indexes(cursor, table_name: str, schema: str = None, catalog_or_db
         elif db_type == 'snowflake':
             # Snowflake doesn't have traditional indexes, but has clustering keys
             # We can show table constraints instead
+            shown = snowflake_schema_probe(cursor, 'indexes', table_name, schema, catalog_or_db)
+            if shown is not None:
+                return shown
+            
             # Qualify INFORMATION_SCHEMA with database name to avoid "no current database" error
             db_qualifier = catalog_or_db if catalog_or_db else session.get('db_database')
             
@@ -682,68 +1004,34 @@ def get_table_indexes(cursor, table_name: str, schema: str = None, catalog_or_db
         return []
 
 def get_table_partitions(cursor, table_name: str, schema: str = None, catalog_or_db: str = None) -> List[Dict[str, Any]]:
-    """Get table partition information (Oracle only - Databricks/Snowflake use different partitioning)"""
+    """
+    Get table partition information (Oracle partition summary and first partitions,
+    Databricks partition/clustering columns)
+    """
     try:
         db_type = get_db_type()
         
-        # Partitions are primarily an Oracle feature in this context
+        if db_type == 'databricks':
+            # Partition and liquid clustering columns come with the shared DESCRIBE TABLE EXTENDED
+            full_table = build_full_table_name(table_name, schema, catalog_or_db, db_type)
+            info = describe_table(cursor, full_table, request_metadata_memo())
+            if not info['partition_columns'] and not info['clustering_columns']:
+                return []
+            return [{
+                'partitioning_type': 'COLUMNS' if info['partition_columns'] else 'CLUSTER BY',
+                'subpartitioning_type': None,
+                'partition_count': None,
+                'partition_columns': info['partition_columns'],
+                'clustering_columns': info['clustering_columns'],
+                'partitions': []
+            }]
+        
+        # Snowflake micro-partitions are not user-defined
         if db_type != 'oracle':
             return []
         
-        check_query = """
-            SELECT PARTITIONING_TYPE, SUBPARTITIONING_TYPE, PARTITION_COUNT
-            FROM ALL_PART_TABLES
-            WHERE TABLE_NAME = :table_name
-        """
-        
-        params = {'table_name': table_name.upper()}
-        
-        if schema:
-            check_query += " AND OWNER = :owner"
-            params['owner'] = schema.upper()
-        
-        cursor.execute(check_query, params)
-        partition_info = cursor.fetchone()
-        
-        if not partition_info:
-            return []
-        
-        detail_query = """
-            SELECT 
-                PARTITION_NAME,
-                HIGH_VALUE,
-                PARTITION_POSITION,
-                TABLESPACE_NAME,
-                NUM_ROWS
-            FROM ALL_TAB_PARTITIONS
-            WHERE TABLE_NAME = :table_name
-        """
-        
-        if schema:
-            detail_query += " AND TABLE_OWNER = :owner"
-        
-        detail_query += " ORDER BY PARTITION_POSITION"
-        
-        cursor.execute(detail_query, params)
-        partitions = cursor.fetchall()
-        
-        partition_list = [{
-            'partitioning_type': partition_info[0],
-            'subpartitioning_type': partition_info[1],
-            'partition_count': partition_info[2],
-            'partitions': []
-        }]
-        
-        for part in partitions:
-            partition_list[0]['partitions'].append({
-                'partition_name': part[0],
-                'high_value': part[1],
-                'position': part[2],
-                'tablespace': part[3],
-                'num_rows': part[4]
-            })
-        
-        return partition_list
+        # Summary plus the first PARTITION_INLINE_LIMIT partitions; /api/partitions pages through the rest
+        return table_partitions(cursor, table_name, schema)
     except Exception as error:
         full_name = build_full_table_name(table_name, schema, catalog_or_db, db_type)
         logger.error(f"Error getting partitions for {full_name}: {error}")
@@ -784,25 +1072,25 @@ def get_primary_key(cursor, table_name: str, schema: str = None, catalog_or_db:
                 }
         
         elif db_type == 'databricks':
-            # Databricks - use DESCRIBE TABLE EXTENDED
+            # Databricks - "# Constraints" section of the shared DESCRIBE TABLE EXTENDED (Unity Catalog)
             try:
                 full_table = build_full_table_name(table_name, schema, catalog_or_db, db_type)
-                query = f"DESCRIBE TABLE EXTENDED {full_table}"
-                cursor.execute(query)
-                rows = cursor.fetchall()
+                primary_key = describe_table(cursor, full_table, request_metadata_memo())['primary_key']
                 
-                # Look for primary key in table details
-                for row in rows:
-                    if row[0] and 'Primary Key' in str(row[1]):
-                        return {
-                            'constraint_name': 'PK_' + table_name,
-                            'columns': str(row[2]) if len(row) > 2 else 'N/A',
-                            'status': 'ENABLED'
-                        }
+                if primary_key:
+                    return {
+                        'constraint_name': primary_key['constraint_name'],
+                        'columns': ', '.join(primary_key['columns']),
+                        'status': 'ENABLED'
+                    }
             except:
                 pass
         
         elif db_type == 'snowflake':
+            shown = snowflake_schema_probe(cursor, 'primary_key', table_name, schema, catalog_or_db)
+            if shown is not None:
+                return shown
+            
             # Snowflake query
             # Qualify INFORMATION_SCHEMA with database name to avoid "no current database" error
             db_qualifier = catalog_or_db if catalog_or_db else session.get('db_database')
@@ -917,11 +1205,26 @@ def get_foreign_keys(cursor, table_name: str, schema: str = None, catalog_or_db:
                 })
         
         elif db_type == 'databricks':
-            # Databricks doesn't have traditional foreign keys
-            # Return empty list
-            pass
+            # Databricks - informational FOREIGN KEY constraints (Unity Catalog) from DESCRIBE TABLE EXTENDED
+            try:
+                full_table = build_full_table_name(table_name, schema, catalog_or_db, db_type)
+                for fk in describe_table(cursor, full_table, request_metadata_memo())['foreign_keys']:
+                    fk_list.append({
+                        'constraint_name': fk['constraint_name'],
+                        'columns': ', '.join(fk['columns']),
+                        'referenced_constraint': None,
+                        'referenced_table': fk['referenced_table'],
+                        'delete_rule': 'NO ACTION',
+                        'status': 'NOT ENFORCED'
+                    })
+            except:
+                pass
         
         elif db_type == 'snowflake':
+            shown = snowflake_schema_probe(cursor, 'foreign_keys', table_name, schema, catalog_or_db)
+            if shown is not None:
+                return shown
+            
             # Snowflake query for foreign keys
             # Qualify INFORMATION_SCHEMA with database name to avoid "no current database" error
             db_qualifier = catalog_or_db if catalog_or_db else session.get('db_database')
@@ -1015,22 +1318,22 @@ def get_last_analyzed(cursor, table_name: str, schema: str = None, catalog_or_db
                 }
         
         elif db_type == 'databricks':
-            # Databricks - use table statistics
+            # Databricks - ANALYZE TABLE statistics from the shared DESCRIBE TABLE EXTENDED;
+            # DESCRIBE DETAIL runs only for tables without statistics, to report their file count
             try:
                 full_table = build_full_table_name(table_name, schema, catalog_or_db, db_type)
-                query = f"DESCRIBE DETAIL {full_table}"
-                cursor.execute(query)
-                details = cursor.fetchone()
+                memo = request_metadata_memo()
+                statistics = describe_table(cursor, full_table, memo)['statistics'] or {}
+                detail = describe_detail(cursor, full_table, memo) if not statistics else {}
                 
-                if details:
-                    return {
-                        'last_analyzed': 'N/A',
-                        'num_rows': details[7] if len(details) > 7 else 'N/A',
-                        'blocks': 'N/A',
-                        'avg_row_len': 'N/A',
-                        'sample_size': 'N/A',
-                        'stale_stats': 'N/A'
-                    }
+                return {
+                    'last_analyzed': 'N/A',
+                    'num_rows': statistics.get('rows') if statistics.get('rows') is not None else 'N/A',
+                    'blocks': detail.get('numFiles', 'N/A'),
+                    'avg_row_len': statistics['bytes'] // statistics['rows'] if statistics.get('rows') else 'N/A',
+                    'sample_size': 'N/A',
+                    'stale_stats': 'N/A'
+                }
             except:
                 pass
         
@@ -1130,6 +1433,260 @@ def get_table_grants(cursor, table_name: str, schema: str = None, catalog_or_db:
         logger.error(f"Error getting grants for {full_name}: {error}")
         return []
 
+# Per-table metadata probes, in /api/analyze response order
+TABLE_PROBES = (
+    ('structure', get_table_structure),
+    ('indexes', get_table_indexes),
+    ('partitions', get_table_partitions),
+    ('primary_key', get_primary_key),
+    ('foreign_keys', get_foreign_keys),
+    ('last_analyzed', get_last_analyzed),
+    ('grants', get_table_grants)
+)
+
+# Sections an /api/analyze request can ask for ("sections" field mask), all by default
+ANALYZE_SECTIONS = ('count',) + tuple(category for category, _ in TABLE_PROBES)
+
+# Probes whose result only changes when the table version changes. Oracle's LAST_DDL_TIME ignores
+# DML and statistics, so counts and last_analyzed are cached only where the version tracks writes.
+CACHEABLE_PROBES = {
+    'oracle': {'structure', 'indexes', 'partitions', 'primary_key', 'foreign_keys', 'grants'},
+    'snowflake': {'count', 'structure', 'indexes', 'partitions', 'primary_key', 'foreign_keys', 'last_analyzed'},
+    'databricks': {'count', 'structure', 'indexes', 'partitions', 'primary_key', 'foreign_keys', 'last_analyzed'}
+}
+
+_metadata_cache = MetadataCache(
+    max_entries=METADATA_CACHE_MAX_ENTRIES,
+    max_bytes=METADATA_CACHE_MAX_BYTES,
+    ttl=METADATA_CACHE_TTL
+)
+
+def metadata_cache_fingerprint() -> str:
+    """Cache namespace for the current session's credentials (what the user can see depends on them)"""
+    db_type, connect_kwargs, _ = get_session_connect_params()
+    return credential_fingerprint(db_type, connect_kwargs)
+
+def read_table_versions(cursor, targets: List[tuple]) -> Dict[tuple, str]:
+    """Table versions for (catalog_or_db, schema, table_name) targets, one validity query per chunk"""
+    db_type = get_db_type()
+    full_names = {key: build_full_table_name(key[2], key[1], key[0], db_type) for key in targets}
+    return fetch_ddl_versions(cursor, db_type, targets, session.get('db_database'), full_names, request_metadata_memo())
+
+def cacheable_probes(count_mode: str = 'exact', sections: tuple = ANALYZE_SECTIONS) -> set:
+    """Cacheable probes for the session's database among the requested sections; only exact counts are cached"""
+    probes = set(CACHEABLE_PROBES.get(get_db_type(), ())) & set(sections)
+    if count_mode != 'exact':
+        probes.discard('count')
+    return probes
+
+def load_cached_metadata(targets: List[tuple], versions: Dict[tuple, str], count_mode: str = 'exact',
+                         sections: tuple = ANALYZE_SECTIONS) -> Dict[str, Dict[tuple, Any]]:
+    """
+    Look up cached probe results for unchanged tables.
+    
+    Returns:
+        dict: category -> {(catalog_or_db, schema, table_name): value}, same shape as fetch_catalog_batch()
+    """
+    fingerprint = metadata_cache_fingerprint()
+    cached = {}
+    for key in targets:
+        if key not in versions:
+            continue
+        for category in cacheable_probes(count_mode, sections):
+            hit, value = _metadata_cache.get((fingerprint,) + key + (category,), versions[key])
+            if hit:
+                cached.setdefault(category, {})[key] = value
+    return cached
+
+def store_cached_metadata(results: List[Dict[str, Any]], versions: Dict[tuple, str], count_mode: str = 'exact'):
+    """Cache the probe results of analyzed tables at the version read before probing"""
+    fingerprint = metadata_cache_fingerprint()
+    for table_info in results:
+        key = (table_info['catalog_or_db'], table_info['schema'], table_info['table_name'])
+        if key not in versions:
+            continue
+        for category in cacheable_probes(count_mode):
+            if category not in table_info or category in table_info.get('timed_out', ()):
+                continue
+            value = table_info[category]
+            if category == 'count' and (not value or value.get('error') or value.get('count_type') != 'exact'):
+                continue
+            _metadata_cache.put((fingerprint,) + key + (category,), versions[key], value)
+
+def cached_table_probe(cursor, category: str, fetch, table_name: str, schema: str = None,
+                       catalog_or_db: str = None, versions: Dict[tuple, str] = None):
+    """
+    Run one get_table_* probe through the metadata cache.
+    
+    Args:
+        cursor: Database cursor
+        category: Probe name ('structure', 'indexes', 'count', ...)
+        fetch: The get_table_* function to call on a miss
+        table_name, schema, catalog_or_db: Table to probe
+        versions: Result of read_table_versions(); tables without a version bypass the cache
+    """
+    key = (catalog_or_db, schema, table_name)
+    if not versions or key not in versions or category not in CACHEABLE_PROBES.get(get_db_type(), ()):
+        return fetch(cursor, table_name, schema, catalog_or_db)
+    
+    cache_key = (metadata_cache_fingerprint(),) + key + (category,)
+    hit, value = _metadata_cache.get(cache_key, versions[key])
+    if hit:
+        return value
+    
+    value = fetch(cursor, table_name, schema, catalog_or_db)
+    if not (category == 'count' and (value.get('error') or value.get('count_type') != 'exact')):
+        _metadata_cache.put(cache_key, versions[key], value)
+    return value
+
+def table_needs_queries(table_name: str, schema: str = None, catalog_or_db: str = None,
+                        batched: Dict[str, Any] = None, counts: Dict[str, int] = None,
+                        sections: tuple = ANALYZE_SECTIONS) -> bool:
+    """True if some requested metadata for the table was not covered by the batched catalog queries"""
+    key = (catalog_or_db, schema, table_name)
+    if 'count' in sections and key not in (batched or {}).get('count', {}) \
+            and build_full_table_name(table_name, schema, catalog_or_db) not in (counts or {}):
+        return True
+    return any(key not in (batched or {}).get(category, {}) for category, _ in TABLE_PROBES if category in sections)
+
+def analyze_table_metadata(cursor, table_name: str, schema: str = None, catalog_or_db: str = None,
+                           batched: Dict[str, Any] = None, counts: Dict[str, int] = None,
+                           count_mode: str = 'exact', sections: tuple = ANALYZE_SECTIONS,
+                           timeouts: ProbeTimeout = None) -> Dict[str, Any]:
+    """
+    Build the /api/analyze result for one table.
+    
+    Args:
+        cursor: Database cursor (only used for metadata missing from batched/counts)
+        table_name: Table name
+        schema: Schema/owner name (optional)
+        catalog_or_db: Catalog (Databricks) or Database (Snowflake) name (optional)
+        batched: Results of fetch_catalog_batch() and/or load_cached_metadata() (optional)
+        counts: Results of fetch_row_counts() (optional)
+        count_mode: Passed to get_table_count() when the count was not batched
+        sections: Sections to include (default: all of ANALYZE_SECTIONS); the others are not queried
+        timeouts: ProbeTimeout of the cursor's connection (optional, no limits without it)
+    
+    Returns:
+        Dict with table_name, schema, catalog_or_db and the requested sections
+        (count, structure, indexes, partitions, primary_key, foreign_keys,
+        last_analyzed, grants), plus "timed_out" listing sections cut off by their limit
+    """
+    batched = batched or {}
+    counts = counts or {}
+    key = (catalog_or_db, schema, table_name)
+    
+    # Build full name for logging
+    db_type = get_db_type()
+    full_name = build_full_table_name(table_name, schema, catalog_or_db, db_type)
+    logger.info(f"Analyzing table: {full_name} (DB: {db_type})")
+    
+    table_info = {
+        'table_name': table_name,
+        'schema': schema,
+        'catalog_or_db': catalog_or_db
+    }
+    
+    timeouts = timeouts or ProbeTimeout(None, db_type)
+    timed_out = []
+    
+    if 'count' in sections:
+        if key in batched.get('count', {}):
+            table_info['count'] = batched['count'][key]
+        elif full_name in counts:
+            table_info['count'] = make_count_info(table_name, schema, catalog_or_db, row_count=counts[full_name])
+        else:
+            with timeouts.probe(cursor, COUNT_TIMEOUT_SECONDS) as clock:
+                table_info['count'] = get_table_count(clock.cursor, table_name, schema, catalog_or_db, count_mode)
+            if clock.timed_out:
+                table_info['count']['timed_out'] = True
+                timed_out.append('count')
+    
+    for category, fetch in TABLE_PROBES:
+        if category not in sections:
+            continue
+        if key in batched.get(category, {}):
+            table_info[category] = batched[category][key]
+        else:
+            with timeouts.probe(cursor) as clock:
+                table_info[category] = fetch(clock.cursor, table_name, schema, catalog_or_db)
+            if clock.timed_out:
+                timed_out.append(category)
+    
+    if timed_out:
+        logger.warning(f"Timed out probing {full_name}: {', '.join(timed_out)}")
+        table_info['timed_out'] = timed_out
+    
+    return table_info
+
+def analyze_table_versioned(cursor, table_name: str, schema: str = None, catalog_or_db: str = None,
+                            batched: Dict[str, Any] = None, counts: Dict[str, int] = None,
+                            count_mode: str = 'exact', sections: tuple = ANALYZE_SECTIONS,
+                            timeouts: ProbeTimeout = None) -> Dict[str, Any]:
+    """
+    analyze_table_metadata() through the metadata cache, reading the table's version on this cursor.
+    
+    Used for Databricks, whose version is one DESCRIBE DETAIL per table: reading it on the
+    worker's connection keeps those statements in the fan-out instead of running them serially first.
+    """
+    key = (catalog_or_db, schema, table_name)
+    versions = read_table_versions(cursor, [key])
+    table_batched = {category: {key: values[key]} for category, values in (batched or {}).items() if key in values}
+    for category, values in load_cached_metadata([key], versions, count_mode, sections).items():
+        table_batched.setdefault(category, {}).update(values)
+    
+    table_info = analyze_table_metadata(cursor, table_name, schema, catalog_or_db, table_batched, counts,
+                                        count_mode, sections, timeouts)
+    if versions:
+        store_cached_metadata([table_info], versions, count_mode)
+    return table_info
+
+def analyze_tables_parallel(targets: List[tuple], batched: Dict[str, Any], counts: Dict[str, int],
+                            workers: int, count_mode: str = 'exact',
+                            sections: tuple = ANALYZE_SECTIONS, versioned: bool = False) -> List[Dict[str, Any]]:
+    """
+    Analyze tables on a bounded thread pool, each task on its own pooled connection.
+    
+    Args:
+        targets: List of (catalog_or_db, schema, table_name)
+        batched: Results of fetch_catalog_batch()
+        counts: Results of fetch_row_counts()
+        workers: Maximum concurrent tables
+        count_mode: Passed to get_table_count() for counts that were not batched
+        sections: Sections to include (see analyze_table_metadata)
+        versioned: Read each table's version and use the metadata cache per task (analyze_table_versioned)
+    
+    Returns:
+        List of table results in the same order as targets
+    """
+    analyze = analyze_table_versioned if versioned else analyze_table_metadata
+    # copy_current_request_context gives every task a fresh g; share this request's memo explicitly
+    memo = request_metadata_memo()
+    
+    def analyze_on_own_connection(target):
+        catalog_or_db, schema, table_name = target
+        g.metadata_memo = memo
+        connection = get_db_connection()
+        timeouts = ProbeTimeout(connection, get_db_type(), PROBE_TIMEOUT_SECONDS)
+        try:
+            with timeouts:
+                cursor = connection.cursor()
+                try:
+                    return analyze(cursor, table_name, schema, catalog_or_db, batched, counts,
+                                   count_mode, sections, timeouts)
+                finally:
+                    cursor.close()
+        finally:
+            release_db_connection(connection, discard=timeouts.timed_out_any)
+    
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='analyze') as executor:
+        # Each task gets its own copy of the request context (session credentials, db_type)
+        futures = [
+            executor.submit(copy_current_request_context(analyze_on_own_connection), target)
+            for target in targets
+        ]
+        return [future.result() for future in futures]
+
 def create_excel_report(data: List[Dict[str, Any]]) -> io.BytesIO:
     """Create Excel report with each table's complete information in a single tab"""
     wb = Workbook()
@@ -1187,7 +1744,7 @@ def create_excel_report(data: List[Dict[str, Any]]) -> io.BytesIO:
         ws.append(["Schema/Owner", owner if owner else 'N/A'])
         ws.append(["Table Name", table['table_name']])
         ws.append(["Full Name", full_table_name])
-        ws.append(["Row Count", table['count'].get('row_count', 'N/A')])
+        ws.append(["Row Count", table.get('count', {}).get('row_count', 'N/A')])
         ws.append(["Column Count", len(table.get('structure', []))])
         ws.append(["Index Count", len(table.get('indexes', []))])
         ws.append(["Partition Count", len(table.get('partitions', []))])
@@ -1323,6 +1880,17 @@ def create_excel_report(data: List[Dict[str, Any]]) -> io.BytesIO:
             ws.append(["Partitioning Type", part_info.get('partitioning_type')])
             ws.append(["Subpartitioning Type", part_info.get('subpartitioning_type', 'None')])
             ws.append(["Partition Count", part_info.get('partition_count')])
+            summary = part_info.get('summary')
+            if summary:
+                ws.append(["Subpartition Count", summary.get('subpartition_count')])
+                ws.append(["First High Value", str(summary.get('first_high_value') or '')[:100]])
+                ws.append(["Last High Value", str(summary.get('last_high_value') or '')[:100]])
+                ws.append(["Total Rows (statistics)", summary.get('total_rows')])
+                ws.append(["Rows per Partition (min / median / max)",
+                           f"{summary.get('min_rows')} / {summary.get('median_rows')} / {summary.get('max_rows')}"])
+                ws.append(["Analyzed / Empty Partitions", f"{summary.get('analyzed_partitions')} / {summary.get('empty_partitions')}"])
+                if part_info.get('next_cursor'):
+                    ws.append(["Partitions Listed", f"First {len(part_info.get('partitions', []))} (see /api/partitions for the rest)"])
             ws.append([])
             
             if part_info.get('partitions'):
@@ -1704,11 +2272,124 @@ def create_comparison_report(differences):
     
     return output
 
+_job_manager = JobManager(
+    JOBS_DB_PATH,
+    max_workers=JOB_WORKERS,
+    max_queued=JOB_MAX_QUEUED,
+    retention_hours=JOB_RETENTION_HOURS
+)
 
-@app.route('/')
-def home():
-    """Root endpoint - show home page"""
-    return render_template('home.html')
+_compare_store = FingerprintStore(COMPARE_STORE_PATH)
+_snapshot_store = SnapshotStore(COMPARE_STORE_PATH)
+
+# Job type -> endpoint it runs; the endpoint's own request body is the job's params
+JOB_TYPES = {
+    'analyze': '/api/analyze',
+    'compare-source-target': '/api/compare-source-target',
+    'compare-query-dual': '/api/compare-query-dual',
+    'compare-schemas': '/api/compare-schemas',
+    'reconcile-dual': '/api/reconcile-dual'
+}
+
+def report_job_progress(done: int, total: int = None, message: str = None):
+    """Report progress of the background job running this request (no-op for ordinary requests)"""
+    report = g.get('job_progress')
+    if report:
+        report(done, total, message)
+
+def read_ndjson_result(response, report) -> tuple:
+    """Collect a streamed whole-schema analysis into one JSON result, reporting progress per table"""
+    result = {'success': True, 'data': [], 'count': 0}
+    total = None
+    for line in response.iter_encoded():
+        for text in line.decode('utf-8').splitlines():
+            if not text.strip():
+                continue
+            item = json.loads(text)
+            if item['type'] == 'start':
+                total = item['total']
+                result.update(schema=item['schema'], pattern=item['pattern'])
+                report(0, total)
+            elif item['type'] == 'table':
+                result['data'].append(item['data'])
+                result['count'] += 1
+                report(result['count'], total)
+            elif item['type'] == 'end':
+                result['elapsed_ms'] = item['elapsed_ms']
+            elif item['type'] == 'error':
+                result.update(success=False, error=item['error'])
+                return result, 500
+    return result, 200
+
+def job_owner() -> str:
+    """Owner key of the caller's jobs, created on their first job (kept apart from the SSO pool's session_id)"""
+    if not session.get('job_owner'):
+        import uuid
+        session['job_owner'] = str(uuid.uuid4())
+    return session['job_owner']
+
+def session_cookie_header() -> str:
+    """Cookie header carrying the caller's cookies with the session as it is now (including changes made by this request)"""
+    name = app.config['SESSION_COOKIE_NAME']
+    cookies = [f"{key}={value}" for key, value in request.cookies.items() if key != name]
+    cookies.append(f"{name}={app.session_interface.get_signing_serializer(app).dumps(dict(session))}")
+    return '; '.join(cookies)
+
+def submit_job(job_type: str, params: Dict[str, Any]) -> str:
+    """
+    Queue params as a request to the job type's endpoint, replayed in the background
+    with the caller's session cookie, so a job does exactly what the synchronous
+    call would (same connections, cache and limits). Only the same session can read it.
+    
+    Returns:
+        Job id (raises JobQueueFullError when the queue is full)
+    """
+    path = JOB_TYPES[job_type]
+    params = {name: value for name, value in params.items() if name != 'async'}
+    owner = job_owner()
+    cookie = session_cookie_header()
+    
+    def run(report):
+        with app.test_request_context(path, method='POST', json=params, headers={'Cookie': cookie}):
+            g.job_progress = report
+            response = app.full_dispatch_request()
+            if response.mimetype == 'application/x-ndjson':
+                g.pop('job_progress')  # progress comes from the stream's lines, not from each chunk
+                return read_ndjson_result(response, report)
+            return response.get_json(silent=True), response.status_code
+    
+    return _job_manager.submit(job_type, run, owner=owner)
+
+def job_accepted(job_id: str, job_type: str):
+    """202 response for a queued job"""
+    return jsonify({
+        'success': True,
+        'job_id': job_id,
+        'type': job_type,
+        'status': 'queued',
+        'status_url': url_for('get_job', job_id=job_id)
+    }), 202
+
+def job_endpoint(job_type: str):
+    """Let an endpoint run as a background job when its request body has "async": true"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            data = request.get_json(silent=True)
+            if isinstance(data, dict) and data.get('async'):
+                try:
+                    return job_accepted(submit_job(job_type, data), job_type)
+                except JobQueueFullError as e:
+                    return jsonify({'success': False, 'error': str(e)}), 503
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@app.route('/')
+def home():
+    """Root endpoint - show home page"""
+    return render_template('home.html')
 
 @app.route('/login')
 def login_page():
@@ -1730,6 +2411,13 @@ def sql_script_generator_page():
     """Serve the SQL Script Generator page"""
     return render_template('sql-script-generator.html')
 
+# Oracle errors that mean the credentials themselves were refused (wrong password, locked or expired account, no CREATE SESSION)
+ORACLE_AUTH_ERRORS = ('ORA-01017', 'ORA-01005', 'ORA-01045', 'ORA-28000', 'ORA-28001', 'DPY-4001')
+
+def is_oracle_auth_error(error: Exception) -> bool:
+    """True if an oracledb error means the login credentials were refused"""
+    return any(code in str(error) for code in ORACLE_AUTH_ERRORS)
+
 @app.route('/api/login', methods=['POST'])
 def login():
     """Login endpoint - validates credentials and creates session for multiple database types"""
@@ -1749,13 +2437,15 @@ def login():
                     'error': 'Username, password, and DSN are required for Oracle'
                 }), 400
             
+            connect_kwargs = {'user': username, 'password': password, 'dsn': dsn}
+            pool_key = credential_fingerprint('oracle', connect_kwargs)
+            
             try:
-                connection = oracledb.connect(
-                    user=username,
-                    password=password,
-                    dsn=dsn
-                )
-                connection.close()
+                # Validate through the session pool so the validated session stays warm
+                connect_started = time.time()
+                pool_existed = _pool_manager.has_pool(pool_key)
+                connection = _pool_manager.acquire(pool_key, lambda: create_connection_pool('oracle', connect_kwargs))
+                login_connect_ms = (time.time() - connect_started) * 1000
                 
                 # Store credentials in session
                 session.permanent = True  # Enable session timeout
@@ -1765,7 +2455,11 @@ def login():
                 session['db_dsn'] = dsn
                 session['logged_in'] = True
                 
-                logger.info(f"Oracle user {username} logged in successfully")
+                # Return the validated connection to the pool instead of closing it
+                release_db_connection(connection)
+                record_login_timing(login_connect_ms)
+                
+                logger.info(f"Oracle user {username} logged in successfully ({login_connect_ms:.0f} ms handshake)")
                 
                 return jsonify({
                     'success': True,
@@ -1775,10 +2469,25 @@ def login():
                 
             except oracledb.Error as error:
                 logger.error(f"Oracle login failed for user {username}: {error}")
+                if not is_oracle_auth_error(error):
+                    # Network trouble or a busy pool: the credentials may be fine and other sessions keep the pool
+                    return jsonify({
+                        'success': False,
+                        'error': f'Could not connect to Oracle: {error}'
+                    }), 503
+                # Don't keep a pool created for credentials that were refused; one other sessions use stays
+                if not pool_existed:
+                    _pool_manager.close_pool(pool_key)
                 return jsonify({
                     'success': False,
                     'error': 'Invalid Oracle credentials or DSN. Please check your inputs.'
                 }), 401
+            except PoolTimeoutError as error:
+                logger.warning(f"Oracle login for user {username} timed out waiting for a pooled connection: {error}")
+                return jsonify({
+                    'success': False,
+                    'error': f'All Oracle connections are busy, try again shortly: {error}'
+                }), 503
         
         # Databricks Login
         elif db_type == 'databricks':
@@ -1815,6 +2524,7 @@ def login():
             
             try:
                 # Try to connect based on authentication method
+                connect_started = time.time()
                 if use_azure_ad:
                     # Azure AD authentication with headless mode
                     import uuid
@@ -1837,11 +2547,8 @@ def login():
                     if 'DATABRICKS_CLI_DO_NOT_REDIRECT' in os.environ:
                         del os.environ['DATABRICKS_CLI_DO_NOT_REDIRECT']
                     
-                    # Cache Azure AD connection to prevent re-authentication
-                    session_id = str(uuid.uuid4())
-                    session['session_id'] = session_id
-                    _connection_cache[session_id] = connection
-                    # Don't close Azure AD connection
+                    # Azure AD pool is scoped to this session to prevent re-authentication
+                    session['session_id'] = str(uuid.uuid4())
                 elif has_token:
                     # Token authentication
                     connection = databricks_sql.connect(
@@ -1850,7 +2557,6 @@ def login():
                         access_token=access_token
                     )
                     auth_method = 'token'
-                    connection.close()
                 else:
                     # Username/password authentication
                     connection = databricks_sql.connect(
@@ -1860,7 +2566,8 @@ def login():
                         password=password
                     )
                     auth_method = 'username/password'
-                    connection.close()
+                
+                login_connect_ms = (time.time() - connect_started) * 1000
                 
                 # Store credentials in session
                 session.permanent = True  # Enable session timeout
@@ -1878,7 +2585,11 @@ def login():
                 
                 session['logged_in'] = True
                 
-                logger.info(f"Databricks user logged in successfully to {server_hostname} using {auth_method}")
+                # Don't close the validated connection - the first request reuses it from the pool
+                adopt_session_connection(connection)
+                record_login_timing(login_connect_ms)
+                
+                logger.info(f"Databricks user logged in successfully to {server_hostname} using {auth_method} ({login_connect_ms:.0f} ms handshake)")
                 
                 return jsonify({
                     'success': True,
@@ -1948,17 +2659,14 @@ def login():
                     conn_params['password'] = password
                     auth_method = 'password'
                 
+                connect_started = time.time()
                 connection = snowflake.connector.connect(**conn_params)
+                login_connect_ms = (time.time() - connect_started) * 1000
                 
-                # Cache SSO connection to prevent re-authentication
+                # SSO pool is scoped to this session to prevent re-authentication
                 if use_sso:
                     import uuid
-                    session_id = str(uuid.uuid4())
-                    session['session_id'] = session_id
-                    _connection_cache[session_id] = connection
-                    # Don't close SSO connection
-                else:
-                    connection.close()
+                    session['session_id'] = str(uuid.uuid4())
                 
                 # Store credentials in session
                 session.permanent = True  # Enable session timeout
@@ -1976,7 +2684,11 @@ def login():
                 
                 session['logged_in'] = True
                 
-                logger.info(f"Snowflake user {username} logged in successfully to {account} using {auth_method}")
+                # Don't close the validated connection - the first request reuses it from the pool
+                adopt_session_connection(connection)
+                record_login_timing(login_connect_ms)
+                
+                logger.info(f"Snowflake user {username} logged in successfully to {account} using {auth_method} ({login_connect_ms:.0f} ms handshake)")
                 
                 return jsonify({
                     'success': True,
@@ -2009,14 +2721,13 @@ def logout():
     """Logout endpoint - clears session"""
     username = session.get('db_user', 'Unknown')
     
-    # Clear cached connection if exists
-    session_id = session.get('session_id')
-    if session_id and session_id in _connection_cache:
-        try:
-            _connection_cache[session_id].close()
-        except:
-            pass
-        del _connection_cache[session_id]
+    # Close the session's SSO/Azure AD pool if exists (credential pools are shared and idle out)
+    try:
+        db_type, connect_kwargs, interactive = get_session_connect_params()
+        if interactive and session.get('session_id'):
+            _pool_manager.close_pool(get_session_pool_key(db_type, connect_kwargs, interactive))
+    except Exception:
+        pass
     
     session.clear()
     logger.info(f"User {username} logged out")
@@ -2027,229 +2738,246 @@ def logout():
 
 
 # Dual database connections storage (for source-target and SQL query compare)
-_dual_connections = {}
+# Idle connections are reaped after DUAL_CONNECTION_IDLE_TTL; LRU eviction keeps within the caps.
+# With DB_BROKER_SOCKET set they are held by the connection broker and shared by all workers.
+if DB_BROKER_SOCKET:
+    _dual_connections = BrokerRegistry(DB_BROKER_SOCKET, DB_BROKER_AUTHKEY.encode())
+    logger.info(f"Dual connections served by connection broker at {DB_BROKER_SOCKET}")
+else:
+    _dual_connections = DualConnectionRegistry(
+        idle_ttl=DUAL_CONNECTION_IDLE_TTL,
+        max_connections=DUAL_CONNECTION_MAX,
+        max_per_user=DUAL_CONNECTION_MAX_PER_USER,
+        connector=lambda db_type, connect_kwargs: open_dual_connection(db_type, connect_kwargs)
+    )
+
+# Background executor for {"async": true} dual logins (SSO can take up to 120 s)
+if DB_BROKER_SOCKET:
+    _dual_login_executor = BrokerAsyncConnector(_dual_connections)
+else:
+    _dual_login_executor = AsyncConnector(_dual_connections, max_workers=DUAL_LOGIN_WORKERS,
+                                          max_queued=DUAL_LOGIN_MAX_QUEUED)
+
+def dual_login_owner() -> str:
+    """Browser-session key for the dual-login per-user cap of logins without a user name (Azure AD)"""
+    if not session.get('dual_owner'):
+        import uuid
+        session['dual_owner'] = str(uuid.uuid4())
+    return session['dual_owner']
+
+def build_dual_connect_params(db_type: str, data: Dict[str, Any]) -> tuple:
+    """
+    Validate a dual-login request and build the driver connect() arguments.
+    
+    Args:
+        db_type: Database type (oracle, databricks, snowflake)
+        data: Request JSON
+    
+    Returns:
+        tuple: (connect_kwargs, entry, auth_method) where entry is the metadata
+               stored alongside the connection in _dual_connections
+    
+    Raises:
+        ValueError: If required fields are missing or the connector is not installed
+    """
+    connection_name = data.get('connection_name', 'source')  # 'source' or 'target'
+    
+    if db_type == 'oracle':
+        username = data.get('username')
+        password = data.get('password')
+        dsn = data.get('dsn')
+        
+        if not username or not password or not dsn:
+            raise ValueError('Username, password, and DSN are required for Oracle')
+        
+        return (
+            {'user': username, 'password': password, 'dsn': dsn},
+            {'db_type': 'oracle', 'connection_name': connection_name, 'username': username},
+            'password'
+        )
+    
+    elif db_type == 'databricks':
+        if not DATABRICKS_AVAILABLE:
+            raise ValueError('Databricks connector not installed')
+        
+        server_hostname = data.get('server_hostname')
+        http_path = data.get('http_path')
+        access_token = data.get('access_token')
+        authenticator = data.get('authenticator')  # 'azuread' for Azure AD
+        
+        # Validate required fields
+        if not server_hostname or not http_path:
+            raise ValueError('Server hostname and HTTP path are required for Databricks')
+        
+        # Check authentication method
+        use_azure_ad = authenticator == 'azuread'
+        has_token = access_token and access_token.strip()
+        
+        if not use_azure_ad and not has_token:
+            raise ValueError('Provide Access Token or use Azure AD authentication')
+        
+        connect_kwargs = {'server_hostname': server_hostname, 'http_path': http_path}
+        if use_azure_ad:
+            connect_kwargs['auth_type'] = 'azure-ad'
+            connect_kwargs['redirect_port'] = 8020
+            auth_method = 'Azure AD'
+        else:
+            connect_kwargs['access_token'] = access_token
+            auth_method = 'token'
+        
+        return (
+            connect_kwargs,
+            {'db_type': 'databricks', 'connection_name': connection_name, 'server_hostname': server_hostname},
+            auth_method
+        )
+    
+    elif db_type == 'snowflake':
+        if not SNOWFLAKE_AVAILABLE:
+            raise ValueError('Snowflake connector not installed')
+        
+        username = data.get('username')
+        password = data.get('password')
+        account = data.get('account')
+        warehouse = data.get('warehouse')
+        database = data.get('database')
+        schema = data.get('schema')
+        authenticator = data.get('authenticator', 'snowflake')  # Default to standard auth
+        
+        # Validate required fields
+        if not username or not account:
+            raise ValueError('Username and account are required for Snowflake')
+        
+        # Check authentication method
+        use_sso = authenticator == 'externalbrowser'
+        
+        if not use_sso and not password:
+            raise ValueError('Password is required for standard authentication. Check "Use SSO" if you login with SSO.')
+        
+        # Build connection parameters
+        conn_params = {
+            'user': username,
+            'account': account
+        }
+        
+        # Add optional parameters
+        if warehouse:
+            conn_params['warehouse'] = warehouse
+        if database:
+            conn_params['database'] = database
+        if schema:
+            conn_params['schema'] = schema
+        
+        # Add authentication
+        if use_sso:
+            conn_params['authenticator'] = 'externalbrowser'
+            conn_params['login_timeout'] = 120  # 2 minutes for browser authentication
+            auth_method = 'SSO (Browser)'
+        else:
+            conn_params['password'] = password
+            auth_method = 'password'
+        
+        return (
+            conn_params,
+            {'db_type': 'snowflake', 'connection_name': connection_name, 'username': username},
+            auth_method
+        )
+    
+    raise ValueError(f'Unsupported database type: {db_type}')
+
+def open_dual_connection(db_type: str, connect_kwargs: Dict[str, Any]):
+    """Open a dual-login connection (handles the Azure AD redirect suppression for Databricks)"""
+    if db_type == 'databricks' and connect_kwargs.get('auth_type') == 'azure-ad':
+        os.environ['DATABRICKS_CLI_DO_NOT_REDIRECT'] = '1'
+        try:
+            return open_db_connection(db_type, connect_kwargs)
+        finally:
+            # Clean up environment variable
+            os.environ.pop('DATABRICKS_CLI_DO_NOT_REDIRECT', None)
+    
+    if db_type == 'snowflake' and connect_kwargs.get('authenticator') == 'externalbrowser':
+        logger.info(f"Attempting Snowflake SSO login for {connect_kwargs['user']} - Browser window should open...")
+    
+    return open_db_connection(db_type, connect_kwargs)
 
 @app.route('/api/dual-login', methods=['POST'])
 def dual_login():
-    """Login endpoint for dual database connections (source and target can be different)"""
+    """
+    Login endpoint for dual database connections (source and target can be different)
+    
+    With {"async": true} the connection is opened on a background executor and the
+    response (202) carries a pending session_id; poll /api/dual-login/status/<session_id>
+    until it reports ready or failed. This keeps the worker free during slow SSO logins
+    and lets source and target connect in parallel.
+    """
     try:
         import uuid
         data = request.get_json()
         db_type = data.get('db_type', 'oracle').lower()
-        connection_name = data.get('connection_name', 'source')  # 'source' or 'target'
+        
+        try:
+            connect_kwargs, entry, auth_method = build_dual_connect_params(db_type, data)
+        except ValueError as error:
+            return jsonify({
+                'success': False,
+                'error': str(error)
+            }), 400
+        
+        # Identifies the environment (not the session), e.g. for the schema compare fingerprints
+        entry['fingerprint'] = credential_fingerprint(db_type, connect_kwargs)
+        # Per-user cap key: Databricks logins carry no user name, so use the token or, for Azure AD, the browser session
+        if db_type == 'databricks':
+            if connect_kwargs.get('access_token'):
+                entry['owner'] = f"token:{entry['fingerprint'][:16]}"
+            else:
+                entry['owner'] = f"azure-ad:{dual_login_owner()}"
         
         # Create unique session ID for this connection
         session_id = str(uuid.uuid4())
+        connection_name = entry['connection_name']
+        display_name = {'oracle': 'Oracle', 'databricks': 'Databricks', 'snowflake': 'Snowflake'}[db_type]
         
-        # Establish connection based on database type
-        if db_type == 'oracle':
-            username = data.get('username')
-            password = data.get('password')
-            dsn = data.get('dsn')
-            
-            if not username or not password or not dsn:
-                return jsonify({
-                    'success': False,
-                    'error': 'Username, password, and DSN are required for Oracle'
-                }), 400
-            
+        if data.get('async'):
             try:
-                import oracledb
-                connection = oracledb.connect(
-                    user=username,
-                    password=password,
-                    dsn=dsn
-                )
-                
-                # Store connection
-                _dual_connections[session_id] = {
-                    'connection': connection,
-                    'db_type': 'oracle',
-                    'connection_name': connection_name,
-                    'username': username
-                }
-                
-                logger.info(f"Dual Oracle connection established: {connection_name} for {username}")
-                
-                return jsonify({
-                    'success': True,
-                    'message': 'Oracle connection successful',
-                    'session_id': session_id,
-                    'db_type': 'oracle'
-                })
-                
-            except Exception as error:
-                logger.error(f"Dual Oracle login failed: {error}")
-                return jsonify({
-                    'success': False,
-                    'error': str(error)
-                }), 401
-        
-        elif db_type == 'databricks':
-            if not DATABRICKS_AVAILABLE:
-                return jsonify({
-                    'success': False,
-                    'error': 'Databricks connector not installed'
-                }), 400
-            
-            server_hostname = data.get('server_hostname')
-            http_path = data.get('http_path')
-            access_token = data.get('access_token')
-            authenticator = data.get('authenticator')  # 'azuread' for Azure AD
+                _dual_login_executor.submit(session_id, db_type, connect_kwargs, entry)
+            except LoginQueueFullError as error:
+                logger.warning(f"Dual {display_name} login refused: {error}")
+                return jsonify({'success': False, 'error': str(error)}), 503
+            logger.info(f"Dual {display_name} connection pending: {connection_name} using {auth_method}")
             
-            # Validate required fields
-            if not server_hostname or not http_path:
-                return jsonify({
-                    'success': False,
-                    'error': 'Server hostname and HTTP path are required for Databricks'
-                }), 400
-            
-            # Check authentication method
-            use_azure_ad = authenticator == 'azuread'
-            has_token = access_token and access_token.strip()
-            
-            if not use_azure_ad and not has_token:
-                return jsonify({
-                    'success': False,
-                    'error': 'Provide Access Token or use Azure AD authentication'
-                }), 400
-            
-            try:
-                # Connect based on authentication method
-                if use_azure_ad:
-                    # Azure AD authentication
-                    import os
-                    os.environ['DATABRICKS_CLI_DO_NOT_REDIRECT'] = '1'
-                    
-                    connection = databricks_sql.connect(
-                        server_hostname=server_hostname,
-                        http_path=http_path,
-                        auth_type='azure-ad',
-                        redirect_port=8020
-                    )
-                    auth_method = 'Azure AD'
-                    
-                    # Clean up environment variable
-                    if 'DATABRICKS_CLI_DO_NOT_REDIRECT' in os.environ:
-                        del os.environ['DATABRICKS_CLI_DO_NOT_REDIRECT']
-                else:
-                    # Token authentication
-                    connection = databricks_sql.connect(
-                        server_hostname=server_hostname,
-                        http_path=http_path,
-                        access_token=access_token
-                    )
-                    auth_method = 'token'
-                
-                _dual_connections[session_id] = {
-                    'connection': connection,
-                    'db_type': 'databricks',
-                    'connection_name': connection_name,
-                    'server_hostname': server_hostname
-                }
-                
-                logger.info(f"Dual Databricks connection established: {connection_name} using {auth_method}")
-                
-                return jsonify({
-                    'success': True,
-                    'message': f'Databricks connection successful ({auth_method})',
-                    'session_id': session_id,
-                    'db_type': 'databricks'
-                })
-                
-            except Exception as error:
-                logger.error(f"Dual Databricks login failed: {error}")
-                return jsonify({
-                    'success': False,
-                    'error': str(error)
-                }), 401
+            return jsonify({
+                'success': True,
+                'status': 'pending',
+                'message': f'{display_name} connection in progress ({auth_method})',
+                'session_id': session_id,
+                'db_type': db_type
+            }), 202
         
-        elif db_type == 'snowflake':
-            if not SNOWFLAKE_AVAILABLE:
-                return jsonify({
-                    'success': False,
-                    'error': 'Snowflake connector not installed'
-                }), 400
-            
-            username = data.get('username')
-            password = data.get('password')
-            account = data.get('account')
-            warehouse = data.get('warehouse')
-            database = data.get('database')
-            schema = data.get('schema')
-            authenticator = data.get('authenticator', 'snowflake')  # Default to standard auth
+        try:
+            # Keep the validated connection for the compare requests that follow
+            entry = _dual_connections.open(session_id, db_type, connect_kwargs, entry)
             
-            # Validate required fields
-            if not username or not account:
-                return jsonify({
-                    'success': False,
-                    'error': 'Username and account are required for Snowflake'
-                }), 400
+            logger.info(f"Dual {display_name} connection established: {connection_name} using {auth_method} ({entry['connect_ms']:.0f} ms handshake)")
             
-            # Check authentication method
-            use_sso = authenticator == 'externalbrowser'
+            return jsonify({
+                'success': True,
+                'message': f'{display_name} connection successful' + ('' if db_type == 'oracle' else f' ({auth_method})'),
+                'session_id': session_id,
+                'db_type': db_type
+            })
             
-            if not use_sso and not password:
-                return jsonify({
-                    'success': False,
-                    'error': 'Password is required for standard authentication. Check "Use SSO" if you login with SSO.'
-                }), 400
+        except RegistryFullError as error:
+            logger.warning(f"Dual {display_name} login refused: {error}")
+            return jsonify({
+                'success': False,
+                'error': f"{error}. Close unused connections or wait for idle ones to expire."
+            }), 429
             
-            try:
-                # Build connection parameters
-                conn_params = {
-                    'user': username,
-                    'account': account
-                }
-                
-                # Add optional parameters
-                if warehouse:
-                    conn_params['warehouse'] = warehouse
-                if database:
-                    conn_params['database'] = database
-                if schema:
-                    conn_params['schema'] = schema
-                
-                # Add authentication
-                if use_sso:
-                    conn_params['authenticator'] = 'externalbrowser'
-                    conn_params['login_timeout'] = 120  # 2 minutes for browser authentication
-                    auth_method = 'SSO (Browser)'
-                    logger.info(f"Attempting Snowflake SSO login for {username} - Browser window should open...")
-                else:
-                    conn_params['password'] = password
-                    auth_method = 'password'
-                
-                connection = snowflake.connector.connect(**conn_params)
-                
-                _dual_connections[session_id] = {
-                    'connection': connection,
-                    'db_type': 'snowflake',
-                    'connection_name': connection_name,
-                    'username': username
-                }
-                
-                logger.info(f"Dual Snowflake connection established: {connection_name} using {auth_method}")
-                
-                return jsonify({
-                    'success': True,
-                    'message': f'Snowflake connection successful ({auth_method})',
-                    'session_id': session_id,
-                    'db_type': 'snowflake'
-                })
-                
-            except Exception as error:
-                logger.error(f"Dual Snowflake login failed: {error}")
-                return jsonify({
-                    'success': False,
-                    'error': str(error)
-                }), 401
-        
-        else:
+        except Exception as error:
+            logger.error(f"Dual {display_name} login failed: {error}")
             return jsonify({
                 'success': False,
-                'error': f'Unsupported database type: {db_type}'
-            }), 400
+                'error': str(error)
+            }), 401
             
     except Exception as e:
         logger.error(f"Error in dual-login: {str(e)}")
@@ -2258,6 +2986,49 @@ def dual_login():
             'error': str(e)
         }), 500
 
+@app.route('/api/dual-login/status/<session_id>', methods=['GET'])
+def dual_login_status(session_id):
+    """Report whether an async dual login is pending, ready or failed"""
+    status = _dual_login_executor.status(session_id)
+    
+    if status is None:
+        return jsonify({
+            'success': False,
+            'status': 'unknown',
+            'error': 'Connection not found or expired'
+        }), 404
+    
+    return jsonify(dict(status, success=status['status'] != 'failed', session_id=session_id))
+
+
+@app.route('/api/dual-logout', methods=['POST'])
+def dual_logout():
+    """Close a dual database connection (source or target) that is no longer needed"""
+    data = request.get_json() or {}
+    session_id = data.get('session_id')
+    
+    if not session_id:
+        return jsonify({'success': False, 'error': 'session_id is required'}), 400
+    
+    closed = _dual_connections.remove(session_id)
+    logger.info(f"Dual connection {session_id} {'closed' if closed else 'already expired'}")
+    
+    return jsonify({
+        'success': True,
+        'closed': closed
+    })
+
+@app.route('/api/dual-connections/status', methods=['GET'])
+def dual_connections_status():
+    """Occupancy of the dual-login connection registry for this worker process (counts only, no user names)"""
+    status = _dual_connections.status()
+    status['users'] = len(status.pop('by_user', {}))
+    return jsonify({
+        'success': True,
+        'pid': os.getpid(),
+        'dual_connections': status
+    })
+
 @app.route('/api/check-auth', methods=['GET'])
 def check_auth():
     """Check if user is authenticated"""
@@ -2315,6 +3086,177 @@ def keepalive():
         'message': 'Not authenticated'
     }), 401
 
+def get_structure_dual(cursor, table: str, schema: str, db_type: str) -> List[Dict[str, Any]]:
+    """Get table structure for dual connection"""
+    structure = []
+    try:
+        if db_type == 'oracle':
+            query = """
+                SELECT 
+                    COLUMN_NAME,
+                    DATA_TYPE,
+                    DATA_LENGTH,
+                    DATA_PRECISION,
+                    DATA_SCALE,
+                    NULLABLE,
+                    DATA_DEFAULT
+                FROM ALL_TAB_COLUMNS
+                WHERE TABLE_NAME = :table_name
+            """
+            params = {'table_name': table.upper()}
+            if schema:
+                query += " AND OWNER = :owner"
+                params['owner'] = schema.upper()
+            query += " ORDER BY COLUMN_ID"
+            
+            cursor.execute(query, params)
+            columns = cursor.fetchall()
+            
+            for col in columns:
+                structure.append({
+                    'column_name': col[0],
+                    'data_type': col[1],
+                    'data_length': col[2],
+                    'data_precision': col[3],
+                    'data_scale': col[4],
+                    'nullable': col[5],
+                    'default_value': col[6]
+                })
+        
+        elif db_type == 'databricks':
+            full_table = f"{schema}.{table}" if schema else table
+            query = f"DESCRIBE TABLE {full_table}"
+            cursor.execute(query)
+            columns = cursor.fetchall()
+            
+            for col in columns:
+                if col[0] and not col[0].startswith('#'):
+                    structure.append({
+                        'column_name': col[0],
+                        'data_type': col[1],
+                        'data_length': None,
+                        'data_precision': None,
+                        'data_scale': None,
+                        'nullable': 'Y',
+                        'default_value': None
+                    })
+        
+        elif db_type == 'snowflake':
+            query = """
+                SELECT 
+                    COLUMN_NAME,
+                    DATA_TYPE,
+                    CHARACTER_MAXIMUM_LENGTH,
+                    NUMERIC_PRECISION,
+                    NUMERIC_SCALE,
+                    IS_NULLABLE,
+                    COLUMN_DEFAULT
+                FROM INFORMATION_SCHEMA.COLUMNS
+                WHERE TABLE_NAME = %s
+            """
+            params = [table.upper()]
+            if schema:
+                query += " AND TABLE_SCHEMA = %s"
+                params.append(schema.upper())
+            query += " ORDER BY ORDINAL_POSITION"
+            
+            cursor.execute(query, params)
+            columns = cursor.fetchall()
+            
+            for col in columns:
+                structure.append({
+                    'column_name': col[0],
+                    'data_type': col[1],
+                    'data_length': col[2],
+                    'data_precision': col[3],
+                    'data_scale': col[4],
+                    'nullable': col[5],
+                    'default_value': col[6]
+                })
+    except Exception as e:
+        logger.error(f"Error getting structure: {e}")
+    
+    return structure
+
+def get_indexes_dual(cursor, table: str, schema: str, db_type: str) -> List[Dict[str, Any]]:
+    """Get index names and types for dual connection (Oracle only; other databases return none)"""
+    if db_type != 'oracle':
+        return []
+    
+    query = """
+        SELECT INDEX_NAME, INDEX_TYPE, UNIQUENESS
+        FROM ALL_INDEXES
+        WHERE TABLE_NAME = :table_name
+    """
+    params = {'table_name': table.upper()}
+    if schema:
+        query += " AND OWNER = :owner"
+        params['owner'] = schema.upper()
+    cursor.execute(query, params)
+    return [{'index_name': row[0], 'index_type': row[1], 'uniqueness': row[2]} for row in cursor.fetchall()]
+
+def get_primary_key_dual(cursor, table: str, schema: str, db_type: str) -> Dict[str, Any]:
+    """Get primary key name and columns for dual connection (Oracle only; None when there is none)"""
+    if db_type != 'oracle':
+        return None
+    
+    query = """
+        SELECT c.CONSTRAINT_NAME,
+               LISTAGG(cc.COLUMN_NAME, ', ') WITHIN GROUP (ORDER BY cc.POSITION) as COLUMNS
+        FROM ALL_CONSTRAINTS c
+        JOIN ALL_CONS_COLUMNS cc ON c.CONSTRAINT_NAME = cc.CONSTRAINT_NAME AND c.OWNER = cc.OWNER
+        WHERE c.TABLE_NAME = :table_name AND c.CONSTRAINT_TYPE = 'P'
+    """
+    params = {'table_name': table.upper()}
+    if schema:
+        query += " AND c.OWNER = :owner"
+        params['owner'] = schema.upper()
+    query += " GROUP BY c.CONSTRAINT_NAME"
+    
+    cursor.execute(query, params)
+    pk_row = cursor.fetchone()
+    if pk_row:
+        return {'constraint_name': pk_row[0], 'columns': pk_row[1]}
+    return None
+
+def probe_dual_side(connection, db_type: str, table: str, schema: str, options: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Run the enabled compare probes for one side of a dual compare on its own cursor.
+    
+    Index and primary key failures are logged and their key is left out, so the
+    caller skips that comparison; count failures propagate to the caller.
+    """
+    results = {}
+    cursor = connection.cursor()
+    try:
+        if options.get('structure', False):
+            results['structure'] = get_structure_dual(cursor, table, schema, db_type)
+        
+        if options.get('rowCount', False):
+            results['count'] = get_dual_table_count(cursor, db_type, table, schema,
+                                                    options.get('count_mode', 'exact'), options.get('sample_percent'))
+        
+        if options.get('indexes', False):
+            try:
+                results['indexes'] = get_indexes_dual(cursor, table, schema, db_type)
+            except Exception as e:
+                logger.error(f"Error getting indexes of {table}: {e}")
+        
+        if options.get('constraints', False):
+            try:
+                results['primary_key'] = get_primary_key_dual(cursor, table, schema, db_type)
+            except Exception as e:
+                logger.error(f"Error getting primary key of {table}: {e}")
+    finally:
+        cursor.close()
+    return results
+
+def run_side_by_side(first, second) -> list:
+    """Run two zero-argument callables concurrently (one per dual connection) and return both results"""
+    with ThreadPoolExecutor(max_workers=2, thread_name_prefix='compare') as executor:
+        futures = [executor.submit(first), executor.submit(second)]
+        return [future.result() for future in futures]
+
 @app.route('/api/compare-source-target-dual', methods=['POST'])
 def compare_source_target_dual():
     """Compare source and target tables using dual database connections"""
@@ -2333,344 +3275,86 @@ def compare_source_target_dual():
         if target_session not in _dual_connections:
             return jsonify({'success': False, 'error': 'Target connection not found or expired'}), 400
         
-        source_conn = _dual_connections[source_session]['connection']
-        target_conn = _dual_connections[target_session]['connection']
-        source_db_type = _dual_connections[source_session]['db_type']
-        target_db_type = _dual_connections[target_session]['db_type']
-        
-        source_table = source_info.get('table')
-        source_schema = source_info.get('schema')
-        target_table = target_info.get('table')
-        target_schema = target_info.get('schema')
-        
-        if not source_table or not target_table:
-            return jsonify({'success': False, 'error': 'Table names are required'}), 400
-        
-        differences = {
-            'total_count': 0,
-            'structure': [],
-            'row_count': {},
-            'indexes': [],
-            'constraints': []
-        }
-        
-        source_cursor = source_conn.cursor()
-        target_cursor = target_conn.cursor()
-        
-        try:
-            # Helper function to get structure using db-specific cursor
-            def get_structure_dual(cursor, table, schema, db_type):
-                """Get table structure for dual connection"""
-                structure = []
-                try:
-                    if db_type == 'oracle':
-                        query = """
-                            SELECT 
-                                COLUMN_NAME,
-                                DATA_TYPE,
-                                DATA_LENGTH,
-                                DATA_PRECISION,
-                                DATA_SCALE,
-                                NULLABLE,
-                                DATA_DEFAULT
-                            FROM ALL_TAB_COLUMNS
-                            WHERE TABLE_NAME = :table_name
-                        """
-                        params = {'table_name': table.upper()}
-                        if schema:
-                            query += " AND OWNER = :owner"
-                            params['owner'] = schema.upper()
-                        query += " ORDER BY COLUMN_ID"
-                        
-                        cursor.execute(query, params)
-                        columns = cursor.fetchall()
-                        
-                        for col in columns:
-                            structure.append({
-                                'column_name': col[0],
-                                'data_type': col[1],
-                                'data_length': col[2],
-                                'data_precision': col[3],
-                                'data_scale': col[4],
-                                'nullable': col[5],
-                                'default_value': col[6]
-                            })
-                    
-                    elif db_type == 'databricks':
-                        full_table = f"{schema}.{table}" if schema else table
-                        query = f"DESCRIBE TABLE {full_table}"
-                        cursor.execute(query)
-                        columns = cursor.fetchall()
-                        
-                        for col in columns:
-                            if col[0] and not col[0].startswith('#'):
-                                structure.append({
-                                    'column_name': col[0],
-                                    'data_type': col[1],
-                                    'data_length': None,
-                                    'data_precision': None,
-                                    'data_scale': None,
-                                    'nullable': 'Y',
-                                    'default_value': None
-                                })
-                    
-                    elif db_type == 'snowflake':
-                        query = """
-                            SELECT 
-                                COLUMN_NAME,
-                                DATA_TYPE,
-                                CHARACTER_MAXIMUM_LENGTH,
-                                NUMERIC_PRECISION,
-                                NUMERIC_SCALE,
-                                IS_NULLABLE,
-                                COLUMN_DEFAULT
-                            FROM INFORMATION_SCHEMA.COLUMNS
-                            WHERE TABLE_NAME = %s
-                        """
-                        params = [table.upper()]
-                        if schema:
-                            query += " AND TABLE_SCHEMA = %s"
-                            params.append(schema.upper())
-                        query += " ORDER BY ORDINAL_POSITION"
-                        
-                        cursor.execute(query, params)
-                        columns = cursor.fetchall()
-                        
-                        for col in columns:
-                            structure.append({
-                                'column_name': col[0],
-                                'data_type': col[1],
-                                'data_length': col[2],
-                                'data_precision': col[3],
-                                'data_scale': col[4],
-                                'nullable': col[5],
-                                'default_value': col[6]
-                            })
-                except Exception as e:
-                    logger.error(f"Error getting structure: {e}")
-                
-                return structure
+        # Lease both connections so the idle reaper cannot close them mid-compare
+        with _dual_connections.lease(source_session) as source_entry, \
+                _dual_connections.lease(target_session) as target_entry:
+            source_conn = source_entry['connection']
+            target_conn = target_entry['connection']
+            source_db_type = source_entry['db_type']
+            target_db_type = target_entry['db_type']
+            
+            source_table = source_info.get('table')
+            source_schema = source_info.get('schema')
+            target_table = target_info.get('table')
+            target_schema = target_info.get('schema')
+            
+            if not source_table or not target_table:
+                return jsonify({'success': False, 'error': 'Table names are required'}), 400
+            
+            differences = {
+                'total_count': 0,
+                'structure': [],
+                'row_count': {},
+                'indexes': [],
+                'constraints': []
+            }
+            
+            # Each side probes its own database on its own thread, so the compare takes about
+            # as long as the slower side; one connection cannot run two statements at once
+            # (compare session ids: in broker mode every lease hands out its own proxy object)
+            probes_started = time.time()
+            if source_session == target_session:
+                source_results = probe_dual_side(source_conn, source_db_type, source_table, source_schema, options)
+                target_results = probe_dual_side(target_conn, target_db_type, target_table, target_schema, options)
+            else:
+                source_results, target_results = run_side_by_side(
+                    lambda: probe_dual_side(source_conn, source_db_type, source_table, source_schema, options),
+                    lambda: probe_dual_side(target_conn, target_db_type, target_table, target_schema, options)
+                )
+            logger.info(f"Probed {source_table} and {target_table} in {(time.time() - probes_started) * 1000:.0f} ms")
             
             # Compare structure
             if options.get('structure', False):
-                source_structure = get_structure_dual(source_cursor, source_table, source_schema, source_db_type)
-                target_structure = get_structure_dual(target_cursor, target_table, target_schema, target_db_type)
-                
-                source_cols = {col['column_name']: col for col in source_structure}
-                target_cols = {col['column_name']: col for col in target_structure}
-                
-                # Find differences
-                all_columns = set(list(source_cols.keys()) + list(target_cols.keys()))
+                source_structure = source_results['structure']
+                target_structure = target_results['structure']
                 
-                for col_name in all_columns:
-                    if col_name not in source_cols:
-                        differences['structure'].append({
-                            'column_name': col_name,
-                            'diff_type': 'Missing in Source',
-                            'source_value': None,
-                            'target_value': f"{target_cols[col_name]['data_type']}({target_cols[col_name].get('data_length', '')})",
-                            'type': 'added'
-                        })
-                        differences['total_count'] += 1
-                    elif col_name not in target_cols:
-                        differences['structure'].append({
-                            'column_name': col_name,
-                            'diff_type': 'Missing in Target',
-                            'source_value': f"{source_cols[col_name]['data_type']}({source_cols[col_name].get('data_length', '')})",
-                            'target_value': None,
-                            'type': 'removed'
-                        })
-                        differences['total_count'] += 1
-                    else:
-                        # Check if data type or attributes differ
-                        source_col = source_cols[col_name]
-                        target_col = target_cols[col_name]
-                        
-                        if (source_col['data_type'] != target_col['data_type'] or 
-                            source_col.get('data_length') != target_col.get('data_length') or
-                            source_col.get('data_precision') != target_col.get('data_precision') or
-                            source_col.get('nullable') != target_col.get('nullable')):
-                            
-                            differences['structure'].append({
-                                'column_name': col_name,
-                                'diff_type': 'Modified',
-                                'source_value': f"{source_col['data_type']}({source_col.get('data_length', '')}) {source_col.get('nullable', '')}",
-                                'target_value': f"{target_col['data_type']}({target_col.get('data_length', '')}) {target_col.get('nullable', '')}",
-                                'type': 'modified'
-                            })
-                            differences['total_count'] += 1
+                differences['structure'] = diff_structure(source_structure, target_structure)
+                differences['total_count'] += len(differences['structure'])
             
             # Compare row count
             if options.get('rowCount', False):
-                source_count_query = f"SELECT COUNT(*) FROM {source_schema + '.' if source_schema else ''}{source_table}"
-                target_count_query = f"SELECT COUNT(*) FROM {target_schema + '.' if target_schema else ''}{target_table}"
-                
-                source_cursor.execute(source_count_query)
-                source_count = source_cursor.fetchone()[0]
-                
-                target_cursor.execute(target_count_query)
-                target_count = target_cursor.fetchone()[0]
+                source_count_info = source_results['count']
+                target_count_info = target_results['count']
+                source_count = source_count_info['row_count']
+                target_count = target_count_info['row_count']
+                different = row_counts_differ(source_count_info, target_count_info)
                 
                 differences['row_count'] = {
                     'source': source_count,
                     'target': target_count,
-                    'different': source_count != target_count,
-                    'difference': abs(source_count - target_count)
+                    'different': different,
+                    'difference': abs(source_count - target_count) if source_count is not None and target_count is not None else None,
+                    'source_ci': count_interval(source_count_info),
+                    'target_ci': count_interval(target_count_info),
+                    'source_count_type': source_count_info['count_type'],
+                    'target_count_type': target_count_info['count_type'],
+                    'source_stats_age_seconds': source_count_info.get('stats_age_seconds'),
+                    'target_stats_age_seconds': target_count_info.get('stats_age_seconds')
                 }
                 
-                if source_count != target_count:
+                if different:
                     differences['total_count'] += 1
             
             # Compare indexes
-            if options.get('indexes', False):
+            if options.get('indexes', False) and 'indexes' in source_results and 'indexes' in target_results:
                 # Note: This is a simplified comparison - actual implementation would need db-specific queries
-                try:
-                    source_indexes = []
-                    target_indexes = []
-                    
-                    # For Oracle
-                    if source_db_type == 'oracle':
-                        query = """
-                            SELECT INDEX_NAME, INDEX_TYPE, UNIQUENESS
-                            FROM ALL_INDEXES
-                            WHERE TABLE_NAME = :table_name
-                        """
-                        params = {'table_name': source_table.upper()}
-                        if source_schema:
-                            query += " AND OWNER = :owner"
-                            params['owner'] = source_schema.upper()
-                        source_cursor.execute(query, params)
-                        source_indexes = [{'index_name': row[0], 'index_type': row[1], 'uniqueness': row[2]} 
-                                        for row in source_cursor.fetchall()]
-                    
-                    if target_db_type == 'oracle':
-                        query = """
-                            SELECT INDEX_NAME, INDEX_TYPE, UNIQUENESS
-                            FROM ALL_INDEXES
-                            WHERE TABLE_NAME = :table_name
-                        """
-                        params = {'table_name': target_table.upper()}
-                        if target_schema:
-                            query += " AND OWNER = :owner"
-                            params['owner'] = target_schema.upper()
-                        target_cursor.execute(query, params)
-                        target_indexes = [{'index_name': row[0], 'index_type': row[1], 'uniqueness': row[2]} 
-                                        for row in target_cursor.fetchall()]
-                    
-                    source_idx_names = {idx['index_name'] for idx in source_indexes}
-                    target_idx_names = {idx['index_name'] for idx in target_indexes}
-                    
-                    # Missing in target
-                    for idx_name in source_idx_names - target_idx_names:
-                        idx = next((i for i in source_indexes if i['index_name'] == idx_name), None)
-                        if idx:
-                            differences['indexes'].append({
-                                'index_name': idx_name,
-                                'diff_type': idx.get('index_type', 'INDEX'),
-                                'status': 'missing_in_target'
-                            })
-                            differences['total_count'] += 1
-                    
-                    # Missing in source
-                    for idx_name in target_idx_names - source_idx_names:
-                        idx = next((i for i in target_indexes if i['index_name'] == idx_name), None)
-                        if idx:
-                            differences['indexes'].append({
-                                'index_name': idx_name,
-                                'diff_type': idx.get('index_type', 'INDEX'),
-                                'status': 'missing_in_source'
-                            })
-                            differences['total_count'] += 1
-                except Exception as e:
-                    logger.error(f"Error comparing indexes: {e}")
+                differences['indexes'] = diff_indexes(source_results['indexes'], target_results['indexes'])
+                differences['total_count'] += len(differences['indexes'])
             
             # Compare constraints
-            if options.get('constraints', False):
-                try:
-                    # Compare primary keys
-                    source_pk = None
-                    target_pk = None
-                    
-                    # For Oracle source
-                    if source_db_type == 'oracle':
-                        query = """
-                            SELECT c.CONSTRAINT_NAME,
-                                   LISTAGG(cc.COLUMN_NAME, ', ') WITHIN GROUP (ORDER BY cc.POSITION) as COLUMNS
-                            FROM ALL_CONSTRAINTS c
-                            JOIN ALL_CONS_COLUMNS cc ON c.CONSTRAINT_NAME = cc.CONSTRAINT_NAME AND c.OWNER = cc.OWNER
-                            WHERE c.TABLE_NAME = :table_name AND c.CONSTRAINT_TYPE = 'P'
-                        """
-                        params = {'table_name': source_table.upper()}
-                        if source_schema:
-                            query += " AND c.OWNER = :owner"
-                            params['owner'] = source_schema.upper()
-                        query += " GROUP BY c.CONSTRAINT_NAME"
-                        
-                        source_cursor.execute(query, params)
-                        pk_row = source_cursor.fetchone()
-                        if pk_row:
-                            source_pk = {'constraint_name': pk_row[0], 'columns': pk_row[1]}
-                    
-                    # For Oracle target
-                    if target_db_type == 'oracle':
-                        query = """
-                            SELECT c.CONSTRAINT_NAME,
-                                   LISTAGG(cc.COLUMN_NAME, ', ') WITHIN GROUP (ORDER BY cc.POSITION) as COLUMNS
-                            FROM ALL_CONSTRAINTS c
-                            JOIN ALL_CONS_COLUMNS cc ON c.CONSTRAINT_NAME = cc.CONSTRAINT_NAME AND c.OWNER = cc.OWNER
-                            WHERE c.TABLE_NAME = :table_name AND c.CONSTRAINT_TYPE = 'P'
-                        """
-                        params = {'table_name': target_table.upper()}
-                        if target_schema:
-                            query += " AND c.OWNER = :owner"
-                            params['owner'] = target_schema.upper()
-                        query += " GROUP BY c.CONSTRAINT_NAME"
-                        
-                        target_cursor.execute(query, params)
-                        pk_row = target_cursor.fetchone()
-                        if pk_row:
-                            target_pk = {'constraint_name': pk_row[0], 'columns': pk_row[1]}
-                    
-                    # Compare primary keys
-                    has_source_pk = bool(source_pk)
-                    has_target_pk = bool(target_pk)
-                    
-                    if has_source_pk and not has_target_pk:
-                        differences['constraints'].append({
-                            'constraint_name': source_pk['constraint_name'],
-                            'constraint_type': 'PRIMARY KEY',
-                            'columns': source_pk.get('columns', ''),
-                            'source_value': source_pk.get('columns', ''),
-                            'target_value': 'None',
-                            'status': 'missing_in_target'
-                        })
-                        differences['total_count'] += 1
-                    elif not has_source_pk and has_target_pk:
-                        differences['constraints'].append({
-                            'constraint_name': target_pk['constraint_name'],
-                            'constraint_type': 'PRIMARY KEY',
-                            'columns': target_pk.get('columns', ''),
-                            'source_value': 'None',
-                            'target_value': target_pk.get('columns', ''),
-                            'status': 'missing_in_source'
-                        })
-                        differences['total_count'] += 1
-                    elif has_source_pk and has_target_pk:
-                        source_pk_cols = source_pk.get('columns', '').strip()
-                        target_pk_cols = target_pk.get('columns', '').strip()
-                        
-                        if source_pk_cols != target_pk_cols:
-                            differences['constraints'].append({
-                                'constraint_name': f"{source_pk['constraint_name']} / {target_pk['constraint_name']}",
-                                'constraint_type': 'PRIMARY KEY',
-                                'columns': 'Different columns',
-                                'source_value': source_pk_cols,
-                                'target_value': target_pk_cols,
-                                'status': 'modified'
-                            })
-                            differences['total_count'] += 1
-                except Exception as e:
-                    logger.error(f"Error comparing constraints: {e}")
+            if options.get('constraints', False) and 'primary_key' in source_results and 'primary_key' in target_results:
+                differences['constraints'] = diff_constraints(source_results['primary_key'], target_results['primary_key'], [], [])
+                differences['total_count'] += len(differences['constraints'])
             
             return jsonify({
                 'success': True,
@@ -2679,10 +3363,6 @@ def compare_source_target_dual():
                 'differences': differences
             })
             
-        finally:
-            source_cursor.close()
-            target_cursor.close()
-            
     except Exception as e:
         logger.error(f"Error in compare-source-target-dual: {str(e)}")
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -2953,14 +3633,23 @@ def export_comparison():
         return jsonify({'success': False, 'error': str(error)}), 500
 
 @app.route('/api/compare-query-dual', methods=['POST'])
+@job_endpoint('compare-query-dual')
 def compare_query_dual():
-    """Compare SQL query results from two different databases"""
+    """
+    Compare SQL query results from two different databases
+    
+    Without key columns rows are compared by position after fetching both results.
+    With "key_columns": ["ID", ...] both queries are ordered by the key and
+    sort-merged batch by batch (see query_diff.py), so rows match by key and the
+    result sets are never held in memory; "batch_size" and "sample_limit" tune it.
+    """
     try:
         data = request.get_json()
         source_session = data.get('source_session')
         target_session = data.get('target_session')
         source_query = data.get('source_query', '').strip()
         target_query = data.get('target_query', '').strip()
+        key_columns = data.get('key_columns')
         
         if source_session not in _dual_connections:
             return jsonify({'success': False, 'error': 'Source connection not found'}), 400
@@ -2971,185 +3660,255 @@ def compare_query_dual():
         if not source_query or not target_query:
             return jsonify({'success': False, 'error': 'Both queries are required'}), 400
         
-        source_conn = _dual_connections[source_session]['connection']
-        target_conn = _dual_connections[target_session]['connection']
-        
-        source_cursor = source_conn.cursor()
-        target_cursor = target_conn.cursor()
-        
-        try:
-            # Execute source query
-            source_cursor.execute(source_query)
-            source_rows = source_cursor.fetchall()
-            source_cols = [desc[0] for desc in source_cursor.description] if source_cursor.description else []
-            
-            # Execute target query
-            target_cursor.execute(target_query)
-            target_rows = target_cursor.fetchall()
-            target_cols = [desc[0] for desc in target_cursor.description] if target_cursor.description else []
-            
-            # STRICT VALIDATION: Check column structure first
-            column_diffs = []
-            
-            # Check if column counts differ
-            if len(source_cols) != len(target_cols):
-                column_diffs.append({
-                    'type': 'COLUMN_COUNT_MISMATCH',
-                    'message': f'Column count mismatch: Source has {len(source_cols)} columns, Target has {len(target_cols)} columns',
-                    'source_columns': ', '.join(source_cols),
-                    'target_columns': ', '.join(target_cols)
-                })
-            
-            # Check if column names differ
-            source_cols_set = set(source_cols)
-            target_cols_set = set(target_cols)
-            
-            missing_in_target = source_cols_set - target_cols_set
-            missing_in_source = target_cols_set - source_cols_set
-            
-            for col in missing_in_target:
-                column_diffs.append({
-                    'type': 'COLUMN_MISSING_IN_TARGET',
-                    'column_name': col,
-                    'message': f'Column "{col}" exists in source but not in target'
-                })
-            
-            for col in missing_in_source:
-                column_diffs.append({
-                    'type': 'COLUMN_MISSING_IN_SOURCE',
-                    'column_name': col,
-                    'message': f'Column "{col}" exists in target but not in source'
-                })
-            
-            # Check if column order differs (even if same columns)
-            if source_cols_set == target_cols_set and source_cols != target_cols:
-                column_diffs.append({
-                    'type': 'COLUMN_ORDER_DIFF',
-                    'message': 'Columns exist in both but in different order',
-                    'source_order': ', '.join(source_cols),
-                    'target_order': ', '.join(target_cols)
-                })
-            
-            # Convert to dictionaries for data comparison
-            source_data = [dict(zip(source_cols, row)) for row in source_rows]
-            target_data = [dict(zip(target_cols, row)) for row in target_rows]
-            
-            # STRICT VALIDATION: Compare row counts
-            row_count_diff = len(source_data) != len(target_data)
-            
-            # Compare data rows
-            matching_rows = 0
-            row_differences = []
-            rows_only_in_source = []
-            rows_only_in_target = []
-            
-            # Get common columns for data comparison
-            common_cols = list(source_cols_set & target_cols_set)
-            
-            # Compare rows that exist in both
-            max_rows = max(len(source_data), len(target_data))
+        if key_columns:
+            try:
+                key_columns = parse_key_columns(key_columns)
+                batch_size = int(data.get('batch_size') or QUERY_DIFF_BATCH_SIZE)
+                sample_limit = int(data.get('sample_limit') or QUERY_DIFF_SAMPLE_LIMIT)
+            except ValueError as error:
+                return jsonify({'success': False, 'error': str(error)}), 400
+            if batch_size <= 0 or sample_limit < 0:
+                return jsonify({'success': False, 'error': 'batch_size must be positive and sample_limit not negative'}), 400
+        
+        # Lease both connections so the idle reaper cannot close them mid-compare
+        with _dual_connections.lease(source_session) as source_entry, \
+                _dual_connections.lease(target_session) as target_entry:
+            source_conn = source_entry['connection']
+            target_conn = target_entry['connection']
+            
+            source_cursor = source_conn.cursor()
+            target_cursor = target_conn.cursor()
             
-            for i in range(max_rows):
-                if i < len(source_data) and i < len(target_data):
-                    # Both have this row - compare values
-                    s_row = source_data[i]
-                    t_row = target_data[i]
-                    row_match = True
-                    
-                    # Compare all columns (not just common ones)
-                    all_cols = source_cols_set | target_cols_set
-                    
-                    for col in all_cols:
-                        s_val = s_row.get(col, None)
-                        t_val = t_row.get(col, None)
+            try:
+                if key_columns:
+                    execute_ordered(source_cursor, source_query, key_columns, batch_size)
+                    execute_ordered(target_cursor, target_query, key_columns, batch_size)
+                    try:
+                        result = merge_diff(source_cursor, target_cursor, key_columns, batch_size, sample_limit,
+                                            report_job_progress)
+                    except ValueError as error:
+                        return jsonify({'success': False, 'error': str(error)}), 400
+                    return jsonify({'success': True, **result})
+                
+                # Execute source query
+                source_cursor.execute(source_query)
+                source_rows = source_cursor.fetchall()
+                source_cols = [desc[0] for desc in source_cursor.description] if source_cursor.description else []
+                
+                # Execute target query
+                target_cursor.execute(target_query)
+                target_rows = target_cursor.fetchall()
+                target_cols = [desc[0] for desc in target_cursor.description] if target_cursor.description else []
+                
+                # STRICT VALIDATION: Check column structure first
+                column_diffs = column_differences(source_cols, target_cols)
+                source_cols_set = set(source_cols)
+                target_cols_set = set(target_cols)
+                
+                # Convert to dictionaries for data comparison
+                source_data = [dict(zip(source_cols, row)) for row in source_rows]
+                target_data = [dict(zip(target_cols, row)) for row in target_rows]
+                
+                # STRICT VALIDATION: Compare row counts
+                row_count_diff = len(source_data) != len(target_data)
+                
+                # Compare data rows
+                matching_rows = 0
+                row_differences = []
+                rows_only_in_source = []
+                rows_only_in_target = []
+                
+                # Get common columns for data comparison
+                common_cols = list(source_cols_set & target_cols_set)
+                
+                # Compare rows that exist in both
+                max_rows = max(len(source_data), len(target_data))
+                
+                for i in range(max_rows):
+                    if i < len(source_data) and i < len(target_data):
+                        # Both have this row - compare values
+                        s_row = source_data[i]
+                        t_row = target_data[i]
+                        row_match = True
                         
-                        # Handle None values properly
-                        if s_val is None and t_val is None:
-                            continue
+                        # Compare all columns (not just common ones)
+                        all_cols = source_cols_set | target_cols_set
                         
-                        # Convert to string for comparison (handles different types)
-                        s_str = str(s_val) if s_val is not None else 'NULL'
-                        t_str = str(t_val) if t_val is not None else 'NULL'
+                        for col in all_cols:
+                            s_val = s_row.get(col, None)
+                            t_val = t_row.get(col, None)
+                            
+                            # Handle None values properly
+                            if s_val is None and t_val is None:
+                                continue
+                            
+                            # Convert to string for comparison (handles different types)
+                            s_str = str(s_val) if s_val is not None else 'NULL'
+                            t_str = str(t_val) if t_val is not None else 'NULL'
+                            
+                            if col not in s_row:
+                                # Column doesn't exist in source
+                                row_match = False
+                                row_differences.append({
+                                    'row_number': i + 1,
+                                    'column_name': col,
+                                    'source_value': 'COLUMN_NOT_IN_SOURCE',
+                                    'target_value': t_str,
+                                    'diff_type': 'column_missing'
+                                })
+                            elif col not in t_row:
+                                # Column doesn't exist in target
+                                row_match = False
+                                row_differences.append({
+                                    'row_number': i + 1,
+                                    'column_name': col,
+                                    'source_value': s_str,
+                                    'target_value': 'COLUMN_NOT_IN_TARGET',
+                                    'diff_type': 'column_missing'
+                                })
+                            elif s_str != t_str:
+                                # Values differ
+                                row_match = False
+                                row_differences.append({
+                                    'row_number': i + 1,
+                                    'column_name': col,
+                                    'source_value': s_str,
+                                    'target_value': t_str,
+                                    'diff_type': 'value_diff'
+                                })
                         
-                        if col not in s_row:
-                            # Column doesn't exist in source
-                            row_match = False
-                            row_differences.append({
-                                'row_number': i + 1,
-                                'column_name': col,
-                                'source_value': 'COLUMN_NOT_IN_SOURCE',
-                                'target_value': t_str,
-                                'diff_type': 'column_missing'
-                            })
-                        elif col not in t_row:
-                            # Column doesn't exist in target
-                            row_match = False
-                            row_differences.append({
-                                'row_number': i + 1,
-                                'column_name': col,
-                                'source_value': s_str,
-                                'target_value': 'COLUMN_NOT_IN_TARGET',
-                                'diff_type': 'column_missing'
-                            })
-                        elif s_str != t_str:
-                            # Values differ
-                            row_match = False
-                            row_differences.append({
-                                'row_number': i + 1,
-                                'column_name': col,
-                                'source_value': s_str,
-                                'target_value': t_str,
-                                'diff_type': 'value_diff'
-                            })
+                        if row_match:
+                            matching_rows += 1
                     
-                    if row_match:
-                        matching_rows += 1
+                    elif i < len(source_data):
+                        # Row exists only in source
+                        rows_only_in_source.append(i + 1)
+                    else:
+                        # Row exists only in target
+                        rows_only_in_target.append(i + 1)
+                
+                # Calculate total differences
+                total_diffs = (
+                    len(column_diffs) +
+                    len(row_differences) +
+                    len(rows_only_in_source) +
+                    len(rows_only_in_target)
+                )
+                
+                # Add row count difference if exists
+                if row_count_diff:
+                    total_diffs += 1
+                
+                return jsonify({
+                    'success': True,
+                    'summary': {
+                        'source_rows': len(source_data),
+                        'target_rows': len(target_data),
+                        'source_columns': len(source_cols),
+                        'target_columns': len(target_cols),
+                        'matching_rows': matching_rows,
+                        'total_differences': total_diffs,
+                        'has_column_differences': len(column_diffs) > 0,
+                        'has_row_count_difference': row_count_diff
+                    },
+                    'differences': {
+                        'column_structure': column_diffs,
+                        'row_differences': row_differences,
+                        'rows_only_in_source': rows_only_in_source,
+                        'rows_only_in_target': rows_only_in_target
+                    }
+                })
                 
-                elif i < len(source_data):
-                    # Row exists only in source
-                    rows_only_in_source.append(i + 1)
-                else:
-                    # Row exists only in target
-                    rows_only_in_target.append(i + 1)
-            
-            # Calculate total differences
-            total_diffs = (
-                len(column_diffs) +
-                len(row_differences) +
-                len(rows_only_in_source) +
-                len(rows_only_in_target)
-            )
-            
-            # Add row count difference if exists
-            if row_count_diff:
-                total_diffs += 1
+            finally:
+                source_cursor.close()
+                target_cursor.close()
             
-            return jsonify({
-                'success': True,
-                'summary': {
-                    'source_rows': len(source_data),
-                    'target_rows': len(target_data),
-                    'source_columns': len(source_cols),
-                    'target_columns': len(target_cols),
-                    'matching_rows': matching_rows,
-                    'total_differences': total_diffs,
-                    'has_column_differences': len(column_diffs) > 0,
-                    'has_row_count_difference': row_count_diff
-                },
-                'differences': {
-                    'column_structure': column_diffs,
-                    'row_differences': row_differences,
-                    'rows_only_in_source': rows_only_in_source,
-                    'rows_only_in_target': rows_only_in_target
-                }
-            })
+    except Exception as e:
+        logger.error(f"Error in compare-query-dual: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/reconcile-dual', methods=['POST'])
+@job_endpoint('reconcile-dual')
+def reconcile_dual():
+    """
+    Reconcile two large tables by hash buckets computed inside each database
+    
+    Expected JSON: {"source_session": "...", "target_session": "...",
+                    "source_table": "APP.ORDERS", "target_table": "APP_QA.ORDERS",
+                    "key_columns": ["ORDER_ID"], "columns": null, "buckets": 64, "leaf_rows": 1000}
+    Both databases compute per-bucket row counts and row-hash checksums; only
+    buckets that differ are split further, and rows are fetched just for the
+    small differing buckets (see reconcile.py). Connections of the same type use
+    their native hash function; across Oracle, Snowflake and Databricks (or with
+    "canonical": true) each column is rendered as a canonical string from the
+    table structures first (see canonical_hash.py; "trim_strings": false keeps
+    trailing blanks significant).
+    Send "async": true to run it as a background job.
+    """
+    try:
+        data = request.get_json()
+        source_session = data.get('source_session')
+        target_session = data.get('target_session')
+        
+        if source_session not in _dual_connections:
+            return jsonify({'success': False, 'error': 'Source connection not found'}), 400
+        
+        if target_session not in _dual_connections:
+            return jsonify({'success': False, 'error': 'Target connection not found'}), 400
+        
+        try:
+            key_columns = parse_key_columns(data.get('key_columns'))
+            buckets = int(data.get('buckets') or RECONCILE_BUCKETS)
+            leaf_rows = int(data.get('leaf_rows') or RECONCILE_LEAF_ROWS)
+            sample_limit = int(data.get('sample_limit') or QUERY_DIFF_SAMPLE_LIMIT)
+        except ValueError as error:
+            return jsonify({'success': False, 'error': str(error)}), 400
+        
+        # Lease both connections so the idle reaper cannot close them mid-reconcile
+        with _dual_connections.lease(source_session) as source_entry, \
+                _dual_connections.lease(target_session) as target_entry:
+            source_conn = source_entry['connection']
+            target_conn = target_entry['connection']
+            source_cursor = source_conn.cursor()
+            target_cursor = target_conn.cursor()
+            run_both = run_side_by_side if source_session != target_session else None
+            canonical = bool(data.get('canonical')) or source_entry['db_type'] != target_entry['db_type']
             
-        finally:
-            source_cursor.close()
-            target_cursor.close()
+            try:
+                try:
+                    source = ReconcileSide(source_cursor, source_entry['db_type'], (data.get('source_table') or '').strip(), 'source')
+                    target = ReconcileSide(target_cursor, target_entry['db_type'], (data.get('target_table') or '').strip(), 'target')
+                    if canonical:
+                        # Column types decide how each value is rendered before hashing
+                        def read_structure(side):
+                            schema, _, table = side.table.rpartition('.')
+                            if side.db_type != 'databricks':
+                                schema = schema.rpartition('.')[2]
+                            side.structure = get_structure_dual(side.cursor, table, schema or None, side.db_type)
+                        (run_both or (lambda first, second: (first(), second())))(
+                            lambda: read_structure(source), lambda: read_structure(target))
+                    
+                    result = reconcile_tables(
+                        source, target, key_columns, data.get('columns'), buckets, leaf_rows,
+                        QUERY_DIFF_BATCH_SIZE, sample_limit, run_both, report_job_progress,
+                        canonical, data.get('trim_strings', True)
+                    )
+                except ValueError as error:
+                    return jsonify({'success': False, 'error': str(error)}), 400
+                
+                return jsonify({
+                    'success': True,
+                    'source_table': source.table,
+                    'target_table': target.table,
+                    **result
+                })
+                
+            finally:
+                source_cursor.close()
+                target_cursor.close()
             
     except Exception as e:
-        logger.error(f"Error in compare-query-dual: {str(e)}")
+        logger.error(f"Error in reconcile-dual: {str(e)}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
@@ -4321,7 +5080,142 @@ def rate_limit_status():
             'error': str(e)
         }), 500
 
+def analyze_targets(targets: List[tuple], use_batch: bool = True, use_cache: bool = True,
+                    count_mode: str = 'exact', sections: tuple = ANALYZE_SECTIONS) -> List[Dict[str, Any]]:
+    """
+    Analyze (catalog_or_db, schema, table_name) targets for the current session.
+    
+    Unchanged tables are served from the metadata cache after one version query,
+    the rest are fetched with one catalog query per category (catalog_batch.py),
+    and whatever still needs per-table queries (e.g. Databricks DESCRIBE) runs on
+    up to ANALYZE_WORKERS threads, each with its own pooled connection (Databricks
+    tables read their version there too, since it is one DESCRIBE DETAIL per table).
+    Row counts follow count_mode (exact, estimated, sampled or auto, see get_table_count).
+    Only the requested sections are queried. Every statement is limited to
+    PROBE_TIMEOUT_SECONDS (COUNT_TIMEOUT_SECONDS for counts); probes that hit the
+    limit are listed in the table's "timed_out" and the other tables still complete.
+    
+    Returns:
+        List of table results in the same order as targets
+    """
+    connection = get_db_connection()
+    db_type = get_db_type()
+    timeouts = ProbeTimeout(connection, db_type, PROBE_TIMEOUT_SECONDS)
+    
+    try:
+        with timeouts:
+            cursor = connection.cursor()
+            
+            # Unchanged tables come from the metadata cache after a single version query
+            versions = {}
+            cached = {}
+            cacheable = cacheable_probes(count_mode, sections)
+            # Databricks versions cost one DESCRIBE DETAIL per table, so they are read by the per-table tasks
+            versioned = bool(use_cache and cacheable) and db_type == 'databricks'
+            if use_cache and cacheable and not versioned:
+                versions = read_table_versions(cursor, targets)
+                cached = load_cached_metadata(targets, versions, count_mode, sections)
+            
+            # One query per category for the remaining tables; categories missing here are fetched per table
+            batched = {}
+            counts = {}
+            if use_batch:
+                uncached = [key for key in targets if not all(key in cached.get(category, {}) for category in cacheable)]
+                categories = [category for category, _ in TABLE_PROBES if category in sections]
+                batch_started = time.time()
+                if uncached and categories:
+                    batched = fetch_catalog_batch(cursor, db_type, uncached, session.get('db_database'), request_metadata_memo(),
+                                                  categories)
+                
+                # Statistics-based counts where count_mode allows them, one batched COUNT(*) pass for exact counts;
+                # tables to sample are left out of both and counted per table by get_table_count()
+                if 'count' in sections:
+                    counted = dict(cached.get('count', {}))
+                    sampled = set()
+                    if count_mode != 'exact':
+                        full_names = {key: build_full_table_name(key[2], key[1], key[0], db_type) for key in targets}
+                        estimates = {}
+                        if count_mode != 'sampled':
+                            estimates = fetch_estimated_counts(cursor, db_type, targets, session.get('db_database'), full_names,
+                                                               request_metadata_memo())
+                        for key in targets:
+                            method = choose_count_method(count_mode, estimates.get(key))
+                            if method == 'estimated':
+                                counted[key] = make_count_info(key[2], key[1], key[0], estimate=estimates[key])
+                            elif method == 'sampled':
+                                sampled.add(key)
+                        batched['count'] = counted
+                    with timeouts.probe(cursor, COUNT_TIMEOUT_SECONDS) as clock:
+                        counts = fetch_row_counts(clock.cursor, [build_full_table_name(t, s, c, db_type) for c, s, t in targets
+                                                           if (c, s, t) not in counted and (c, s, t) not in sampled])
+                logger.info(f"Batched catalog queries for {len(uncached)} of {len(targets)} table(s) in {(time.time() - batch_started) * 1000:.0f} ms "
+                            f"(categories: {', '.join(sorted(batched)) or 'none'})")
+            for category, values in cached.items():
+                batched.setdefault(category, {}).update(values)
+            
+            # Fan out only the tables that still need queries; SSO/Azure AD pools hold a single connection
+            pending = [i for i, (c, s, t) in enumerate(targets) if table_needs_queries(t, s, c, batched, counts, sections)]
+            pending_set = set(pending)
+            _, _, interactive = get_session_connect_params()
+            workers = 1 if interactive else min(ANALYZE_WORKERS, DB_POOL_MAX_SIZE, len(pending))
+            
+            results = [None] * len(targets)
+            for i, (catalog_or_db, schema, table_name) in enumerate(targets):
+                if workers <= 1 or i not in pending_set:
+                    analyze = analyze_table_versioned if versioned and i in pending_set else analyze_table_metadata
+                    results[i] = analyze(cursor, table_name, schema, catalog_or_db, batched, counts,
+                                         count_mode, sections, timeouts)
+                    report_job_progress(sum(1 for r in results if r is not None), len(targets))
+            
+            cursor.close()
+    finally:
+        # Return the connection to the pool (kept warm for the next request); a statement
+        # cut off by its timeout may leave the session mid-call, so that connection is dropped
+        release_db_connection(connection, discard=timeouts.timed_out_any)
+    
+    if workers > 1:
+        parallel_started = time.time()
+        parallel_results = analyze_tables_parallel([targets[i] for i in pending], batched, counts, workers, count_mode, sections,
+                                                   versioned)
+        for i, table_info in zip(pending, parallel_results):
+            results[i] = table_info
+        report_job_progress(len(targets), len(targets))
+        logger.info(f"Analyzed {len(pending)} table(s) on {workers} threads in {(time.time() - parallel_started) * 1000:.0f} ms")
+    
+    if versions:
+        store_cached_metadata(results, versions, count_mode)
+    
+    return results
+
+def stream_schema_analysis(targets: List[tuple], schema: str, pattern: str, use_batch: bool, use_cache: bool,
+                           count_mode: str = 'exact', sections: tuple = ANALYZE_SECTIONS):
+    """
+    Generate NDJSON lines for a whole-schema analysis, ANALYZE_STREAM_CHUNK tables at a time.
+    
+    Lines are {"type": "start", ...}, one {"type": "table", "index": n, "data": {...}}
+    per table, and a closing {"type": "end", ...} or {"type": "error", ...}.
+    Only one chunk of results is held in memory at a time.
+    """
+    started = time.time()
+    yield app.json.dumps({'type': 'start', 'schema': schema, 'pattern': pattern, 'total': len(targets)}) + '\n'
+    
+    analyzed = 0
+    try:
+        for offset in range(0, len(targets), ANALYZE_STREAM_CHUNK):
+            for table_info in analyze_targets(targets[offset:offset + ANALYZE_STREAM_CHUNK], use_batch, use_cache, count_mode, sections):
+                yield app.json.dumps({'type': 'table', 'index': analyzed, 'data': table_info}) + '\n'
+                analyzed += 1
+    except Exception as e:
+        logger.error(f"Error streaming analysis of {schema}: {str(e)}")
+        yield app.json.dumps({'type': 'error', 'error': str(e), 'count': analyzed}) + '\n'
+        return
+    
+    elapsed_ms = round((time.time() - started) * 1000, 1)
+    logger.info(f"Streamed analysis of {analyzed} table(s) in {schema} ({elapsed_ms:.0f} ms)")
+    yield app.json.dumps({'type': 'end', 'count': analyzed, 'elapsed_ms': elapsed_ms}) + '\n'
+
 @app.route('/api/analyze', methods=['POST'])
+@job_endpoint('analyze')
 def analyze_tables():
     """
     Main endpoint to analyze tables
@@ -4329,11 +5223,59 @@ def analyze_tables():
     1. {"tables": ["TABLE1", "TABLE2"], "owner": "SCHEMA1"}
     2. {"tables": ["SCHEMA1.TABLE1", "SCHEMA2.TABLE2"]}
     3. {"tables": "SCHEMA1.TABLE1, SCHEMA2.TABLE2, TABLE3", "owner": "DEFAULT_SCHEMA"}
+    4. {"schema": "APP", "pattern": "ORD%"} - every matching table in the schema
+       (optional "catalog" for Databricks/Snowflake), streamed back as NDJSON
+    
+    Metadata comes from the metadata cache and batched catalog queries where
+    possible (see analyze_targets); send "batch": false or "cache": false to
+    turn either off. "count_mode" is exact (default), estimated, sampled or auto.
+    "sections" (e.g. ["structure", "primary_key"]) limits the result, and the
+    queries run, to those sections of ANALYZE_SECTIONS. "async": true runs the
+    analysis as a background job (202 with a job_id, see /api/jobs).
     """
     try:
         data = request.get_json()
         table_inputs = data.get('tables', [])
         default_owner = data.get('owner', None)
+        use_batch = data.get('batch', True)
+        use_cache = data.get('cache', True)
+        count_mode = data.get('count_mode', 'exact')
+        
+        if count_mode not in COUNT_MODES:
+            return jsonify({'success': False, 'error': f"count_mode must be one of: {', '.join(COUNT_MODES)}"}), 400
+        
+        sections = data.get('sections') or ANALYZE_SECTIONS
+        if isinstance(sections, str):
+            sections = [section.strip() for section in sections.split(',')]
+        unknown = [section for section in sections if section not in ANALYZE_SECTIONS]
+        if unknown:
+            return jsonify({'success': False, 'error': f"Unknown section(s): {', '.join(unknown)}. Valid sections: {', '.join(ANALYZE_SECTIONS)}"}), 400
+        sections = tuple(sections)
+        
+        # Whole-schema mode: enumerate the tables up front, then stream results as they complete
+        if not table_inputs and data.get('schema'):
+            schema = data['schema'].strip().upper()
+            pattern = (data.get('pattern') or '%').strip()
+            catalog_or_db = (data.get('catalog') or '').strip().upper() or None
+            
+            connection = get_db_connection()
+            try:
+                cursor = connection.cursor()
+                table_names = fetch_schema_tables(cursor, get_db_type(), schema, pattern, catalog_or_db,
+                                                  session.get('db_database'))
+                cursor.close()
+            finally:
+                release_db_connection(connection)
+            
+            logger.info(f"Schema analysis: {len(table_names)} table(s) in {schema} matching {pattern}")
+            targets = [(catalog_or_db, schema, table_name) for table_name in table_names]
+            
+            response = Response(
+                stream_with_context(stream_schema_analysis(targets, schema, pattern, use_batch, use_cache, count_mode, sections)),
+                mimetype='application/x-ndjson'
+            )
+            response.headers['X-Accel-Buffering'] = 'no'  # let reverse proxies pass lines through
+            return response
         
         if not table_inputs:
             return jsonify({'error': 'No table names provided'}), 400
@@ -4342,11 +5284,7 @@ def analyze_tables():
         if isinstance(table_inputs, str):
             table_inputs = [t.strip() for t in table_inputs.split(',')]
         
-        connection = get_db_connection()
-        cursor = connection.cursor()
-        
-        results = []
-        
+        targets = []
         for table_input in table_inputs:
             table_input = table_input.strip()
             
@@ -4357,33 +5295,9 @@ def analyze_tables():
             if not schema and default_owner:
                 schema = default_owner.upper()
             
-            # Build full name for logging
-            db_type = get_db_type()
-            full_name = build_full_table_name(table_name, schema, catalog_or_db, db_type)
-            logger.info(f"Analyzing table: {full_name} (DB: {db_type})")
-            
-            table_info = {
-                'table_name': table_name,
-                'schema': schema,
-                'catalog_or_db': catalog_or_db,
-                'count': get_table_count(cursor, table_name, schema, catalog_or_db),
-                'structure': get_table_structure(cursor, table_name, schema, catalog_or_db),
-                'indexes': get_table_indexes(cursor, table_name, schema, catalog_or_db),
-                'partitions': get_table_partitions(cursor, table_name, schema, catalog_or_db),
-                'primary_key': get_primary_key(cursor, table_name, schema, catalog_or_db),
-                'foreign_keys': get_foreign_keys(cursor, table_name, schema, catalog_or_db),
-                'last_analyzed': get_last_analyzed(cursor, table_name, schema, catalog_or_db),
-                'grants': get_table_grants(cursor, table_name, schema, catalog_or_db)
-            }
-            
-            results.append(table_info)
+            targets.append((catalog_or_db, schema, table_name))
         
-        cursor.close()
-        
-        # Don't close cached connections (Azure AD/SSO) to prevent re-authentication
-        session_id = session.get('session_id')
-        if not (session_id and session_id in _connection_cache):
-            connection.close()
+        results = analyze_targets(targets, use_batch, use_cache, count_mode, sections)
         
         return jsonify({
             'success': True,
@@ -4511,12 +5425,198 @@ def health_check():
     """Health check endpoint"""
     try:
         connection = get_db_connection()
-        connection.close()
-        return jsonify({'status': 'healthy', 'database': 'connected'})
+        release_db_connection(connection)
+        return jsonify({'status': 'healthy', 'database': 'connected', 'pools': _pool_manager.status()})
     except Exception as e:
         return jsonify({'status': 'unhealthy', 'error': str(e)}), 500
     
     
+@app.route('/api/metadata-cache', methods=['GET'])
+def metadata_cache_status():
+    """Metadata cache usage and hit/miss counters for this worker process"""
+    return jsonify({
+        'success': True,
+        'metadata_cache': _metadata_cache.stats()
+    })
+
+
+@app.route('/api/metadata-cache/clear', methods=['POST'])
+def clear_metadata_cache():
+    """Drop cached metadata for the current session's credentials"""
+    try:
+        removed = _metadata_cache.clear(metadata_cache_fingerprint())
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    return jsonify({
+        'success': True,
+        'removed': removed
+    })
+
+
+@app.route('/api/profile-table', methods=['POST'])
+def profile_table():
+    """
+    Sampled row count and column profile for one table
+    
+    Expected JSON: {"table": "SCHEMA.TABLE", "owner": "DEFAULT_SCHEMA",
+                    "columns": ["COL1", "COL2"], "sample_percent": 0.5}
+    columns and sample_percent are optional; the rate is sized from the
+    optimizer statistics (about SAMPLE_TARGET_ROWS rows) when omitted.
+    """
+    try:
+        data = request.get_json()
+        catalog_or_db, schema, table_name = parse_table_input(data.get('table', '').strip())
+        schema = schema or (data.get('owner') or '').strip().upper() or None
+        
+        if not table_name:
+            return jsonify({'success': False, 'error': 'Table name is required'}), 400
+        
+        sample_percent = data.get('sample_percent')
+        if sample_percent is not None and not 0 < float(sample_percent) <= 100:
+            return jsonify({'success': False, 'error': 'sample_percent must be greater than 0 and at most 100'}), 400
+        
+        connection = get_db_connection()
+        
+        try:
+            cursor = connection.cursor()
+            db_type = get_db_type()
+            full_table_name = build_full_table_name(table_name, schema, catalog_or_db, db_type)
+            
+            columns = get_table_structure(cursor, table_name, schema, catalog_or_db)
+            if data.get('columns'):
+                wanted = {column.upper() for column in data['columns']}
+                columns = [column for column in columns if column['column_name'].upper() in wanted]
+            
+            key = (catalog_or_db, schema, table_name)
+            estimate = fetch_estimated_counts(cursor, db_type, [key], session.get('db_database'),
+                                              {key: full_table_name}, request_metadata_memo()).get(key)
+            percent = float(sample_percent) if sample_percent else min(
+                100.0, choose_sample_percent(estimate.get('row_count') if estimate else None,
+                                             SAMPLE_TARGET_ROWS, SAMPLE_DEFAULT_PERCENT))
+            
+            count_info = get_table_count(cursor, table_name, schema, catalog_or_db, 'sampled', percent)
+            profile = sampled_column_profile(cursor, db_type, full_table_name, columns, percent, SAMPLE_CONFIDENCE)
+            
+            cursor.close()
+        finally:
+            release_db_connection(connection)
+        
+        return jsonify({
+            'success': True,
+            'table_name': table_name,
+            'schema': schema,
+            'catalog_or_db': catalog_or_db,
+            'statistics': estimate,
+            'count': count_info,
+            'profile': profile
+        })
+        
+    except Exception as e:
+        logger.error(f"Error in profile_table: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/partitions', methods=['GET'])
+def list_partitions():
+    """
+    Page through an Oracle table's partitions in position order
+    
+    Query parameters: table (SCHEMA.TABLE), owner (optional default schema),
+    cursor (next_cursor of the previous page or of the analysis result; empty
+    for the first page) and limit (default PARTITION_PAGE_SIZE, at most PARTITION_PAGE_MAX).
+    """
+    try:
+        _, schema, table_name = parse_table_input(request.args.get('table', '').strip())
+        schema = schema or (request.args.get('owner') or '').strip().upper() or None
+        
+        if not table_name:
+            return jsonify({'success': False, 'error': 'Table name is required'}), 400
+        if get_db_type() != 'oracle':
+            return jsonify({'success': False, 'error': 'Partition pages are only available for Oracle'}), 400
+        
+        try:
+            after = int(request.args.get('cursor') or 0)
+            limit = int(request.args.get('limit') or PARTITION_PAGE_SIZE)
+        except ValueError:
+            return jsonify({'success': False, 'error': 'cursor and limit must be integers'}), 400
+        if after < 0 or not 0 < limit <= PARTITION_PAGE_MAX:
+            return jsonify({'success': False, 'error': f'limit must be between 1 and {PARTITION_PAGE_MAX}'}), 400
+        
+        connection = get_db_connection()
+        
+        try:
+            cursor = connection.cursor()
+            page = partition_page(cursor, table_name, schema, after, limit)
+            cursor.close()
+        finally:
+            release_db_connection(connection)
+        
+        return jsonify({
+            'success': True,
+            'table_name': table_name,
+            'schema': schema,
+            'partitions': page['partitions'],
+            'count': len(page['partitions']),
+            'next_cursor': page['next_cursor']
+        })
+    
+    except Exception as e:
+        logger.error(f"Error in list_partitions: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/pool-status', methods=['GET'])
+def pool_status():
+    """Connection pool occupancy and liveness probe counters for this worker process"""
+    return jsonify({
+        'success': True,
+        'pid': os.getpid(),
+        'connection_pools': _pool_manager.status()
+    })
+
+@app.route('/api/jobs', methods=['POST'])
+def create_job():
+    """
+    Start a background job: {"type": <a JOB_TYPES name, e.g. "analyze" or "reconcile-dual">, "params": {...}}
+    where params is the body the synchronous endpoint takes. Poll GET /api/jobs/<job_id> for the result.
+    """
+    try:
+        data = request.get_json() or {}
+        job_type = data.get('type')
+        params = data.get('params') or {}
+        
+        if job_type not in JOB_TYPES:
+            return jsonify({'success': False, 'error': f"type must be one of: {', '.join(JOB_TYPES)}"}), 400
+        if not isinstance(params, dict):
+            return jsonify({'success': False, 'error': 'params must be an object'}), 400
+        
+        return job_accepted(submit_job(job_type, params), job_type)
+    
+    except JobQueueFullError as e:
+        return jsonify({'success': False, 'error': str(e)}), 503
+    except Exception as e:
+        logger.error(f"Error creating job: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Job status and progress, plus the endpoint's JSON response once finished ("result": false to leave it out)"""
+    owner = session.get('job_owner')
+    job = _job_manager.get(job_id, include_result=request.args.get('result', 'true').lower() != 'false',
+                           owner=owner) if owner else None
+    if job is None:
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+    return jsonify({'success': True, 'job': job})
+
 @app.route('/ui')
 def ui():
     """Serve the UI"""
@@ -4543,6 +5643,7 @@ def data_comparison_page():
     return render_template('data-comparison.html')
 
 @app.route('/api/compare-source-target', methods=['POST'])
+@job_endpoint('compare-source-target')
 def compare_source_target():
     """
     Compare source and target tables
@@ -4578,218 +5679,87 @@ def compare_source_target():
             return jsonify({'success': False, 'error': 'Source and target table names are required'}), 400
         
         connection = get_db_connection()
-        cursor = connection.cursor()
-        
-        differences = {
-            'total_count': 0,
-            'structure': [],
-            'row_count': {},
-            'indexes': [],
-            'constraints': []
-        }
-        
-        # Compare structure
-        if options.get('structure', True):
-            source_structure = get_table_structure(cursor, source_table, source_schema, source_catalog_or_db)
-            target_structure = get_table_structure(cursor, target_table, target_schema, target_catalog_or_db)
-            
-            source_cols = {col['column_name']: col for col in source_structure}
-            target_cols = {col['column_name']: col for col in target_structure}
-            
-            # Find differences
-            all_columns = set(list(source_cols.keys()) + list(target_cols.keys()))
-            
-            for col_name in all_columns:
-                if col_name not in source_cols:
-                    differences['structure'].append({
-                        'column_name': col_name,
-                        'diff_type': 'Missing in Source',
-                        'source_value': None,
-                        'target_value': f"{target_cols[col_name]['data_type']}({target_cols[col_name].get('data_length', '')})",
-                        'type': 'added'
-                    })
-                    differences['total_count'] += 1
-                elif col_name not in target_cols:
-                    differences['structure'].append({
-                        'column_name': col_name,
-                        'diff_type': 'Missing in Target',
-                        'source_value': f"{source_cols[col_name]['data_type']}({source_cols[col_name].get('data_length', '')})",
-                        'target_value': None,
-                        'type': 'removed'
-                    })
-                    differences['total_count'] += 1
-                else:
-                    # Check if data type or length differs
-                    source_col = source_cols[col_name]
-                    target_col = target_cols[col_name]
-                    
-                    if (source_col['data_type'] != target_col['data_type'] or 
-                        source_col.get('data_length') != target_col.get('data_length') or
-                        source_col.get('data_precision') != target_col.get('data_precision') or
-                        source_col.get('nullable') != target_col.get('nullable')):
-                        
-                        differences['structure'].append({
-                            'column_name': col_name,
-                            'diff_type': 'Modified',
-                            'source_value': f"{source_col['data_type']}({source_col.get('data_length', '')}) {source_col.get('nullable', '')}",
-                            'target_value': f"{target_col['data_type']}({target_col.get('data_length', '')}) {target_col.get('nullable', '')}",
-                            'type': 'modified'
-                        })
-                        differences['total_count'] += 1
         
-        # Compare row count
-        if options.get('rowCount', True):
-            source_count = get_table_count(cursor, source_table, source_schema, source_catalog_or_db)
-            target_count = get_table_count(cursor, target_table, target_schema, target_catalog_or_db)
-            
-            source_rows = source_count.get('row_count', 0)
-            target_rows = target_count.get('row_count', 0)
+        try:
+            cursor = connection.cursor()
+            
+            # One version query lets unchanged tables be compared from the metadata cache
+            versions = {}
+            if options.get('cache', True):
+                versions = read_table_versions(cursor, [
+                    (source_catalog_or_db, source_schema, source_table),
+                    (target_catalog_or_db, target_schema, target_table)
+                ])
             
-            differences['row_count'] = {
-                'source': source_rows,
-                'target': target_rows,
-                'difference': abs(source_rows - target_rows) if source_rows and target_rows else 0,
-                'different': source_rows != target_rows
+            differences = {
+                'total_count': 0,
+                'structure': [],
+                'row_count': {},
+                'indexes': [],
+                'constraints': []
             }
             
-            if source_rows != target_rows:
-                differences['total_count'] += 1
-        
-        # Compare indexes
-        if options.get('indexes', False):
-            source_indexes = get_table_indexes(cursor, source_table, source_schema, source_catalog_or_db)
-            target_indexes = get_table_indexes(cursor, target_table, target_schema, target_catalog_or_db)
-            
-            source_idx_names = {idx['index_name'] for idx in source_indexes}
-            target_idx_names = {idx['index_name'] for idx in target_indexes}
-            
-            # Missing in target
-            for idx_name in source_idx_names - target_idx_names:
-                idx = next((i for i in source_indexes if i['index_name'] == idx_name), None)
-                if idx:
-                    differences['indexes'].append({
-                        'index_name': idx_name,
-                        'diff_type': idx.get('index_type', 'INDEX'),
-                        'status': 'missing_in_target'
-                    })
-                    differences['total_count'] += 1
+            # Compare structure
+            if options.get('structure', True):
+                source_structure = cached_table_probe(cursor, 'structure', get_table_structure, source_table, source_schema, source_catalog_or_db, versions)
+                target_structure = cached_table_probe(cursor, 'structure', get_table_structure, target_table, target_schema, target_catalog_or_db, versions)
+                
+                differences['structure'] = diff_structure(source_structure, target_structure)
+                differences['total_count'] += len(differences['structure'])
             
-            # Missing in source
-            for idx_name in target_idx_names - source_idx_names:
-                idx = next((i for i in target_indexes if i['index_name'] == idx_name), None)
-                if idx:
-                    differences['indexes'].append({
-                        'index_name': idx_name,
-                        'diff_type': idx.get('index_type', 'INDEX'),
-                        'status': 'missing_in_source'
-                    })
-                    differences['total_count'] += 1
-        
-        # Compare constraints
-        if options.get('constraints', False):
-            source_pk = get_primary_key(cursor, source_table, source_schema, source_catalog_or_db)
-            target_pk = get_primary_key(cursor, target_table, target_schema, target_catalog_or_db)
-            source_fks = get_foreign_keys(cursor, source_table, source_schema, source_catalog_or_db)
-            target_fks = get_foreign_keys(cursor, target_table, target_schema, target_catalog_or_db)
-            
-            # Compare primary keys
-            has_source_pk = bool(source_pk.get('constraint_name'))
-            has_target_pk = bool(target_pk.get('constraint_name'))
-            
-            if has_source_pk and not has_target_pk:
-                # Primary key exists in source but not in target
-                differences['constraints'].append({
-                    'constraint_name': source_pk['constraint_name'],
-                    'constraint_type': 'PRIMARY KEY',
-                    'columns': source_pk.get('columns', ''),
-                    'source_value': source_pk.get('columns', ''),
-                    'target_value': 'None',
-                    'status': 'missing_in_target'
-                })
-                differences['total_count'] += 1
-            elif not has_source_pk and has_target_pk:
-                # Primary key exists in target but not in source
-                differences['constraints'].append({
-                    'constraint_name': target_pk['constraint_name'],
-                    'constraint_type': 'PRIMARY KEY',
-                    'columns': target_pk.get('columns', ''),
-                    'source_value': 'None',
-                    'target_value': target_pk.get('columns', ''),
-                    'status': 'missing_in_source'
-                })
-                differences['total_count'] += 1
-            elif has_source_pk and has_target_pk:
-                # Both have primary keys - check if columns are different
-                source_pk_cols = source_pk.get('columns', '').strip()
-                target_pk_cols = target_pk.get('columns', '').strip()
+            # Compare row count
+            if options.get('rowCount', True):
+                # Only exact counts go through the cache ('count' is the cacheable probe name)
+                count_mode = options.get('count_mode', 'exact')
+                count_probe = 'count' if count_mode == 'exact' else f'count_{count_mode}'
+                sample_percent = options.get('sample_percent')
+                fetch_count = lambda c, t, s, d: get_table_count(c, t, s, d, count_mode, sample_percent)
+                source_count = cached_table_probe(cursor, count_probe, fetch_count, source_table, source_schema, source_catalog_or_db, versions)
+                target_count = cached_table_probe(cursor, count_probe, fetch_count, target_table, target_schema, target_catalog_or_db, versions)
                 
-                if source_pk_cols != target_pk_cols:
-                    differences['constraints'].append({
-                        'constraint_name': f"{source_pk['constraint_name']} / {target_pk['constraint_name']}",
-                        'constraint_type': 'PRIMARY KEY',
-                        'columns': 'Different columns',
-                        'source_value': source_pk_cols,
-                        'target_value': target_pk_cols,
-                        'status': 'modified'
-                    })
+                source_rows = source_count.get('row_count', 0)
+                target_rows = target_count.get('row_count', 0)
+                
+                different = row_counts_differ(source_count, target_count)
+                
+                differences['row_count'] = {
+                    'source': source_rows,
+                    'target': target_rows,
+                    'difference': abs(source_rows - target_rows) if source_rows and target_rows else 0,
+                    'different': different,
+                    'source_ci': count_interval(source_count),
+                    'target_ci': count_interval(target_count),
+                    'source_count_type': source_count.get('count_type'),
+                    'target_count_type': target_count.get('count_type'),
+                    'source_stats_age_seconds': source_count.get('stats_age_seconds'),
+                    'target_stats_age_seconds': target_count.get('stats_age_seconds')
+                }
+                
+                if different:
                     differences['total_count'] += 1
             
-            # Compare foreign keys - create dictionaries for easier comparison
-            source_fks_dict = {fk['constraint_name']: fk for fk in source_fks}
-            target_fks_dict = {fk['constraint_name']: fk for fk in target_fks}
-            
-            all_fk_names = set(source_fks_dict.keys()) | set(target_fks_dict.keys())
+            # Compare indexes
+            if options.get('indexes', False):
+                source_indexes = cached_table_probe(cursor, 'indexes', get_table_indexes, source_table, source_schema, source_catalog_or_db, versions)
+                target_indexes = cached_table_probe(cursor, 'indexes', get_table_indexes, target_table, target_schema, target_catalog_or_db, versions)
+                
+                differences['indexes'] = diff_indexes(source_indexes, target_indexes)
+                differences['total_count'] += len(differences['indexes'])
             
-            for fk_name in all_fk_names:
-                source_fk = source_fks_dict.get(fk_name)
-                target_fk = target_fks_dict.get(fk_name)
+            # Compare constraints
+            if options.get('constraints', False):
+                source_pk = cached_table_probe(cursor, 'primary_key', get_primary_key, source_table, source_schema, source_catalog_or_db, versions)
+                target_pk = cached_table_probe(cursor, 'primary_key', get_primary_key, target_table, target_schema, target_catalog_or_db, versions)
+                source_fks = cached_table_probe(cursor, 'foreign_keys', get_foreign_keys, source_table, source_schema, source_catalog_or_db, versions)
+                target_fks = cached_table_probe(cursor, 'foreign_keys', get_foreign_keys, target_table, target_schema, target_catalog_or_db, versions)
                 
-                if source_fk and not target_fk:
-                    # FK exists in source but not in target
-                    differences['constraints'].append({
-                        'constraint_name': fk_name,
-                        'constraint_type': 'FOREIGN KEY',
-                        'columns': source_fk.get('columns', ''),
-                        'source_value': f"{source_fk.get('columns', '')} -> {source_fk.get('referenced_table', '')}",
-                        'target_value': 'None',
-                        'status': 'missing_in_target'
-                    })
-                    differences['total_count'] += 1
-                elif not source_fk and target_fk:
-                    # FK exists in target but not in source
-                    differences['constraints'].append({
-                        'constraint_name': fk_name,
-                        'constraint_type': 'FOREIGN KEY',
-                        'columns': target_fk.get('columns', ''),
-                        'source_value': 'None',
-                        'target_value': f"{target_fk.get('columns', '')} -> {target_fk.get('referenced_table', '')}",
-                        'status': 'missing_in_source'
-                    })
-                    differences['total_count'] += 1
-                elif source_fk and target_fk:
-                    # Both have FK with same name - check if details are different
-                    source_cols = source_fk.get('columns', '').strip()
-                    target_cols = target_fk.get('columns', '').strip()
-                    source_ref_table = source_fk.get('referenced_table', '').strip()
-                    target_ref_table = target_fk.get('referenced_table', '').strip()
-                    
-                    if source_cols != target_cols or source_ref_table != target_ref_table:
-                        differences['constraints'].append({
-                            'constraint_name': fk_name,
-                            'constraint_type': 'FOREIGN KEY',
-                            'columns': 'Different structure',
-                            'source_value': f"{source_cols} -> {source_ref_table}",
-                            'target_value': f"{target_cols} -> {target_ref_table}",
-                            'status': 'modified'
-                        })
-                        differences['total_count'] += 1
-        
-        cursor.close()
-        
-        # Don't close cached connections (Azure AD/SSO) to prevent re-authentication
-        session_id = session.get('session_id')
-        if not (session_id and session_id in _connection_cache):
-            connection.close()
+                differences['constraints'] = diff_constraints(source_pk, target_pk, source_fks, target_fks)
+                differences['total_count'] += len(differences['constraints'])
+                
+            cursor.close()
+        finally:
+            # Return the connection to the pool (kept warm for the next request)
+            release_db_connection(connection)
         
         # Build full table names for display
         db_type = get_db_type()
@@ -4810,6 +5780,120 @@ def compare_source_target():
             'error': str(e)
         }), 500
 
+@app.route('/api/compare-schemas', methods=['POST'])
+@job_endpoint('compare-schemas')
+def compare_schemas():
+    """
+    Compare every table of two schemas in one pass
+    
+    Expected JSON: {"source": {"schema": "APP", "catalog": null}, "target": {"schema": "APP_QA"},
+                    "pattern": "%", "options": {"structure": true, "indexes": true, "constraints": true}}
+    Both schemas are read from the logged-in database unless "source_session" and
+    "target_session" name dual-login connections, which are then read concurrently.
+    Each side's catalog is loaded in bulk once (see schema_compare.py) and diffed in
+    memory; per-table differences are shaped like /api/compare-source-target.
+    Table fingerprints are kept in COMPARE_STORE_PATH, so on a repeat compare
+    unchanged pairs with equal fingerprints are skipped without loading their
+    metadata ("options": {"fingerprints": false} turns this off).
+    On Oracle and Snowflake each side's last metadata snapshot is kept there too:
+    a repeat compare asks which tables changed since the previous run
+    (LAST_DDL_TIME / LAST_ALTERED), reloads only those and restores the rest
+    ("options": {"incremental": false} reloads everything and resets the baseline).
+    Send "async": true to run it as a background job.
+    """
+    try:
+        data = request.get_json()
+        source = data.get('source', {})
+        target = data.get('target', {})
+        options = data.get('options', {})
+        pattern = (data.get('pattern') or '%').strip()
+        source_session = data.get('source_session')
+        target_session = data.get('target_session')
+        
+        source_schema = (source.get('schema') or '').strip().upper()
+        target_schema = (target.get('schema') or '').strip().upper()
+        source_catalog = (source.get('catalog') or '').strip().upper() or None
+        target_catalog = (target.get('catalog') or '').strip().upper() or None
+        
+        if not source_schema or not target_schema:
+            return jsonify({'success': False, 'error': 'Source and target schemas are required'}), 400
+        
+        categories = []
+        if options.get('structure', True):
+            categories.append('structure')
+        if options.get('indexes', True):
+            categories.append('indexes')
+        if options.get('constraints', True):
+            categories.extend(['primary_key', 'foreign_keys'])
+        categories = tuple(categories) or SCHEMA_COMPARE_CATEGORIES
+        
+        started = time.time()
+        store = _compare_store if options.get('fingerprints', True) else None
+        snapshots = _snapshot_store if store is not None else None
+        incremental = options.get('incremental', True)
+        
+        if source_session or target_session:
+            if source_session not in _dual_connections:
+                return jsonify({'success': False, 'error': 'Source connection not found or expired'}), 400
+            if target_session not in _dual_connections:
+                return jsonify({'success': False, 'error': 'Target connection not found or expired'}), 400
+            
+            # Lease both connections so the idle reaper cannot close them mid-compare
+            with _dual_connections.lease(source_session) as source_entry, \
+                    _dual_connections.lease(target_session) as target_entry:
+                source_cursor = source_entry['connection'].cursor()
+                target_cursor = target_entry['connection'].cursor()
+                try:
+                    source_side = SchemaSide(source_cursor, source_entry['db_type'], source_schema, source_catalog, store=store,
+                                             scope=f"{source_entry.get('fingerprint')}:{source_catalog or ''}.{source_schema}",
+                                             snapshots=snapshots, incremental=incremental)
+                    target_side = SchemaSide(target_cursor, target_entry['db_type'], target_schema, target_catalog, store=store,
+                                             scope=f"{target_entry.get('fingerprint')}:{target_catalog or ''}.{target_schema}",
+                                             snapshots=snapshots, incremental=incremental)
+                    
+                    # Each side works on its own connection, so both databases are queried at once
+                    run_both = run_side_by_side if source_session != target_session else None
+                    
+                    result = compare_schema_sides(source_side, target_side, pattern, categories, run_both)
+                finally:
+                    source_cursor.close()
+                    target_cursor.close()
+        else:
+            connection = get_db_connection()
+            try:
+                cursor = connection.cursor()
+                db_type = get_db_type()
+                memo = request_metadata_memo()
+                scope = metadata_cache_fingerprint()
+                source_side = SchemaSide(cursor, db_type, source_schema, source_catalog, session.get('db_database'), memo,
+                                         store, f"{scope}:{source_catalog or ''}.{source_schema}", snapshots, incremental)
+                target_side = SchemaSide(cursor, db_type, target_schema, target_catalog, session.get('db_database'), memo,
+                                         store, f"{scope}:{target_catalog or ''}.{target_schema}", snapshots, incremental)
+                result = compare_schema_sides(source_side, target_side, pattern, categories)
+                cursor.close()
+            finally:
+                release_db_connection(connection)
+        
+        elapsed_ms = round((time.time() - started) * 1000, 1)
+        logger.info(f"Compared schemas {source_schema} and {target_schema}: {result['summary']['source_tables']} / "
+                    f"{result['summary']['target_tables']} table(s), {result['summary']['modified']} modified ({elapsed_ms:.0f} ms)")
+        
+        return jsonify({
+            'success': True,
+            'source_schema': source_schema,
+            'target_schema': target_schema,
+            'pattern': pattern,
+            'elapsed_ms': elapsed_ms,
+            **result
+        })
+        
+    except Exception as e:
+        logger.error(f"Error in compare_schemas: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
 @app.route('/api/compare-query-data', methods=['POST'])
 def compare_query_data():
     """Execute and compare SQL query results"""
@@ -4822,19 +5906,27 @@ def compare_query_data():
             return jsonify({'success': False, 'error': 'Both queries required'}), 400
         
         conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Execute source query
-        cursor.execute(source_sql)
-        source_rows = cursor.fetchall()
-        source_columns = [desc[0] for desc in cursor.description]
         
-        # Execute target query
-        cursor.execute(target_sql)
-        target_rows = cursor.fetchall()
-        target_columns = [desc[0] for desc in cursor.description]
+        try:
+            cursor = conn.cursor()
+            
+            # Execute source query
+            cursor.execute(source_sql)
+            source_rows = cursor.fetchall()
+            source_columns = [desc[0] for desc in cursor.description]
+            
+            # Execute target query
+            cursor.execute(target_sql)
+            target_rows = cursor.fetchall()
+            target_columns = [desc[0] for desc in cursor.description]
+            
+            # Close cursor immediately after fetching data
+            cursor.close()
+        finally:
+            # Return the connection to the pool before comparing
+            release_db_connection(conn)
         
-        # Compare results (do this BEFORE closing connection in case we need it)
+        # Compare results
         row_diffs = []
         missing_target = []
         missing_source = []
@@ -4844,14 +5936,6 @@ def compare_query_data():
         source_data = [dict(zip(source_columns, row)) for row in source_rows]
         target_data = [dict(zip(target_columns, row)) for row in target_rows]
         
-        # Close cursor and connection immediately after fetching data
-        cursor.close()
-        
-        # Don't close cached connections (Azure AD/SSO)
-        session_id = session.get('session_id')
-        if not (session_id and session_id in _connection_cache):
-            conn.close()
-        
         # Compare row by row
         max_rows = max(len(source_data), len(target_data))
         for idx in range(max_rows):
@@ -0,0 +1,228 @@
+"""
+Canonical Row Hashing
+Per-dialect SQL that renders column values as identical canonical strings and hashes them, so Oracle, Snowflake and Databricks checksums agree
+"""
+
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+# Hashes are folded into 0 .. HASH_RANGE - 1; a NULL column hashes to HASH_RANGE itself
+HASH_RANGE = 4294967296
+NULL_HASH = HASH_RANGE
+
+# Float columns are compared as decimals rounded to this many places
+FLOAT_SCALE = 10
+
+# Characters of CLOB / long text compared (Oracle hashes at most 4000 bytes of a string)
+LOB_PREFIX_CHARS = 1000
+
+# Fractional second digits Databricks timestamps carry
+_DATABRICKS_FRACTION = 6
+
+_FLOAT_TYPES = ('FLOAT', 'BINARY_FLOAT', 'BINARY_DOUBLE', 'DOUBLE', 'REAL', 'DOUBLE PRECISION')
+_INTEGER_TYPES = ('INT', 'INTEGER', 'BIGINT', 'SMALLINT', 'TINYINT', 'BYTEINT', 'LONG', 'SHORT', 'BYTE')
+_STRING_TYPES = ('VARCHAR2', 'NVARCHAR2', 'CHAR', 'NCHAR', 'VARCHAR', 'STRING', 'TEXT', 'CHARACTER')
+_LOB_TYPES = ('CLOB', 'NCLOB')
+
+
+def column_type(db_type, column):
+    """
+    Classify a get_table_structure() column for canonical rendering
+
+    Args:
+        db_type: Database type (oracle, databricks, snowflake)
+        column: Structure entry with data_type, data_precision and data_scale
+
+    Returns:
+        dict: kind (number, float, string, lob, date, timestamp, boolean, binary or
+              unsupported), scale (decimal places, None when unbounded), fraction
+              (fractional second digits), utc (whether the value carries a time zone)
+              and national (Oracle NCHAR types)
+    """
+    data_type = (column.get('data_type') or '').upper().strip()
+    base = re.sub(r'\(.*?\)', '', data_type).strip()
+    arguments = [int(value) for value in re.findall(r'\d+', (re.findall(r'\((.*?)\)', data_type) or [''])[0])]
+    scale = column.get('data_scale')
+    info = {'kind': 'unsupported', 'scale': None, 'fraction': None, 'utc': False,
+            'national': base in ('NCHAR', 'NVARCHAR2', 'NCLOB')}
+
+    if base in ('NUMBER', 'NUMERIC', 'DECIMAL', 'DEC'):
+        if db_type == 'databricks':
+            scale = arguments[1] if len(arguments) > 1 else 0
+        elif db_type == 'snowflake' and scale is None:
+            scale = 0
+        info.update(kind='number', scale=int(scale) if scale is not None else None)
+    elif base in _INTEGER_TYPES:
+        info.update(kind='number', scale=0)
+    elif base in _FLOAT_TYPES:
+        info['kind'] = 'float'
+    elif base in _STRING_TYPES:
+        info['kind'] = 'string'
+    elif base in _LOB_TYPES:
+        info['kind'] = 'lob'
+    elif base == 'DATE' and db_type == 'oracle':
+        info.update(kind='timestamp', fraction=0)  # an Oracle DATE has a time of day
+    elif base == 'DATE':
+        info['kind'] = 'date'
+    elif base.startswith('TIMESTAMP') or base == 'DATETIME':
+        if db_type == 'oracle':
+            fraction = arguments[0] if arguments else (scale if scale is not None else 6)
+        elif db_type == 'snowflake':
+            fraction = arguments[0] if arguments else 9
+        else:
+            fraction = _DATABRICKS_FRACTION
+        utc = ('TIME ZONE' in base or base in ('TIMESTAMP_TZ', 'TIMESTAMP_LTZ')
+               or (db_type == 'databricks' and base == 'TIMESTAMP'))
+        info.update(kind='timestamp', fraction=int(fraction), utc=utc)
+    elif base == 'BOOLEAN':
+        info['kind'] = 'boolean'
+    elif base in ('RAW', 'BINARY', 'VARBINARY'):
+        info['kind'] = 'binary'
+    return info
+
+
+def pair_spec(source_type, target_type, trim_strings=True):
+    """
+    Rendering both sides of a column pair agree on
+
+    Numbers keep their digits without trailing zeros; a side with unbounded scale
+    is rounded to the other side's declared scale, and float pairs are rounded to
+    FLOAT_SCALE. Timestamps use the smaller fractional precision of the two and
+    UTC for zoned values; a day-only DATE on either side compares days. A LOB on
+    either side compares the first LOB_PREFIX_CHARS characters.
+
+    Returns:
+        dict: per-side rendering options {'source': {...}, 'target': {...}}
+    """
+    kinds = {source_type['kind'], target_type['kind']}
+    source = dict(source_type, trim=trim_strings, round_scale=None, prefix=None, date_only=False)
+    target = dict(target_type, trim=trim_strings, round_scale=None, prefix=None, date_only=False)
+
+    if kinds <= {'number', 'float'}:
+        if 'float' in kinds:
+            source.update(kind='float', round_scale=FLOAT_SCALE)
+            target.update(kind='float', round_scale=FLOAT_SCALE)
+        elif source['scale'] is None and target['scale'] is not None:
+            source['round_scale'] = target['scale']
+        elif target['scale'] is None and source['scale'] is not None:
+            target['round_scale'] = source['scale']
+    elif kinds <= {'date', 'timestamp'}:
+        date_only = 'date' in kinds
+        fraction = min(source['fraction'] or 0, target['fraction'] or 0)
+        source.update(date_only=date_only, fraction=fraction)
+        target.update(date_only=date_only, fraction=fraction)
+    elif kinds <= {'string', 'lob'} and 'lob' in kinds:
+        source['prefix'] = target['prefix'] = LOB_PREFIX_CHARS
+
+    return {'source': source, 'target': target}
+
+
+def _strip_zeros(db_type, text):
+    """Drop trailing fractional zeros (and a bare trailing point) from a decimal string"""
+    if db_type == 'snowflake':
+        return f"IFF(CONTAINS({text}, '.'), RTRIM(RTRIM({text}, '0'), '.'), {text})"
+    return (f"CASE WHEN INSTR({text}, '.') > 0 "
+            f"THEN TRIM(TRAILING '.' FROM TRIM(TRAILING '0' FROM {text})) ELSE {text} END")
+
+
+def _number_text(db_type, value, spec):
+    if spec['kind'] == 'float' or spec['round_scale'] is not None:
+        scale = spec['round_scale']
+        decimal = 'NUMBER' if db_type in ('oracle', 'snowflake') else 'DECIMAL'
+        value = f"CAST(ROUND({value}, {scale}) AS {decimal}(38, {scale}))"
+    if db_type == 'oracle':
+        # TM9 is the shortest form ('.5' for 0.5); the dot is fixed whatever NLS_NUMERIC_CHARACTERS says
+        return (f"REGEXP_REPLACE(TO_CHAR({value}, 'TM9', 'NLS_NUMERIC_CHARACTERS=''.,'''), "
+                f"'^(-?)\\.', '\\10.')")
+    if db_type == 'snowflake':
+        return _strip_zeros(db_type, f"TO_VARCHAR({value})")
+    return _strip_zeros(db_type, f"CAST({value} AS STRING)")
+
+
+def _timestamp_text(db_type, value, spec):
+    fraction = spec['fraction'] or 0
+    if db_type == 'databricks':
+        if spec['utc']:
+            value = f"to_utc_timestamp({value}, current_timezone())"
+        pattern = 'yyyy-MM-dd' if spec['date_only'] else \
+            'yyyy-MM-dd HH:mm:ss' + (f".{'S' * min(fraction, _DATABRICKS_FRACTION)}" if fraction else '')
+        return f"date_format({value}, '{pattern}')"
+
+    if spec['utc']:
+        value = f"SYS_EXTRACT_UTC({value})" if db_type == 'oracle' else f"CONVERT_TIMEZONE('UTC', {value})"
+    pattern = 'YYYY-MM-DD' if spec['date_only'] else \
+        'YYYY-MM-DD HH24:MI:SS' + (f".FF{fraction}" if fraction else '')
+    return f"TO_CHAR({value}, '{pattern}')"
+
+
+def _string_text(db_type, value, spec):
+    if db_type == 'oracle':
+        if spec['kind'] == 'lob':
+            value = f"DBMS_LOB.SUBSTR({value}, {spec['prefix']}, 1)"
+        elif spec['prefix']:
+            value = f"SUBSTR({value}, 1, {spec['prefix']})"
+        if spec['national']:
+            value = f"TO_CHAR({value})"  # hash database-charset (UTF-8) bytes, not UTF-16
+        # '' is NULL in Oracle already
+        return f"RTRIM({value})" if spec['trim'] else value
+    if spec['prefix']:
+        value = f"LEFT({value}, {spec['prefix']})"
+    if spec['trim']:
+        value = f"RTRIM({value})"
+    return f"NULLIF({value}, '')"
+
+
+def canonical_expression(db_type, column, spec):
+    """
+    SQL rendering one column as its canonical string (NULL stays NULL)
+
+    Args:
+        db_type: Database type (oracle, databricks, snowflake)
+        column: Column name as the database returns it
+        spec: This side's options from pair_spec()
+
+    Raises:
+        ValueError: If the column type cannot be rendered canonically
+    """
+    kind = spec['kind']
+    if kind in ('number', 'float'):
+        return _number_text(db_type, column, spec)
+    if kind in ('date', 'timestamp'):
+        return _timestamp_text(db_type, column, spec)
+    if kind in ('string', 'lob'):
+        return _string_text(db_type, column, spec)
+    if kind == 'boolean':
+        return f"CASE WHEN {column} THEN '1' WHEN NOT {column} THEN '0' END"
+    if kind == 'binary':
+        if db_type == 'oracle':
+            return f"LOWER(RAWTOHEX({column}))"
+        if db_type == 'snowflake':
+            return f"LOWER(TO_VARCHAR({column}, 'HEX'))"
+        return f"LOWER(HEX({column}))"
+    raise ValueError(f"Column {column} has a type that cannot be hashed across databases; leave it out of columns")
+
+
+def canonical_hash(db_type, expression):
+    """
+    SQL hashing a canonical string: the first 32 bits of its MD5, NULL_HASH for NULL
+
+    Oracle's STANDARD_HASH hashes the database character set bytes, which match
+    Snowflake and Databricks (UTF-8) on AL32UTF8 databases.
+    """
+    if db_type == 'oracle':
+        digest = f"TO_NUMBER(SUBSTR(RAWTOHEX(STANDARD_HASH({expression}, 'MD5')), 1, 8), 'XXXXXXXX')"
+    elif db_type == 'snowflake':
+        digest = f"TO_NUMBER(SUBSTR(MD5({expression}), 1, 8), 'XXXXXXXX')"
+    elif db_type == 'databricks':
+        digest = f"CAST(conv(substr(md5({expression}), 1, 8), 16, 10) AS DECIMAL(38, 0))"
+    else:
+        raise ValueError(f'Unsupported database type: {db_type}')
+    return f"CASE WHEN {expression} IS NULL THEN {NULL_HASH} ELSE {digest} END"
+
+
+def fold_hashes(hashes):
+    """SQL combining column hashes (any order-sensitive weighting works the same on every database)"""
+    terms = [f"{column_hash} * {pow(31, position, HASH_RANGE)}" for position, column_hash in enumerate(hashes)]
+    return f"MOD({' + '.join(terms)}, {HASH_RANGE})"
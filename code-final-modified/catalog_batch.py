@@ -0,0 +1,784 @@
+"""
+Catalog Batch Queries
+Fetches table metadata for many tables with one dictionary query per category instead of one query per table
+"""
+
+import logging
+from datetime import datetime
+
+from databricks_metadata import describe_table, describe_detail
+from snowflake_metadata import schema_metadata
+from oracle_partitions import (
+    PARTITION_INLINE_LIMIT, SUMMARY_COLUMNS, DETAIL_COLUMNS, high_values_as_text, build_partition_info
+)
+
+logger = logging.getLogger(__name__)
+
+# Tables per statement; keeps OR-predicates and bind lists well below driver limits
+CATALOG_CHUNK_SIZE = 500
+COUNT_CHUNK_SIZE = 100
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _predicate(tables, owner_col, table_col, paramstyle, params):
+    """
+    Build "(OWNER = ? AND TABLE_NAME = ?) OR (TABLE_NAME = ?) ..." for a chunk of tables
+
+    Unqualified tables match the name in any schema, like the per-table queries do.
+    """
+    clauses = []
+    for i, (schema, table_name) in enumerate(tables):
+        if paramstyle == 'named':
+            params[f't{i}'] = table_name.upper()
+            table_bind = f':t{i}'
+            if schema:
+                params[f'o{i}'] = schema.upper()
+                clauses.append(f"({owner_col} = :o{i} AND {table_col} = {table_bind})")
+            else:
+                clauses.append(f"{table_col} = {table_bind}")
+        else:
+            if schema:
+                params.extend([schema.upper(), table_name.upper()])
+                clauses.append(f"({owner_col} = %s AND {table_col} = %s)")
+            else:
+                params.append(table_name.upper())
+                clauses.append(f"{table_col} = %s")
+    return "(" + " OR ".join(clauses) + ")"
+
+
+class _Grouped:
+    """Rows of a batched query grouped by (owner, table), in query order"""
+
+    def __init__(self):
+        self.by_owner = {}
+        self.by_table = {}
+
+    def add(self, owner, table_name, values):
+        self.by_owner.setdefault((owner, table_name), []).append(values)
+        self.by_table.setdefault(table_name, []).append(values)
+
+    def rows(self, schema, table_name):
+        if schema:
+            return self.by_owner.get((schema.upper(), table_name.upper()), [])
+        return self.by_table.get(table_name.upper(), [])
+
+
+def _run_grouped(cursor, sql, tables, owner_col, table_col, paramstyle, grouped=None):
+    """
+    Run a batched query over tables in chunks
+
+    The query must select the owner and table name as its first two columns
+    and contain a {predicate} placeholder.
+    """
+    grouped = grouped or _Grouped()
+    for chunk in _chunks(tables, CATALOG_CHUNK_SIZE):
+        params = {} if paramstyle == 'named' else []
+        cursor.execute(sql.format(predicate=_predicate(chunk, owner_col, table_col, paramstyle, params)), params)
+        for row in cursor.fetchall():
+            grouped.add(row[0], row[1], row[2:])
+    return grouped
+
+
+# ---------------------------------------------------------------------------
+# Oracle
+# ---------------------------------------------------------------------------
+
+def _oracle_structure(cursor, tables):
+    grouped = _run_grouped(cursor, """
+        SELECT OWNER, TABLE_NAME, COLUMN_NAME, DATA_TYPE, DATA_LENGTH,
+               DATA_PRECISION, DATA_SCALE, NULLABLE, DATA_DEFAULT
+        FROM ALL_TAB_COLUMNS
+        WHERE {predicate}
+        ORDER BY TABLE_NAME, COLUMN_ID
+    """, tables, 'OWNER', 'TABLE_NAME', 'named')
+    return lambda schema, table_name: [{
+        'column_name': col[0],
+        'data_type': col[1],
+        'data_length': col[2],
+        'data_precision': col[3],
+        'data_scale': col[4],
+        'nullable': col[5],
+        'default_value': col[6]
+    } for col in grouped.rows(schema, table_name)]
+
+
+def _oracle_indexes(cursor, tables):
+    grouped = _run_grouped(cursor, """
+        SELECT
+            i.OWNER,
+            i.TABLE_NAME,
+            i.INDEX_NAME,
+            i.INDEX_TYPE,
+            i.UNIQUENESS,
+            LISTAGG(ic.COLUMN_NAME, ', ') WITHIN GROUP (ORDER BY ic.COLUMN_POSITION) as COLUMNS,
+            i.STATUS,
+            i.TABLESPACE_NAME
+        FROM ALL_INDEXES i
+        LEFT JOIN ALL_IND_COLUMNS ic ON i.INDEX_NAME = ic.INDEX_NAME
+            AND i.TABLE_NAME = ic.TABLE_NAME
+            AND i.OWNER = ic.INDEX_OWNER
+        WHERE {predicate}
+        GROUP BY i.OWNER, i.TABLE_NAME, i.INDEX_NAME, i.INDEX_TYPE, i.UNIQUENESS, i.STATUS, i.TABLESPACE_NAME
+        ORDER BY i.TABLE_NAME, i.INDEX_NAME
+    """, tables, 'i.OWNER', 'i.TABLE_NAME', 'named')
+    return lambda schema, table_name: [{
+        'index_name': idx[0],
+        'index_type': idx[1],
+        'uniqueness': idx[2],
+        'columns': idx[3],
+        'status': idx[4],
+        'tablespace': idx[5]
+    } for idx in grouped.rows(schema, table_name)]
+
+
+def _oracle_partitions(cursor, tables):
+    info = _run_grouped(cursor, """
+        SELECT OWNER, TABLE_NAME, PARTITIONING_TYPE, SUBPARTITIONING_TYPE, PARTITION_COUNT
+        FROM ALL_PART_TABLES
+        WHERE {predicate}
+    """, tables, 'OWNER', 'TABLE_NAME', 'named')
+
+    # Summaries, then only the inline page and the last partition of each partitioned table
+    partitioned = [(schema, table_name) for schema, table_name in tables if info.rows(schema, table_name)]
+    summaries = _Grouped()
+    details = _Grouped()
+    if partitioned:
+        summaries = _run_grouped(cursor, f"""
+            SELECT TABLE_OWNER, TABLE_NAME, {SUMMARY_COLUMNS}
+            FROM ALL_TAB_PARTITIONS
+            WHERE {{predicate}}
+            GROUP BY TABLE_OWNER, TABLE_NAME
+        """, partitioned, 'TABLE_OWNER', 'TABLE_NAME', 'named')
+        with high_values_as_text(cursor):
+            details = _run_grouped(cursor, f"""
+                SELECT TABLE_OWNER, TABLE_NAME, {DETAIL_COLUMNS}
+                FROM ALL_TAB_PARTITIONS
+                WHERE {{predicate}}
+                    AND (PARTITION_POSITION <= {PARTITION_INLINE_LIMIT}
+                         OR (TABLE_OWNER, TABLE_NAME, PARTITION_POSITION) IN (
+                             SELECT TABLE_OWNER, TABLE_NAME, MAX(PARTITION_POSITION)
+                             FROM ALL_TAB_PARTITIONS
+                             WHERE {{predicate}}
+                             GROUP BY TABLE_OWNER, TABLE_NAME))
+                ORDER BY TABLE_NAME, PARTITION_POSITION
+            """, partitioned, 'TABLE_OWNER', 'TABLE_NAME', 'named')
+
+    def build(schema, table_name):
+        rows = info.rows(schema, table_name)
+        if not rows:
+            return []
+        summary = summaries.rows(schema, table_name)
+        return build_partition_info(rows[0], summary[0] if summary else None, details.rows(schema, table_name))
+    return build
+
+
+def _oracle_primary_key(cursor, tables):
+    grouped = _run_grouped(cursor, """
+        SELECT
+            c.OWNER,
+            c.TABLE_NAME,
+            c.CONSTRAINT_NAME,
+            LISTAGG(cc.COLUMN_NAME, ', ') WITHIN GROUP (ORDER BY cc.POSITION) as COLUMNS,
+            c.STATUS
+        FROM ALL_CONSTRAINTS c
+        JOIN ALL_CONS_COLUMNS cc ON c.CONSTRAINT_NAME = cc.CONSTRAINT_NAME
+            AND c.OWNER = cc.OWNER
+        WHERE c.CONSTRAINT_TYPE = 'P'
+            AND {predicate}
+        GROUP BY c.OWNER, c.TABLE_NAME, c.CONSTRAINT_NAME, c.STATUS
+    """, tables, 'c.OWNER', 'c.TABLE_NAME', 'named')
+
+    def build(schema, table_name):
+        rows = grouped.rows(schema, table_name)
+        if not rows:
+            return {}
+        return {'constraint_name': rows[0][0], 'columns': rows[0][1], 'status': rows[0][2]}
+    return build
+
+
+def _oracle_foreign_keys(cursor, tables):
+    grouped = _run_grouped(cursor, """
+        SELECT
+            c.OWNER,
+            c.TABLE_NAME,
+            c.CONSTRAINT_NAME,
+            LISTAGG(cc.COLUMN_NAME, ', ') WITHIN GROUP (ORDER BY cc.POSITION) as COLUMNS,
+            c.R_CONSTRAINT_NAME,
+            rc.TABLE_NAME as REFERENCED_TABLE,
+            c.DELETE_RULE,
+            c.STATUS
+        FROM ALL_CONSTRAINTS c
+        JOIN ALL_CONS_COLUMNS cc ON c.CONSTRAINT_NAME = cc.CONSTRAINT_NAME
+            AND c.OWNER = cc.OWNER
+        LEFT JOIN ALL_CONSTRAINTS rc ON c.R_CONSTRAINT_NAME = rc.CONSTRAINT_NAME
+            AND c.R_OWNER = rc.OWNER
+        WHERE c.CONSTRAINT_TYPE = 'R'
+            AND {predicate}
+        GROUP BY c.OWNER, c.TABLE_NAME, c.CONSTRAINT_NAME, c.R_CONSTRAINT_NAME, rc.TABLE_NAME, c.DELETE_RULE, c.STATUS
+        ORDER BY c.TABLE_NAME, c.CONSTRAINT_NAME
+    """, tables, 'c.OWNER', 'c.TABLE_NAME', 'named')
+    return lambda schema, table_name: [{
+        'constraint_name': fk[0],
+        'columns': fk[1],
+        'referenced_constraint': fk[2],
+        'referenced_table': fk[3],
+        'delete_rule': fk[4],
+        'status': fk[5]
+    } for fk in grouped.rows(schema, table_name)]
+
+
+def _oracle_last_analyzed(cursor, tables):
+    grouped = _run_grouped(cursor, """
+        SELECT OWNER, TABLE_NAME, LAST_ANALYZED, NUM_ROWS, BLOCKS, AVG_ROW_LEN, SAMPLE_SIZE
+        FROM ALL_TABLES
+        WHERE {predicate}
+    """, tables, 'OWNER', 'TABLE_NAME', 'named')
+
+    def build(schema, table_name):
+        rows = grouped.rows(schema, table_name)
+        if not rows:
+            return {}
+        stats = rows[0]
+        return {
+            'last_analyzed': stats[0].strftime('%Y-%m-%d %H:%M:%S') if stats[0] else None,
+            'num_rows': stats[1],
+            'blocks': stats[2],
+            'avg_row_len': stats[3],
+            'sample_size': stats[4],
+            'stale_stats': 'NO'
+        }
+    return build
+
+
+def _oracle_grants(cursor, tables):
+    grouped = _run_grouped(cursor, """
+        SELECT TABLE_SCHEMA, TABLE_NAME, GRANTEE, PRIVILEGE, GRANTABLE, GRANTOR
+        FROM ALL_TAB_PRIVS
+        WHERE {predicate}
+        ORDER BY TABLE_NAME, GRANTEE, PRIVILEGE
+    """, tables, 'TABLE_SCHEMA', 'TABLE_NAME', 'named')
+    return lambda schema, table_name: [{
+        'grantee': grant[0],
+        'privilege': grant[1],
+        'grantable': grant[2],
+        'grantor': grant[3]
+    } for grant in grouped.rows(schema, table_name)]
+
+
+# ---------------------------------------------------------------------------
+# Snowflake (INFORMATION_SCHEMA is per database, so tables are batched per database)
+# ---------------------------------------------------------------------------
+
+def _info_schema(database, view):
+    return f"{database}.INFORMATION_SCHEMA.{view}" if database else f"INFORMATION_SCHEMA.{view}"
+
+
+def _snowflake_structure(cursor, tables, database):
+    grouped = _run_grouped(cursor, f"""
+        SELECT TABLE_SCHEMA, TABLE_NAME, COLUMN_NAME, DATA_TYPE, CHARACTER_MAXIMUM_LENGTH,
+               NUMERIC_PRECISION, NUMERIC_SCALE, IS_NULLABLE, COLUMN_DEFAULT
+        FROM {_info_schema(database, 'COLUMNS')}
+        WHERE {{predicate}}
+        ORDER BY TABLE_NAME, ORDINAL_POSITION
+    """, tables, 'TABLE_SCHEMA', 'TABLE_NAME', 'pyformat')
+    return lambda schema, table_name: [{
+        'column_name': col[0],
+        'data_type': col[1],
+        'data_length': col[2],
+        'data_precision': col[3],
+        'data_scale': col[4],
+        'nullable': col[5],
+        'default_value': col[6]
+    } for col in grouped.rows(schema, table_name)]
+
+
+def _snowflake_indexes(cursor, tables, database):
+    grouped = _run_grouped(cursor, f"""
+        SELECT TABLE_SCHEMA, TABLE_NAME, CONSTRAINT_NAME, CONSTRAINT_TYPE
+        FROM {_info_schema(database, 'TABLE_CONSTRAINTS')}
+        WHERE CONSTRAINT_TYPE IN ('PRIMARY KEY', 'UNIQUE')
+            AND {{predicate}}
+    """, tables, 'TABLE_SCHEMA', 'TABLE_NAME', 'pyformat')
+    return lambda schema, table_name: [{
+        'index_name': const[0],
+        'index_type': const[1],
+        'uniqueness': 'UNIQUE',
+        'columns': 'N/A',
+        'status': 'ACTIVE',
+        'tablespace': 'N/A'
+    } for const in grouped.rows(schema, table_name)]
+
+
+def _snowflake_primary_key(cursor, tables, database):
+    grouped = _run_grouped(cursor, f"""
+        SELECT TABLE_SCHEMA, TABLE_NAME, CONSTRAINT_NAME
+        FROM {_info_schema(database, 'TABLE_CONSTRAINTS')}
+        WHERE CONSTRAINT_TYPE = 'PRIMARY KEY'
+            AND {{predicate}}
+    """, tables, 'TABLE_SCHEMA', 'TABLE_NAME', 'pyformat')
+
+    # Resolve the key columns of every primary key found, in one query per chunk,
+    # grouped by (schema, table, constraint) so each table's lookup is a dict hit
+    pk_names = sorted({rows[0][0] for rows in grouped.by_owner.values()})
+    columns = {}
+    for chunk in _chunks(pk_names, CATALOG_CHUNK_SIZE):
+        cursor.execute(f"""
+            SELECT TABLE_SCHEMA, TABLE_NAME, CONSTRAINT_NAME, COLUMN_NAME
+            FROM {_info_schema(database, 'KEY_COLUMN_USAGE')}
+            WHERE CONSTRAINT_NAME IN ({', '.join(['%s'] * len(chunk))})
+            ORDER BY ORDINAL_POSITION
+        """, list(chunk))
+        for owner, table_name, constraint_name, column_name in cursor.fetchall():
+            columns.setdefault((owner, table_name, constraint_name), []).append(column_name)
+
+    owners = {(name, rows[0][0]): owner for (owner, name), rows in grouped.by_owner.items()}
+
+    def build(schema, table_name):
+        rows = grouped.rows(schema, table_name)
+        if not rows:
+            return {}
+        constraint_name = rows[0][0]
+        owner = schema.upper() if schema else owners[(table_name.upper(), constraint_name)]
+        return {
+            'constraint_name': constraint_name,
+            'columns': ', '.join(columns.get((owner, table_name.upper(), constraint_name), [])),
+            'status': 'ENABLED'
+        }
+    return build
+
+
+def _snowflake_foreign_keys(cursor, tables, database):
+    grouped = _run_grouped(cursor, f"""
+        SELECT
+            TC.TABLE_SCHEMA,
+            TC.TABLE_NAME,
+            TC.CONSTRAINT_NAME,
+            TC.CONSTRAINT_NAME as R_CONSTRAINT_NAME,
+            RC.TABLE_NAME as REFERENCED_TABLE
+        FROM {_info_schema(database, 'TABLE_CONSTRAINTS')} TC
+        LEFT JOIN {_info_schema(database, 'REFERENTIAL_CONSTRAINTS')} RC
+            ON TC.CONSTRAINT_NAME = RC.CONSTRAINT_NAME
+        WHERE TC.CONSTRAINT_TYPE = 'FOREIGN KEY'
+            AND {{predicate}}
+    """, tables, 'TC.TABLE_SCHEMA', 'TC.TABLE_NAME', 'pyformat')
+    return lambda schema, table_name: [{
+        'constraint_name': fk[0],
+        'columns': 'N/A',
+        'referenced_constraint': fk[1],
+        'referenced_table': fk[2],
+        'delete_rule': 'NO ACTION',
+        'status': 'ENABLED'
+    } for fk in grouped.rows(schema, table_name)]
+
+
+_ORACLE_CATEGORIES = {
+    'structure': _oracle_structure,
+    'indexes': _oracle_indexes,
+    'partitions': _oracle_partitions,
+    'primary_key': _oracle_primary_key,
+    'foreign_keys': _oracle_foreign_keys,
+    'last_analyzed': _oracle_last_analyzed,
+    'grants': _oracle_grants
+}
+
+_SNOWFLAKE_CATEGORIES = {
+    'structure': _snowflake_structure,
+    'indexes': _snowflake_indexes,
+    'primary_key': _snowflake_primary_key,
+    'foreign_keys': _snowflake_foreign_keys
+}
+
+
+def fetch_catalog_batch(cursor, db_type, tables, default_database=None, memo=None, categories=None):
+    """
+    Fetch metadata categories for many tables with one query per category
+
+    Snowflake tables with a schema are read from SHOW ... IN SCHEMA (one
+    metadata-only command per kind and schema, see snowflake_metadata.py);
+    INFORMATION_SCHEMA is queried only for the rest.
+
+    Args:
+        cursor: Database cursor
+        db_type: Database type (oracle, databricks, snowflake)
+        tables: List of (catalog_or_db, schema, table_name) tuples
+        default_database: Snowflake database used for tables without one
+        memo: Per-request memo shared with the per-table probes (optional)
+        categories: Categories to fetch (default: every category batched for the dialect)
+
+    Returns:
+        dict: category -> {(catalog_or_db, schema, table_name): value}, with values
+              shaped like the per-table get_* functions. Categories that are not
+              batched for this dialect, or whose query failed, are missing so the
+              caller falls back to per-table queries for them.
+    """
+    batched = {}
+    unique_tables = list(dict.fromkeys(tables))
+
+    if db_type == 'oracle':
+        pairs = list(dict.fromkeys((schema, table_name) for _, schema, table_name in unique_tables))
+        for category, fetch in _ORACLE_CATEGORIES.items():
+            if categories is not None and category not in categories:
+                continue
+            try:
+                build = fetch(cursor, pairs)
+                batched[category] = {key: build(key[1], key[2]) for key in unique_tables}
+            except Exception as error:
+                logger.warning(f"Batched {category} query failed, falling back to per-table queries: {error}")
+
+    elif db_type == 'snowflake':
+        wanted = [category for category in _SNOWFLAKE_CATEGORIES if categories is None or category in categories]
+        remaining = {category: [] for category in wanted}
+        for key in unique_tables:
+            for category in wanted:
+                if not key[1]:
+                    remaining[category].append(key)
+                    continue
+                try:
+                    metadata = schema_metadata(key[0] or default_database, key[1], memo)
+                    batched.setdefault(category, {})[key] = getattr(metadata, category)(cursor, key[2])
+                except Exception as error:
+                    logger.debug(f"SHOW {category} unavailable for {key}, using INFORMATION_SCHEMA: {error}")
+                    remaining[category].append(key)
+
+        for category, fetch in _SNOWFLAKE_CATEGORIES.items():
+            if not remaining.get(category):
+                continue
+            by_database = {}
+            for key in remaining[category]:
+                by_database.setdefault(key[0] or default_database, []).append(key)
+            try:
+                values = {}
+                for database, keys in by_database.items():
+                    pairs = list(dict.fromkeys((schema, table_name) for _, schema, table_name in keys))
+                    build = fetch(cursor, pairs, database)
+                    values.update({key: build(key[1], key[2]) for key in keys})
+                batched.setdefault(category, {}).update(values)
+            except Exception as error:
+                logger.warning(f"Batched {category} query failed, falling back to per-table queries: {error}")
+
+    return batched
+
+
+def fetch_row_counts(cursor, full_names):
+    """
+    Count rows of many tables with UNION ALL statements (COUNT_CHUNK_SIZE tables each)
+
+    Args:
+        cursor: Database cursor
+        full_names: Fully qualified table names
+
+    Returns:
+        dict: full_name -> row count. Tables in a chunk that failed (for example
+              because one table does not exist) are missing so the caller can
+              count them individually and report the error per table.
+    """
+    counts = {}
+    unique_names = list(dict.fromkeys(full_names))
+
+    for chunk in _chunks(unique_names, COUNT_CHUNK_SIZE):
+        query = "\nUNION ALL\n".join(
+            f"SELECT {position}, COUNT(*) FROM {full_name}" for position, full_name in enumerate(chunk)
+        )
+        try:
+            cursor.execute(query)
+            for position, count in cursor.fetchall():
+                counts[chunk[int(position)]] = count
+        except Exception as error:
+            logger.warning(f"Batched row count failed for {len(chunk)} table(s), counting individually: {error}")
+
+    return counts
+
+
+def fetch_ddl_versions(cursor, db_type, tables, default_database=None, full_names=None, memo=None):
+    """
+    Read a version marker per table that changes whenever its metadata changes
+
+    Oracle uses ALL_OBJECTS.LAST_DDL_TIME of the table and its indexes,
+    Snowflake INFORMATION_SCHEMA.TABLES.LAST_ALTERED (one query per chunk) and
+    Databricks the Delta lastModified from DESCRIBE DETAIL (one query per table).
+
+    Args:
+        cursor: Database cursor
+        db_type: Database type (oracle, databricks, snowflake)
+        tables: List of (catalog_or_db, schema, table_name) tuples
+        default_database: Snowflake database used for tables without one
+        full_names: {(catalog_or_db, schema, table_name): qualified name}, needed for Databricks
+        memo: Per-request DESCRIBE memo shared with the Databricks probes (optional)
+
+    Returns:
+        dict: (catalog_or_db, schema, table_name) -> version string. Tables whose
+              version could not be read are missing and must not be served from cache.
+    """
+    versions = {}
+    unique_tables = list(dict.fromkeys(tables))
+
+    def version_of(rows):
+        return '|'.join(sorted(str(row[0]) for row in rows)) if rows else None
+
+    try:
+        if db_type == 'oracle':
+            pairs = list(dict.fromkeys((schema, table_name) for _, schema, table_name in unique_tables))
+            grouped = _run_grouped(cursor, """
+                SELECT OWNER, OBJECT_NAME, LAST_DDL_TIME
+                FROM ALL_OBJECTS
+                WHERE OBJECT_TYPE = 'TABLE'
+                    AND {predicate}
+            """, pairs, 'OWNER', 'OBJECT_NAME', 'named')
+            _run_grouped(cursor, """
+                SELECT i.TABLE_OWNER, i.TABLE_NAME, o.LAST_DDL_TIME
+                FROM ALL_INDEXES i
+                JOIN ALL_OBJECTS o ON o.OWNER = i.OWNER
+                    AND o.OBJECT_NAME = i.INDEX_NAME
+                    AND o.OBJECT_TYPE = 'INDEX'
+                WHERE {predicate}
+            """, pairs, 'i.TABLE_OWNER', 'i.TABLE_NAME', 'named', grouped)
+            for key in unique_tables:
+                versions[key] = version_of(grouped.rows(key[1], key[2]))
+
+        elif db_type == 'snowflake':
+            by_database = {}
+            for key in unique_tables:
+                by_database.setdefault(key[0] or default_database, []).append(key)
+            for database, keys in by_database.items():
+                pairs = list(dict.fromkeys((schema, table_name) for _, schema, table_name in keys))
+                grouped = _run_grouped(cursor, f"""
+                    SELECT TABLE_SCHEMA, TABLE_NAME, LAST_ALTERED
+                    FROM {_info_schema(database, 'TABLES')}
+                    WHERE {{predicate}}
+                """, pairs, 'TABLE_SCHEMA', 'TABLE_NAME', 'pyformat')
+                for key in keys:
+                    versions[key] = version_of(grouped.rows(key[1], key[2]))
+
+        elif db_type == 'databricks':
+            for key in unique_tables:
+                last_modified = describe_detail(cursor, (full_names or {})[key], memo).get('lastModified')
+                if last_modified:
+                    versions[key] = str(last_modified)
+
+    except Exception as error:
+        logger.warning(f"Could not read table versions, metadata cache bypassed: {error}")
+
+    return {key: version for key, version in versions.items() if version}
+
+
+def fetch_database_time(cursor, db_type):
+    """
+    Current time on the database server, the baseline for a later fetch_changed_tables()
+
+    Returns:
+        datetime: SYSDATE (Oracle) or CURRENT_TIMESTAMP() (Snowflake); None for
+                  Databricks, whose catalog has no per-schema change query
+    """
+    if db_type == 'oracle':
+        cursor.execute("SELECT SYSDATE FROM DUAL")
+        return cursor.fetchone()[0]
+    if db_type == 'snowflake':
+        cursor.execute("SELECT CURRENT_TIMESTAMP()")
+        return cursor.fetchone()[0]
+    return None
+
+
+def fetch_changed_tables(cursor, db_type, schema, since, catalog_or_db=None, default_database=None):
+    """
+    Tables of a schema whose DDL changed at or after a fetch_database_time() baseline
+
+    One query per schema: Oracle compares ALL_OBJECTS.LAST_DDL_TIME of the tables
+    and their indexes, Snowflake INFORMATION_SCHEMA.TABLES.LAST_ALTERED (which DML
+    also moves, so a few unchanged tables may be reported).
+
+    Args:
+        cursor: Database cursor
+        db_type: Database type (oracle, databricks, snowflake)
+        schema: Schema/owner name
+        since: Baseline datetime
+        catalog_or_db: Database (Snowflake)
+        default_database: Snowflake database used when catalog_or_db is not given
+
+    Returns:
+        set: Changed table names; None when changes cannot be read (Databricks, or the query failed)
+    """
+    try:
+        if db_type == 'oracle':
+            cursor.execute("""
+                SELECT OBJECT_NAME
+                FROM ALL_OBJECTS
+                WHERE OWNER = :owner
+                    AND OBJECT_TYPE = 'TABLE'
+                    AND LAST_DDL_TIME >= :since
+                UNION
+                SELECT i.TABLE_NAME
+                FROM ALL_INDEXES i
+                JOIN ALL_OBJECTS o ON o.OWNER = i.OWNER
+                    AND o.OBJECT_NAME = i.INDEX_NAME
+                    AND o.OBJECT_TYPE = 'INDEX'
+                WHERE i.TABLE_OWNER = :owner
+                    AND o.LAST_DDL_TIME >= :since
+            """, {'owner': schema.upper(), 'since': since})
+            return {row[0] for row in cursor.fetchall()}
+
+        if db_type == 'snowflake':
+            cursor.execute(f"""
+                SELECT TABLE_NAME
+                FROM {_info_schema(catalog_or_db or default_database, 'TABLES')}
+                WHERE TABLE_SCHEMA = %s
+                    AND LAST_ALTERED >= %s
+            """, [schema.upper(), since])
+            return {row[0] for row in cursor.fetchall()}
+
+    except Exception as error:
+        logger.warning(f"Could not read tables changed in {schema} since {since}: {error}")
+
+    return None
+
+
+def fetch_schema_tables(cursor, db_type, schema, pattern='%', catalog_or_db=None, default_database=None):
+    """
+    List the tables of a schema whose names match a LIKE pattern
+
+    Args:
+        cursor: Database cursor
+        db_type: Database type (oracle, databricks, snowflake)
+        schema: Schema/owner name
+        pattern: SQL LIKE pattern (default: '%'); Databricks gets it as a '*' wildcard
+        catalog_or_db: Catalog (Databricks) or database (Snowflake)
+        default_database: Snowflake database used when catalog_or_db is not given
+
+    Returns:
+        list: Table names, sorted
+    """
+    if db_type == 'oracle':
+        cursor.execute("""
+            SELECT TABLE_NAME
+            FROM ALL_TABLES
+            WHERE OWNER = :owner
+                AND TABLE_NAME LIKE :pattern
+            ORDER BY TABLE_NAME
+        """, {'owner': schema.upper(), 'pattern': pattern.upper()})
+        return [row[0] for row in cursor.fetchall()]
+
+    if db_type == 'snowflake':
+        cursor.execute(f"""
+            SELECT TABLE_NAME
+            FROM {_info_schema(catalog_or_db or default_database, 'TABLES')}
+            WHERE TABLE_SCHEMA = %s
+                AND TABLE_NAME LIKE %s
+                AND TABLE_TYPE = 'BASE TABLE'
+            ORDER BY TABLE_NAME
+        """, [schema.upper(), pattern.upper()])
+        return [row[0] for row in cursor.fetchall()]
+
+    if db_type == 'databricks':
+        target = f"{catalog_or_db}.{schema}" if catalog_or_db else schema
+        like = pattern.replace('%', '*').replace("'", '')
+        cursor.execute(f"SHOW TABLES IN {target} LIKE '{like}'")
+        # Rows are (database, tableName, isTemporary)
+        return sorted(row[1].upper() for row in cursor.fetchall() if not (len(row) > 2 and row[2]))
+
+    raise ValueError(f'Unsupported database type: {db_type}')
+
+
+def _stats_age(timestamp):
+    """(formatted timestamp, age in seconds) of a statistics timestamp"""
+    if not timestamp or not isinstance(timestamp, datetime):
+        return None, None
+    now = datetime.now(timestamp.tzinfo) if timestamp.tzinfo else datetime.now()
+    return timestamp.strftime('%Y-%m-%d %H:%M:%S'), max(0, int((now - timestamp).total_seconds()))
+
+
+def fetch_estimated_counts(cursor, db_type, tables, default_database=None, full_names=None, memo=None):
+    """
+    Read row counts from optimizer statistics / table metadata instead of scanning
+
+    Oracle reads ALL_TAB_STATISTICS (NUM_ROWS, LAST_ANALYZED, STALE_STATS) and
+    Snowflake INFORMATION_SCHEMA.TABLES.ROW_COUNT, batched like the catalog
+    queries. Databricks parses the "Statistics" row of DESCRIBE TABLE EXTENDED
+    (present after ANALYZE TABLE ... COMPUTE STATISTICS), one query per table.
+
+    Args:
+        cursor: Database cursor
+        db_type: Database type (oracle, databricks, snowflake)
+        tables: List of (catalog_or_db, schema, table_name) tuples
+        default_database: Snowflake database used for tables without one
+        full_names: {(catalog_or_db, schema, table_name): qualified name}, needed for Databricks
+        memo: Per-request DESCRIBE memo shared with the Databricks probes (optional)
+
+    Returns:
+        dict: key -> {'row_count', 'count_type': 'estimated', 'count_source',
+              'stats_as_of', 'stats_age_seconds', 'stale'}. Tables without
+              statistics are missing.
+    """
+    estimates = {}
+    unique_tables = list(dict.fromkeys(tables))
+
+    try:
+        if db_type == 'oracle':
+            pairs = list(dict.fromkeys((schema, table_name) for _, schema, table_name in unique_tables))
+            grouped = _run_grouped(cursor, """
+                SELECT OWNER, TABLE_NAME, NUM_ROWS, LAST_ANALYZED, STALE_STATS
+                FROM ALL_TAB_STATISTICS
+                WHERE OBJECT_TYPE = 'TABLE'
+                    AND {predicate}
+            """, pairs, 'OWNER', 'TABLE_NAME', 'named')
+            for key in unique_tables:
+                rows = grouped.rows(key[1], key[2])
+                if rows and rows[0][0] is not None:
+                    num_rows, last_analyzed, stale_stats = rows[0]
+                    stats_as_of, age = _stats_age(last_analyzed)
+                    estimates[key] = {
+                        'row_count': num_rows,
+                        'count_type': 'estimated',
+                        'count_source': 'ALL_TAB_STATISTICS.NUM_ROWS',
+                        'stats_as_of': stats_as_of,
+                        'stats_age_seconds': age,
+                        'stale': stale_stats == 'YES' if stale_stats else None
+                    }
+
+        elif db_type == 'snowflake':
+            by_database = {}
+            for key in unique_tables:
+                by_database.setdefault(key[0] or default_database, []).append(key)
+            for database, keys in by_database.items():
+                pairs = list(dict.fromkeys((schema, table_name) for _, schema, table_name in keys))
+                grouped = _run_grouped(cursor, f"""
+                    SELECT TABLE_SCHEMA, TABLE_NAME, ROW_COUNT, LAST_ALTERED
+                    FROM {_info_schema(database, 'TABLES')}
+                    WHERE {{predicate}}
+                """, pairs, 'TABLE_SCHEMA', 'TABLE_NAME', 'pyformat')
+                for key in keys:
+                    rows = grouped.rows(key[1], key[2])
+                    if rows and rows[0][0] is not None:
+                        stats_as_of, age = _stats_age(rows[0][1])
+                        # ROW_COUNT is maintained by Snowflake on every write, so it is never stale
+                        estimates[key] = {
+                            'row_count': rows[0][0],
+                            'count_type': 'estimated',
+                            'count_source': 'INFORMATION_SCHEMA.TABLES.ROW_COUNT',
+                            'stats_as_of': stats_as_of,
+                            'stats_age_seconds': age,
+                            'stale': False
+                        }
+
+        elif db_type == 'databricks':
+            for key in unique_tables:
+                try:
+                    statistics = describe_table(cursor, (full_names or {})[key], memo)['statistics']
+                    if statistics and statistics['rows'] is not None:
+                        estimates[key] = {
+                            'row_count': statistics['rows'],
+                            'count_type': 'estimated',
+                            'count_source': 'DESCRIBE TABLE EXTENDED Statistics',
+                            'stats_as_of': None,
+                            'stats_age_seconds': None,
+                            'stale': None
+                        }
+                except Exception as error:
+                    logger.debug(f"No table statistics for {key}: {error}")
+
+    except Exception as error:
+        logger.warning(f"Could not read optimizer statistics for row estimates: {error}")
+
+    return estimates
@@ -0,0 +1,273 @@
+"""
+Compare Store
+Structural table fingerprints and schema snapshots persisted in SQLite, so repeat compares skip what has not changed
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS fingerprints (
+        scope TEXT NOT NULL,
+        table_key TEXT NOT NULL,
+        categories TEXT NOT NULL,
+        version TEXT NOT NULL,
+        fingerprint TEXT NOT NULL,
+        updated_at REAL NOT NULL,
+        PRIMARY KEY (scope, table_key, categories)
+    )
+"""
+
+# Last loaded metadata per table, and when (database time) each snapshot scope was last complete
+_SNAPSHOT_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS snapshots (
+        scope TEXT NOT NULL,
+        table_key TEXT NOT NULL,
+        categories TEXT NOT NULL,
+        metadata TEXT NOT NULL,
+        updated_at REAL NOT NULL,
+        PRIMARY KEY (scope, table_key, categories)
+    );
+    CREATE TABLE IF NOT EXISTS baselines (
+        scope TEXT NOT NULL,
+        categories TEXT NOT NULL,
+        taken_at TEXT NOT NULL,
+        tables INTEGER NOT NULL,
+        updated_at REAL NOT NULL,
+        PRIMARY KEY (scope, categories)
+    );
+"""
+
+# Rows per IN (...) lookup, below SQLite's bound-parameter limit
+_LOOKUP_CHUNK = 500
+
+
+def _normalized(metadata, category):
+    """The parts of a category that the schema_compare diffs look at, in a canonical order"""
+    value = metadata.get(category)
+    if category == 'structure':
+        return sorted([col['column_name'], col.get('data_type'), col.get('data_length'),
+                       col.get('data_precision'), col.get('nullable')] for col in value or [])
+    if category == 'indexes':
+        return sorted(idx['index_name'] for idx in value or [])
+    if category == 'primary_key':
+        return (value.get('columns') or '').strip() if value and value.get('constraint_name') else None
+    if category == 'foreign_keys':
+        return sorted([fk['constraint_name'], (fk.get('columns') or '').strip(),
+                       (fk.get('referenced_table') or '').strip()] for fk in value or [])
+    raise ValueError(f'Unknown category: {category}')
+
+
+def table_fingerprint(metadata, categories):
+    """
+    SHA-256 of a table's normalized metadata
+
+    Two tables with equal fingerprints have no differences in the compared
+    categories. Returns None when a category is missing (it could not be
+    read), since such a table must always be diffed.
+    """
+    if any(category not in metadata for category in categories):
+        return None
+    payload = json.dumps({category: _normalized(metadata, category) for category in sorted(categories)},
+                         sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def snapshot_copy(metadata):
+    """Metadata as it reads back from a snapshot (JSON types), so stored and freshly loaded tables diff alike"""
+    return json.loads(json.dumps(metadata, default=str))
+
+
+class FingerprintStore:
+    """
+    Table fingerprints by (scope, table, categories), valid while the table version is unchanged
+
+    scope identifies the environment and schema (e.g. a credential fingerprint plus
+    the schema name); version is the DDL version marker from fetch_ddl_versions().
+    """
+
+    def __init__(self, db_path):
+        """
+        Initialize store
+
+        Args:
+            db_path: SQLite database file (shared by worker processes)
+        """
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        with self._connect() as db:
+            db.execute(_SCHEMA)
+
+    def _connect(self):
+        db = sqlite3.connect(self.db_path, timeout=30)
+        db.execute("PRAGMA journal_mode=WAL")
+        return db
+
+    def get_many(self, scope, versions, categories):
+        """
+        Stored fingerprints still valid for the given versions
+
+        Args:
+            scope: Environment/schema scope
+            versions: {table_key: version}
+            categories: Compared categories
+
+        Returns:
+            dict: {table_key: fingerprint} for tables whose stored version matches
+        """
+        found = {}
+        categories_key = ','.join(sorted(categories))
+        keys = list(versions)
+        with self._connect() as db:
+            for start in range(0, len(keys), _LOOKUP_CHUNK):
+                chunk = keys[start:start + _LOOKUP_CHUNK]
+                rows = db.execute(
+                    f"SELECT table_key, version, fingerprint FROM fingerprints WHERE scope = ? AND categories = ?"
+                    f" AND table_key IN ({', '.join('?' * len(chunk))})",
+                    (scope, categories_key, *chunk)
+                ).fetchall()
+                found.update({table_key: fingerprint for table_key, version, fingerprint in rows
+                              if version == versions[table_key]})
+        with self._lock:
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, scope, entries, categories):
+        """
+        Store fingerprints
+
+        Args:
+            scope: Environment/schema scope
+            entries: {table_key: (version, fingerprint)}
+            categories: Compared categories
+        """
+        if not entries:
+            return
+        categories_key = ','.join(sorted(categories))
+        now = time.time()
+        with self._connect() as db:
+            db.executemany(
+                "INSERT OR REPLACE INTO fingerprints (scope, table_key, categories, version, fingerprint, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                [(scope, table_key, categories_key, version, fingerprint, now)
+                 for table_key, (version, fingerprint) in entries.items()]
+            )
+
+    def stats(self):
+        """Lookup counters for this process"""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses}
+
+
+class SnapshotStore:
+    """
+    Last loaded metadata per (scope, table, categories), plus the database time it is complete as of
+
+    A baseline is recorded only after a compare has refreshed or confirmed every
+    snapshot row of its scope, so on the next run a table whose DDL has not
+    changed since the baseline can be served from its snapshot.
+    """
+
+    def __init__(self, db_path):
+        """
+        Initialize store
+
+        Args:
+            db_path: SQLite database file (shared by worker processes)
+        """
+        self.db_path = db_path
+        with self._connect() as db:
+            db.executescript(_SNAPSHOT_SCHEMA)
+
+    def _connect(self):
+        db = sqlite3.connect(self.db_path, timeout=30)
+        db.execute("PRAGMA journal_mode=WAL")
+        return db
+
+    def baseline(self, scope, categories):
+        """
+        Database time of the scope's last complete snapshot
+
+        Returns:
+            str: ISO timestamp, or None when the scope has no baseline yet
+        """
+        with self._connect() as db:
+            row = db.execute("SELECT taken_at FROM baselines WHERE scope = ? AND categories = ?",
+                             (scope, ','.join(sorted(categories)))).fetchone()
+        return row[0] if row else None
+
+    def get_many(self, scope, table_keys, categories):
+        """
+        Stored snapshots of table_keys
+
+        Returns:
+            dict: {table_key: {category: value}} for tables with a snapshot
+        """
+        found = {}
+        categories_key = ','.join(sorted(categories))
+        keys = list(table_keys)
+        with self._connect() as db:
+            for start in range(0, len(keys), _LOOKUP_CHUNK):
+                chunk = keys[start:start + _LOOKUP_CHUNK]
+                rows = db.execute(
+                    f"SELECT table_key, metadata FROM snapshots WHERE scope = ? AND categories = ?"
+                    f" AND table_key IN ({', '.join('?' * len(chunk))})",
+                    (scope, categories_key, *chunk)
+                ).fetchall()
+                found.update({table_key: json.loads(metadata) for table_key, metadata in rows})
+        return found
+
+    def put_many(self, scope, tables, categories):
+        """
+        Store snapshots
+
+        Args:
+            scope: Environment/schema scope
+            tables: {table_key: {category: value}}
+            categories: Compared categories
+        """
+        if not tables:
+            return
+        categories_key = ','.join(sorted(categories))
+        now = time.time()
+        with self._connect() as db:
+            db.executemany(
+                "INSERT OR REPLACE INTO snapshots (scope, table_key, categories, metadata, updated_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                [(scope, table_key, categories_key, json.dumps(metadata, default=str), now)
+                 for table_key, metadata in tables.items()]
+            )
+
+    def commit(self, scope, categories, taken_at, current):
+        """
+        Record a baseline, dropping snapshots that are not known to be current
+
+        Args:
+            scope: Environment/schema scope
+            categories: Compared categories
+            taken_at: ISO database time read before the compare looked for changes
+            current: Table keys whose snapshot was refreshed or confirmed unchanged
+        """
+        categories_key = ','.join(sorted(categories))
+        current = set(current)
+        with self._connect() as db:
+            stored = [row[0] for row in db.execute(
+                "SELECT table_key FROM snapshots WHERE scope = ? AND categories = ?", (scope, categories_key)
+            ).fetchall()]
+            stale = [table_key for table_key in stored if table_key not in current]
+            db.executemany("DELETE FROM snapshots WHERE scope = ? AND table_key = ? AND categories = ?",
+                           [(scope, table_key, categories_key) for table_key in stale])
+            db.execute(
+                "INSERT OR REPLACE INTO baselines (scope, categories, taken_at, tables, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (scope, categories_key, taken_at, len(current), time.time())
+            )
+        logger.info(f"Snapshot baseline of {scope} at {taken_at}: {len(current)} table(s), {len(stale)} dropped")
@@ -0,0 +1,537 @@
+"""
+Connection Broker
+Local process that owns dual-login database connections and runs queries for every gunicorn worker
+
+Run it next to the web workers (gunicorn.conf.py starts it automatically when
+DB_BROKER_SOCKET is set):
+
+    python connection_broker.py --socket /tmp/db-analyzer-broker.sock
+
+For local testing, point --connector at a function that returns fake DB-API
+connections, e.g. --connector fake_drivers:connect
+"""
+
+import argparse
+import importlib
+import logging
+import os
+import signal
+import sys
+import threading
+import uuid
+from contextlib import contextmanager
+from multiprocessing.connection import Client, Listener
+
+from dual_connections import DualConnectionRegistry, AsyncConnector, ConnectionExpiredError, RegistryFullError, LoginQueueFullError
+
+logger = logging.getLogger(__name__)
+
+# Errors that keep their type when re-raised in the worker
+_REMOTE_ERRORS = {
+    'ConnectionExpiredError': ConnectionExpiredError,
+    'RegistryFullError': RegistryFullError,
+    'LoginQueueFullError': LoginQueueFullError,
+    'ValueError': ValueError
+}
+
+
+class BrokerError(Exception):
+    """Raised in the worker when the broker reports a database or protocol error"""
+
+
+def _remote_error(error_type, error_class, message):
+    """
+    Exception to raise in the worker for an error the broker reported
+
+    Driver errors (e.g. oracledb.DatabaseError) are re-raised as a subclass of
+    both the driver's class, when the worker can import it, and BrokerError, so
+    'except oracledb.Error' and 'except BrokerError' both still match.
+    """
+    if error_type in _REMOTE_ERRORS:
+        return _REMOTE_ERRORS[error_type](message)
+    module_name, _, class_name = (error_class or '').rpartition('.')
+    try:
+        driver_class = getattr(importlib.import_module(module_name), class_name)
+        if isinstance(driver_class, type) and issubclass(driver_class, Exception):
+            return type(class_name, (driver_class, BrokerError), {})(message)
+    except Exception:
+        pass
+    return BrokerError(message)
+
+
+def default_connector(db_type, connect_kwargs):
+    """
+    Open a real database connection inside the broker process
+
+    Args:
+        db_type: Database type (oracle, databricks, snowflake)
+        connect_kwargs: Driver connect() arguments
+
+    Returns:
+        DB-API connection
+    """
+    if db_type == 'oracle':
+        import oracledb
+        return oracledb.connect(**connect_kwargs)
+
+    if db_type == 'databricks':
+        from databricks import sql as databricks_sql
+        if connect_kwargs.get('auth_type') == 'azure-ad':
+            os.environ['DATABRICKS_CLI_DO_NOT_REDIRECT'] = '1'
+            try:
+                return databricks_sql.connect(**connect_kwargs)
+            finally:
+                os.environ.pop('DATABRICKS_CLI_DO_NOT_REDIRECT', None)
+        return databricks_sql.connect(**connect_kwargs)
+
+    if db_type == 'snowflake':
+        import snowflake.connector
+        return snowflake.connector.connect(**connect_kwargs)
+
+    raise ValueError(f'Unsupported database type: {db_type}')
+
+
+def _to_wire(value):
+    """Make a fetched value picklable (LOBs are read into str/bytes)"""
+    if hasattr(value, 'read') and callable(value.read):
+        return value.read()
+    return value
+
+
+def _describe(description):
+    """Picklable copy of cursor.description (type codes become their names)"""
+    if not description:
+        return None
+    return [
+        (col[0], None if col[1] is None else getattr(col[1], 'name', None) or str(col[1])) + tuple(col[2:7])
+        for col in description
+    ]
+
+
+def _public(entry):
+    """Registry entry without the connection object"""
+    return {k: v for k, v in entry.items() if k != 'connection'}
+
+
+class ConnectionBroker:
+    """
+    Owns database connections and executes cursor operations for remote workers
+
+    Connections live in a DualConnectionRegistry, so idle reaping, LRU eviction
+    and the per-user caps apply once for the whole deployment instead of once
+    per worker. Each worker socket is served by its own thread; a session is
+    leased for as long as a worker holds an open cursor on it.
+    """
+
+    def __init__(self, address, authkey, connector=None, registry=None, login_workers=4, login_max_queued=20):
+        """
+        Initialize broker
+
+        Args:
+            address: Unix socket path to listen on
+            authkey: Shared secret (bytes) workers must present
+            connector: Callable(db_type, connect_kwargs) returning a DB-API
+                connection (default: the real drivers)
+            registry: DualConnectionRegistry to store connections in
+            login_workers: Background threads for async logins (default: 4)
+            login_max_queued: Async logins pending before new ones are refused (default: 20)
+        """
+        self.address = address
+        self.authkey = authkey
+        self.registry = registry or DualConnectionRegistry()
+        self.registry.connector = connector or self.registry.connector or default_connector
+        self.logins = AsyncConnector(self.registry, max_workers=login_workers, max_queued=login_max_queued)
+        self._cursors = {}  # cursor_id -> (cursor, lease context manager)
+        self._lock = threading.Lock()
+        self._listener = None
+        self.requests = 0
+
+    def serve_forever(self):
+        """Accept worker connections until close() is called"""
+        if os.path.exists(self.address):
+            os.unlink(self.address)
+        self._listener = Listener(self.address, family='AF_UNIX', authkey=self.authkey)
+        logger.info(f"Connection broker listening on {self.address}")
+
+        while True:
+            try:
+                channel = self._listener.accept()
+            except OSError:
+                break  # listener closed
+            except Exception as error:
+                logger.warning(f"Rejected broker client: {error}")
+                continue
+            threading.Thread(target=self._serve_client, args=(channel,), name='broker-client', daemon=True).start()
+
+    def close(self):
+        """Stop accepting clients and close every connection"""
+        if self._listener is not None:
+            self._listener.close()
+        with self._lock:
+            cursors = list(self._cursors)
+        for cursor_id in cursors:
+            self._close_cursor(cursor_id)
+        self.registry.close_all()
+
+    def _serve_client(self, channel):
+        """Handle requests from one worker socket; release its cursors when it goes away"""
+        owned = set()
+        try:
+            while True:
+                try:
+                    op, args = channel.recv()
+                except (EOFError, OSError):
+                    break
+                try:
+                    result = self._dispatch(op, args, owned)
+                    channel.send(('ok', result))
+                except Exception as error:
+                    error_class = f"{type(error).__module__}.{type(error).__qualname__}"
+                    channel.send(('error', type(error).__name__, str(error), error_class))
+        finally:
+            for cursor_id in list(owned):
+                self._close_cursor(cursor_id)
+            channel.close()
+
+    def _dispatch(self, op, args, owned):
+        """Run one request"""
+        self.requests += 1
+
+        if op == 'open':
+            session_id, db_type, connect_kwargs, entry = args
+            return _public(self.registry.open(session_id, db_type, connect_kwargs, entry))
+
+        if op == 'submit':
+            self.logins.submit(*args)
+            return True
+
+        if op == 'login_status':
+            return self.logins.status(args[0])
+
+        if op == 'get':
+            entry = self.registry.get(args[0])
+            return _public(entry) if entry is not None else None
+
+        if op == 'remove':
+            return self.registry.remove(args[0])
+
+        if op == 'status':
+            return dict(self.registry.status(), broker_requests=self.requests)
+
+        if op == 'cursor':
+            lease = self.registry.lease(args[0])
+            entry = lease.__enter__()
+            try:
+                cursor = entry['connection'].cursor()
+            except Exception:
+                lease.__exit__(None, None, None)
+                raise
+            cursor_id = uuid.uuid4().hex
+            with self._lock:
+                self._cursors[cursor_id] = (cursor, lease)
+            owned.add(cursor_id)
+            return cursor_id
+
+        if op == 'execute':
+            cursor_id, sql, params = args
+            cursor = self._cursor(cursor_id)
+            if params is None:
+                cursor.execute(sql)
+            else:
+                cursor.execute(sql, params)
+            return _describe(cursor.description), getattr(cursor, 'rowcount', -1)
+
+        if op == 'fetch':
+            cursor_id, size = args
+            cursor = self._cursor(cursor_id)
+            rows = cursor.fetchall() if size is None else cursor.fetchmany(size)
+            return [tuple(_to_wire(value) for value in row) for row in rows]
+
+        if op == 'close_cursor':
+            owned.discard(args[0])
+            self._close_cursor(args[0])
+            return True
+
+        raise ValueError(f'Unknown broker operation: {op}')
+
+    def _cursor(self, cursor_id):
+        with self._lock:
+            item = self._cursors.get(cursor_id)
+        if item is None:
+            raise ValueError('Cursor is closed')
+        return item[0]
+
+    def _close_cursor(self, cursor_id):
+        """Close a cursor and end its session lease"""
+        with self._lock:
+            item = self._cursors.pop(cursor_id, None)
+        if item is None:
+            return
+        cursor, lease = item
+        try:
+            cursor.close()
+        except Exception:
+            pass
+        lease.__exit__(None, None, None)
+
+
+class BrokerClient:
+    """
+    Worker-side connection to the broker
+
+    Each thread gets its own socket so concurrent requests in one worker do
+    not interleave messages. A dropped socket is reopened once per call.
+    """
+
+    def __init__(self, address, authkey):
+        """
+        Initialize client
+
+        Args:
+            address: Broker Unix socket path
+            authkey: Shared secret (bytes)
+        """
+        self.address = address
+        self.authkey = authkey
+        self._local = threading.local()
+
+    def _channel(self):
+        channel = getattr(self._local, 'channel', None)
+        if channel is None:
+            channel = Client(self.address, family='AF_UNIX', authkey=self.authkey)
+            self._local.channel = channel
+        return channel
+
+    def call(self, op, *args):
+        """
+        Send one request and wait for the reply
+
+        Only a request that could not be sent is retried (on a fresh socket): once
+        it is on the wire the broker may have run it, so a lost reply is raised
+        rather than executing the statement or fetch a second time.
+
+        Raises:
+            ConnectionExpiredError, RegistryFullError, LoginQueueFullError, ValueError: Re-raised from the broker
+            Driver errors (e.g. oracledb.Error, also a BrokerError) when the worker has the driver
+            BrokerError: For any other broker-side error
+        """
+        for attempt in (1, 2):
+            try:
+                channel = self._channel()
+                channel.send((op, args))
+                break
+            except OSError:
+                self._local.channel = None
+                if attempt == 2:
+                    raise
+        try:
+            reply = channel.recv()
+        except (EOFError, OSError):
+            self._local.channel = None
+            raise
+        if reply[0] == 'ok':
+            return reply[1]
+        _, error_type, message, *error_class = reply
+        raise _remote_error(error_type, error_class[0] if error_class else None, message)
+
+
+class BrokerCursor:
+    """DB-API cursor proxy; rows are fetched from the broker on demand"""
+
+    def __init__(self, client, cursor_id):
+        self._client = client
+        self._cursor_id = cursor_id
+        self.description = None
+        self.rowcount = -1
+        self.arraysize = 1000
+
+    def execute(self, sql, params=None):
+        self.description, self.rowcount = self._client.call('execute', self._cursor_id, sql, params)
+        return self
+
+    def fetchone(self):
+        rows = self._client.call('fetch', self._cursor_id, 1)
+        return rows[0] if rows else None
+
+    def fetchmany(self, size=None):
+        return self._client.call('fetch', self._cursor_id, size or self.arraysize)
+
+    def fetchall(self):
+        return self._client.call('fetch', self._cursor_id, None)
+
+    def __iter__(self):
+        while True:
+            rows = self.fetchmany()
+            if not rows:
+                return
+            yield from rows
+
+    def close(self):
+        if self._cursor_id is not None:
+            self._client.call('close_cursor', self._cursor_id)
+            self._cursor_id = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class BrokerConnection:
+    """
+    DB-API connection proxy for a session owned by the broker
+
+    close() only closes the cursors opened through the proxy: the broker
+    decides when the real connection closes (dual-logout, idle reaping or
+    eviction).
+    """
+
+    def __init__(self, client, session_id):
+        self._client = client
+        self.session_id = session_id
+        self._cursors = []
+
+    def cursor(self):
+        cursor = BrokerCursor(self._client, self._client.call('cursor', self.session_id))
+        self._cursors.append(cursor)
+        return cursor
+
+    def close(self):
+        """Close cursors opened through this proxy (ends their broker-side lease)"""
+        cursors, self._cursors = self._cursors, []
+        for cursor in cursors:
+            try:
+                cursor.close()
+            except Exception:
+                pass
+
+
+class BrokerRegistry:
+    """
+    Drop-in replacement for DualConnectionRegistry that stores connections in the broker
+
+    Entries handed to callers carry a BrokerConnection, so endpoint code that
+    does entry['connection'].cursor() works unchanged on any worker.
+    """
+
+    def __init__(self, address, authkey):
+        """
+        Initialize registry proxy
+
+        Args:
+            address: Broker Unix socket path
+            authkey: Shared secret (bytes)
+        """
+        self.client = BrokerClient(address, authkey)
+
+    def _entry(self, session_id, public):
+        return dict(public, connection=BrokerConnection(self.client, session_id))
+
+    def open(self, session_id, db_type, connect_kwargs, entry):
+        """Open the connection inside the broker and register it there"""
+        return self._entry(session_id, self.client.call('open', session_id, db_type, connect_kwargs, entry))
+
+    def __contains__(self, session_id):
+        return self.client.call('get', session_id) is not None
+
+    def __getitem__(self, session_id):
+        public = self.client.call('get', session_id)
+        if public is None:
+            raise ConnectionExpiredError(f"Connection {session_id} not found or expired")
+        return self._entry(session_id, public)
+
+    def get(self, session_id, default=None):
+        try:
+            return self[session_id]
+        except ConnectionExpiredError:
+            return default
+
+    @contextmanager
+    def lease(self, session_id):
+        """
+        Borrow an entry for the duration of a request
+
+        The broker leases the session for each open cursor; cursors the request
+        left open are closed on exit so the session can be reaped again.
+        """
+        entry = self[session_id]
+        try:
+            yield entry
+        finally:
+            entry['connection'].close()
+
+    def remove(self, session_id):
+        return self.client.call('remove', session_id)
+
+    def reap(self):
+        return 0  # the broker runs its own reaper
+
+    def start_reaper(self):
+        pass
+
+    def status(self):
+        return dict(self.client.call('status'), broker=self.client.address)
+
+
+class BrokerAsyncConnector:
+    """Drop-in replacement for AsyncConnector that opens connections inside the broker"""
+
+    def __init__(self, registry):
+        """
+        Initialize async connector proxy
+
+        Args:
+            registry: BrokerRegistry sharing the broker client
+        """
+        self.registry = registry
+        self.client = registry.client
+
+    def submit(self, session_id, db_type, connect_kwargs, entry):
+        self.client.call('submit', session_id, db_type, connect_kwargs, entry)
+
+    def status(self, session_id):
+        return self.client.call('login_status', session_id)
+
+
+def load_connector(path):
+    """Import a connector given as 'module:function'"""
+    module_name, _, attr = path.partition(':')
+    return getattr(importlib.import_module(module_name), attr or 'connect')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='DB Analyzer connection broker')
+    parser.add_argument('--socket', default=os.getenv('DB_BROKER_SOCKET', '/tmp/db-analyzer-broker.sock'))
+    parser.add_argument('--connector', default=os.getenv('DB_BROKER_CONNECTOR'),
+                        help="'module:function' returning DB-API connections (default: real drivers)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - broker - %(levelname)s - %(message)s')
+
+    authkey = os.getenv('DB_BROKER_AUTHKEY')
+    if not authkey:
+        parser.error('DB_BROKER_AUTHKEY must be set (shared with the web workers)')
+
+    registry = DualConnectionRegistry(
+        idle_ttl=int(os.getenv('DUAL_CONNECTION_IDLE_TTL', '1800')),
+        max_connections=int(os.getenv('DUAL_CONNECTION_MAX', '50')),
+        max_per_user=int(os.getenv('DUAL_CONNECTION_MAX_PER_USER', '6'))
+    )
+    connector = load_connector(args.connector) if args.connector else None
+    broker = ConnectionBroker(args.socket, authkey.encode(), connector=connector, registry=registry,
+                              login_workers=int(os.getenv('DUAL_LOGIN_WORKERS', '4')),
+                              login_max_queued=int(os.getenv('DUAL_LOGIN_MAX_QUEUED', '20')))
+
+    # gunicorn stops the broker with SIGTERM; exit through the finally block so connections close cleanly
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        broker.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        broker.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,641 @@
+"""
+Connection Pool for Database Sessions
+Keeps bounded, thread-safe pools of warm database connections keyed by credential fingerprint
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no pooled connection becomes available within the checkout timeout"""
+
+
+def credential_fingerprint(db_type, params):
+    """
+    Build a stable, non-reversible key for a set of connection parameters
+
+    Args:
+        db_type: Database type (oracle, databricks, snowflake)
+        params: Dict of connection parameters (may include secrets)
+
+    Returns:
+        str: SHA-256 hex digest identifying the credential set
+    """
+    payload = json.dumps({'db_type': db_type, 'params': params}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+# Cheapest valid round-trip per dialect, used when the driver has no ping()
+LIVENESS_PROBES = {
+    'oracle': 'SELECT 1 FROM DUAL',
+    'snowflake': 'SELECT 1',
+    'databricks': 'SELECT 1'
+}
+
+
+class LivenessStats:
+    """
+    Thread-safe counters for connection liveness checks
+
+    skipped: probe avoided because the connection was used successfully within the window
+    probed: probe actually issued (ping or dialect query)
+    failed: probe found a dead connection, which was discarded
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.skipped = 0
+        self.probed = 0
+        self.failed = 0
+
+    def record(self, skipped=False, failed=False):
+        """Record the outcome of one liveness check"""
+        with self._lock:
+            if skipped:
+                self.skipped += 1
+            else:
+                self.probed += 1
+                if failed:
+                    self.failed += 1
+
+    def snapshot(self):
+        """
+        Get counter values
+
+        Returns:
+            dict: Counters plus the number of round-trips saved by skipping probes
+        """
+        with self._lock:
+            total = self.skipped + self.probed
+            return {
+                'probe_skipped': self.skipped,
+                'probe_run': self.probed,
+                'probe_failed': self.failed,
+                'round_trips_saved': self.skipped,
+                'skip_ratio': round(self.skipped / total, 3) if total else 0
+            }
+
+
+# Global liveness counters shared by all pools in this process
+liveness_stats = LivenessStats()
+
+
+def check_connection_alive(connection, db_type=None):
+    """
+    Check whether a connection is still usable
+
+    Uses connection.ping() where the driver provides it (oracledb), then
+    is_healthy()/is_closed() style flags, and finally the cheapest valid
+    query for the dialect (SELECT 1 FROM DUAL on Oracle).
+
+    Args:
+        connection: DB-API connection to check
+        db_type: Database type (oracle, databricks, snowflake)
+
+    Returns:
+        bool: True if the connection answered
+    """
+    try:
+        ping = getattr(connection, 'ping', None)
+        if callable(ping):
+            ping()
+            return True
+
+        is_healthy = getattr(connection, 'is_healthy', None)
+        if callable(is_healthy) and not is_healthy():
+            return False
+
+        is_closed = getattr(connection, 'is_closed', None)
+        if callable(is_closed) and is_closed():
+            return False
+
+        if getattr(connection, 'open', True) is False:
+            return False
+
+        cursor = connection.cursor()
+        try:
+            cursor.execute(LIVENESS_PROBES.get(db_type, 'SELECT 1'))
+            cursor.fetchall()
+        finally:
+            cursor.close()
+        return True
+    except Exception as error:
+        logger.warning(f"Liveness probe failed ({db_type}): {error}")
+        return False
+
+
+def validate_connection(connection, db_type, last_used, window):
+    """
+    Time-gated liveness check: skip the probe if the connection was used recently
+
+    Args:
+        connection: DB-API connection to check
+        db_type: Database type used to pick the probe
+        last_used: Timestamp of the last successful use
+        window: Seconds after last use during which the probe is skipped
+
+    Returns:
+        bool: True if the connection can be handed out
+    """
+    if window and time.time() - last_used <= window:
+        liveness_stats.record(skipped=True)
+        return True
+
+    alive = check_connection_alive(connection, db_type)
+    liveness_stats.record(failed=not alive)
+    return alive
+
+
+class _PooledConnection:
+    """Bookkeeping for one physical connection owned by a pool"""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.created_at = time.time()
+        self.last_used = self.created_at
+
+
+class ConnectionPool:
+    """
+    Queue-based connection pool (used for Snowflake and Databricks)
+
+    Connections are handed out LIFO so the warmest one is reused first. Idle
+    connections are closed after idle_timeout and every connection is recycled
+    once it is older than max_lifetime.
+    """
+
+    def __init__(self, connect, min_size=0, max_size=4, checkout_timeout=30,
+                 idle_timeout=300, max_lifetime=3600, name='pool',
+                 db_type=None, liveness_window=30):
+        """
+        Initialize connection pool
+
+        Args:
+            connect: Zero-argument callable that opens a new DB-API connection
+            min_size: Connections kept open by idle eviction (default: 0); connections
+                are opened on demand or adopted, never pre-opened
+            max_size: Maximum connections open at once (default: 4)
+            checkout_timeout: Seconds to wait for a free connection (default: 30)
+            idle_timeout: Seconds an idle connection is kept (default: 300)
+            max_lifetime: Seconds before a connection is recycled (default: 3600)
+            name: Label used in logs and status output
+            db_type: Database type, selects the liveness probe
+            liveness_window: Skip the liveness probe if the connection was used
+                within this many seconds (default: 30, 0 = always probe)
+        """
+        self._connect = connect
+        self.db_type = db_type
+        self.liveness_window = liveness_window
+        self.min_size = min_size
+        self.max_size = max(1, max_size)
+        self.checkout_timeout = checkout_timeout
+        self.idle_timeout = idle_timeout
+        self.max_lifetime = max_lifetime
+        self.name = name
+
+        self._cond = threading.Condition()
+        self._idle = []  # LIFO stack of _PooledConnection
+        self._in_use = {}  # id(connection) -> _PooledConnection
+        self._size = 0
+        self._closed = False
+        self.last_activity = time.time()
+
+    def _is_expired(self, entry, now):
+        """Check whether a connection has outlived max_lifetime"""
+        return bool(self.max_lifetime) and now - entry.created_at > self.max_lifetime
+
+    def _evict_locked(self, now):
+        """
+        Remove expired and surplus idle connections (caller holds the lock)
+
+        Returns:
+            list: Connections that must be closed outside the lock
+        """
+        to_close = []
+        keep = []
+        for entry in self._idle:
+            idle_for = now - entry.last_used
+            surplus = self._size - len(to_close) > self.min_size
+            if self._is_expired(entry, now) or (self.idle_timeout and idle_for > self.idle_timeout and surplus):
+                to_close.append(entry.connection)
+            else:
+                keep.append(entry)
+        self._idle = keep
+        self._size -= len(to_close)
+        return to_close
+
+    @staticmethod
+    def _close_quietly(connections):
+        """Close connections, ignoring errors from already-dead sessions"""
+        for connection in connections:
+            try:
+                connection.close()
+            except Exception:
+                pass
+
+    def acquire(self):
+        """
+        Check out a connection, opening a new one if the pool has room
+
+        Returns:
+            Connection: A DB-API connection owned by this pool
+
+        Raises:
+            PoolTimeoutError: If the pool is exhausted for checkout_timeout seconds
+        """
+        deadline = time.time() + self.checkout_timeout
+        to_close = []
+
+        while True:
+            entry = None
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise RuntimeError(f"Connection pool {self.name} is closed")
+
+                    to_close.extend(self._evict_locked(time.time()))
+
+                    if self._idle:
+                        entry = self._idle.pop()
+                        break
+
+                    if self._size < self.max_size:
+                        # Reserve a slot, then open the connection outside the lock
+                        self._size += 1
+                        break
+
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        self._close_quietly(to_close)
+                        raise PoolTimeoutError(
+                            f"No connection available in {self.name} after {self.checkout_timeout}s "
+                            f"({self.max_size} in use)"
+                        )
+                    self._cond.wait(remaining)
+
+            self._close_quietly(to_close)
+            to_close = []
+
+            if entry is None or validate_connection(entry.connection, self.db_type,
+                                                    entry.last_used, self.liveness_window):
+                break
+
+            # Dead connection: free its slot and try again
+            logger.warning(f"Discarding dead connection from {self.name}")
+            self._close_quietly([entry.connection])
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+
+        if entry is None:
+            try:
+                entry = _PooledConnection(self._connect())
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                raise
+
+        with self._cond:
+            entry.last_used = time.time()
+            self._in_use[id(entry.connection)] = entry
+            self.last_activity = entry.last_used
+
+        return entry.connection
+
+    def release(self, connection, discard=False):
+        """
+        Return a connection to the pool
+
+        Args:
+            connection: Connection previously returned by acquire()
+            discard: Close the connection instead of keeping it (e.g. after a network error)
+        """
+        close_it = False
+        with self._cond:
+            entry = self._in_use.pop(id(connection), None)
+            if entry is None:
+                return
+
+            now = time.time()
+            if discard or self._closed or self._is_expired(entry, now):
+                self._size -= 1
+                close_it = True
+            else:
+                entry.last_used = now
+                self._idle.append(entry)
+
+            self.last_activity = now
+            self._cond.notify()
+
+        if close_it:
+            self._close_quietly([connection])
+
+    def adopt(self, connection):
+        """
+        Add an already-open connection to the idle set
+
+        Args:
+            connection: Live connection opened outside the pool (e.g. at login)
+
+        Returns:
+            bool: True if adopted, False if the pool was full and the connection was closed
+        """
+        with self._cond:
+            adopted = not self._closed and self._size < self.max_size
+            if adopted:
+                self._idle.append(_PooledConnection(connection))
+                self._size += 1
+                self.last_activity = time.time()
+                self._cond.notify()
+
+        if not adopted:
+            self._close_quietly([connection])
+        return adopted
+
+    def reap(self):
+        """Close idle and expired connections; called periodically by PoolManager"""
+        with self._cond:
+            to_close = self._evict_locked(time.time())
+            if to_close:
+                self._cond.notify_all()
+        self._close_quietly(to_close)
+        return len(to_close)
+
+    def is_unused(self):
+        """True when the pool holds no connections at all"""
+        with self._cond:
+            return self._size == 0
+
+    def close(self):
+        """Close all idle connections; in-use ones are closed when released"""
+        with self._cond:
+            self._closed = True
+            to_close = [entry.connection for entry in self._idle]
+            self._size -= len(self._idle)
+            self._idle = []
+            self._cond.notify_all()
+        self._close_quietly(to_close)
+
+    def status(self):
+        """
+        Get pool occupancy
+
+        Returns:
+            dict: Pool size, idle and in-use counts and limits
+        """
+        with self._cond:
+            return {
+                'name': self.name,
+                'kind': 'queue',
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': len(self._in_use),
+                'min_size': self.min_size,
+                'max_size': self.max_size
+            }
+
+
+class OracleSessionPool:
+    """
+    Oracle pool backed by oracledb.create_pool
+
+    Exposes the same acquire/release/reap/close/status interface as ConnectionPool
+    while letting the driver handle session reuse, idle timeout, lifetime and
+    liveness: a session idle for longer than liveness_window is pinged by the
+    driver before it is handed out (these pings are not in liveness_stats).
+    """
+
+    def __init__(self, user, password, dsn, min_size=1, max_size=4, checkout_timeout=30,
+                 idle_timeout=300, max_lifetime=3600, name='oracle', liveness_window=30):
+        import oracledb
+
+        self._oracledb = oracledb
+        self.name = name
+        self.liveness_window = liveness_window
+        self.last_activity = time.time()
+        self._pool = oracledb.create_pool(
+            user=user,
+            password=password,
+            dsn=dsn,
+            min=min_size,
+            max=max(1, max_size),
+            increment=1,
+            getmode=oracledb.POOL_GETMODE_TIMEDWAIT,
+            wait_timeout=int(checkout_timeout * 1000),  # milliseconds
+            timeout=int(idle_timeout),
+            max_lifetime_session=int(max_lifetime),
+            ping_interval=int(liveness_window)  # 0 = ping on every acquire
+        )
+
+    def acquire(self):
+        """Check out a pooled Oracle session; the driver pings it first if it has been idle"""
+        try:
+            connection = self._pool.acquire()
+        except self._oracledb.Error as error:
+            # DPY-4005 / ORA-24457: timed out waiting for a free session
+            if 'DPY-4005' in str(error) or 'ORA-24457' in str(error):
+                raise PoolTimeoutError(f"No connection available in {self.name}: {error}") from error
+            raise
+
+        self.last_activity = time.time()
+        return connection
+
+    def release(self, connection, discard=False):
+        """Return a session to the pool, or drop it if discard is set"""
+        self.last_activity = time.time()
+        try:
+            if discard:
+                self._pool.drop(connection)
+            else:
+                self._pool.release(connection)
+        except self._oracledb.Error as error:
+            logger.warning(f"Error returning connection to {self.name}: {error}")
+
+    def reap(self):
+        """The driver enforces idle timeout and max lifetime itself"""
+        return 0
+
+    def is_unused(self):
+        """True when no sessions are checked out"""
+        return self._pool.busy == 0
+
+    def close(self):
+        """Close the pool and all of its sessions"""
+        try:
+            self._pool.close(force=True)
+        except self._oracledb.Error as error:
+            logger.warning(f"Error closing {self.name}: {error}")
+
+    def status(self):
+        """Get pool occupancy as reported by the driver"""
+        return {
+            'name': self.name,
+            'kind': 'oracledb',
+            'size': self._pool.opened,
+            'idle': self._pool.opened - self._pool.busy,
+            'in_use': self._pool.busy,
+            'min_size': self._pool.min,
+            'max_size': self._pool.max
+        }
+
+
+class PoolManager:
+    """
+    Registry of connection pools keyed by credential fingerprint
+
+    Tracks which pool each checked-out connection came from so callers can
+    simply hand the connection back, and runs a background reaper that closes
+    idle connections and drops pools nobody has used for a while.
+    """
+
+    def __init__(self, pool_idle_timeout=1800, reap_interval=60):
+        """
+        Initialize pool manager
+
+        Args:
+            pool_idle_timeout: Seconds an unused pool is kept before it is closed (default: 1800)
+            reap_interval: Seconds between reaper runs (default: 60)
+        """
+        self.pool_idle_timeout = pool_idle_timeout
+        self.reap_interval = reap_interval
+        self._pools = {}
+        self._owners = {}  # id(connection) -> pool key
+        self._lock = threading.Lock()
+        self._reaper = None
+
+    def get_pool(self, key, factory):
+        """
+        Get the pool for a key, creating it with factory() on first use
+
+        Args:
+            key: Credential fingerprint
+            factory: Zero-argument callable returning a new pool
+        """
+        with self._lock:
+            pool = self._pools.get(key)
+        if pool is not None:
+            return pool
+
+        # Create outside the lock: Oracle pool creation opens sessions
+        new_pool = factory()
+        with self._lock:
+            pool = self._pools.setdefault(key, new_pool)
+        if pool is not new_pool:
+            new_pool.close()
+        return pool
+
+    def has_pool(self, key):
+        """Check whether a pool exists for a key"""
+        with self._lock:
+            return key in self._pools
+
+    def acquire(self, key, factory):
+        """
+        Check out a connection from the pool for a key
+
+        Args:
+            key: Credential fingerprint
+            factory: Callable that creates the pool if it does not exist yet
+
+        Returns:
+            Connection: A pooled DB-API connection
+        """
+        self.start_reaper()
+        pool = self.get_pool(key, factory)
+        connection = pool.acquire()
+        with self._lock:
+            self._owners[id(connection)] = key
+        return connection
+
+    def adopt(self, key, factory, connection):
+        """
+        Hand an already-open connection to the pool for a key
+
+        Args:
+            key: Credential fingerprint
+            factory: Callable that creates the pool if it does not exist yet
+            connection: Live connection to add to the pool
+
+        Returns:
+            bool: True if the pool kept the connection
+        """
+        self.start_reaper()
+        return self.get_pool(key, factory).adopt(connection)
+
+    def release(self, connection, discard=False):
+        """
+        Return a connection to whichever pool it came from
+
+        Connections that did not come from a pool are simply closed.
+        """
+        with self._lock:
+            key = self._owners.pop(id(connection), None)
+            pool = self._pools.get(key) if key else None
+
+        if pool is None:
+            try:
+                connection.close()
+            except Exception:
+                pass
+            return
+
+        pool.release(connection, discard=discard)
+
+    def close_pool(self, key):
+        """Close and forget the pool for a key"""
+        with self._lock:
+            pool = self._pools.pop(key, None)
+        if pool is not None:
+            pool.close()
+            logger.info(f"Closed connection pool {pool.name}")
+
+    def reap(self):
+        """Close idle connections and drop pools that have gone unused"""
+        now = time.time()
+        with self._lock:
+            pools = list(self._pools.items())
+
+        for key, pool in pools:
+            try:
+                pool.reap()
+                if pool.is_unused() and now - pool.last_activity > self.pool_idle_timeout:
+                    self.close_pool(key)
+            except Exception as error:
+                logger.warning(f"Error reaping connection pool {pool.name}: {error}")
+
+    def _reap_forever(self):
+        """Reaper thread body"""
+        while True:
+            time.sleep(self.reap_interval)
+            self.reap()
+
+    def start_reaper(self):
+        """Start the background reaper thread once per process"""
+        if self._reaper is not None:
+            return
+        with self._lock:
+            if self._reaper is None:
+                self._reaper = threading.Thread(target=self._reap_forever, name='db-pool-reaper', daemon=True)
+                self._reaper.start()
+
+    def status(self):
+        """
+        Get status for every pool
+
+        Returns:
+            dict: Number of pools and per-pool occupancy (keys are truncated fingerprints)
+        """
+        with self._lock:
+            pools = list(self._pools.items())
+        return {
+            'pool_count': len(pools),
+            'pools': {key[:12]: pool.status() for key, pool in pools},
+            'liveness': liveness_stats.snapshot()
+        }
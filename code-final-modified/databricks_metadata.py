@@ -0,0 +1,156 @@
+"""
+Databricks Table Metadata
+Parses one DESCRIBE TABLE EXTENDED (plus DESCRIBE DETAIL on demand) into every per-table probe result
+"""
+
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+_CONSTRAINT_PK = re.compile(r'PRIMARY KEY\s*\((.*?)\)', re.IGNORECASE)
+_CONSTRAINT_FK = re.compile(r'FOREIGN KEY\s*\((.*?)\)\s*REFERENCES\s+(\S+)\s*\((.*?)\)', re.IGNORECASE)
+_STATISTICS = re.compile(r'(\d+)\s+bytes(?:,\s*(\d+)\s+rows)?', re.IGNORECASE)
+
+
+def _identifiers(text):
+    """Split a `a`, `b` column list (or a `cat`.`sch`.`tbl` name part) into bare names"""
+    return [part.strip().strip('`') for part in text.split(',') if part.strip()]
+
+
+def _properties(text):
+    """Parse the [key=value, key=value] form of the Table Properties row"""
+    properties = {}
+    for item in (text or '').strip().strip('[]').split(','):
+        if '=' in item:
+            name, value = item.split('=', 1)
+            properties[name.strip()] = value.strip()
+    return properties
+
+
+def parse_describe_extended(rows):
+    """
+    Parse DESCRIBE TABLE EXTENDED rows (col_name, data_type, comment)
+
+    The output is a column list, then sections introduced by "# ..." rows:
+    "# Partition Information" / "# Clustering Information" (a "# col_name"
+    header and the key columns), "# Detailed Table Information" (name/value
+    rows such as Location, Provider, Owner and Statistics) and, for Unity
+    Catalog tables with constraints, "# Constraints".
+
+    Returns:
+        dict: columns, partition_columns, clustering_columns, primary_key,
+              foreign_keys, details, properties, statistics ({'bytes', 'rows'})
+    """
+    info = {
+        'columns': [],
+        'partition_columns': [],
+        'clustering_columns': [],
+        'primary_key': None,
+        'foreign_keys': [],
+        'details': {},
+        'properties': {},
+        'statistics': None
+    }
+    section = 'columns'
+
+    for row in rows:
+        name = (row[0] or '').strip() if row else ''
+        value = row[1] if len(row) > 1 else None
+        comment = row[2] if len(row) > 2 else None
+
+        if name.startswith('#'):
+            heading = name.lstrip('#').strip().lower()
+            if heading == 'col_name':
+                continue
+            if 'partition' in heading:
+                section = 'partition_columns'
+            elif 'clustering' in heading:
+                section = 'clustering_columns'
+            elif 'constraint' in heading:
+                section = 'constraints'
+            elif 'detailed' in heading or 'storage' in heading:
+                section = 'details'
+            else:
+                section = 'other'
+            continue
+        if not name:
+            continue
+
+        if section == 'columns':
+            info['columns'].append({'column_name': name, 'data_type': value, 'comment': comment})
+        elif section in ('partition_columns', 'clustering_columns'):
+            info[section].append(name)
+        elif section == 'details':
+            info['details'][name] = value
+            if name == 'Table Properties':
+                info['properties'] = _properties(value)
+            elif name == 'Statistics' and value:
+                match = _STATISTICS.search(str(value))
+                if match:
+                    info['statistics'] = {
+                        'bytes': int(match.group(1)),
+                        'rows': int(match.group(2)) if match.group(2) else None
+                    }
+        elif section == 'constraints':
+            definition = str(value or '')
+            primary_key = _CONSTRAINT_PK.search(definition)
+            foreign_key = _CONSTRAINT_FK.search(definition)
+            if primary_key:
+                info['primary_key'] = {'constraint_name': name, 'columns': _identifiers(primary_key.group(1))}
+            elif foreign_key:
+                info['foreign_keys'].append({
+                    'constraint_name': name,
+                    'columns': _identifiers(foreign_key.group(1)),
+                    'referenced_table': '.'.join(_identifiers(foreign_key.group(2).replace('.', ','))),
+                    'referenced_columns': _identifiers(foreign_key.group(3))
+                })
+
+    return info
+
+
+def describe_table(cursor, full_name, memo=None):
+    """
+    Parsed DESCRIBE TABLE EXTENDED for a table
+
+    Results are kept in memo (any dict, normally one per request) so every
+    probe of the same table shares one warehouse round trip.
+
+    Args:
+        cursor: Database cursor
+        full_name: catalog.schema.table
+        memo: Dict shared by the callers of one request (optional)
+
+    Returns:
+        dict: parse_describe_extended() result
+    """
+    memo = memo if memo is not None else {}
+    key = ('extended', full_name)
+    if key not in memo:
+        cursor.execute(f"DESCRIBE TABLE EXTENDED {full_name}")
+        memo[key] = parse_describe_extended(cursor.fetchall())
+    return memo[key]
+
+
+def describe_detail(cursor, full_name, memo=None):
+    """
+    DESCRIBE DETAIL (Delta only) as a dict keyed by column name, memoized like describe_table()
+
+    Only needed for what DESCRIBE TABLE EXTENDED lacks: lastModified, numFiles
+    and sizeInBytes of tables without computed statistics.
+
+    Returns:
+        dict: e.g. format, location, lastModified, partitionColumns, numFiles, sizeInBytes
+              (empty for tables that are not Delta)
+    """
+    memo = memo if memo is not None else {}
+    key = ('detail', full_name)
+    if key not in memo:
+        try:
+            cursor.execute(f"DESCRIBE DETAIL {full_name}")
+            row = cursor.fetchone()
+            memo[key] = dict(zip([desc[0] for desc in cursor.description or []], row)) if row else {}
+        except Exception as error:
+            logger.debug(f"No DESCRIBE DETAIL for {full_name}: {error}")
+            memo[key] = {}
+    return memo[key]
@@ -0,0 +1,389 @@
+"""
+Dual Connection Registry
+Tracks source/target connections opened by /api/dual-login, closes idle ones and caps how many stay open
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+class ConnectionExpiredError(Exception):
+    """Raised when a dual-login session id is unknown, reaped or evicted"""
+
+
+class RegistryFullError(Exception):
+    """Raised when every slot is in use and no idle connection can be evicted"""
+
+
+class LoginQueueFullError(Exception):
+    """Raised when too many async logins are already pending"""
+
+
+class DualConnectionRegistry:
+    """
+    LRU registry of dual-login connections with a background idle reaper
+
+    Each entry is the dict stored by dual-login ('connection', 'db_type',
+    'connection_name', 'username'/'server_hostname'). The registry adds
+    last-use tracking, closes connections idle longer than idle_ttl, and
+    enforces a global and per-user cap by evicting the least recently used
+    idle connection. Connections currently leased to a request are never
+    reaped or evicted.
+    """
+
+    def __init__(self, idle_ttl=1800, max_connections=50, max_per_user=6, reap_interval=60, connector=None):
+        """
+        Initialize registry
+
+        Args:
+            connector: Callable(db_type, connect_kwargs) used by open() to create connections
+            idle_ttl: Seconds an unused connection is kept open (default: 1800)
+            max_connections: Maximum open connections in this process (default: 50)
+            max_per_user: Maximum open connections per user/host (default: 6)
+            reap_interval: Seconds between reaper runs (default: 60)
+        """
+        self.idle_ttl = idle_ttl
+        self.max_connections = max_connections
+        self.max_per_user = max_per_user
+        self.reap_interval = reap_interval
+        self.connector = connector
+        self._entries = OrderedDict()  # session_id -> entry, least recently used first
+        self._lock = threading.RLock()
+        self._reaper = None
+        self.evicted = 0
+        self.reaped = 0
+
+    @staticmethod
+    def owner_of(entry):
+        """Key used for the per-user cap: the entry's 'owner' (set for logins without a user name), else its username"""
+        return f"{entry.get('db_type')}:{entry.get('owner') or entry.get('username') or 'unknown'}"
+
+    @staticmethod
+    def _close_quietly(entries):
+        """Close connections, ignoring errors from already-dead sessions"""
+        for session_id, entry in entries:
+            try:
+                entry['connection'].close()
+            except Exception:
+                pass
+
+    def _pick_victim_locked(self, owner=None):
+        """Least recently used idle entry (optionally for one owner), or None"""
+        for session_id, entry in self._entries.items():
+            if entry['in_use']:
+                continue
+            if owner is None or self.owner_of(entry) == owner:
+                return session_id
+        return None
+
+    def register(self, session_id, entry):
+        """
+        Store a new connection, evicting LRU idle connections to stay within the caps
+
+        Args:
+            session_id: Id returned to the browser
+            entry: Dict with at least 'connection' and 'db_type'
+
+        Raises:
+            RegistryFullError: If a cap is reached and nothing can be evicted
+                (the new connection is closed)
+        """
+        now = time.time()
+        entry.setdefault('created_at', now)
+        entry['last_used'] = now
+        entry['in_use'] = 0
+        owner = self.owner_of(entry)
+        evicted = []
+        refused = None
+
+        with self._lock:
+            while sum(1 for e in self._entries.values() if self.owner_of(e) == owner) >= self.max_per_user:
+                victim = self._pick_victim_locked(owner)
+                if victim is None:
+                    refused = f"Too many open connections for {owner} (limit {self.max_per_user})"
+                    break
+                evicted.append((victim, self._entries.pop(victim)))
+
+            while refused is None and len(self._entries) >= self.max_connections:
+                victim = self._pick_victim_locked()
+                if victim is None:
+                    refused = f"Too many open connections (limit {self.max_connections})"
+                    break
+                evicted.append((victim, self._entries.pop(victim)))
+
+            if refused is None:
+                self._entries[session_id] = entry
+            self.evicted += len(evicted)
+
+        for victim, _ in evicted:
+            logger.info(f"Evicted least recently used dual connection {victim}")
+        self._close_quietly(evicted)
+
+        if refused:
+            self._close_quietly([(session_id, entry)])
+            raise RegistryFullError(refused)
+
+        self.start_reaper()
+
+    def open(self, session_id, db_type, connect_kwargs, entry):
+        """
+        Open a connection with the registry's connector and register it
+
+        Args:
+            session_id: Id returned to the browser
+            db_type: Database type passed to the connector
+            connect_kwargs: Driver connect() arguments
+            entry: Registry metadata ('db_type', 'connection_name', ...)
+
+        Returns:
+            dict: The registered entry, with 'connect_ms' set
+
+        Raises:
+            RegistryFullError: If a cap is reached and nothing can be evicted
+        """
+        started = time.time()
+        entry['connection'] = self.connector(db_type, connect_kwargs)
+        entry['connect_ms'] = round((time.time() - started) * 1000, 1)
+        self.register(session_id, entry)
+        return entry
+
+    def __contains__(self, session_id):
+        with self._lock:
+            return session_id in self._entries
+
+    def __getitem__(self, session_id):
+        """Get an entry and mark it as recently used"""
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None:
+                raise ConnectionExpiredError(f"Connection {session_id} not found or expired")
+            entry['last_used'] = time.time()
+            self._entries.move_to_end(session_id)
+            return entry
+
+    def get(self, session_id, default=None):
+        """Get an entry (marking it used) or default"""
+        try:
+            return self[session_id]
+        except ConnectionExpiredError:
+            return default
+
+    @contextmanager
+    def lease(self, session_id):
+        """
+        Borrow an entry for the duration of a request so it is not reaped mid-query
+
+        Yields:
+            dict: The registry entry
+        """
+        with self._lock:
+            entry = self[session_id]
+            entry['in_use'] += 1
+        try:
+            yield entry
+        finally:
+            with self._lock:
+                entry['in_use'] -= 1
+                entry['last_used'] = time.time()
+
+    def remove(self, session_id):
+        """
+        Close and forget a connection
+
+        Returns:
+            bool: True if the session existed
+        """
+        with self._lock:
+            entry = self._entries.pop(session_id, None)
+        if entry is None:
+            return False
+        self._close_quietly([(session_id, entry)])
+        return True
+
+    def close_all(self):
+        """Close every connection (used on shutdown)"""
+        with self._lock:
+            entries = list(self._entries.items())
+            self._entries.clear()
+        self._close_quietly(entries)
+
+    def reap(self):
+        """
+        Close connections idle longer than idle_ttl
+
+        Returns:
+            int: Number of connections closed
+        """
+        cutoff = time.time() - self.idle_ttl
+        with self._lock:
+            expired = [(sid, e) for sid, e in self._entries.items()
+                       if not e['in_use'] and e['last_used'] < cutoff]
+            for sid, _ in expired:
+                del self._entries[sid]
+            self.reaped += len(expired)
+
+        if expired:
+            logger.info(f"Reaped {len(expired)} idle dual connection(s)")
+        self._close_quietly(expired)
+        return len(expired)
+
+    def _reap_forever(self):
+        """Reaper thread body"""
+        while True:
+            time.sleep(self.reap_interval)
+            try:
+                self.reap()
+            except Exception as error:
+                logger.warning(f"Error reaping dual connections: {error}")
+
+    def start_reaper(self):
+        """Start the background reaper thread once per process"""
+        if self._reaper is not None:
+            return
+        with self._lock:
+            if self._reaper is None:
+                self._reaper = threading.Thread(target=self._reap_forever, name='dual-conn-reaper', daemon=True)
+                self._reaper.start()
+
+    def status(self):
+        """
+        Get registry occupancy
+
+        Returns:
+            dict: Open/in-use counts, per-type and per-user breakdown and limits
+        """
+        now = time.time()
+        with self._lock:
+            entries = list(self._entries.values())
+            by_type = {}
+            by_user = {}
+            for entry in entries:
+                by_type[entry.get('db_type')] = by_type.get(entry.get('db_type'), 0) + 1
+                owner = self.owner_of(entry)
+                by_user[owner] = by_user.get(owner, 0) + 1
+
+            return {
+                'open': len(entries),
+                'in_use': sum(1 for e in entries if e['in_use']),
+                'by_db_type': by_type,
+                'by_user': by_user,
+                'oldest_idle_seconds': int(max((now - e['last_used'] for e in entries), default=0)),
+                'max_connections': self.max_connections,
+                'max_per_user': self.max_per_user,
+                'idle_ttl_seconds': self.idle_ttl,
+                'evicted_total': self.evicted,
+                'reaped_total': self.reaped
+            }
+
+
+class AsyncConnector:
+    """
+    Opens dual-login connections on a bounded background executor
+
+    The request thread returns immediately with a pending session id; the
+    connection is registered in the DualConnectionRegistry once it is ready.
+    Outcomes are kept for result_ttl seconds so the browser can poll them.
+    At most max_queued logins wait or run at once; submit() refuses the rest.
+    """
+
+    def __init__(self, registry, max_workers=4, result_ttl=600, max_queued=20):
+        """
+        Initialize async connector
+
+        Args:
+            registry: DualConnectionRegistry that receives ready connections
+            max_workers: Maximum logins in progress at once (default: 4)
+            result_ttl: Seconds a finished login's status is kept (default: 600)
+            max_queued: Logins waiting or running before submit() refuses (default: 20)
+        """
+        self.registry = registry
+        self.result_ttl = result_ttl
+        self.max_queued = max_queued
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='dual-login')
+        self._states = {}  # session_id -> status dict
+        self._lock = threading.Lock()
+
+    def _prune_locked(self, now):
+        """Forget finished logins older than result_ttl"""
+        expired = [sid for sid, state in self._states.items()
+                   if state.get('finished_at') and now - state['finished_at'] > self.result_ttl]
+        for sid in expired:
+            del self._states[sid]
+
+    def submit(self, session_id, db_type, connect_kwargs, entry):
+        """
+        Start opening a connection in the background
+
+        Args:
+            session_id: Id returned to the browser
+            db_type: Database type
+            connect_kwargs: Driver connect() arguments, passed to registry.open()
+            entry: Registry metadata ('db_type', 'connection_name', ...)
+
+        Raises:
+            LoginQueueFullError: If max_queued logins are already pending
+        """
+        now = time.time()
+        with self._lock:
+            self._prune_locked(now)
+            pending = sum(1 for state in self._states.values() if state['status'] == 'pending')
+            if pending >= self.max_queued:
+                raise LoginQueueFullError(f"{pending} logins are already in progress; try again later")
+            self._states[session_id] = {
+                'status': 'pending',
+                'db_type': entry.get('db_type'),
+                'connection_name': entry.get('connection_name'),
+                'started_at': now,
+                'finished_at': None
+            }
+        self._executor.submit(self._run, session_id, db_type, connect_kwargs, entry)
+
+    def _run(self, session_id, db_type, connect_kwargs, entry):
+        """Executor body: connect, register and record the outcome"""
+        try:
+            entry = self.registry.open(session_id, db_type, connect_kwargs, entry)
+            outcome = {'status': 'ready', 'connect_ms': entry['connect_ms']}
+            logger.info(f"Dual {entry.get('db_type')} connection ready: {entry.get('connection_name')} "
+                        f"({entry['connect_ms']:.0f} ms handshake)")
+        except Exception as error:
+            outcome = {'status': 'failed', 'error': str(error)}
+            logger.error(f"Async dual {entry.get('db_type')} login failed: {error}")
+
+        with self._lock:
+            state = self._states.get(session_id)
+            if state is not None:
+                state.update(outcome)
+                state['finished_at'] = time.time()
+
+    def status(self, session_id):
+        """
+        Get the status of a login
+
+        Returns:
+            dict: 'status' is pending, ready or failed (None if the id is unknown);
+                  ready connections that were later reaped report expired
+        """
+        with self._lock:
+            self._prune_locked(time.time())
+            state = self._states.get(session_id)
+            state = dict(state) if state else None
+
+        if state is None:
+            # Synchronous logins and pruned async ones are only known to the registry
+            if session_id in self.registry:
+                entry = self.registry.get(session_id)
+                return {'status': 'ready', 'db_type': entry.get('db_type'),
+                        'connection_name': entry.get('connection_name')}
+            return None
+
+        if state['status'] == 'ready' and session_id not in self.registry:
+            state['status'] = 'expired'
+
+        state['elapsed_ms'] = round(((state['finished_at'] or time.time()) - state['started_at']) * 1000, 1)
+        return state
@@ -0,0 +1,27 @@
+"""
+Fake Drivers
+In-memory SQLite connections standing in for Oracle, Databricks and Snowflake, for running the connection broker without databases
+
+    python connection_broker.py --socket /tmp/db-analyzer-broker.sock --connector fake_drivers:connect
+"""
+
+import logging
+import sqlite3
+
+logger = logging.getLogger(__name__)
+
+
+def connect(db_type, connect_kwargs):
+    """
+    Open a DB-API connection for any database type
+
+    Args:
+        db_type: Database type (oracle, databricks, snowflake), only logged
+        connect_kwargs: Driver connect() arguments; 'database' picks a SQLite file (default: in memory)
+
+    Returns:
+        sqlite3.Connection usable from the broker's client and login threads
+    """
+    database = connect_kwargs.get('database') or ':memory:'
+    logger.info(f"Fake {db_type} connection to {database}")
+    return sqlite3.connect(database, check_same_thread=False)
@@ -0,0 +1,47 @@
+"""
+Gunicorn hooks
+Starts the connection broker before the workers fork when DB_BROKER_SOCKET is set
+"""
+
+import os
+import secrets
+import subprocess
+import sys
+import time
+
+_broker = None
+
+
+def on_starting(server):
+    """Spawn connection_broker.py and share its auth key with the workers"""
+    global _broker
+    socket_path = os.getenv('DB_BROKER_SOCKET')
+    if not socket_path:
+        return
+
+    # Workers inherit the master's environment, so a generated key reaches them too
+    os.environ.setdefault('DB_BROKER_AUTHKEY', secrets.token_hex(32))
+
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)  # stale socket from a previous run
+
+    broker_script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'connection_broker.py')
+    _broker = subprocess.Popen([sys.executable, broker_script, '--socket', socket_path])
+
+    # Wait for the socket so the first dual-login does not race the broker start-up
+    deadline = time.time() + 10
+    while not os.path.exists(socket_path) and time.time() < deadline:
+        if _broker.poll() is not None:
+            raise RuntimeError(f"Connection broker exited with code {_broker.returncode}")
+        time.sleep(0.1)
+    server.log.info(f"Connection broker started (pid {_broker.pid}) on {socket_path}")
+
+
+def on_exit(server):
+    """Stop the broker with the master process"""
+    if _broker is not None and _broker.poll() is None:
+        _broker.terminate()
+        try:
+            _broker.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            _broker.kill()
@@ -0,0 +1,250 @@
+"""
+Background Jobs
+Runs long analyze/compare requests on a bounded executor and keeps their status and results in SQLite
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Job states; queued and running jobs of a process that died are marked interrupted
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+INTERRUPTED = 'interrupted'
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS jobs (
+        id TEXT PRIMARY KEY,
+        type TEXT NOT NULL,
+        status TEXT NOT NULL,
+        pid INTEGER NOT NULL,
+        boot_id TEXT,
+        owner TEXT,
+        progress_done INTEGER,
+        progress_total INTEGER,
+        message TEXT,
+        created_at REAL NOT NULL,
+        started_at REAL,
+        finished_at REAL,
+        http_status INTEGER,
+        result TEXT,
+        error TEXT
+    )
+"""
+
+
+class JobQueueFullError(Exception):
+    """Too many jobs are queued in this process"""
+    pass
+
+
+class JobManager:
+    """
+    Bounded background executor with job state persisted to SQLite
+
+    Every gunicorn worker has its own executor but they share the database
+    file, so a job can be polled through any worker. Rows record the pid and
+    boot id (kernel boot + process start time) of the worker running them; on
+    start-up, queued/running jobs whose process no longer exists are marked
+    interrupted, even if a restarted container reused the pid. Rows also
+    record their owner, and get() only returns a job to that owner.
+    """
+
+    def __init__(self, db_path, max_workers=2, max_queued=20, retention_hours=24, progress_interval=0.5):
+        """
+        Initialize job manager
+
+        Args:
+            db_path: SQLite database file
+            max_workers: Jobs running at once in this process (default: 2)
+            max_queued: Jobs waiting or running in this process before submit() refuses (default: 20)
+            retention_hours: Finished jobs older than this are deleted (default: 24)
+            progress_interval: Minimum seconds between progress writes of a job (default: 0.5)
+        """
+        self.db_path = db_path
+        self.max_queued = max_queued
+        self.retention_seconds = retention_hours * 3600
+        self.progress_interval = progress_interval
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+        self._lock = threading.Lock()
+        self._active = 0
+        self._last_progress = {}
+        self._boot_id = _boot_id(os.getpid())
+
+        with self._connect() as db:
+            db.execute(_SCHEMA)
+            # Job stores created before boot_id/owner existed
+            columns = {row[1] for row in db.execute("PRAGMA table_info(jobs)")}
+            for column in ('boot_id', 'owner'):
+                if column not in columns:
+                    db.execute(f"ALTER TABLE jobs ADD COLUMN {column} TEXT")
+        self._recover()
+
+    def _connect(self):
+        db = sqlite3.connect(self.db_path, timeout=30)
+        db.execute("PRAGMA journal_mode=WAL")
+        return db
+
+    def _recover(self):
+        """Mark jobs left behind by dead processes as interrupted and drop expired ones"""
+        now = time.time()
+        with self._connect() as db:
+            rows = db.execute("SELECT id, pid, boot_id FROM jobs WHERE status IN (?, ?)", (QUEUED, RUNNING)).fetchall()
+            dead = [job_id for job_id, pid, boot_id in rows if not _process_alive(pid, boot_id)]
+            for job_id in dead:
+                db.execute(
+                    "UPDATE jobs SET status = ?, finished_at = ?, error = ? WHERE id = ?",
+                    (INTERRUPTED, now, 'The worker running this job stopped before it finished', job_id)
+                )
+            db.execute("DELETE FROM jobs WHERE finished_at IS NOT NULL AND finished_at < ?", (now - self.retention_seconds,))
+        if dead:
+            logger.warning(f"Marked {len(dead)} job(s) interrupted by a worker restart")
+
+    def submit(self, job_type, run, owner=None):
+        """
+        Queue a job
+
+        Args:
+            job_type: Job type name, e.g. 'analyze'
+            run: Callable taking a report(done, total, message=None) function and
+                 returning (json-serializable result, http_status)
+            owner: Key of the caller (e.g. their session id); get() must be given the same key
+
+        Returns:
+            str: Job id
+
+        Raises:
+            JobQueueFullError: If max_queued jobs are already waiting or running here
+        """
+        with self._lock:
+            if self._active >= self.max_queued:
+                raise JobQueueFullError(f"{self._active} jobs are already queued; try again later")
+            self._active += 1
+
+        job_id = uuid.uuid4().hex
+        with self._connect() as db:
+            db.execute(
+                "INSERT INTO jobs (id, type, status, pid, boot_id, owner, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, job_type, QUEUED, os.getpid(), self._boot_id, owner, time.time())
+            )
+        self._executor.submit(self._run, job_id, run)
+        logger.info(f"Queued {job_type} job {job_id}")
+        return job_id
+
+    def _run(self, job_id, run):
+        started = time.time()
+        self._update(job_id, status=RUNNING, started_at=started)
+        try:
+            result, http_status = run(lambda done, total, message=None: self.report(job_id, done, total, message))
+            success = http_status < 400
+            self._update(
+                job_id,
+                status=SUCCEEDED if success else FAILED,
+                finished_at=time.time(),
+                http_status=http_status,
+                result=json.dumps(result, default=str),
+                error=None if success else (result or {}).get('error')
+            )
+            logger.info(f"Job {job_id} finished ({http_status}) in {time.time() - started:.1f}s")
+        except Exception as error:
+            logger.error(f"Job {job_id} failed: {error}")
+            self._update(job_id, status=FAILED, finished_at=time.time(), http_status=500, error=str(error))
+        finally:
+            with self._lock:
+                self._active -= 1
+                self._last_progress.pop(job_id, None)
+
+    def _update(self, job_id, **fields):
+        assignments = ', '.join(f"{name} = ?" for name in fields)
+        with self._connect() as db:
+            db.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+    def report(self, job_id, done, total=None, message=None):
+        """Record job progress (throttled to one write per progress_interval, except the final one)"""
+        now = time.time()
+        with self._lock:
+            if now - self._last_progress.get(job_id, 0) < self.progress_interval and done != total:
+                return
+            self._last_progress[job_id] = now
+        self._update(job_id, progress_done=done, progress_total=total, message=message)
+
+    def get(self, job_id, include_result=True, owner=None):
+        """
+        Get a job's status
+
+        Args:
+            job_id: Job id returned by submit()
+            include_result: Include the result of a finished job (default: True)
+            owner: Caller's key; jobs submitted with another owner are not returned
+
+        Returns:
+            dict: id, type, status, progress, timestamps, http_status, error and
+                  (once finished, if include_result) result; None if unknown or not the caller's
+        """
+        with self._connect() as db:
+            row = db.execute(
+                "SELECT id, type, status, progress_done, progress_total, message, created_at, started_at,"
+                " finished_at, http_status, result, error FROM jobs WHERE id = ? AND owner IS ?",
+                (job_id, owner)
+            ).fetchone()
+        if row is None:
+            return None
+
+        (job_id, job_type, status, done, total, message, created_at, started_at,
+         finished_at, http_status, result, error) = row
+        job = {
+            'id': job_id,
+            'type': job_type,
+            'status': status,
+            'progress': {
+                'done': done,
+                'total': total,
+                'percent': round(done * 100.0 / total, 1) if done is not None and total else None,
+                'message': message
+            },
+            'created_at': created_at,
+            'started_at': started_at,
+            'finished_at': finished_at,
+            'elapsed_seconds': round((finished_at or time.time()) - started_at, 1) if started_at else None,
+            'http_status': http_status,
+            'error': error
+        }
+        if include_result and result is not None:
+            job['result'] = json.loads(result)
+        return job
+
+
+def _boot_id(pid):
+    """Kernel boot id and start time of a process, which a reused pid does not share; None without /proc"""
+    try:
+        with open('/proc/sys/kernel/random/boot_id') as f:
+            boot = f.read().strip()
+        with open(f'/proc/{pid}/stat') as f:
+            # starttime is field 22; fields after the parenthesized command name start at field 3
+            started = f.read().rsplit(')', 1)[1].split()[19]
+        return f"{boot}:{started}"
+    except (OSError, IndexError):
+        return None
+
+
+def _process_alive(pid, boot_id=None):
+    if pid == os.getpid():
+        return False  # a new manager in this process never inherits running jobs
+    if boot_id is not None:
+        return _boot_id(pid) == boot_id
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        return True
+    return True
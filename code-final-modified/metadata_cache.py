@@ -0,0 +1,137 @@
+"""
+Metadata Cache
+Caches data dictionary probe results per table and drops them when the table's DDL version changes
+"""
+
+import logging
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+class MetadataCache:
+    """
+    LRU cache of get_table_* probe results
+
+    Keys are (connection fingerprint, catalog_or_db, schema, table, probe).
+    Every entry stores the table version it was read at (LAST_DDL_TIME,
+    LAST_ALTERED or Delta lastModified); a lookup with a different version is
+    a miss and drops the entry. Values are pickled, which gives callers their
+    own copy and an exact size for the byte budget. Entries also expire after
+    ttl seconds as a safety net for changes that do not bump the version.
+    """
+
+    def __init__(self, max_entries=5000, max_bytes=64 * 1024 * 1024, ttl=3600):
+        """
+        Initialize cache
+
+        Args:
+            max_entries: Maximum cached probe results (default: 5000)
+            max_bytes: Maximum total size of cached results (default: 64 MB)
+            ttl: Seconds an entry is trusted even if the version matches (default: 3600)
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (version, payload, stored_at)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.evictions = 0
+
+    def _drop_locked(self, key):
+        _, payload, _ = self._entries.pop(key)
+        self._bytes -= len(payload)
+
+    def get(self, key, version):
+        """
+        Look up a probe result
+
+        Args:
+            key: (fingerprint, catalog_or_db, schema, table, probe)
+            version: Current table version
+
+        Returns:
+            tuple: (True, value) on a hit, (False, None) on a miss
+        """
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                self.misses += 1
+                return False, None
+
+            cached_version, payload, stored_at = item
+            if cached_version != version or time.time() - stored_at > self.ttl:
+                self._drop_locked(key)
+                self.stale += 1
+                self.misses += 1
+                return False, None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+        return True, pickle.loads(payload)
+
+    def put(self, key, version, value):
+        """
+        Store a probe result read at the given table version
+
+        Results larger than the whole byte budget are not cached.
+        """
+        try:
+            payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as error:
+            logger.warning(f"Metadata for {key[1:]} is not cacheable: {error}")
+            return
+        if len(payload) > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._drop_locked(key)
+            self._entries[key] = (version, payload, time.time())
+            self._bytes += len(payload)
+
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                self._drop_locked(next(iter(self._entries)))
+                self.evictions += 1
+
+    def clear(self, fingerprint=None):
+        """
+        Drop cached results (all, or only those for one connection fingerprint)
+
+        Returns:
+            int: Number of entries removed
+        """
+        with self._lock:
+            keys = [key for key in self._entries if fingerprint is None or key[0] == fingerprint]
+            for key in keys:
+                self._drop_locked(key)
+        return len(keys)
+
+    def stats(self):
+        """
+        Get cache statistics
+
+        Returns:
+            dict: Entry/byte usage, limits and hit/miss counters
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'stale': self.stale,
+                'evictions': self.evictions,
+                'hit_ratio': round(self.hits / lookups, 3) if lookups else 0.0
+            }
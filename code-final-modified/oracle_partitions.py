@@ -0,0 +1,178 @@
+"""
+Oracle Partition Metadata
+Partition summaries and keyset pages over ALL_TAB_PARTITIONS, so tables with thousands of partitions stay cheap to analyze
+"""
+
+import logging
+from contextlib import contextmanager
+
+import oracledb
+
+logger = logging.getLogger(__name__)
+
+# Partitions listed inline in an analysis result; the rest are read page by page
+PARTITION_INLINE_LIMIT = 100
+
+# HIGH_VALUE is a LONG; fetched into a bounded text buffer instead of the driver's LONG default
+HIGH_VALUE_MAX_CHARS = 32767
+
+# Aggregates after the owner and table columns; PARTITION_POSITION runs 1..n without gaps
+SUMMARY_COLUMNS = """
+    COUNT(*), NVL(SUM(SUBPARTITION_COUNT), 0), MAX(PARTITION_POSITION),
+    SUM(NUM_ROWS), MIN(NUM_ROWS), MAX(NUM_ROWS), ROUND(AVG(NUM_ROWS)), MEDIAN(NUM_ROWS),
+    COUNT(NUM_ROWS), SUM(CASE WHEN NUM_ROWS = 0 THEN 1 ELSE 0 END)
+"""
+
+DETAIL_COLUMNS = "PARTITION_NAME, HIGH_VALUE, PARTITION_POSITION, TABLESPACE_NAME, NUM_ROWS"
+
+
+def _high_value_handler(cursor, metadata):
+    if metadata.type_code is oracledb.DB_TYPE_LONG:
+        return cursor.var(oracledb.DB_TYPE_LONG, HIGH_VALUE_MAX_CHARS, arraysize=cursor.arraysize)
+
+
+@contextmanager
+def high_values_as_text(cursor):
+    """Fetch LONG columns (HIGH_VALUE) through a bounded output type handler while the block runs"""
+    previous = cursor.outputtypehandler
+    cursor.outputtypehandler = _high_value_handler
+    try:
+        yield cursor
+    finally:
+        cursor.outputtypehandler = previous
+
+
+def partition_row(row):
+    """(PARTITION_NAME, HIGH_VALUE, PARTITION_POSITION, TABLESPACE_NAME, NUM_ROWS) row as a dict"""
+    return {
+        'partition_name': row[0],
+        'high_value': row[1],
+        'position': row[2],
+        'tablespace': row[3],
+        'num_rows': row[4]
+    }
+
+
+def build_partition_info(part_table, summary, details, inline_limit=PARTITION_INLINE_LIMIT):
+    """
+    Shape one table's partition metadata like get_table_partitions()
+
+    Args:
+        part_table: (PARTITIONING_TYPE, SUBPARTITIONING_TYPE, PARTITION_COUNT) from ALL_PART_TABLES
+        summary: SUMMARY_COLUMNS row, or None when no partition is visible
+        details: DETAIL_COLUMNS rows for positions 1..inline_limit and the last position
+        inline_limit: Partitions listed inline
+
+    Returns:
+        list: [dict] with the partitioning types, partition_count (actual, not the
+              1048575 ALL_PART_TABLES reports for interval tables), the first
+              inline_limit partitions, next_cursor for /api/partitions and a summary
+    """
+    count, subpartitions, last_position, total_rows, min_rows, max_rows, avg_rows, median_rows, analyzed, empty = \
+        summary or (0, 0, 0, None, None, None, None, None, 0, 0)
+    rows = {row[2]: row for row in details}
+    first, last = rows.get(1), rows.get(last_position)
+
+    return [{
+        'partitioning_type': part_table[0],
+        'subpartitioning_type': part_table[1],
+        'partition_count': count,
+        'partitions': [partition_row(rows[position]) for position in sorted(rows) if position <= inline_limit],
+        'next_cursor': str(inline_limit) if last_position > inline_limit else None,
+        'summary': {
+            'partition_count': count,
+            'subpartition_count': subpartitions,
+            # By position; for RANGE/INTERVAL partitioning these are the lowest and highest bounds
+            'first_high_value': first[1] if first else None,
+            'last_high_value': last[1] if last else None,
+            'total_rows': total_rows,
+            'min_rows': min_rows,
+            'max_rows': max_rows,
+            'avg_rows': avg_rows,
+            'median_rows': median_rows,
+            'analyzed_partitions': analyzed,
+            'empty_partitions': empty
+        }
+    }]
+
+
+def table_partitions(cursor, table_name, schema=None, inline_limit=PARTITION_INLINE_LIMIT):
+    """
+    Partition summary and the first inline_limit partitions of one table (three queries, none returning every partition)
+
+    Returns:
+        list: build_partition_info() result, or [] when the table is not partitioned
+    """
+    params = {'table_name': table_name.upper()}
+    owner_filter = ''
+    if schema:
+        params['owner'] = schema.upper()
+        owner_filter = " AND TABLE_OWNER = :owner"
+
+    cursor.execute(f"""
+        SELECT PARTITIONING_TYPE, SUBPARTITIONING_TYPE, PARTITION_COUNT
+        FROM ALL_PART_TABLES
+        WHERE TABLE_NAME = :table_name{' AND OWNER = :owner' if schema else ''}
+    """, params)
+    part_table = cursor.fetchone()
+    if not part_table:
+        return []
+
+    cursor.execute(f"""
+        SELECT {SUMMARY_COLUMNS}
+        FROM ALL_TAB_PARTITIONS
+        WHERE TABLE_NAME = :table_name{owner_filter}
+    """, params)
+    summary = cursor.fetchone()
+
+    details = []
+    if summary and summary[0]:
+        with high_values_as_text(cursor):
+            cursor.execute(f"""
+                SELECT {DETAIL_COLUMNS}
+                FROM ALL_TAB_PARTITIONS
+                WHERE TABLE_NAME = :table_name{owner_filter}
+                    AND (PARTITION_POSITION <= :inline_limit OR PARTITION_POSITION = :last_position)
+                ORDER BY PARTITION_POSITION
+            """, dict(params, inline_limit=inline_limit, last_position=summary[2]))
+            details = cursor.fetchall()
+
+    return build_partition_info(part_table, summary, details, inline_limit)
+
+
+def partition_page(cursor, table_name, schema=None, after=0, limit=200):
+    """
+    One keyset page of a table's partitions, in position order
+
+    Args:
+        cursor: Oracle cursor
+        table_name: Table name
+        schema: Owner (optional)
+        after: Position of the last partition already read (the previous page's next_cursor, 0 to start)
+        limit: Partitions per page
+
+    Returns:
+        dict: partitions and next_cursor (None on the last page)
+    """
+    params = {'table_name': table_name.upper(), 'after': after, 'until': after + limit + 1}
+    owner_filter = ''
+    if schema:
+        params['owner'] = schema.upper()
+        owner_filter = " AND TABLE_OWNER = :owner"
+
+    with high_values_as_text(cursor):
+        cursor.arraysize = limit + 1
+        cursor.execute(f"""
+            SELECT {DETAIL_COLUMNS}
+            FROM ALL_TAB_PARTITIONS
+            WHERE TABLE_NAME = :table_name{owner_filter}
+                AND PARTITION_POSITION > :after AND PARTITION_POSITION <= :until
+            ORDER BY PARTITION_POSITION
+        """, params)
+        rows = cursor.fetchall()
+
+    partitions = [partition_row(row) for row in rows[:limit]]
+    return {
+        'partitions': partitions,
+        'next_cursor': str(partitions[-1]['position']) if len(rows) > limit else None
+    }
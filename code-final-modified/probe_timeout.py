@@ -0,0 +1,198 @@
+"""
+Probe Timeouts
+Per-statement time limits for metadata and count probes, so one slow table cannot stall a whole analysis
+"""
+
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+# Driver errors of a statement aborted by its time limit: oracledb call_timeout
+# (thin / thick mode) and Snowflake STATEMENT_TIMEOUT_IN_SECONDS
+_TIMEOUT_ERRORS = {
+    'oracle': ('DPY-4024', 'ORA-03156'),
+    'snowflake': ('000630',),
+}
+
+
+def is_timeout_error(error, db_type):
+    """True if a driver error means the statement hit its time limit"""
+    if db_type == 'snowflake' and getattr(error, 'errno', None) == 630:
+        return True
+    return any(code in str(error) for code in _TIMEOUT_ERRORS.get(db_type, ()))
+
+
+class ProbeClock:
+    """Outcome of one timed probe"""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.started = time.time()
+        self.elapsed = 0.0
+        self.cancelled = False
+        self.timeout_error = None
+        self.cursor = None
+
+    @property
+    def timed_out(self):
+        # Oracle and Snowflake abort the statement themselves (the get_table_* functions swallow
+        # the error, so clock.cursor records it); Databricks statements are cancelled by the timer
+        return self.cancelled or self.timeout_error is not None
+
+
+class _WatchedCursor:
+    """Cursor proxy recording time limit errors on the clock before the caller handles them"""
+
+    def __init__(self, cursor, clock, db_type):
+        object.__setattr__(self, '_cursor', cursor)
+        object.__setattr__(self, '_clock', clock)
+        object.__setattr__(self, '_db_type', db_type)
+
+    def _watch(self, method, *args, **kwargs):
+        try:
+            result = method(*args, **kwargs)
+        except Exception as error:
+            if is_timeout_error(error, self._db_type):
+                self._clock.timeout_error = error
+            raise
+        return self if result is self._cursor else result
+
+    def execute(self, *args, **kwargs):
+        return self._watch(self._cursor.execute, *args, **kwargs)
+
+    def executemany(self, *args, **kwargs):
+        return self._watch(self._cursor.executemany, *args, **kwargs)
+
+    def fetchone(self):
+        return self._watch(self._cursor.fetchone)
+
+    def fetchmany(self, *args, **kwargs):
+        return self._watch(self._cursor.fetchmany, *args, **kwargs)
+
+    def fetchall(self):
+        return self._watch(self._cursor.fetchall)
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._cursor, name, value)
+
+
+class ProbeTimeout:
+    """
+    Statement time limits on one connection for the duration of an analysis
+
+    Oracle uses the oracledb call_timeout attribute (no round trip, so it is
+    switched per probe), Snowflake the STATEMENT_TIMEOUT_IN_SECONDS session
+    parameter (changed only when the limit changes and unset on exit, so the
+    pooled connection goes back without it), and Databricks a timer thread
+    that cancels the running statement.
+    """
+
+    def __init__(self, connection, db_type, default_seconds=0):
+        """
+        Initialize timeouts
+
+        Args:
+            connection: Connection the probes run on
+            db_type: Database type (oracle, databricks, snowflake)
+            default_seconds: Limit for probes that do not pass their own (0 = no limit)
+        """
+        self.connection = connection
+        self.db_type = db_type
+        self.default_seconds = default_seconds
+        self.timed_out_any = False
+        self._applied = 0
+        self._original_call_timeout = None
+
+    def __enter__(self):
+        if self.db_type == 'oracle':
+            self._original_call_timeout = getattr(self.connection, 'call_timeout', 0)
+        self._apply(self.default_seconds)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            if self.db_type == 'oracle' and self._original_call_timeout is not None:
+                self.connection.call_timeout = self._original_call_timeout
+            elif self.db_type == 'snowflake' and self._applied:
+                cursor = self.connection.cursor()
+                try:
+                    cursor.execute("ALTER SESSION UNSET STATEMENT_TIMEOUT_IN_SECONDS")
+                finally:
+                    cursor.close()
+        except Exception as error:
+            logger.warning(f"Could not reset statement timeout: {error}")
+        return False
+
+    def _apply(self, seconds):
+        if seconds == self._applied:
+            return
+        if self.db_type == 'oracle':
+            self.connection.call_timeout = int(seconds * 1000)
+        elif self.db_type == 'snowflake':
+            cursor = self.connection.cursor()
+            try:
+                if seconds:
+                    cursor.execute(f"ALTER SESSION SET STATEMENT_TIMEOUT_IN_SECONDS = {int(seconds)}")
+                else:
+                    cursor.execute("ALTER SESSION UNSET STATEMENT_TIMEOUT_IN_SECONDS")
+            finally:
+                cursor.close()
+        self._applied = seconds
+
+    def probe(self, cursor, seconds=None):
+        """
+        Context manager limiting the statements run inside it
+
+        Args:
+            cursor: Cursor the probe uses (Databricks cancels it when the limit passes)
+            seconds: Limit for this probe (default: default_seconds, 0 = no limit)
+
+        Yields:
+            ProbeClock: run the probe on clock.cursor and check timed_out after the block
+        """
+        if self.connection is None:
+            seconds = 0  # no connection to limit (callers without timeouts)
+        return _Probe(self, cursor, self.default_seconds if seconds is None else seconds)
+
+
+class _Probe:
+    def __init__(self, timeout, cursor, seconds):
+        self.timeout = timeout
+        self.cursor = cursor
+        self.seconds = seconds
+        self.clock = None
+        self.timer = None
+
+    def __enter__(self):
+        self.timeout._apply(self.seconds)
+        self.clock = ProbeClock(self.seconds)
+        self.clock.cursor = _WatchedCursor(self.cursor, self.clock, self.timeout.db_type)
+        if self.timeout.db_type == 'databricks' and self.seconds:
+            self.timer = threading.Timer(self.seconds, self._cancel)
+            self.timer.daemon = True
+            self.timer.start()
+        return self.clock
+
+    def _cancel(self):
+        self.clock.cancelled = True
+        try:
+            self.cursor.cancel()
+        except Exception as error:
+            logger.warning(f"Could not cancel statement after {self.seconds}s: {error}")
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.timer is not None:
+            self.timer.cancel()
+        self.clock.elapsed = time.time() - self.clock.started
+        if self.clock.timed_out:
+            self.timeout.timed_out_any = True
+        return False
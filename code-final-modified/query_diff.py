@@ -0,0 +1,304 @@
+"""
+Query Diff
+Streams two query results ordered by key columns and sort-merges them, so result sets of any size diff in constant memory
+"""
+
+import logging
+import re
+import time
+from datetime import date, datetime
+from decimal import Decimal
+
+logger = logging.getLogger(__name__)
+
+# Rows fetched per round trip on each side
+DEFAULT_BATCH_SIZE = 5000
+
+# Differences listed per category; the rest are only counted
+DEFAULT_SAMPLE_LIMIT = 100
+
+_IDENTIFIER = re.compile(r'^[A-Za-z_][A-Za-z0-9_$#]*$')
+
+
+def column_differences(source_cols, target_cols):
+    """
+    Column count, name and order differences between two result sets
+
+    Returns:
+        list: {'type', 'message', ...} per difference, as /api/compare-query-dual reports them
+    """
+    column_diffs = []
+
+    if len(source_cols) != len(target_cols):
+        column_diffs.append({
+            'type': 'COLUMN_COUNT_MISMATCH',
+            'message': f'Column count mismatch: Source has {len(source_cols)} columns, Target has {len(target_cols)} columns',
+            'source_columns': ', '.join(source_cols),
+            'target_columns': ', '.join(target_cols)
+        })
+
+    source_cols_set = set(source_cols)
+    target_cols_set = set(target_cols)
+
+    for col in source_cols_set - target_cols_set:
+        column_diffs.append({
+            'type': 'COLUMN_MISSING_IN_TARGET',
+            'column_name': col,
+            'message': f'Column "{col}" exists in source but not in target'
+        })
+
+    for col in target_cols_set - source_cols_set:
+        column_diffs.append({
+            'type': 'COLUMN_MISSING_IN_SOURCE',
+            'column_name': col,
+            'message': f'Column "{col}" exists in target but not in source'
+        })
+
+    if source_cols_set == target_cols_set and source_cols != target_cols:
+        column_diffs.append({
+            'type': 'COLUMN_ORDER_DIFF',
+            'message': 'Columns exist in both but in different order',
+            'source_order': ', '.join(source_cols),
+            'target_order': ', '.join(target_cols)
+        })
+
+    return column_diffs
+
+
+def parse_key_columns(key_columns):
+    """
+    Validate key columns given as a list or a comma-separated string
+
+    Raises:
+        ValueError: If no key column is given or one is not a plain identifier
+    """
+    if isinstance(key_columns, str):
+        key_columns = key_columns.split(',')
+    names = [str(name).strip() for name in key_columns or [] if str(name).strip()]
+    if not names:
+        raise ValueError('At least one key column is required')
+    invalid = [name for name in names if not _IDENTIFIER.match(name)]
+    if invalid:
+        raise ValueError(f"Invalid key column(s): {', '.join(invalid)}")
+    return names
+
+
+def ordered_query(query, key_columns):
+    """Wrap a query so it returns its rows ordered by key_columns, NULL keys last on every dialect"""
+    query = query.strip().rstrip(';').strip()
+    order_by = ', '.join(f"{name} NULLS LAST" for name in key_columns)
+    return f"SELECT * FROM (\n{query}\n) q ORDER BY {order_by}"
+
+
+def execute_ordered(cursor, query, key_columns, batch_size=DEFAULT_BATCH_SIZE):
+    """Run query ordered by key_columns, fetching batch_size rows per round trip"""
+    cursor.arraysize = batch_size
+    cursor.execute(ordered_query(query, key_columns))
+    return [desc[0] for desc in cursor.description] if cursor.description else []
+
+
+def _key_positions(columns, key_columns, side):
+    by_name = {name.upper(): position for position, name in enumerate(columns)}
+    missing = [name for name in key_columns if name.upper() not in by_name]
+    if missing:
+        raise ValueError(f"Key column(s) not in the {side} result: {', '.join(missing)}")
+    return [by_name[name.upper()] for name in key_columns]
+
+
+def _normalize(value):
+    """Comparable form of a driver value: dates as datetimes, every number as a Decimal"""
+    # e.g. an Oracle DATE arrives as datetime and a Snowflake DATE as date, NUMBER as int, float or Decimal
+    if isinstance(value, datetime) or isinstance(value, bool):
+        return value
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    if isinstance(value, float):
+        return Decimal(str(value))
+    if isinstance(value, (int, Decimal)):
+        return Decimal(value)
+    return value
+
+
+def _sort_key(row, positions):
+    # NULLs sort after every value, as NULLS LAST asks the database to do
+    return tuple((row[position] is None, _normalize(row[position])) for position in positions)
+
+
+def _mixed_types(error):
+    return ValueError(f"Key values of different types cannot be compared ({error}); mixed key types "
+                      f"cannot be merged, cast the key columns to one type in both queries")
+
+
+def _ordered_rows(cursor, positions, batch_size, side, stats):
+    """Yield (sort key, row) in key order, checking the database returned them that way"""
+    previous = None
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            return
+        for row in rows:
+            key = _sort_key(row, positions)
+            if previous is not None:
+                try:
+                    out_of_order = key < previous
+                except TypeError as error:
+                    raise _mixed_types(error) from error
+                if out_of_order:
+                    raise ValueError(
+                        f"The {side} rows are not in key order as Python compares them "
+                        f"(near key {[value for _, value in key]}); mixed key types or a linguistic "
+                        f"collation (e.g. Oracle NLS_SORT) cannot be merged"
+                    )
+                if key == previous:
+                    stats['duplicate_keys'] += 1
+            previous = key
+            stats['rows'] += 1
+            yield key, row
+
+
+def _same(source_value, target_value):
+    if source_value == target_value:
+        return True
+    if source_value is None or target_value is None:
+        return False
+    try:
+        if _normalize(source_value) == _normalize(target_value):
+            return True
+    except ArithmeticError:
+        pass
+    return str(source_value) == str(target_value)
+
+
+def _text(value):
+    return str(value) if value is not None else 'NULL'
+
+
+def merge_diff(source_cursor, target_cursor, key_columns, batch_size=DEFAULT_BATCH_SIZE,
+               sample_limit=DEFAULT_SAMPLE_LIMIT, report=None):
+    """
+    Sort-merge two executed, key-ordered cursors (see execute_ordered)
+
+    Rows are classified as matched, changed (same key, a differing value in a
+    column both sides have, names matched case-insensitively), only in source or only in target. Only counters and
+    the first sample_limit differences per category are kept.
+
+    Args:
+        source_cursor, target_cursor: Cursors of the ordered queries
+        key_columns: Key column names (matched case-insensitively)
+        batch_size: Rows per fetchmany() (default: DEFAULT_BATCH_SIZE)
+        sample_limit: Differences listed per category (default: DEFAULT_SAMPLE_LIMIT)
+        report: Optional callable(done, total, message) called once per source batch
+
+    Returns:
+        dict: summary and differences, shaped like the positional /api/compare-query-dual
+              result; rows are identified by their key values instead of row numbers
+
+    Raises:
+        ValueError: If a key column is missing, a side is not in key order or keys
+                    of different types meet (e.g. a number and a string)
+    """
+    started = time.time()
+    source_cols = [desc[0] for desc in source_cursor.description] if source_cursor.description else []
+    target_cols = [desc[0] for desc in target_cursor.description] if target_cursor.description else []
+    column_diffs = column_differences(source_cols, target_cols)
+
+    source_key = _key_positions(source_cols, key_columns, 'source')
+    target_key = _key_positions(target_cols, key_columns, 'target')
+    key_names = [source_cols[position] for position in source_key]
+    # Matched case-insensitively like the keys (Oracle/Snowflake upper-case names, Databricks lower-cases them)
+    target_positions = {name.upper(): position for position, name in enumerate(target_cols)}
+    compared = [(name, position, target_positions[name.upper()]) for position, name in enumerate(source_cols)
+                if name.upper() in target_positions and position not in source_key]
+
+    source_stats = {'rows': 0, 'duplicate_keys': 0}
+    target_stats = {'rows': 0, 'duplicate_keys': 0}
+    source_rows = _ordered_rows(source_cursor, source_key, batch_size, 'source', source_stats)
+    target_rows = _ordered_rows(target_cursor, target_key, batch_size, 'target', target_stats)
+
+    counts = {'matching': 0, 'changed': 0, 'source_only': 0, 'target_only': 0, 'value_differences': 0}
+    row_differences = []
+    rows_only_in_source = []
+    rows_only_in_target = []
+
+    def key_dict(row, positions):
+        return {name: row[position] for name, position in zip(key_names, positions)}
+
+    next_report = batch_size
+    source = next(source_rows, None)
+    target = next(target_rows, None)
+    while source is not None or target is not None:
+        try:
+            source_first = target is None or (source is not None and source[0] < target[0])
+            target_first = not source_first and (source is None or target[0] < source[0])
+        except TypeError as error:
+            raise _mixed_types(error) from error
+        if source_first:
+            counts['source_only'] += 1
+            if len(rows_only_in_source) < sample_limit:
+                rows_only_in_source.append(key_dict(source[1], source_key))
+            source = next(source_rows, None)
+        elif target_first:
+            counts['target_only'] += 1
+            if len(rows_only_in_target) < sample_limit:
+                rows_only_in_target.append(key_dict(target[1], target_key))
+            target = next(target_rows, None)
+        else:
+            source_row, target_row = source[1], target[1]
+            changed = False
+            for name, source_position, target_position in compared:
+                if not _same(source_row[source_position], target_row[target_position]):
+                    changed = True
+                    counts['value_differences'] += 1
+                    if len(row_differences) < sample_limit:
+                        row_differences.append({
+                            'key': key_dict(source_row, source_key),
+                            'column_name': name,
+                            'source_value': _text(source_row[source_position]),
+                            'target_value': _text(target_row[target_position]),
+                            'diff_type': 'value_diff'
+                        })
+            counts['changed' if changed else 'matching'] += 1
+            source = next(source_rows, None)
+            target = next(target_rows, None)
+
+        if report and source_stats['rows'] >= next_report:
+            next_report += batch_size
+            report(source_stats['rows'], None, f"{source_stats['rows']} source / {target_stats['rows']} target rows merged")
+
+    row_count_diff = source_stats['rows'] != target_stats['rows']
+    total_diffs = (len(column_diffs) + counts['value_differences'] + counts['source_only']
+                   + counts['target_only'] + (1 if row_count_diff else 0))
+    logger.info(f"Merged {source_stats['rows']} source and {target_stats['rows']} target rows on "
+                f"{', '.join(key_names)} in {time.time() - started:.1f}s: {counts['changed']} changed, "
+                f"{counts['source_only']} source-only, {counts['target_only']} target-only")
+
+    return {
+        'summary': {
+            'mode': 'merge',
+            'key_columns': key_names,
+            'source_rows': source_stats['rows'],
+            'target_rows': target_stats['rows'],
+            'source_columns': len(source_cols),
+            'target_columns': len(target_cols),
+            'matching_rows': counts['matching'],
+            'changed_rows': counts['changed'],
+            'rows_only_in_source': counts['source_only'],
+            'rows_only_in_target': counts['target_only'],
+            'value_differences': counts['value_differences'],
+            'source_duplicate_keys': source_stats['duplicate_keys'],
+            'target_duplicate_keys': target_stats['duplicate_keys'],
+            'total_differences': total_diffs,
+            'has_column_differences': len(column_diffs) > 0,
+            'has_row_count_difference': row_count_diff,
+            'sample_limit': sample_limit,
+            'truncated': (counts['value_differences'] > len(row_differences)
+                          or counts['source_only'] > len(rows_only_in_source)
+                          or counts['target_only'] > len(rows_only_in_target))
+        },
+        'differences': {
+            'column_structure': column_diffs,
+            'row_differences': row_differences,
+            'rows_only_in_source': rows_only_in_source,
+            'rows_only_in_target': rows_only_in_target
+        }
+    }
@@ -0,0 +1,319 @@
+"""
+Hash Reconciliation
+Compares two tables by per-bucket row counts and checksums computed in each database, fetching rows only for buckets that differ
+"""
+
+import logging
+import re
+import time
+
+from query_diff import parse_key_columns, execute_ordered, merge_diff, DEFAULT_BATCH_SIZE, DEFAULT_SAMPLE_LIMIT
+from canonical_hash import HASH_RANGE, column_type, pair_spec, canonical_expression, canonical_hash, fold_hashes
+
+logger = logging.getLogger(__name__)
+
+# Buckets per split, and bucket size below which rows are fetched and merged
+DEFAULT_BUCKETS = 64
+DEFAULT_LEAF_ROWS = 1000
+
+# Bucket residues per IN (...) list, below Oracle's 1000-expression limit
+_RESIDUE_CHUNK = 500
+
+_TABLE_NAME = re.compile(r'^[A-Za-z_][A-Za-z0-9_$#]*(\.[A-Za-z_][A-Za-z0-9_$#]*){0,2}$')
+_COLUMN_NAME = re.compile(r'^[A-Za-z_][A-Za-z0-9_$#]*$')
+
+
+def _oracle_hash(columns):
+    # ORA_HASH takes one expression: hash each column (NULL gets a value outside the hash range)
+    # and fold them with distinct odd weights, so swapped values change the result
+    terms = [f"NVL(ORA_HASH({name}), {HASH_RANGE}) * {pow(31, position, HASH_RANGE)}"
+             for position, name in enumerate(columns)]
+    return f"MOD({' + '.join(terms)}, {HASH_RANGE})"
+
+
+def hash_expression(db_type, columns):
+    """
+    SQL expression hashing columns of a row into 0 .. HASH_RANGE - 1
+
+    Oracle folds ORA_HASH per column, Snowflake uses HASH(...) and Databricks
+    xxhash64(...), both of which take every column and handle NULLs. Values are
+    only comparable between databases of the same type (see canonical_hash.py
+    for hashes that agree across types).
+
+    Args:
+        db_type: Database type (oracle, databricks, snowflake)
+        columns: Column names
+    """
+    if db_type == 'oracle':
+        return _oracle_hash(columns)
+    if db_type == 'snowflake':
+        return f"BITAND(HASH({', '.join(columns)}), {HASH_RANGE - 1})"
+    if db_type == 'databricks':
+        return f"(xxhash64({', '.join(columns)}) & {HASH_RANGE - 1})"
+    raise ValueError(f'Unsupported database type: {db_type}')
+
+
+class ReconcileSide:
+    """One table of a reconciliation, with the key and compared columns named as that database returns them"""
+
+    def __init__(self, cursor, db_type, table, label, structure=None):
+        """
+        Initialize side
+
+        Args:
+            cursor: Database cursor (used by one thread at a time)
+            db_type: Database type (oracle, databricks, snowflake)
+            table: Table name, optionally qualified by schema (and catalog/database)
+            label: 'source' or 'target', for messages
+            structure: get_table_structure() columns, needed for canonical hashing
+        """
+        if not _TABLE_NAME.match(table or ''):
+            raise ValueError(f"Invalid {label} table name: {table}")
+        self.cursor = cursor
+        self.db_type = db_type
+        self.table = table
+        self.label = label
+        self.columns = []
+        self.key_columns = []
+        self.compared = []
+        self.structure = structure
+        self.canonical = None  # column -> canonical string expression, when hashing canonically
+        self.rows = 0
+
+    def describe(self):
+        """Read the table's column names without fetching rows"""
+        self.cursor.execute(f"SELECT * FROM {self.table} WHERE 1 = 0")
+        self.columns = [desc[0] for desc in self.cursor.description]
+        self.cursor.fetchall()
+
+    def resolve(self, key_columns, compared):
+        """Map requested key and compared column names (any case) onto this side's names"""
+        by_name = {name.upper(): name for name in self.columns}
+        missing = [name for name in list(key_columns) + list(compared) if name.upper() not in by_name]
+        if missing:
+            raise ValueError(f"Column(s) not in the {self.label} table: {', '.join(missing)}")
+        self.key_columns = [by_name[name.upper()] for name in key_columns]
+        self.compared = [by_name[name.upper()] for name in compared]
+
+    def _hash(self, columns):
+        if self.canonical:
+            return fold_hashes([canonical_hash(self.db_type, self.canonical[name]) for name in columns])
+        return hash_expression(self.db_type, columns)
+
+    def key_hash(self):
+        return self._hash(self.key_columns)
+
+    def row_hash(self):
+        return self._hash(self.key_columns + self.compared)
+
+    def column_types(self):
+        """column_type() of the key and compared columns, from the structure"""
+        if not self.structure:
+            raise ValueError(f"The {self.label} table structure is needed to hash canonically")
+        by_name = {column['column_name'].upper(): column for column in self.structure}
+        missing = [name for name in self.key_columns + self.compared if name.upper() not in by_name]
+        if missing:
+            raise ValueError(f"Column(s) missing from the {self.label} table structure: {', '.join(missing)}")
+        return {name: column_type(self.db_type, by_name[name.upper()]) for name in self.key_columns + self.compared}
+
+    def bucket_checksums(self, modulus, parents, parent_modulus):
+        """
+        Row count and checksum per bucket MOD(key hash, modulus)
+
+        Args:
+            modulus: Buckets of this level (a multiple of parent_modulus)
+            parents: Residues MOD(key hash, parent_modulus) to restrict to (None for the whole table)
+            parent_modulus: Modulus of the previous level
+
+        Returns:
+            dict: {bucket: (row count, checksum)}
+        """
+        checksum = 'SUM(CAST(rh AS DECIMAL(38, 0)))' if self.db_type == 'databricks' else 'SUM(rh)'
+        sql = f"""
+            SELECT MOD(kh, {modulus}), COUNT(*), {checksum}
+            FROM (
+                SELECT {self.key_hash()} AS kh, {self.row_hash()} AS rh
+                FROM {self.table}
+            ) h
+            {{where}}
+            GROUP BY MOD(kh, {modulus})
+        """
+        buckets = {}
+        chunks = [None] if parents is None else [parents[start:start + _RESIDUE_CHUNK]
+                                                 for start in range(0, len(parents), _RESIDUE_CHUNK)]
+        for chunk in chunks:
+            where = '' if chunk is None else \
+                f"WHERE MOD(kh, {parent_modulus}) IN ({', '.join(str(residue) for residue in chunk)})"
+            self.cursor.execute(sql.format(where=where))
+            for bucket, count, total in self.cursor.fetchall():
+                buckets[int(bucket)] = (int(count), int(total or 0))
+        return buckets
+
+    def execute_leaf(self, modulus, residues, batch_size):
+        """Run the key-ordered query of the rows in buckets MOD(key hash, modulus) IN residues"""
+        select = ', '.join(f"{self.canonical[name] if self.canonical else name} AS {name.upper()}"
+                           for name in self.key_columns + self.compared)
+        sql = (f"SELECT {select} FROM {self.table} "
+               f"WHERE MOD({self.key_hash()}, {modulus}) IN ({', '.join(str(residue) for residue in residues)})")
+        execute_ordered(self.cursor, sql, [name.upper() for name in self.key_columns], batch_size)
+
+
+def _serial(first, second):
+    return first(), second()
+
+
+def _canonicalize(source, target, trim_strings):
+    """Give both sides canonical expressions agreed per column pair (see canonical_hash.pair_spec)"""
+    source_types, target_types = source.column_types(), target.column_types()
+    source.canonical, target.canonical = {}, {}
+    for source_name, target_name in zip(source.key_columns + source.compared, target.key_columns + target.compared):
+        spec = pair_spec(source_types[source_name], target_types[target_name], trim_strings)
+        source.canonical[source_name] = canonical_expression(source.db_type, source_name, spec['source'])
+        target.canonical[target_name] = canonical_expression(target.db_type, target_name, spec['target'])
+
+
+def reconcile_tables(source, target, key_columns, columns=None, buckets=DEFAULT_BUCKETS,
+                     leaf_rows=DEFAULT_LEAF_ROWS, batch_size=DEFAULT_BATCH_SIZE,
+                     sample_limit=DEFAULT_SAMPLE_LIMIT, run_both=None, report=None,
+                     canonical=False, trim_strings=True):
+    """
+    Checksum-then-drill-down reconciliation of two ReconcileSides
+
+    Each level groups both tables by MOD(key hash, buckets ** level) inside the
+    database and compares (row count, row hash sum) per bucket. Only buckets that
+    differ are split further; once a differing bucket holds at most leaf_rows rows
+    (or the hash cannot be split further) its rows are fetched in key order and
+    sort-merged (query_diff.merge_diff).
+
+    Tables on different database types (or with canonical=True) are hashed over
+    canonical column strings built from both structures, so equal values hash
+    alike; the fetched rows are then compared in their canonical form too.
+
+    Args:
+        source, target: ReconcileSide objects
+        key_columns: Key column names
+        columns: Compared column names (default: every non-key column both tables have)
+        buckets: Buckets per split (default: DEFAULT_BUCKETS)
+        leaf_rows: Largest bucket whose rows are fetched (default: DEFAULT_LEAF_ROWS)
+        batch_size: Rows per fetch when merging buckets
+        sample_limit: Differences listed per category
+        run_both: Callable(first, second) running two zero-argument callables, e.g.
+                  concurrently when the sides use different connections (default: in turn)
+        report: Optional callable(done, total, message) called once per level
+        canonical: Hash canonical strings even when both databases are of the same type
+        trim_strings: Ignore trailing blanks of strings when hashing canonically
+
+    Returns:
+        dict: summary, levels (buckets compared and differing per level) and
+              differences shaped like the key-ordered /api/compare-query-dual result
+
+    Raises:
+        ValueError: If a column is missing or invalid, or buckets / leaf_rows are out of range
+    """
+    started = time.time()
+    run_both = run_both or _serial
+    key_columns = parse_key_columns(key_columns)
+    if not 2 <= buckets <= 1024 or leaf_rows < 1:
+        raise ValueError('buckets must be between 2 and 1024 and leaf_rows positive')
+
+    run_both(source.describe, target.describe)
+    if columns:
+        compared = [name.strip() for name in (columns.split(',') if isinstance(columns, str) else columns) if name.strip()]
+    else:
+        target_names = {name.upper() for name in target.columns}
+        keys = {name.upper() for name in key_columns}
+        compared = [name for name in source.columns if name.upper() in target_names and name.upper() not in keys]
+    invalid = [name for name in compared if not _COLUMN_NAME.match(name)]
+    if invalid:
+        raise ValueError(f"Only plain column names can be hashed: {', '.join(invalid)}")
+    source.resolve(key_columns, compared)
+    target.resolve(key_columns, compared)
+    canonical = canonical or source.db_type != target.db_type
+    if canonical:
+        _canonicalize(source, target, trim_strings)
+
+    levels = []
+    leaves = []  # (modulus, residue) of differing buckets to fetch
+    parents, parent_modulus, modulus = None, 1, buckets
+    while True:
+        source_buckets, target_buckets = run_both(
+            lambda: source.bucket_checksums(modulus, parents, parent_modulus),
+            lambda: target.bucket_checksums(modulus, parents, parent_modulus)
+        )
+        if parents is None:
+            source.rows = sum(count for count, _ in source_buckets.values())
+            target.rows = sum(count for count, _ in target_buckets.values())
+
+        differing = sorted(bucket for bucket in set(source_buckets) | set(target_buckets)
+                           if source_buckets.get(bucket) != target_buckets.get(bucket))
+        levels.append({
+            'level': len(levels) + 1,
+            'buckets': modulus,
+            'buckets_compared': len(set(source_buckets) | set(target_buckets)),
+            'buckets_differing': len(differing)
+        })
+        if report:
+            report(len(levels), None, f"Level {len(levels)}: {len(differing)} of {modulus} bucket(s) differ")
+
+        can_split = modulus * buckets <= HASH_RANGE
+        split = []
+        for bucket in differing:
+            size = max(source_buckets.get(bucket, (0, 0))[0], target_buckets.get(bucket, (0, 0))[0])
+            if size > leaf_rows and can_split:
+                split.append(bucket)
+            else:
+                leaves.append((modulus, bucket))
+        if not split:
+            break
+        parents, parent_modulus, modulus = split, modulus, modulus * buckets
+
+    counts = {'changed_rows': 0, 'rows_only_in_source': 0, 'rows_only_in_target': 0,
+              'value_differences': 0, 'fetched_source_rows': 0, 'fetched_target_rows': 0}
+    differences = {'row_differences': [], 'rows_only_in_source': [], 'rows_only_in_target': []}
+    by_modulus = {}
+    for leaf_modulus, residue in leaves:
+        by_modulus.setdefault(leaf_modulus, []).append(residue)
+    for leaf_modulus, residues in by_modulus.items():
+        for start in range(0, len(residues), _RESIDUE_CHUNK):
+            chunk = residues[start:start + _RESIDUE_CHUNK]
+            run_both(lambda: source.execute_leaf(leaf_modulus, chunk, batch_size),
+                     lambda: target.execute_leaf(leaf_modulus, chunk, batch_size))
+            merged = merge_diff(source.cursor, target.cursor, [name.upper() for name in key_columns],
+                                batch_size, sample_limit)
+            summary = merged['summary']
+            for name in ('changed_rows', 'rows_only_in_source', 'rows_only_in_target'):
+                counts[name] += summary[name]
+            counts['fetched_source_rows'] += summary['source_rows']
+            counts['fetched_target_rows'] += summary['target_rows']
+            counts['value_differences'] += summary['value_differences']
+            for name, items in differences.items():
+                items.extend(merged['differences'][name][:sample_limit - len(items)])
+
+    elapsed_ms = round((time.time() - started) * 1000, 1)
+    logger.info(f"Reconciled {source.table} / {target.table}: {source.rows} / {target.rows} rows, "
+                f"{len(levels)} level(s), {len(leaves)} bucket(s) fetched, {counts['changed_rows']} changed, "
+                f"{counts['rows_only_in_source']} source-only, {counts['rows_only_in_target']} target-only "
+                f"({elapsed_ms:.0f} ms)")
+
+    return {
+        'summary': {
+            'mode': 'hash_buckets',
+            'hashing': 'canonical' if canonical else 'native',
+            'key_columns': source.key_columns,
+            'compared_columns': source.compared,
+            'source_rows': source.rows,
+            'target_rows': target.rows,
+            'matching_rows': source.rows - counts['changed_rows'] - counts['rows_only_in_source'],
+            **counts,
+            'buckets_fetched': len(leaves),
+            'total_differences': counts['value_differences'] + counts['rows_only_in_source'] + counts['rows_only_in_target'],
+            'has_row_count_difference': source.rows != target.rows,
+            'sample_limit': sample_limit,
+            'truncated': (counts['value_differences'] > len(differences['row_differences'])
+                          or counts['rows_only_in_source'] > len(differences['rows_only_in_source'])
+                          or counts['rows_only_in_target'] > len(differences['rows_only_in_target'])),
+            'elapsed_ms': elapsed_ms
+        },
+        'levels': levels,
+        'differences': differences
+    }
@@ -0,0 +1,196 @@
+"""
+Sampled Estimates
+Row counts and column profiles from table samples, with confidence intervals
+"""
+
+import logging
+import math
+from statistics import NormalDist
+
+logger = logging.getLogger(__name__)
+
+# Oracle accepts sample percentages in [0.000001, 100)
+MIN_SAMPLE_PERCENT = 0.000001
+MAX_SAMPLE_PERCENT = 99.999999
+
+# Types that cannot be counted DISTINCT (or are too expensive to) in a profile
+_UNPROFILED_TYPES = ('LOB', 'LONG', 'XMLTYPE', 'RAW', 'BINARY', 'VARIANT', 'OBJECT', 'ARRAY', 'MAP', 'STRUCT', 'GEOGRAPHY', 'GEOMETRY')
+
+
+def _z(confidence):
+    return NormalDist().inv_cdf(0.5 + confidence / 2)
+
+
+def choose_sample_percent(expected_rows=None, target_rows=100000, default_percent=1.0):
+    """
+    Pick a sampling rate that reads roughly target_rows rows
+
+    Args:
+        expected_rows: Row count guess (e.g. stale statistics), or None
+        target_rows: Rows the sample should contain (default: 100000)
+        default_percent: Rate used when nothing is known about the size (default: 1%)
+
+    Returns:
+        float: Sample percentage, or 100 when the table is small enough to read fully
+    """
+    if not expected_rows:
+        return default_percent
+    percent = target_rows * 100.0 / expected_rows
+    if percent >= MAX_SAMPLE_PERCENT:
+        return 100.0
+    return max(MIN_SAMPLE_PERCENT, percent)
+
+
+def sample_clause(db_type, percent, block=False):
+    """
+    Dialect sampling clause to place after the table name
+
+    Oracle can sample whole blocks (SAMPLE BLOCK), which reads only the sampled
+    blocks; row sampling (SAMPLE, Snowflake BERNOULLI, Databricks TABLESAMPLE)
+    still visits every row but keeps rows independent.
+    """
+    percent = f"{percent:.6f}".rstrip('0').rstrip('.')
+    if db_type == 'oracle':
+        return f"SAMPLE BLOCK ({percent})" if block else f"SAMPLE ({percent})"
+    if db_type == 'snowflake':
+        return f"SAMPLE BERNOULLI ({percent})"
+    if db_type == 'databricks':
+        return f"TABLESAMPLE ({percent} PERCENT)"
+    raise ValueError(f'Unsupported database type: {db_type}')
+
+
+def quote_identifier(db_type, name):
+    """Quote a column name for the dialect"""
+    if db_type == 'databricks':
+        return '`' + name.replace('`', '``') + '`'
+    return '"' + name.replace('"', '""') + '"'
+
+
+def sampled_row_count(cursor, db_type, full_name, percent, confidence=0.95):
+    """
+    Estimate a row count from a Bernoulli sample of rows (or of Oracle blocks)
+
+    With inclusion probability q and sampled cluster sizes c_i (rows per block
+    on Oracle, 1 for row sampling), N = sum(c_i) / q and
+    Var(N) = (1 - q) / q^2 * sum(c_i^2).
+
+    Args:
+        cursor: Database cursor
+        db_type: Database type (oracle, databricks, snowflake)
+        full_name: Qualified table name
+        percent: Sample percentage (0-100)
+        confidence: Confidence level of the interval (default: 0.95)
+
+    Returns:
+        dict: row_count, count_type 'sampled', sample_percent, sampled_rows,
+              confidence_level, ci_low, ci_high and relative_error
+    """
+    q = percent / 100.0
+
+    if db_type == 'oracle':
+        # Block sampling reads only ~percent of the blocks; cluster sizes keep the interval honest
+        cursor.execute(f"""
+            SELECT NVL(SUM(c), 0), NVL(SUM(c * c), 0)
+            FROM (
+                SELECT COUNT(*) c
+                FROM {full_name} {sample_clause(db_type, percent, block=True)}
+                GROUP BY DBMS_ROWID.ROWID_RELATIVE_FNO(ROWID), DBMS_ROWID.ROWID_BLOCK_NUMBER(ROWID)
+            )
+        """)
+        sampled_rows, sum_squares = cursor.fetchone()
+    else:
+        cursor.execute(f"SELECT COUNT(*) FROM {full_name} {sample_clause(db_type, percent)}")
+        sampled_rows = cursor.fetchone()[0]
+        sum_squares = sampled_rows
+
+    sampled_rows = int(sampled_rows or 0)
+    estimate = sampled_rows / q
+    z = _z(confidence)
+
+    if sampled_rows == 0:
+        # Nothing sampled: the table is empty or smaller than about 1/q rows (rule of three)
+        ci_low, ci_high = 0, math.ceil(3 / q)
+    else:
+        margin = z * math.sqrt((1 - q) / (q * q) * float(sum_squares))
+        ci_low, ci_high = max(sampled_rows, math.floor(estimate - margin)), math.ceil(estimate + margin)
+
+    return {
+        'row_count': int(round(estimate)),
+        'count_type': 'sampled',
+        'count_source': sample_clause(db_type, percent, block=db_type == 'oracle'),
+        'sample_percent': percent,
+        'sampled_rows': sampled_rows,
+        'confidence_level': confidence,
+        'ci_low': ci_low,
+        'ci_high': ci_high,
+        'relative_error': round((ci_high - ci_low) / 2 / estimate, 4) if estimate else None
+    }
+
+
+def wilson_interval(successes, trials, confidence=0.95):
+    """Wilson score interval for a proportion"""
+    if trials == 0:
+        return None, None
+    z = _z(confidence)
+    p = successes / trials
+    denominator = 1 + z * z / trials
+    centre = (p + z * z / (2 * trials)) / denominator
+    margin = z * math.sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials)) / denominator
+    return max(0.0, centre - margin), min(1.0, centre + margin)
+
+
+def sampled_column_profile(cursor, db_type, full_name, columns, percent, confidence=0.95):
+    """
+    Profile columns from a row sample: null fraction (with Wilson interval) and distinct values seen
+
+    Args:
+        cursor: Database cursor
+        db_type: Database type (oracle, databricks, snowflake)
+        full_name: Qualified table name
+        columns: Column dicts from get_table_structure() ('column_name', 'data_type')
+        percent: Sample percentage (0-100, 100 reads the whole table)
+        confidence: Confidence level of the intervals (default: 0.95)
+
+    Returns:
+        dict: sample_percent, sampled_rows, confidence_level and a 'columns' list with
+              null_fraction, null_fraction_ci, non_null_in_sample and distinct_in_sample
+              (distinct counts are for the sample only and are not scaled)
+    """
+    selects = ["COUNT(*)"]
+    profiled = []
+    for column in columns:
+        name = column['column_name']
+        data_type = str(column.get('data_type') or '').upper()
+        quoted = quote_identifier(db_type, name)
+        selects.append(f"COUNT({quoted})")
+        distinct = not any(marker in data_type for marker in _UNPROFILED_TYPES)
+        if distinct:
+            selects.append(f"COUNT(DISTINCT {quoted})")
+        profiled.append((name, column.get('data_type'), distinct))
+
+    # At 100% the whole table is profiled, without a sampling clause
+    clause = sample_clause(db_type, percent) if percent < 100 else ''
+    cursor.execute(f"SELECT {', '.join(selects)} FROM {full_name} {clause}")
+    row = list(cursor.fetchone())
+    sampled_rows = int(row.pop(0) or 0)
+
+    results = []
+    for name, data_type, distinct in profiled:
+        non_null = int(row.pop(0) or 0)
+        distinct_count = int(row.pop(0) or 0) if distinct else None
+        low, high = wilson_interval(sampled_rows - non_null, sampled_rows, confidence)
+        results.append({
+            'column_name': name,
+            'data_type': data_type,
+            'null_fraction': round((sampled_rows - non_null) / sampled_rows, 6) if sampled_rows else None,
+            'null_fraction_ci': [round(low, 6), round(high, 6)] if low is not None else None,
+            'non_null_in_sample': non_null,
+            'distinct_in_sample': distinct_count
+        })
+
+    return {
+        'sample_percent': percent,
+        'sampled_rows': sampled_rows,
+        'confidence_level': confidence,
+        'columns': results
+    }
@@ -0,0 +1,553 @@
+"""
+Schema Compare
+Loads two schemas' column, index and constraint catalogs in bulk and diffs them in memory
+"""
+
+import logging
+import time
+from datetime import datetime
+
+from catalog_batch import (
+    fetch_catalog_batch, fetch_schema_tables, fetch_ddl_versions, fetch_database_time, fetch_changed_tables
+)
+from compare_store import table_fingerprint, snapshot_copy
+from databricks_metadata import describe_table
+
+logger = logging.getLogger(__name__)
+
+# Metadata categories a schema compare can load and diff
+SCHEMA_COMPARE_CATEGORIES = ('structure', 'indexes', 'primary_key', 'foreign_keys')
+
+
+def _column_text(column, with_nullable=False):
+    text = f"{column['data_type']}({column.get('data_length', '')})"
+    return f"{text} {column.get('nullable', '')}" if with_nullable else text
+
+
+def diff_structure(source_structure, target_structure):
+    """
+    Column differences between two tables, as compare_source_target reports them
+
+    Returns:
+        list: {'column_name', 'diff_type', 'source_value', 'target_value', 'type'} per
+              added, removed or modified column (type, length, precision or nullability)
+    """
+    source_cols = {col['column_name']: col for col in source_structure}
+    target_cols = {col['column_name']: col for col in target_structure}
+    differences = []
+
+    for col_name in set(source_cols) | set(target_cols):
+        source_col = source_cols.get(col_name)
+        target_col = target_cols.get(col_name)
+        if source_col is None:
+            differences.append({
+                'column_name': col_name,
+                'diff_type': 'Missing in Source',
+                'source_value': None,
+                'target_value': _column_text(target_col),
+                'type': 'added'
+            })
+        elif target_col is None:
+            differences.append({
+                'column_name': col_name,
+                'diff_type': 'Missing in Target',
+                'source_value': _column_text(source_col),
+                'target_value': None,
+                'type': 'removed'
+            })
+        elif (source_col['data_type'] != target_col['data_type'] or
+              source_col.get('data_length') != target_col.get('data_length') or
+              source_col.get('data_precision') != target_col.get('data_precision') or
+              source_col.get('nullable') != target_col.get('nullable')):
+            differences.append({
+                'column_name': col_name,
+                'diff_type': 'Modified',
+                'source_value': _column_text(source_col, with_nullable=True),
+                'target_value': _column_text(target_col, with_nullable=True),
+                'type': 'modified'
+            })
+
+    return differences
+
+
+def diff_indexes(source_indexes, target_indexes):
+    """
+    Indexes present on one side only, matched by name
+
+    Returns:
+        list: {'index_name', 'diff_type', 'status'} with status missing_in_target or missing_in_source
+    """
+    source_by_name = {idx['index_name']: idx for idx in source_indexes}
+    target_by_name = {idx['index_name']: idx for idx in target_indexes}
+    differences = []
+
+    for by_name, other, status in ((source_by_name, target_by_name, 'missing_in_target'),
+                                   (target_by_name, source_by_name, 'missing_in_source')):
+        for idx_name, idx in by_name.items():
+            if idx_name not in other:
+                differences.append({
+                    'index_name': idx_name,
+                    'diff_type': idx.get('index_type', 'INDEX'),
+                    'status': status
+                })
+
+    return differences
+
+
+def diff_constraints(source_pk, target_pk, source_fks, target_fks):
+    """
+    Primary key and foreign key differences, as compare_source_target reports them
+
+    Args:
+        source_pk, target_pk: get_primary_key() results ({} or None when there is none)
+        source_fks, target_fks: get_foreign_keys() results
+
+    Returns:
+        list: {'constraint_name', 'constraint_type', 'columns', 'source_value', 'target_value', 'status'}
+    """
+    differences = []
+    has_source_pk = bool(source_pk and source_pk.get('constraint_name'))
+    has_target_pk = bool(target_pk and target_pk.get('constraint_name'))
+
+    if has_source_pk and not has_target_pk:
+        differences.append({
+            'constraint_name': source_pk['constraint_name'],
+            'constraint_type': 'PRIMARY KEY',
+            'columns': source_pk.get('columns', ''),
+            'source_value': source_pk.get('columns', ''),
+            'target_value': 'None',
+            'status': 'missing_in_target'
+        })
+    elif not has_source_pk and has_target_pk:
+        differences.append({
+            'constraint_name': target_pk['constraint_name'],
+            'constraint_type': 'PRIMARY KEY',
+            'columns': target_pk.get('columns', ''),
+            'source_value': 'None',
+            'target_value': target_pk.get('columns', ''),
+            'status': 'missing_in_source'
+        })
+    elif has_source_pk and has_target_pk:
+        source_pk_cols = (source_pk.get('columns') or '').strip()
+        target_pk_cols = (target_pk.get('columns') or '').strip()
+        if source_pk_cols != target_pk_cols:
+            differences.append({
+                'constraint_name': f"{source_pk['constraint_name']} / {target_pk['constraint_name']}",
+                'constraint_type': 'PRIMARY KEY',
+                'columns': 'Different columns',
+                'source_value': source_pk_cols,
+                'target_value': target_pk_cols,
+                'status': 'modified'
+            })
+
+    source_fks_dict = {fk['constraint_name']: fk for fk in source_fks or []}
+    target_fks_dict = {fk['constraint_name']: fk for fk in target_fks or []}
+
+    for fk_name in set(source_fks_dict) | set(target_fks_dict):
+        source_fk = source_fks_dict.get(fk_name)
+        target_fk = target_fks_dict.get(fk_name)
+
+        if source_fk and not target_fk:
+            differences.append({
+                'constraint_name': fk_name,
+                'constraint_type': 'FOREIGN KEY',
+                'columns': source_fk.get('columns', ''),
+                'source_value': f"{source_fk.get('columns', '')} -> {source_fk.get('referenced_table', '')}",
+                'target_value': 'None',
+                'status': 'missing_in_target'
+            })
+        elif not source_fk and target_fk:
+            differences.append({
+                'constraint_name': fk_name,
+                'constraint_type': 'FOREIGN KEY',
+                'columns': target_fk.get('columns', ''),
+                'source_value': 'None',
+                'target_value': f"{target_fk.get('columns', '')} -> {target_fk.get('referenced_table', '')}",
+                'status': 'missing_in_source'
+            })
+        else:
+            source_cols = (source_fk.get('columns') or '').strip()
+            target_cols = (target_fk.get('columns') or '').strip()
+            source_ref_table = (source_fk.get('referenced_table') or '').strip()
+            target_ref_table = (target_fk.get('referenced_table') or '').strip()
+            if source_cols != target_cols or source_ref_table != target_ref_table:
+                differences.append({
+                    'constraint_name': fk_name,
+                    'constraint_type': 'FOREIGN KEY',
+                    'columns': 'Different structure',
+                    'source_value': f"{source_cols} -> {source_ref_table}",
+                    'target_value': f"{target_cols} -> {target_ref_table}",
+                    'status': 'modified'
+                })
+
+    return differences
+
+
+def diff_tables(source, target, categories=SCHEMA_COMPARE_CATEGORIES):
+    """
+    All differences between two tables' metadata
+
+    Args:
+        source, target: {category: value} for one table each (see load_schema_catalog)
+        categories: Categories to compare
+
+    Returns:
+        dict: total_count, structure, indexes and constraints, shaped like the
+              'differences' of compare_source_target (without row_count)
+    """
+    differences = {'total_count': 0, 'structure': [], 'indexes': [], 'constraints': []}
+    if 'structure' in categories:
+        differences['structure'] = diff_structure(source.get('structure', []), target.get('structure', []))
+    if 'indexes' in categories:
+        differences['indexes'] = diff_indexes(source.get('indexes', []), target.get('indexes', []))
+    if 'primary_key' in categories or 'foreign_keys' in categories:
+        differences['constraints'] = diff_constraints(
+            source.get('primary_key') if 'primary_key' in categories else None,
+            target.get('primary_key') if 'primary_key' in categories else None,
+            source.get('foreign_keys', []) if 'foreign_keys' in categories else [],
+            target.get('foreign_keys', []) if 'foreign_keys' in categories else []
+        )
+    differences['total_count'] = sum(len(differences[section]) for section in ('structure', 'indexes', 'constraints'))
+    return differences
+
+
+def _databricks_table(cursor, full_name, memo):
+    """Structure and keys of a Databricks table from its DESCRIBE TABLE EXTENDED (no indexes)"""
+    info = describe_table(cursor, full_name, memo)
+    primary_key = info['primary_key']
+    return {
+        'structure': [{
+            'column_name': col['column_name'],
+            'data_type': col['data_type'],
+            'data_length': None,
+            'data_precision': None,
+            'data_scale': None,
+            'nullable': 'Y',
+            'default_value': None
+        } for col in info['columns']],
+        'indexes': [],
+        'primary_key': {
+            'constraint_name': primary_key['constraint_name'],
+            'columns': ', '.join(primary_key['columns']),
+            'status': 'NOT ENFORCED'
+        } if primary_key else {},
+        'foreign_keys': [{
+            'constraint_name': fk['constraint_name'],
+            'columns': ', '.join(fk['columns']),
+            'referenced_constraint': None,
+            'referenced_table': fk['referenced_table'],
+            'delete_rule': 'NO ACTION',
+            'status': 'NOT ENFORCED'
+        } for fk in info['foreign_keys']]
+    }
+
+
+def load_schema_catalog(cursor, db_type, schema, catalog_or_db=None, default_database=None, pattern='%',
+                        categories=SCHEMA_COMPARE_CATEGORIES, memo=None, table_names=None):
+    """
+    Metadata of every table in a schema, read in bulk
+
+    Oracle and Snowflake use the batched catalog queries (one query per category
+    and chunk of tables, SHOW ... IN SCHEMA on Snowflake); Databricks reads one
+    DESCRIBE TABLE EXTENDED per table.
+
+    Args:
+        cursor: Database cursor
+        db_type: Database type (oracle, databricks, snowflake)
+        schema: Schema/owner name
+        catalog_or_db: Catalog (Databricks) or database (Snowflake)
+        default_database: Snowflake database used when catalog_or_db is not given
+        pattern: SQL LIKE pattern for table names (default: '%')
+        categories: Categories to load (default: SCHEMA_COMPARE_CATEGORIES)
+        memo: Per-request metadata memo (optional)
+        table_names: Tables to load (default: every table matching pattern)
+
+    Returns:
+        dict: {table_name: {category: value}}; a category that could not be read
+              for a table is missing from its dict
+    """
+    started = time.time()
+    memo = memo if memo is not None else {}
+    schema = schema.upper()
+    if table_names is None:
+        table_names = fetch_schema_tables(cursor, db_type, schema, pattern, catalog_or_db, default_database)
+    tables = {table_name: {} for table_name in table_names}
+
+    if db_type == 'databricks':
+        prefix = f"{catalog_or_db}.{schema}" if catalog_or_db else schema
+        for table_name in table_names:
+            try:
+                info = _databricks_table(cursor, f"{prefix}.{table_name}", memo)
+                tables[table_name] = {category: info[category] for category in categories}
+            except Exception as error:
+                logger.warning(f"Could not describe {prefix}.{table_name}: {error}")
+    else:
+        keys = [(catalog_or_db, schema, table_name) for table_name in table_names]
+        batched = fetch_catalog_batch(cursor, db_type, keys, default_database, memo, list(categories))
+        for category, values in batched.items():
+            for key, value in values.items():
+                tables[key[2]][category] = value
+        missing = [category for category in categories if category not in batched]
+        if missing and table_names:
+            logger.warning(f"Schema {schema}: could not load {', '.join(missing)}; those categories are not compared")
+
+    logger.info(f"Loaded {db_type} catalog of {schema}: {len(table_names)} table(s) in {(time.time() - started) * 1000:.0f} ms")
+    return tables
+
+
+def compare_schema_catalogs(source_tables, target_tables, categories=SCHEMA_COMPARE_CATEGORIES,
+                            source_fingerprints=None, target_fingerprints=None):
+    """
+    Diff two load_schema_catalog() results, joining tables by name
+
+    Pairs whose fingerprints (see compare_store.table_fingerprint) are equal are
+    identical without a detailed diff; their metadata may then be None (not loaded).
+
+    Returns:
+        dict: summary (table counts), missing_in_target / missing_in_source (table
+              names) and modified ([{'table_name', 'differences'}] per table with differences)
+    """
+    source_fingerprints = source_fingerprints or {}
+    target_fingerprints = target_fingerprints or {}
+    missing_in_target = sorted(name for name in source_tables if name not in target_tables)
+    missing_in_source = sorted(name for name in target_tables if name not in source_tables)
+    modified = []
+    identical = 0
+    fingerprint_matches = 0
+
+    for table_name in sorted(name for name in source_tables if name in target_tables):
+        fingerprint = source_fingerprints.get(table_name)
+        if fingerprint and fingerprint == target_fingerprints.get(table_name):
+            identical += 1
+            fingerprint_matches += 1
+            continue
+        source, target = source_tables[table_name] or {}, target_tables[table_name] or {}
+        # Only categories read on both sides, so a failed load is not reported as a difference
+        compared = [category for category in categories if category in source and category in target]
+        differences = diff_tables(source, target, compared)
+        if differences['total_count']:
+            modified.append({'table_name': table_name, 'differences': differences})
+        else:
+            identical += 1
+
+    return {
+        'summary': {
+            'source_tables': len(source_tables),
+            'target_tables': len(target_tables),
+            'missing_in_target': len(missing_in_target),
+            'missing_in_source': len(missing_in_source),
+            'modified': len(modified),
+            'identical': identical,
+            'fingerprint_matches': fingerprint_matches,
+            'total_differences': len(missing_in_target) + len(missing_in_source)
+                                 + sum(table['differences']['total_count'] for table in modified)
+        },
+        'missing_in_target': missing_in_target,
+        'missing_in_source': missing_in_source,
+        'modified': modified
+    }
+
+
+class SchemaSide:
+    """
+    One side of a schema compare: its tables, their versions and fingerprints, and the metadata loaded for them
+
+    With a SnapshotStore (Oracle and Snowflake), discover() asks the database
+    which tables changed since the last baseline and restores every other table
+    from its snapshot; load() then only runs for changed or new tables. Without
+    one, or on Databricks, a FingerprintStore lets discover() read one version
+    marker per table and the fingerprints stored for those versions, and load()
+    runs for tables whose fingerprint is unknown or differs from the other side.
+    """
+
+    def __init__(self, cursor, db_type, schema, catalog_or_db=None, default_database=None,
+                 memo=None, store=None, scope=None, snapshots=None, incremental=True):
+        """
+        Initialize side
+
+        Args:
+            cursor: Database cursor (used by one thread at a time)
+            db_type: Database type (oracle, databricks, snowflake)
+            schema: Schema/owner name
+            catalog_or_db: Catalog (Databricks) or database (Snowflake)
+            default_database: Snowflake database used when catalog_or_db is not given
+            memo: Per-request metadata memo (optional)
+            store: FingerprintStore (optional; without it every table is loaded)
+            scope: Store scope identifying the environment and schema
+            snapshots: SnapshotStore (optional)
+            incremental: Serve unchanged tables from the last baseline (False reloads
+                         every table and records a new baseline)
+        """
+        self.cursor = cursor
+        self.db_type = db_type
+        self.schema = schema.upper()
+        self.catalog_or_db = catalog_or_db
+        self.default_database = default_database
+        self.memo = memo if memo is not None else {}
+        self.store = store
+        self.scope = scope
+        self.snapshots = snapshots
+        self.incremental = incremental
+        self.table_names = []
+        self.versions = {}  # table_name -> version marker
+        self.fingerprints = {}  # table_name -> fingerprint (stored or computed)
+        self.tables = {}  # table_name -> {category: value}, loaded or restored tables only
+        self.snapshot_scope = None
+        self.baseline_time = None  # database time read before looking for changes
+        self.since = None  # previous baseline, when one was used
+        self.changed = None  # tables changed since the previous baseline
+        self.current = set()  # tables whose snapshot is refreshed or confirmed unchanged
+        self.restored = 0
+        self.loaded = 0
+
+    @property
+    def tracks_snapshots(self):
+        """Whether this side keeps snapshots (every table is then loaded or restored)"""
+        return self.baseline_time is not None
+
+    def full_name(self, table_name):
+        if self.db_type == 'databricks':
+            prefix = f"{self.catalog_or_db}.{self.schema}" if self.catalog_or_db else self.schema
+            return f"{prefix}.{table_name}"
+        return f"{self.schema}.{table_name}"
+
+    def discover(self, pattern, categories):
+        """List the schema's tables, then restore unchanged ones from snapshots or look up their stored fingerprints"""
+        self.table_names = fetch_schema_tables(self.cursor, self.db_type, self.schema, pattern,
+                                               self.catalog_or_db, self.default_database)
+        if self.snapshots is not None:
+            # The pattern is part of the scope: a baseline only vouches for the tables it listed
+            self.snapshot_scope = f"{self.scope}|{pattern.upper()}"
+            try:
+                self.baseline_time = fetch_database_time(self.cursor, self.db_type)
+            except Exception as error:
+                logger.warning(f"Could not read the database time of {self.schema}, snapshots not used: {error}")
+        if not self.table_names:
+            return
+        if self.tracks_snapshots:
+            self._restore_snapshots(categories)
+            return
+        if self.store is None:
+            return
+        keys = [(self.catalog_or_db, self.schema, table_name) for table_name in self.table_names]
+        versions = fetch_ddl_versions(self.cursor, self.db_type, keys, self.default_database,
+                                      {key: self.full_name(key[2]) for key in keys}, self.memo)
+        self.versions = {key[2]: version for key, version in versions.items()}
+        self.fingerprints = self.store.get_many(self.scope, self.versions, categories)
+
+    def _restore_snapshots(self, categories):
+        since = self.snapshots.baseline(self.snapshot_scope, categories) if self.incremental else None
+        if since is None:
+            return
+        changed = fetch_changed_tables(self.cursor, self.db_type, self.schema, datetime.fromisoformat(since),
+                                       self.catalog_or_db, self.default_database)
+        if changed is None:
+            return
+        self.since = since
+        self.changed = changed & set(self.table_names)
+        restored = self.snapshots.get_many(self.snapshot_scope,
+                                           [name for name in self.table_names if name not in changed], categories)
+        self.restored = len(restored)
+        for table_name, metadata in restored.items():
+            self.tables[table_name] = metadata
+            self.current.add(table_name)
+            fingerprint = table_fingerprint(metadata, categories)
+            if fingerprint:
+                self.fingerprints[table_name] = fingerprint
+        logger.info(f"{self.schema}: {len(self.changed)} table(s) changed since {since}, "
+                    f"{len(restored)} of {len(self.table_names)} restored from snapshots")
+
+    def load(self, table_names, categories):
+        """Load metadata of table_names, fingerprint it and store the fingerprints and snapshots"""
+        loaded = load_schema_catalog(self.cursor, self.db_type, self.schema, self.catalog_or_db,
+                                     self.default_database, categories=categories, memo=self.memo,
+                                     table_names=table_names)
+        self.loaded += len(loaded)
+        fresh = {}
+        complete = {}
+        for table_name, metadata in loaded.items():
+            fingerprint = table_fingerprint(metadata, categories)
+            self.fingerprints.pop(table_name, None)
+            if self.tracks_snapshots:
+                metadata = snapshot_copy(metadata)
+            self.tables[table_name] = metadata
+            if fingerprint:
+                self.fingerprints[table_name] = fingerprint
+                complete[table_name] = metadata
+                if table_name in self.versions:
+                    fresh[table_name] = (self.versions[table_name], fingerprint)
+        if self.store is not None:
+            self.store.put_many(self.scope, fresh, categories)
+        if self.tracks_snapshots:
+            # Tables with a category that failed to load keep no snapshot and are loaded again next time
+            self.snapshots.put_many(self.snapshot_scope, complete, categories)
+            self.current.update(complete)
+
+    def commit_baseline(self, categories):
+        """Record this run's database time as the new baseline once every snapshot is current"""
+        if self.tracks_snapshots:
+            self.snapshots.commit(self.snapshot_scope, categories, self.baseline_time.isoformat(), self.current)
+
+    def baseline_summary(self):
+        """How this side's tables were obtained, for the compare result"""
+        return {
+            'mode': ('incremental' if self.since else 'full') if self.tracks_snapshots else
+                    ('fingerprints' if self.store is not None else 'full'),
+            'since': self.since,
+            'baseline': self.baseline_time.isoformat() if self.tracks_snapshots else None,
+            'changed_tables': len(self.changed) if self.changed is not None else None,
+            'restored_tables': self.restored,
+            'loaded_tables': self.loaded
+        }
+
+
+def compare_schema_sides(source, target, pattern='%', categories=SCHEMA_COMPARE_CATEGORIES, run_both=None):
+    """
+    Compare two SchemaSides, loading metadata only for tables that may have changed
+
+    A side that keeps snapshots loads each of its tables that was neither restored
+    nor loaded before, so its next baseline covers the whole schema; otherwise only
+    common pairs without equal fingerprints are loaded. Each side records its new
+    baseline after the diff.
+
+    Args:
+        source, target: SchemaSide objects
+        pattern: SQL LIKE pattern for table names
+        categories: Categories to compare
+        run_both: Callable(first, second) running two zero-argument callables, e.g.
+                  concurrently when the sides use different connections (default: in turn)
+
+    Returns:
+        dict: compare_schema_catalogs() result; summary also counts the pairs
+              skipped without a detailed diff ('unchanged_skipped'), and baseline
+              reports how each side's tables were obtained
+    """
+    run_both = run_both or (lambda first, second: (first(), second()))
+    run_both(lambda: source.discover(pattern, categories), lambda: target.discover(pattern, categories))
+
+    target_names = set(target.table_names)
+    common = [name for name in source.table_names if name in target_names]
+    unchanged = {name for name in common
+                 if source.fingerprints.get(name) and source.fingerprints.get(name) == target.fingerprints.get(name)}
+
+    def pending(side):
+        names = side.table_names if side.tracks_snapshots else [name for name in common if name not in unchanged]
+        return [name for name in names if name not in side.tables]
+
+    source_pending, target_pending = pending(source), pending(target)
+    run_both(lambda: source_pending and source.load(source_pending, categories),
+             lambda: target_pending and target.load(target_pending, categories))
+
+    result = compare_schema_catalogs(
+        {name: source.tables.get(name) for name in source.table_names},
+        {name: target.tables.get(name) for name in target.table_names},
+        categories, source.fingerprints, target.fingerprints
+    )
+    source.commit_baseline(categories)
+    target.commit_baseline(categories)
+
+    result['summary']['unchanged_skipped'] = len(unchanged)
+    result['baseline'] = {'source': source.baseline_summary(), 'target': target.baseline_summary()}
+    logger.info(f"Schema compare {source.schema} / {target.schema}: {len(unchanged)} of {len(common)} common table(s) "
+                f"unchanged, {len(source_pending)} / {len(target_pending)} table(s) loaded")
+    return result
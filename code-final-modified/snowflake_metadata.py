@@ -0,0 +1,181 @@
+"""
+Snowflake Schema Metadata
+Indexes SHOW ... IN SCHEMA output (read through RESULT_SCAN) so per-table probes need no INFORMATION_SCHEMA queries
+"""
+
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# SHOW commands return at most this many rows; a full result may be truncated
+SHOW_ROW_LIMIT = 10000
+
+# SHOW COLUMNS type names that INFORMATION_SCHEMA.COLUMNS.DATA_TYPE spells differently
+_TYPE_NAMES = {'FIXED': 'NUMBER', 'REAL': 'FLOAT'}
+
+_SHOW_QUERIES = {
+    'COLUMNS': """
+        SELECT "table_name", "column_name",
+               PARSE_JSON("data_type"):type::STRING,
+               PARSE_JSON("data_type"):length::NUMBER,
+               PARSE_JSON("data_type"):precision::NUMBER,
+               PARSE_JSON("data_type"):scale::NUMBER,
+               PARSE_JSON("data_type"):nullable::BOOLEAN,
+               "default"
+        FROM TABLE(RESULT_SCAN(LAST_QUERY_ID()))
+    """,
+    'PRIMARY KEYS': """
+        SELECT "table_name", "constraint_name", "column_name"
+        FROM TABLE(RESULT_SCAN(LAST_QUERY_ID()))
+        ORDER BY "table_name", "key_sequence"
+    """,
+    'UNIQUE KEYS': """
+        SELECT "table_name", "constraint_name", "column_name"
+        FROM TABLE(RESULT_SCAN(LAST_QUERY_ID()))
+        ORDER BY "table_name", "constraint_name", "key_sequence"
+    """,
+    'IMPORTED KEYS': """
+        SELECT "fk_table_name", "fk_name", "fk_column_name", "pk_name",
+               "pk_database_name" || '.' || "pk_schema_name" || '.' || "pk_table_name", "delete_rule"
+        FROM TABLE(RESULT_SCAN(LAST_QUERY_ID()))
+        ORDER BY "fk_table_name", "fk_name", "key_sequence"
+    """
+}
+
+
+class ShowTruncatedError(Exception):
+    """SHOW ... IN SCHEMA hit the row limit, so the index would be incomplete"""
+    pass
+
+
+class SnowflakeSchemaMetadata:
+    """
+    Metadata of every table in one DATABASE.SCHEMA from SHOW commands
+
+    Each SHOW kind (COLUMNS, PRIMARY KEYS, UNIQUE KEYS, IMPORTED KEYS) runs once,
+    on first use, and is projected and typed by a RESULT_SCAN(LAST_QUERY_ID())
+    query on the same cursor. SHOW reads the metadata layer only, unlike the
+    INFORMATION_SCHEMA views. Results are shaped like the get_table_* functions.
+
+    The index is shared by the threads of a request, so every lookup takes the
+    caller's own cursor and loading is serialized by a lock: a SHOW and its
+    RESULT_SCAN always run back to back on one connection.
+    """
+
+    def __init__(self, database, schema):
+        """
+        Initialize index
+
+        Args:
+            database: Database name, or None for the session's current database
+            schema: Schema name
+        """
+        self.scope = f"{database}.{schema}" if database else schema
+        self._rows = {}  # SHOW kind -> {TABLE_NAME: [rows]}
+        self._errors = {}  # SHOW kind -> error, so a failing SHOW is not repeated
+        self._lock = threading.Lock()
+
+    def _load(self, cursor, kind):
+        with self._lock:
+            return self._load_locked(cursor, kind)
+
+    def _load_locked(self, cursor, kind):
+        if kind in self._errors:
+            raise self._errors[kind]
+        if kind not in self._rows:
+            try:
+                cursor.execute(f"SHOW {kind} IN SCHEMA {self.scope}")
+                cursor.execute(_SHOW_QUERIES[kind])
+                rows = cursor.fetchall()
+                if len(rows) >= SHOW_ROW_LIMIT:
+                    raise ShowTruncatedError(f"SHOW {kind} IN SCHEMA {self.scope} returned {len(rows)} rows (limit {SHOW_ROW_LIMIT})")
+            except Exception as error:
+                self._errors[kind] = error
+                raise
+            by_table = {}
+            for row in rows:
+                by_table.setdefault(row[0], []).append(row[1:])
+            self._rows[kind] = by_table
+            logger.debug(f"SHOW {kind} IN SCHEMA {self.scope}: {len(rows)} rows for {len(by_table)} table(s)")
+        return self._rows[kind]
+
+    def _keys(self, cursor, kind, table_name):
+        """{constraint_name: [columns]} in key order"""
+        keys = {}
+        for constraint_name, column_name in self._load(cursor, kind).get(table_name.upper(), []):
+            keys.setdefault(constraint_name, []).append(column_name)
+        return keys
+
+    def structure(self, cursor, table_name):
+        """Columns, shaped like get_table_structure()"""
+        return [{
+            'column_name': column_name,
+            'data_type': _TYPE_NAMES.get(data_type, data_type),
+            'data_length': length,
+            'data_precision': precision,
+            'data_scale': scale,
+            'nullable': 'YES' if nullable else 'NO',
+            'default_value': default or None
+        } for column_name, data_type, length, precision, scale, nullable, default
+            in self._load(cursor, 'COLUMNS').get(table_name.upper(), [])]
+
+    def primary_key(self, cursor, table_name):
+        """Primary key, shaped like get_primary_key() ({} when there is none)"""
+        for constraint_name, columns in self._keys(cursor, 'PRIMARY KEYS', table_name).items():
+            return {
+                'constraint_name': constraint_name,
+                'columns': ', '.join(columns),
+                'status': 'ENABLED'
+            }
+        return {}
+
+    def indexes(self, cursor, table_name):
+        """Primary and unique keys, shaped like get_table_indexes()"""
+        index_list = []
+        for kind, index_type in (('PRIMARY KEYS', 'PRIMARY KEY'), ('UNIQUE KEYS', 'UNIQUE')):
+            for constraint_name, columns in self._keys(cursor, kind, table_name).items():
+                index_list.append({
+                    'index_name': constraint_name,
+                    'index_type': index_type,
+                    'uniqueness': 'UNIQUE',
+                    'columns': ', '.join(columns),
+                    'status': 'ACTIVE',
+                    'tablespace': 'N/A'
+                })
+        return index_list
+
+    def foreign_keys(self, cursor, table_name):
+        """Imported keys, shaped like get_foreign_keys()"""
+        fk_list = {}
+        for fk_name, column_name, pk_name, referenced_table, delete_rule in self._load(cursor, 'IMPORTED KEYS').get(table_name.upper(), []):
+            fk = fk_list.setdefault(fk_name, {
+                'constraint_name': fk_name,
+                'columns': [],
+                'referenced_constraint': pk_name,
+                'referenced_table': referenced_table,
+                'delete_rule': delete_rule or 'NO ACTION',
+                'status': 'ENABLED'
+            })
+            fk['columns'].append(column_name)
+        return [dict(fk, columns=', '.join(fk['columns'])) for fk in fk_list.values()]
+
+
+def schema_metadata(database, schema, memo=None):
+    """
+    SnowflakeSchemaMetadata for a schema, shared through memo (normally one dict per request)
+
+    Lookups pass their own cursor, since a request may move between pooled
+    connections (e.g. chunks of a streamed analysis or parallel workers).
+
+    Args:
+        database: Database name (optional)
+        schema: Schema name
+        memo: Dict shared by the callers of one request (optional)
+    """
+    memo = memo if memo is not None else {}
+    key = ('snowflake_schema', (database or '').upper(), schema.upper())
+    if key not in memo:
+        # setdefault keeps the first index when two threads create one at once
+        memo.setdefault(key, SnowflakeSchemaMetadata(database.upper() if database else None, schema.upper()))
+    return memo[key]
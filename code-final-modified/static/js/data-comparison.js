@@ -472,10 +472,28 @@ async function exportQueryComparison() {
     }
 }
 
+// Close a dual-login connection on the server (sendBeacon survives page unload)
+function closeDualSession(sessionId) {
+    if (!sessionId) return;
+    const payload = new Blob([JSON.stringify({ session_id: sessionId })], { type: 'application/json' });
+    navigator.sendBeacon('/api/dual-logout', payload);
+}
+
+// Don't leave database sessions open when the tab is closed; a page kept in the
+// back/forward cache (event.persisted) can be restored with its sessions, so keep them
+// (the server's idle reaper closes them if the page never comes back)
+window.addEventListener('pagehide', (event) => {
+    if (event.persisted) return;
+    closeDualSession(sourceSessionId);
+    closeDualSession(targetSessionId);
+});
+
 // Reset all fields and connections
 function resetAllFields() {
     if (confirm('Are you sure you want to reset all fields and disconnect from databases?')) {
-        // Reset connection state
+        // Release server-side connections, then reset connection state
+        closeDualSession(sourceSessionId);
+        closeDualSession(targetSessionId);
         sourceConnected = false;
         targetConnected = false;
         sourceSessionId = null;
@@ -0,0 +1,161 @@
+"""
+Canonical Row Hashing Test
+Checks column classification, the rendering agreed per column pair and the SQL generated for each dialect
+
+Run with: python -m unittest test_canonical_hash (or pytest)
+"""
+
+import unittest
+
+from canonical_hash import NULL_HASH, canonical_expression, canonical_hash, column_type, fold_hashes, pair_spec
+from reconcile import ReconcileSide, reconcile_tables
+
+ORACLE_NUMBER = {'data_type': 'NUMBER', 'data_precision': None, 'data_scale': None}
+SNOWFLAKE_NUMBER = {'data_type': 'NUMBER', 'data_precision': 38, 'data_scale': 0}
+
+
+class ColumnTypeTest(unittest.TestCase):
+
+    def test_numbers(self):
+        self.assertEqual(column_type('oracle', ORACLE_NUMBER)['scale'], None)
+        self.assertEqual(column_type('oracle', {'data_type': 'NUMBER', 'data_scale': 2})['scale'], 2)
+        self.assertEqual(column_type('snowflake', SNOWFLAKE_NUMBER)['scale'], 0)
+        self.assertEqual(column_type('databricks', {'data_type': 'decimal(10,2)'})['scale'], 2)
+        self.assertEqual(column_type('databricks', {'data_type': 'bigint'})['kind'], 'number')
+        self.assertEqual(column_type('oracle', {'data_type': 'BINARY_DOUBLE'})['kind'], 'float')
+        self.assertFalse(column_type('oracle', ORACLE_NUMBER)['national'])
+
+    def test_dates_and_timestamps(self):
+        oracle_date = column_type('oracle', {'data_type': 'DATE'})
+        self.assertEqual((oracle_date['kind'], oracle_date['fraction']), ('timestamp', 0))
+        self.assertEqual(column_type('snowflake', {'data_type': 'DATE'})['kind'], 'date')
+        zoned = column_type('oracle', {'data_type': 'TIMESTAMP(3) WITH TIME ZONE', 'data_scale': 3})
+        self.assertEqual((zoned['fraction'], zoned['utc']), (3, True))
+        self.assertEqual(column_type('snowflake', {'data_type': 'TIMESTAMP_NTZ(9)'})['fraction'], 9)
+        self.assertTrue(column_type('databricks', {'data_type': 'timestamp'})['utc'])
+
+    def test_strings_and_others(self):
+        self.assertTrue(column_type('oracle', {'data_type': 'NVARCHAR2'})['national'])
+        self.assertEqual(column_type('oracle', {'data_type': 'CLOB'})['kind'], 'lob')
+        self.assertEqual(column_type('databricks', {'data_type': 'string'})['kind'], 'string')
+        self.assertEqual(column_type('oracle', {'data_type': 'XMLTYPE'})['kind'], 'unsupported')
+
+
+class PairSpecTest(unittest.TestCase):
+
+    def test_unbounded_number_rounds_to_the_other_scale(self):
+        spec = pair_spec(column_type('oracle', ORACLE_NUMBER), column_type('snowflake', SNOWFLAKE_NUMBER))
+        self.assertEqual(spec['source']['round_scale'], 0)
+        self.assertIsNone(spec['target']['round_scale'])
+
+    def test_float_pairs_round_to_float_scale(self):
+        spec = pair_spec(column_type('oracle', {'data_type': 'BINARY_DOUBLE'}), column_type('snowflake', SNOWFLAKE_NUMBER))
+        self.assertEqual(spec['source']['kind'], 'float')
+        self.assertEqual(spec['target']['kind'], 'float')
+        self.assertEqual(spec['source']['round_scale'], spec['target']['round_scale'])
+
+    def test_oracle_date_against_timestamp_compares_seconds(self):
+        spec = pair_spec(column_type('oracle', {'data_type': 'DATE'}),
+                         column_type('snowflake', {'data_type': 'TIMESTAMP_NTZ(9)'}))
+        for side in ('source', 'target'):
+            self.assertEqual((spec[side]['fraction'], spec[side]['date_only']), (0, False))
+
+    def test_day_only_date_against_timestamp_compares_days(self):
+        spec = pair_spec(column_type('snowflake', {'data_type': 'DATE'}),
+                         column_type('oracle', {'data_type': 'TIMESTAMP(6)', 'data_scale': 6}))
+        self.assertTrue(spec['source']['date_only'] and spec['target']['date_only'])
+
+    def test_lob_against_string_compares_a_prefix(self):
+        spec = pair_spec(column_type('oracle', {'data_type': 'CLOB'}), column_type('snowflake', {'data_type': 'VARCHAR'}))
+        self.assertEqual(spec['source']['prefix'], spec['target']['prefix'])
+        self.assertIsNotNone(spec['source']['prefix'])
+
+
+class CanonicalExpressionTest(unittest.TestCase):
+
+    def expressions(self, source_column, target_column, source_db='oracle', target_db='snowflake', trim=True):
+        spec = pair_spec(column_type(source_db, source_column), column_type(target_db, target_column), trim)
+        return (canonical_expression(source_db, 'C', spec['source']),
+                canonical_expression(target_db, 'C', spec['target']))
+
+    def test_number_scale(self):
+        oracle, snowflake = self.expressions(ORACLE_NUMBER, SNOWFLAKE_NUMBER)
+        self.assertIn("CAST(ROUND(C, 0) AS NUMBER(38, 0))", oracle)
+        self.assertIn("'TM9'", oracle)
+        self.assertIn("NLS_NUMERIC_CHARACTERS", oracle)
+        self.assertEqual(snowflake, "IFF(CONTAINS(TO_VARCHAR(C), '.'), RTRIM(RTRIM(TO_VARCHAR(C), '0'), '.'), TO_VARCHAR(C))")
+        databricks, _ = self.expressions({'data_type': 'decimal(10,2)'}, ORACLE_NUMBER, 'databricks', 'oracle')
+        self.assertIn("TRIM(TRAILING '0' FROM CAST(C AS STRING))", databricks)
+
+    def test_timestamp_precision_and_utc(self):
+        oracle, databricks = self.expressions({'data_type': 'TIMESTAMP(3) WITH TIME ZONE', 'data_scale': 3},
+                                              {'data_type': 'timestamp'}, 'oracle', 'databricks')
+        self.assertEqual(oracle, "TO_CHAR(SYS_EXTRACT_UTC(C), 'YYYY-MM-DD HH24:MI:SS.FF3')")
+        self.assertEqual(databricks, "date_format(to_utc_timestamp(C, current_timezone()), 'yyyy-MM-dd HH:mm:ss.SSS')")
+        oracle, snowflake = self.expressions({'data_type': 'DATE'}, {'data_type': 'TIMESTAMP_TZ(9)'})
+        self.assertEqual(oracle, "TO_CHAR(C, 'YYYY-MM-DD HH24:MI:SS')")
+        self.assertEqual(snowflake, "TO_CHAR(CONVERT_TIMEZONE('UTC', C), 'YYYY-MM-DD HH24:MI:SS')")
+
+    def test_string_trimming(self):
+        oracle, snowflake = self.expressions({'data_type': 'VARCHAR2'}, {'data_type': 'VARCHAR'})
+        self.assertEqual((oracle, snowflake), ("RTRIM(C)", "NULLIF(RTRIM(C), '')"))
+        oracle, snowflake = self.expressions({'data_type': 'VARCHAR2'}, {'data_type': 'VARCHAR'}, trim=False)
+        self.assertEqual((oracle, snowflake), ("C", "NULLIF(C, '')"))
+        national, _ = self.expressions({'data_type': 'NVARCHAR2'}, {'data_type': 'VARCHAR'})
+        self.assertEqual(national, "RTRIM(TO_CHAR(C))")
+
+    def test_unsupported_type(self):
+        with self.assertRaises(ValueError):
+            self.expressions({'data_type': 'XMLTYPE'}, {'data_type': 'VARIANT'})
+
+    def test_null_hash_and_fold(self):
+        for db_type in ('oracle', 'snowflake', 'databricks'):
+            self.assertTrue(canonical_hash(db_type, 'X').startswith(f"CASE WHEN X IS NULL THEN {NULL_HASH} ELSE "))
+        self.assertIn("STANDARD_HASH(X, 'MD5')", canonical_hash('oracle', 'X'))
+        self.assertIn("conv(substr(md5(X), 1, 8), 16, 10)", canonical_hash('databricks', 'X'))
+        self.assertEqual(fold_hashes(['A', 'B']), "MOD(A * 1 + B * 31, 4294967296)")
+        with self.assertRaises(ValueError):
+            canonical_hash('mysql', 'X')
+
+
+class RecordingCursor:
+    """Cursor returning no rows, recording the statements it runs"""
+
+    def __init__(self, columns):
+        self.description = [(name, None, None, None, None, None, None) for name in columns]
+        self.arraysize = 1
+        self.statements = []
+
+    def execute(self, sql, *params):
+        self.statements.append(sql)
+
+    def fetchall(self):
+        return []
+
+    def fetchmany(self, size):
+        return []
+
+
+class CanonicalReconcileTest(unittest.TestCase):
+
+    def test_different_database_types_hash_canonically(self):
+        source = ReconcileSide(RecordingCursor(['ID', 'AMOUNT']), 'oracle', 'APP.T', 'source',
+                               structure=[dict(ORACLE_NUMBER, column_name='ID'), dict(ORACLE_NUMBER, column_name='AMOUNT')])
+        target = ReconcileSide(RecordingCursor(['ID', 'AMOUNT']), 'snowflake', 'DB.APP.T', 'target',
+                               structure=[dict(SNOWFLAKE_NUMBER, column_name='ID'),
+                                          {'column_name': 'AMOUNT', 'data_type': 'NUMBER', 'data_scale': 2}])
+        result = reconcile_tables(source, target, 'ID')
+        self.assertEqual(result['summary']['hashing'], 'canonical')
+        self.assertIn("STANDARD_HASH(", source.cursor.statements[-1])
+        self.assertIn("ROUND(AMOUNT, 2)", source.cursor.statements[-1])
+        self.assertIn("MD5(", target.cursor.statements[-1])
+
+    def test_canonical_hashing_needs_the_structure(self):
+        source = ReconcileSide(RecordingCursor(['ID']), 'oracle', 'T', 'source')
+        target = ReconcileSide(RecordingCursor(['ID']), 'snowflake', 'T', 'target')
+        with self.assertRaises(ValueError):
+            reconcile_tables(source, target, 'ID')
+
+
+if __name__ == '__main__':
+    unittest.main()
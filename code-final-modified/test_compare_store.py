@@ -0,0 +1,112 @@
+"""
+Compare Store Test
+Checks structural table fingerprints, and the fingerprints and snapshots stored in a temporary SQLite database
+
+Run with: python -m unittest test_compare_store (or pytest)
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+
+from compare_store import FingerprintStore, SnapshotStore, snapshot_copy, table_fingerprint
+
+CATEGORIES = ('structure', 'indexes', 'primary_key', 'foreign_keys')
+
+
+def metadata(columns=(('ID', 'NUMBER'),), primary_key='ID'):
+    return {
+        'structure': [{'column_name': name, 'data_type': data_type, 'data_length': 22,
+                       'data_precision': None, 'nullable': 'Y', 'default_value': None} for name, data_type in columns],
+        'indexes': [{'index_name': 'T_PK', 'index_type': 'NORMAL'}],
+        'primary_key': {'constraint_name': 'T_PK', 'columns': primary_key} if primary_key else {},
+        'foreign_keys': []
+    }
+
+
+class TableFingerprintTest(unittest.TestCase):
+
+    def test_order_and_ignored_attributes_do_not_matter(self):
+        first = metadata([('ID', 'NUMBER'), ('NAME', 'VARCHAR2')])
+        second = metadata([('NAME', 'VARCHAR2'), ('ID', 'NUMBER')])
+        second['structure'][0]['default_value'] = "'x'"
+        second['primary_key']['columns'] = ' ID '
+        self.assertEqual(table_fingerprint(first, CATEGORIES), table_fingerprint(second, CATEGORIES))
+
+    def test_compared_differences_change_the_fingerprint(self):
+        base = table_fingerprint(metadata(), CATEGORIES)
+        self.assertNotEqual(base, table_fingerprint(metadata([('ID', 'VARCHAR2')]), CATEGORIES))
+        self.assertNotEqual(base, table_fingerprint(metadata(primary_key=None), CATEGORIES))
+        self.assertEqual(table_fingerprint(metadata(primary_key=None), ['structure']),
+                         table_fingerprint(metadata(), ['structure']))
+
+    def test_missing_category_has_no_fingerprint(self):
+        partial = metadata()
+        del partial['indexes']
+        self.assertIsNone(table_fingerprint(partial, CATEGORIES))
+        self.assertIsNotNone(table_fingerprint(partial, ['structure']))
+
+
+class FingerprintStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.store = FingerprintStore(os.path.join(self.directory, 'compare.db'))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_fingerprints_are_valid_for_their_version(self):
+        self.store.put_many('env|APP', {'T': ('v1', 'abc'), 'U': ('v1', 'def')}, CATEGORIES)
+        found = self.store.get_many('env|APP', {'T': 'v1', 'U': 'v2', 'V': 'v1'}, CATEGORIES)
+        self.assertEqual(found, {'T': 'abc'})
+        self.assertEqual(self.store.stats(), {'hits': 1, 'misses': 2})
+
+    def test_scope_and_categories_are_part_of_the_key(self):
+        self.store.put_many('env|APP', {'T': ('v1', 'abc')}, CATEGORIES)
+        self.assertEqual(self.store.get_many('other|APP', {'T': 'v1'}, CATEGORIES), {})
+        self.assertEqual(self.store.get_many('env|APP', {'T': 'v1'}, ['structure']), {})
+        self.assertEqual(self.store.get_many('env|APP', {'T': 'v1'}, list(reversed(CATEGORIES))), {'T': 'abc'})
+
+
+class SnapshotStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.store = SnapshotStore(os.path.join(self.directory, 'compare.db'))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_no_baseline_until_committed(self):
+        self.store.put_many('env|APP|%', {'T': metadata()}, CATEGORIES)
+        self.assertIsNone(self.store.baseline('env|APP|%', CATEGORIES))
+        self.store.commit('env|APP|%', CATEGORIES, '2026-01-01T10:00:00', {'T'})
+        self.assertEqual(self.store.baseline('env|APP|%', CATEGORIES), '2026-01-01T10:00:00')
+        self.assertIsNone(self.store.baseline('env|APP|%', ['structure']))
+
+    def test_snapshots_read_back_as_stored(self):
+        self.store.put_many('env|APP|%', {'T': metadata(), 'U': metadata(primary_key=None)}, CATEGORIES)
+        found = self.store.get_many('env|APP|%', ['T', 'U', 'V'], CATEGORIES)
+        self.assertEqual(found, {'T': metadata(), 'U': metadata(primary_key=None)})
+
+    def test_commit_drops_stale_snapshots(self):
+        tables = {name: metadata() for name in ('T', 'U', 'V')}
+        self.store.put_many('env|APP|%', tables, CATEGORIES)
+        self.store.put_many('env|OTHER|%', tables, CATEGORIES)
+        self.store.commit('env|APP|%', CATEGORIES, '2026-01-01T10:00:00', ['T', 'V'])
+        self.assertEqual(set(self.store.get_many('env|APP|%', tables, CATEGORIES)), {'T', 'V'})
+        # Other scopes keep their snapshots
+        self.assertEqual(set(self.store.get_many('env|OTHER|%', tables, CATEGORIES)), {'T', 'U', 'V'})
+
+    def test_snapshot_copy_matches_what_reads_back(self):
+        loaded = dict(metadata(), created=datetime(2026, 1, 1))
+        self.store.put_many('env|APP|%', {'T': loaded}, CATEGORIES)
+        self.assertEqual(self.store.get_many('env|APP|%', ['T'], CATEGORIES)['T'], snapshot_copy(loaded))
+        self.assertEqual(snapshot_copy(loaded)['created'], '2026-01-01 00:00:00')
+
+
+if __name__ == '__main__':
+    unittest.main()
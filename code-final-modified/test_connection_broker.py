@@ -0,0 +1,130 @@
+"""
+Connection Broker Test
+Starts the broker on a temporary socket with the fake drivers and round-trips queries through the worker-side proxies
+
+Run with: python -m unittest test_connection_broker (or pytest)
+"""
+
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+
+from connection_broker import BrokerClient, BrokerError, BrokerRegistry, BrokerAsyncConnector, ConnectionBroker, load_connector
+from dual_connections import ConnectionExpiredError
+
+AUTHKEY = b'test-broker-key'
+
+
+class ConnectionBrokerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.address = os.path.join(self.directory.name, 'broker.sock')
+        self.broker = ConnectionBroker(self.address, AUTHKEY, connector=load_connector('fake_drivers:connect'))
+        self.thread = threading.Thread(target=self.broker.serve_forever, daemon=True)
+        self.thread.start()
+        # serve_forever creates the socket file once it listens
+        for _ in range(200):
+            if os.path.exists(self.address):
+                break
+            threading.Event().wait(0.01)
+        self.registry = BrokerRegistry(self.address, AUTHKEY)
+
+    def tearDown(self):
+        # Closing the listener does not wake a blocked accept(); the daemon thread is left behind
+        self.broker.close()
+        self.directory.cleanup()
+
+    def test_query_round_trip(self):
+        self.registry.open('source', 'oracle', {}, {'db_type': 'oracle', 'username': 'scott'})
+        self.assertIn('source', self.registry)
+
+        with self.registry.lease('source') as entry:
+            self.assertEqual(entry['db_type'], 'oracle')
+            cursor = entry['connection'].cursor()
+            cursor.execute("CREATE TABLE t (id INTEGER, name TEXT)")
+            cursor.execute("INSERT INTO t VALUES (1, 'a'), (2, 'b'), (3, NULL)")
+            cursor.execute("SELECT id, name FROM t ORDER BY id")
+            self.assertEqual([col[0] for col in cursor.description], ['id', 'name'])
+            self.assertEqual(cursor.fetchone(), (1, 'a'))
+            self.assertEqual(cursor.fetchall(), [(2, 'b'), (3, None)])
+
+        # The connection stays in the broker between requests
+        with self.registry.lease('source') as entry:
+            cursor = entry['connection'].cursor()
+            self.assertEqual(cursor.execute("SELECT COUNT(*) FROM t").fetchall(), [(3,)])
+
+        self.assertTrue(self.registry.remove('source'))
+        with self.assertRaises(ConnectionExpiredError):
+            self.registry['source']
+
+    def test_async_login(self):
+        logins = BrokerAsyncConnector(self.registry)
+        logins.submit('target', 'snowflake', {}, {'db_type': 'snowflake', 'username': 'scott'})
+        for _ in range(200):
+            status = logins.status('target')
+            if status and status['status'] != 'pending':
+                break
+            threading.Event().wait(0.01)
+
+        with self.registry.lease('target') as entry:
+            cursor = entry['connection'].cursor()
+            self.assertEqual(cursor.execute("SELECT 1 + 1").fetchall(), [(2,)])
+
+    def test_driver_errors_keep_their_type(self):
+        self.registry.open('source', 'oracle', {}, {'db_type': 'oracle', 'username': 'scott'})
+        with self.registry.lease('source') as entry:
+            cursor = entry['connection'].cursor()
+            with self.assertRaises(sqlite3.OperationalError) as raised:
+                cursor.execute("SELECT * FROM missing_table")
+            self.assertIsInstance(raised.exception, BrokerError)
+            self.assertIn('missing_table', str(raised.exception))
+
+
+class BrokerClientRetryTest(unittest.TestCase):
+
+    class Channel:
+        def __init__(self, fail_send=False):
+            self.fail_send = fail_send
+            self.sent = []
+
+        def send(self, message):
+            if self.fail_send:
+                raise BrokenPipeError('stale socket')
+            self.sent.append(message)
+
+        def recv(self):
+            raise EOFError()
+
+    def client(self, *channels):
+        client = BrokerClient('/nonexistent.sock', AUTHKEY)
+        queue = list(channels)
+
+        def channel():
+            # Like BrokerClient._channel, with the next fake channel instead of a socket
+            if getattr(client._local, 'channel', None) is None:
+                client._local.channel = queue.pop(0)
+            return client._local.channel
+        client._channel = channel
+        return client
+
+    def test_request_on_the_wire_is_not_resent(self):
+        channel = self.Channel()
+        spare = self.Channel()
+        with self.assertRaises(EOFError):
+            self.client(channel, spare).call('execute', 'c1', 'DELETE FROM t', None)
+        self.assertEqual(len(channel.sent), 1)
+        self.assertEqual(spare.sent, [])
+
+    def test_unsent_request_is_retried_on_a_new_socket(self):
+        stale = self.Channel(fail_send=True)
+        fresh = self.Channel()
+        with self.assertRaises(EOFError):
+            self.client(stale, fresh).call('status')
+        self.assertEqual(len(fresh.sent), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,170 @@
+"""
+Connection Pool Test
+Checks out, returns and reaps fake connections through ConnectionPool and PoolManager
+
+Run with: python -m unittest test_connection_pool (or pytest)
+"""
+
+import unittest
+
+from connection_pool import ConnectionPool, PoolManager, PoolTimeoutError, check_connection_alive
+
+
+class FakeConnection:
+    """Connection recording whether it was closed; ping() fails once dead"""
+
+    def __init__(self, number):
+        self.number = number
+        self.closed = False
+        self.dead = False
+
+    def ping(self):
+        if self.dead:
+            raise OSError('connection reset')
+
+    def close(self):
+        self.closed = True
+
+
+class FakeConnector:
+    """Zero-argument connect callable handing out numbered FakeConnections"""
+
+    def __init__(self):
+        self.opened = []
+
+    def __call__(self):
+        connection = FakeConnection(len(self.opened) + 1)
+        self.opened.append(connection)
+        return connection
+
+
+def make_pool(**options):
+    connect = FakeConnector()
+    options.setdefault('checkout_timeout', 0.05)
+    return ConnectionPool(connect, name='test', db_type='snowflake', **options), connect
+
+
+class ConnectionPoolTest(unittest.TestCase):
+
+    def test_released_connection_is_reused(self):
+        pool, connect = make_pool(max_size=2)
+        first = pool.acquire()
+        pool.release(first)
+        self.assertIs(pool.acquire(), first)
+        self.assertEqual(len(connect.opened), 1)
+
+    def test_exhausted_pool_times_out(self):
+        pool, connect = make_pool(max_size=2)
+        pool.acquire()
+        pool.acquire()
+        with self.assertRaises(PoolTimeoutError):
+            pool.acquire()
+        self.assertEqual(pool.status()['in_use'], 2)
+
+    def test_discarded_connection_frees_its_slot(self):
+        pool, connect = make_pool(max_size=1)
+        first = pool.acquire()
+        pool.release(first, discard=True)
+        self.assertTrue(first.closed)
+        self.assertIsNot(pool.acquire(), first)
+        self.assertEqual(pool.status()['size'], 1)
+
+    def test_dead_idle_connection_is_replaced(self):
+        pool, connect = make_pool(max_size=1, liveness_window=0)
+        first = pool.acquire()
+        pool.release(first)
+        first.dead = True
+        second = pool.acquire()
+        self.assertIsNot(second, first)
+        self.assertTrue(first.closed)
+
+    def test_reap_closes_idle_and_expired_connections(self):
+        pool, connect = make_pool(max_size=3, min_size=1, idle_timeout=60)
+        connections = [pool.acquire() for _ in range(3)]
+        for connection in connections:
+            pool.release(connection)
+        for entry in pool._idle:
+            entry.last_used -= 120
+        self.assertEqual(pool.reap(), 2)
+        self.assertEqual(pool.status()['size'], 1)
+
+        pool.max_lifetime = 1
+        pool._idle[0].created_at -= 10
+        self.assertEqual(pool.reap(), 1)
+        self.assertTrue(pool.is_unused())
+        self.assertTrue(all(connection.closed for connection in connections))
+
+    def test_adopt_respects_max_size(self):
+        pool, connect = make_pool(max_size=1)
+        adopted, extra = FakeConnection('a'), FakeConnection('b')
+        self.assertTrue(pool.adopt(adopted))
+        self.assertFalse(pool.adopt(extra))
+        self.assertTrue(extra.closed)
+        self.assertIs(pool.acquire(), adopted)
+
+    def test_closed_pool_closes_returned_connections(self):
+        pool, connect = make_pool()
+        connection = pool.acquire()
+        pool.close()
+        pool.release(connection)
+        self.assertTrue(connection.closed)
+        with self.assertRaises(RuntimeError):
+            pool.acquire()
+
+
+class PoolManagerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.manager = PoolManager(pool_idle_timeout=60)
+        # Keep the background reaper out of the tests
+        self.manager._reaper = object()
+        self.connect = FakeConnector()
+
+    def factory(self):
+        return ConnectionPool(self.connect, max_size=2, checkout_timeout=0.05, name='test')
+
+    def test_connections_return_to_their_pool(self):
+        connection = self.manager.acquire('key', self.factory)
+        self.assertTrue(self.manager.has_pool('key'))
+        self.manager.release(connection)
+        self.assertFalse(connection.closed)
+        self.assertIs(self.manager.acquire('key', self.factory), connection)
+        self.assertEqual(self.manager.status()['pool_count'], 1)
+
+    def test_unpooled_connection_is_closed(self):
+        stray = FakeConnection('stray')
+        self.manager.release(stray)
+        self.assertTrue(stray.closed)
+
+    def test_reap_drops_unused_pools(self):
+        connection = self.manager.acquire('key', self.factory)
+        pool = self.manager.get_pool('key', self.factory)
+        pool.last_activity -= 120
+        self.manager.reap()
+        # A pool with a checked-out connection is kept
+        self.assertTrue(self.manager.has_pool('key'))
+
+        self.manager.release(connection, discard=True)
+        pool.last_activity -= 120
+        self.manager.reap()
+        self.assertFalse(self.manager.has_pool('key'))
+
+    def test_close_pool(self):
+        connection = self.manager.acquire('key', self.factory)
+        self.manager.release(connection)
+        self.manager.close_pool('key')
+        self.assertTrue(connection.closed)
+        self.assertFalse(self.manager.has_pool('key'))
+
+
+class LivenessTest(unittest.TestCase):
+
+    def test_probe_uses_ping(self):
+        connection = FakeConnection(1)
+        self.assertTrue(check_connection_alive(connection, 'oracle'))
+        connection.dead = True
+        self.assertFalse(check_connection_alive(connection, 'oracle'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+"""
+Dual Connection Registry Test
+Registers fake dual-login connections and checks LRU eviction, the per-user cap and idle reaping
+
+Run with: python -m unittest test_dual_connections (or pytest)
+"""
+
+import unittest
+
+from dual_connections import ConnectionExpiredError, DualConnectionRegistry, RegistryFullError
+
+
+class FakeConnection:
+    """Connection recording whether it was closed"""
+
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def entry(username='alice', db_type='oracle', **fields):
+    return dict({'connection': FakeConnection(), 'db_type': db_type, 'username': username}, **fields)
+
+
+class DualConnectionRegistryTest(unittest.TestCase):
+
+    def registry(self, **options):
+        registry = DualConnectionRegistry(**options)
+        # Keep the background reaper out of the tests
+        registry._reaper = object()
+        return registry
+
+    def test_least_recently_used_is_evicted(self):
+        registry = self.registry(max_connections=2, max_per_user=5)
+        first, second = entry('alice'), entry('bob')
+        registry.register('a', first)
+        registry.register('b', second)
+        registry['a']  # 'b' is now the least recently used
+        registry.register('c', entry('carol'))
+        self.assertEqual((('a' in registry), ('b' in registry), ('c' in registry)), (True, False, True))
+        self.assertTrue(second['connection'].closed)
+        self.assertEqual(registry.status()['evicted_total'], 1)
+
+    def test_per_user_cap_evicts_that_users_connection(self):
+        registry = self.registry(max_connections=10, max_per_user=2)
+        registry.register('a1', entry('alice'))
+        registry.register('b1', entry('bob'))
+        registry.register('a2', entry('alice'))
+        registry.register('a3', entry('alice'))
+        self.assertNotIn('a1', registry)
+        self.assertIn('b1', registry)
+        self.assertEqual(registry.status()['by_user'], {'oracle:alice': 2, 'oracle:bob': 1})
+
+    def test_owner_keys_the_per_user_cap(self):
+        registry = self.registry(max_per_user=1)
+        registry.register('t1', entry(None, 'databricks', owner='token:abc'))
+        registry.register('t2', entry(None, 'databricks', owner='token:def'))
+        self.assertEqual(len(registry.status()['by_user']), 2)
+        self.assertEqual(DualConnectionRegistry.owner_of(entry('alice', 'snowflake')), 'snowflake:alice')
+
+    def test_leased_connections_are_not_evicted(self):
+        registry = self.registry(max_per_user=1)
+        registry.register('a1', entry('alice'))
+        refused = entry('alice')
+        with registry.lease('a1'):
+            with self.assertRaises(RegistryFullError):
+                registry.register('a2', refused)
+        self.assertTrue(refused['connection'].closed)
+        self.assertIn('a1', registry)
+        registry.register('a2', entry('alice'))
+        self.assertNotIn('a1', registry)
+
+    def test_reap_skips_leased_connections(self):
+        registry = self.registry(idle_ttl=60)
+        idle, leased = entry('alice'), entry('bob')
+        registry.register('idle', idle)
+        registry.register('leased', leased)
+        with registry.lease('leased'):
+            for item in (idle, leased):
+                item['last_used'] -= 120
+            self.assertEqual(registry.reap(), 1)
+        self.assertTrue(idle['connection'].closed)
+        self.assertFalse(leased['connection'].closed)
+        self.assertIn('leased', registry)
+        self.assertEqual(registry.reap(), 0)
+
+    def test_expired_and_removed_sessions(self):
+        registry = self.registry()
+        registry.register('a', entry())
+        self.assertTrue(registry.remove('a'))
+        self.assertFalse(registry.remove('a'))
+        with self.assertRaises(ConnectionExpiredError):
+            registry['a']
+        self.assertIsNone(registry.get('a'))
+
+    def test_open_uses_the_connector(self):
+        connections = []
+
+        def connector(db_type, connect_kwargs):
+            connections.append((db_type, connect_kwargs))
+            return FakeConnection()
+
+        registry = self.registry(connector=connector)
+        opened = registry.open('s', 'snowflake', {'user': 'alice'}, {'db_type': 'snowflake', 'username': 'alice'})
+        self.assertEqual(connections, [('snowflake', {'user': 'alice'})])
+        self.assertIn('connect_ms', opened)
+        self.assertIs(registry['s'], opened)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+"""
+Background Jobs Test
+Runs jobs through a JobManager backed by a temporary SQLite file and checks results, ownership, the queue cap and restart recovery
+
+Run with: python -m unittest test_jobs (or pytest)
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from jobs import FAILED, INTERRUPTED, QUEUED, RUNNING, SUCCEEDED, JobManager, JobQueueFullError
+
+
+class JobManagerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.directory, 'jobs.db')
+        self.managers = []
+
+    def tearDown(self):
+        for manager in self.managers:
+            manager._executor.shutdown(wait=True)
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def manager(self, **options):
+        manager = JobManager(self.db_path, **options)
+        self.managers.append(manager)
+        return manager
+
+    def wait(self, manager, job_id, owner=None):
+        deadline = time.time() + 5
+        while time.time() < deadline:
+            job = manager.get(job_id, owner=owner)
+            if job['status'] not in (QUEUED, RUNNING):
+                return job
+            time.sleep(0.01)
+        self.fail(f"Job {job_id} did not finish")
+
+    def test_result_and_progress(self):
+        manager = self.manager(progress_interval=0)
+
+        def run(report):
+            report(1, 2, 'half')
+            report(2, 2, 'done')
+            return {'tables': 2}, 200
+
+        job = self.wait(manager, manager.submit('analyze', run, owner='alice'), owner='alice')
+        self.assertEqual((job['status'], job['http_status'], job['result']), (SUCCEEDED, 200, {'tables': 2}))
+        self.assertEqual(job['progress'], {'done': 2, 'total': 2, 'percent': 100.0, 'message': 'done'})
+        self.assertNotIn('result', manager.get(job['id'], include_result=False, owner='alice'))
+
+    def test_failures_are_recorded(self):
+        manager = self.manager()
+
+        def crash(report):
+            raise RuntimeError('boom')
+
+        job = self.wait(manager, manager.submit('analyze', lambda report: ({'error': 'bad table'}, 400)))
+        self.assertEqual((job['status'], job['error']), (FAILED, 'bad table'))
+        job = self.wait(manager, manager.submit('analyze', crash))
+        self.assertEqual((job['status'], job['http_status'], job['error']), (FAILED, 500, 'boom'))
+
+    def test_jobs_are_returned_to_their_owner_only(self):
+        manager = self.manager()
+        job_id = manager.submit('compare', lambda report: ({}, 200), owner='alice')
+        self.wait(manager, job_id, owner='alice')
+        self.assertIsNone(manager.get(job_id, owner='bob'))
+        self.assertIsNone(manager.get(job_id))
+        self.assertIsNone(manager.get('unknown', owner='alice'))
+
+    def test_queue_full(self):
+        manager = self.manager(max_workers=1, max_queued=1)
+        release = threading.Event()
+        job_id = manager.submit('analyze', lambda report: (release.wait(5), 200))
+        with self.assertRaises(JobQueueFullError):
+            manager.submit('analyze', lambda report: ({}, 200))
+        release.set()
+        self.wait(manager, job_id)
+        # The finished job frees its slot
+        self.wait(manager, manager.submit('analyze', lambda report: ({}, 200)))
+
+    def test_recovery_marks_jobs_of_dead_workers_interrupted(self):
+        manager = self.manager()
+        now = time.time()
+        rows = [
+            ('same-pid', QUEUED, os.getpid(), None, None),  # a new manager in this process never inherits jobs
+            ('reused-pid', RUNNING, 1, 'another-boot:1', None),  # pid alive, but not the process that ran it
+            ('alive', RUNNING, 1, None, None),
+            ('expired', SUCCEEDED, 1, None, now - 48 * 3600)
+        ]
+        with manager._connect() as db:
+            db.executemany(
+                "INSERT INTO jobs (id, type, status, pid, boot_id, created_at, finished_at) VALUES (?, 'analyze', ?, ?, ?, ?, ?)",
+                [(job_id, status, pid, boot_id, now, finished_at) for job_id, status, pid, boot_id, finished_at in rows]
+            )
+
+        restarted = self.manager()
+        status = {job_id: (restarted.get(job_id) or {}).get('status') for job_id, *_ in rows}
+        self.assertEqual(status, {'same-pid': INTERRUPTED, 'reused-pid': INTERRUPTED, 'alive': RUNNING, 'expired': None})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+"""
+Query Diff Test
+Sort-merges fake key-ordered cursors and checks the row classification of merge_diff
+
+Run with: python -m unittest test_query_diff (or pytest)
+"""
+
+import unittest
+from datetime import date, datetime
+from decimal import Decimal
+
+from query_diff import merge_diff, ordered_query, parse_key_columns
+
+
+class FakeCursor:
+    """Executed cursor returning rows in the given order"""
+
+    def __init__(self, columns, rows):
+        self.description = [(name, None, None, None, None, None, None) for name in columns]
+        self._rows = list(rows)
+
+    def fetchmany(self, size):
+        rows, self._rows = self._rows[:size], self._rows[size:]
+        return rows
+
+
+def merge(source_rows, target_rows, columns=('ID', 'NAME'), target_columns=None, key=('ID',), **options):
+    source = FakeCursor(columns, source_rows)
+    target = FakeCursor(target_columns or columns, target_rows)
+    return merge_diff(source, target, list(key), batch_size=options.pop('batch_size', 2), **options)
+
+
+class MergeDiffTest(unittest.TestCase):
+
+    def test_row_classification(self):
+        result = merge(
+            [(1, 'a'), (2, 'b'), (3, 'c'), (5, 'e')],
+            [(1, 'a'), (2, 'B'), (4, 'd'), (5, 'e')]
+        )
+        summary = result['summary']
+        self.assertEqual((summary['matching_rows'], summary['changed_rows']), (2, 1))
+        self.assertEqual((summary['rows_only_in_source'], summary['rows_only_in_target']), (1, 1))
+        self.assertEqual(summary['value_differences'], 1)
+        self.assertEqual(summary['total_differences'], 3)
+        self.assertEqual(result['differences']['row_differences'], [{
+            'key': {'ID': 2}, 'column_name': 'NAME', 'source_value': 'b', 'target_value': 'B', 'diff_type': 'value_diff'
+        }])
+        self.assertEqual(result['differences']['rows_only_in_source'], [{'ID': 3}])
+        self.assertEqual(result['differences']['rows_only_in_target'], [{'ID': 4}])
+
+    def test_null_keys_sort_last(self):
+        result = merge([(1, 'a'), (None, 'x')], [(1, 'a'), (2, 'b'), (None, 'x')])
+        summary = result['summary']
+        self.assertEqual(summary['matching_rows'], 2)
+        self.assertEqual(summary['rows_only_in_target'], 1)
+
+    def test_duplicate_keys_are_counted(self):
+        result = merge([(1, 'a'), (1, 'a'), (2, 'b')], [(1, 'a'), (2, 'b')])
+        self.assertEqual(result['summary']['source_duplicate_keys'], 1)
+        self.assertEqual(result['summary']['target_duplicate_keys'], 0)
+
+    def test_out_of_order_rows_are_rejected(self):
+        with self.assertRaises(ValueError):
+            merge([(2, 'b'), (1, 'a')], [(1, 'a'), (2, 'b')])
+
+    def test_date_and_datetime_keys_match(self):
+        result = merge(
+            [(datetime(2024, 1, 1), 'a'), (datetime(2024, 1, 2), 'b')],
+            [(date(2024, 1, 1), 'a'), (date(2024, 1, 3), 'c')],
+            columns=('DAY', 'NAME'), key=('DAY',)
+        )
+        summary = result['summary']
+        self.assertEqual(summary['matching_rows'], 1)
+        self.assertEqual((summary['rows_only_in_source'], summary['rows_only_in_target']), (1, 1))
+
+    def test_numeric_keys_of_different_types_match(self):
+        result = merge([(1, Decimal('1.50')), (2, 2.5)], [(Decimal('1'), 1.5), (2.0, Decimal('2.5'))])
+        self.assertEqual(result['summary']['matching_rows'], 2)
+        self.assertEqual(result['summary']['changed_rows'], 0)
+
+    def test_mixed_key_types_are_rejected(self):
+        with self.assertRaises(ValueError):
+            merge([(1, 'a')], [('1', 'a')])
+        with self.assertRaises(ValueError):
+            merge([(1, 'a'), ('x', 'b')], [(1, 'a')])
+
+    def test_columns_match_case_insensitively(self):
+        result = merge([(1, 'a')], [(1, 'b')], target_columns=('id', 'name'))
+        self.assertEqual(result['summary']['changed_rows'], 1)
+        self.assertEqual(result['summary']['key_columns'], ['ID'])
+
+    def test_sample_limit_truncates(self):
+        result = merge([(i, 'a') for i in range(5)], [], sample_limit=2)
+        self.assertEqual(result['summary']['rows_only_in_source'], 5)
+        self.assertEqual(len(result['differences']['rows_only_in_source']), 2)
+        self.assertTrue(result['summary']['truncated'])
+
+    def test_missing_key_column(self):
+        with self.assertRaises(ValueError):
+            merge([(1, 'a')], [(1, 'a')], key=('CODE',))
+
+
+class KeyColumnsTest(unittest.TestCase):
+
+    def test_parse_key_columns(self):
+        self.assertEqual(parse_key_columns(' id, name ,'), ['id', 'name'])
+        with self.assertRaises(ValueError):
+            parse_key_columns('')
+        with self.assertRaises(ValueError):
+            parse_key_columns(['id; DROP TABLE t'])
+
+    def test_ordered_query(self):
+        self.assertEqual(ordered_query('SELECT * FROM t;', ['id', 'name']),
+                         "SELECT * FROM (\nSELECT * FROM t\n) q ORDER BY id NULLS LAST, name NULLS LAST")
+
+
+if __name__ == '__main__':
+    unittest.main()
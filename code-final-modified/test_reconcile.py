@@ -0,0 +1,123 @@
+"""
+Hash Reconciliation Test
+Reconciles SQLite tables standing in for Oracle (ORA_HASH, NVL and MOD registered as functions) and checks bucket splitting and leaf fetches
+
+Run with: python -m unittest test_reconcile (or pytest)
+"""
+
+import sqlite3
+import unittest
+import zlib
+
+from reconcile import ReconcileSide, reconcile_tables
+
+
+def database(rows):
+    db = sqlite3.connect(':memory:')
+    db.create_function('ORA_HASH', 1, lambda value: None if value is None else zlib.crc32(str(value).encode()))
+    db.create_function('NVL', 2, lambda value, default: default if value is None else value)
+    db.create_function('MOD', 2, lambda value, modulus: value % modulus)
+    db.execute("CREATE TABLE t (id INTEGER, name TEXT, amount INTEGER)")
+    db.executemany("INSERT INTO t VALUES (?, ?, ?)", rows)
+    return db
+
+
+class FakeCursor:
+    """DB-API cursor over SQLite that records the statements it runs"""
+
+    def __init__(self, db):
+        self._cursor = db.cursor()
+        self.description = None
+        self.arraysize = 1
+        self.statements = []
+
+    def execute(self, sql, *params):
+        self.statements.append(sql)
+        self._cursor.execute(sql, *params)
+        self.description = self._cursor.description
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def fetchmany(self, size):
+        return self._cursor.fetchmany(size)
+
+
+ROWS = [(i, f'n{i}', i * 3) for i in range(2000)]
+
+
+def sides(source_rows, target_rows):
+    source = ReconcileSide(FakeCursor(database(source_rows)), 'oracle', 't', 'source')
+    target = ReconcileSide(FakeCursor(database(target_rows)), 'oracle', 't', 'target')
+    return source, target
+
+
+class ReconcileTablesTest(unittest.TestCase):
+
+    def test_identical_tables_fetch_nothing(self):
+        source, target = sides(ROWS, ROWS)
+        result = reconcile_tables(source, target, 'ID', buckets=16, leaf_rows=50)
+        summary = result['summary']
+        self.assertEqual(len(result['levels']), 1)
+        self.assertEqual(result['levels'][0]['buckets_differing'], 0)
+        self.assertEqual(summary['buckets_fetched'], 0)
+        self.assertEqual(summary['total_differences'], 0)
+        self.assertEqual(summary['matching_rows'], len(ROWS))
+        self.assertEqual(summary['compared_columns'], ['name', 'amount'])
+        self.assertEqual(summary['hashing'], 'native')
+
+    def test_differences_are_found_by_splitting_buckets(self):
+        target_rows = list(ROWS)
+        target_rows[500] = (500, 'changed', 1500)
+        target_rows[900] = (900, 'n900', None)
+        del target_rows[700]
+        target_rows.append((99999, 'new', 0))
+        source, target = sides(ROWS, target_rows)
+
+        result = reconcile_tables(source, target, 'id', buckets=4, leaf_rows=20)
+        summary = result['summary']
+        self.assertGreater(len(result['levels']), 1)
+        self.assertEqual(result['levels'][1]['buckets'], 16)
+        self.assertEqual((summary['changed_rows'], summary['value_differences']), (2, 2))
+        self.assertEqual((summary['rows_only_in_source'], summary['rows_only_in_target']), (1, 1))
+        self.assertEqual(result['differences']['rows_only_in_source'], [{'ID': 700}])
+        self.assertEqual(result['differences']['rows_only_in_target'], [{'ID': 99999}])
+        # Only the differing buckets' rows are fetched, each at most leaf_rows
+        self.assertLess(summary['fetched_source_rows'], len(ROWS) // 10)
+        self.assertFalse(summary['has_row_count_difference'])
+
+    def test_leaf_fetch_is_key_ordered_and_restricted_to_buckets(self):
+        target_rows = list(ROWS)
+        target_rows[5] = (5, 'changed', 15)
+        source, target = sides(ROWS, target_rows)
+        reconcile_tables(source, target, 'ID', columns='name', buckets=8, leaf_rows=1000)
+        leaf = source.cursor.statements[-1]
+        self.assertIn('MOD(MOD(NVL(ORA_HASH(id), 4294967296) * 1, 4294967296), 8) IN (', leaf)
+        self.assertIn('ORDER BY ID NULLS LAST', leaf)
+        self.assertNotIn('amount', leaf)
+
+    def test_bucket_checksums_restricted_to_parents(self):
+        source, _ = sides(ROWS, ROWS)
+        source.describe()
+        source.resolve(['ID'], ['NAME'])
+        level_one = source.bucket_checksums(4, None, 1)
+        level_two = source.bucket_checksums(16, [1], 4)
+        self.assertEqual(sum(count for count, _ in level_one.values()), len(ROWS))
+        self.assertTrue(all(bucket % 4 == 1 for bucket in level_two))
+        self.assertEqual(sum(count for count, _ in level_two.values()), level_one[1][0])
+
+    def test_validation(self):
+        source, target = sides(ROWS, ROWS)
+        for options in ({'buckets': 1}, {'buckets': 2000}, {'leaf_rows': 0}):
+            with self.assertRaises(ValueError):
+                reconcile_tables(source, target, 'ID', **options)
+        with self.assertRaises(ValueError):
+            reconcile_tables(source, target, 'CODE')
+        with self.assertRaises(ValueError):
+            reconcile_tables(source, target, 'ID', columns=['name || amount'])
+        with self.assertRaises(ValueError):
+            ReconcileSide(None, 'oracle', 't; DROP TABLE t', 'source')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,186 @@
+"""
+Schema Compare Test
+Diffs in-memory table metadata and checks the column, constraint and table differences a schema compare reports
+
+Run with: python -m unittest test_schema_compare (or pytest)
+"""
+
+import unittest
+
+from compare_store import table_fingerprint
+from schema_compare import (
+    SCHEMA_COMPARE_CATEGORIES, compare_schema_catalogs, compare_schema_sides, diff_constraints, diff_structure,
+    diff_tables
+)
+
+
+def column(name, data_type='NUMBER', data_length=22, nullable='Y', data_precision=None):
+    return {'column_name': name, 'data_type': data_type, 'data_length': data_length,
+            'data_precision': data_precision, 'nullable': nullable}
+
+
+def table(columns, primary_key=None, foreign_keys=(), indexes=()):
+    return {
+        'structure': list(columns),
+        'indexes': list(indexes),
+        'primary_key': primary_key or {},
+        'foreign_keys': list(foreign_keys)
+    }
+
+
+PK = {'constraint_name': 'T_PK', 'columns': 'ID'}
+FK = {'constraint_name': 'T_FK', 'columns': 'PARENT_ID', 'referenced_table': 'PARENT'}
+
+
+class DiffStructureTest(unittest.TestCase):
+
+    def test_added_removed_and_modified_columns(self):
+        differences = diff_structure(
+            [column('ID'), column('NAME', 'VARCHAR2', 50), column('OLD')],
+            [column('ID'), column('NAME', 'VARCHAR2', 100), column('NEW', 'DATE', 7)]
+        )
+        by_column = {diff['column_name']: diff for diff in differences}
+        self.assertEqual(set(by_column), {'NAME', 'OLD', 'NEW'})
+        self.assertEqual(by_column['NEW']['type'], 'added')
+        self.assertEqual(by_column['NEW']['target_value'], 'DATE(7)')
+        self.assertEqual(by_column['OLD']['type'], 'removed')
+        self.assertIsNone(by_column['OLD']['target_value'])
+        self.assertEqual(by_column['NAME']['type'], 'modified')
+        self.assertEqual((by_column['NAME']['source_value'], by_column['NAME']['target_value']),
+                         ('VARCHAR2(50) Y', 'VARCHAR2(100) Y'))
+
+    def test_nullability_and_precision_are_compared(self):
+        differences = diff_structure([column('A', nullable='N'), column('B', data_precision=10)],
+                                     [column('A', nullable='Y'), column('B', data_precision=12)])
+        self.assertEqual(sorted(diff['column_name'] for diff in differences), ['A', 'B'])
+
+    def test_identical_columns(self):
+        self.assertEqual(diff_structure([column('ID')], [column('ID')]), [])
+
+
+class DiffConstraintsTest(unittest.TestCase):
+
+    def test_primary_key_missing_on_either_side(self):
+        [missing] = diff_constraints(PK, {}, [], [])
+        self.assertEqual((missing['constraint_type'], missing['status']), ('PRIMARY KEY', 'missing_in_target'))
+        [missing] = diff_constraints(None, PK, [], [])
+        self.assertEqual(missing['status'], 'missing_in_source')
+
+    def test_primary_key_columns_modified(self):
+        [modified] = diff_constraints(PK, {'constraint_name': 'T_PK2', 'columns': 'ID, CODE'}, [], [])
+        self.assertEqual(modified['status'], 'modified')
+        self.assertEqual(modified['constraint_name'], 'T_PK / T_PK2')
+        self.assertEqual((modified['source_value'], modified['target_value']), ('ID', 'ID, CODE'))
+
+    def test_foreign_keys_added_removed_and_modified(self):
+        other = {'constraint_name': 'OTHER_FK', 'columns': 'X', 'referenced_table': 'X_TABLE'}
+        moved = dict(FK, referenced_table='ANCESTOR')
+        differences = diff_constraints(PK, PK, [FK, other], [moved, dict(other, constraint_name='NEW_FK')])
+        by_name = {diff['constraint_name']: diff['status'] for diff in differences}
+        self.assertEqual(by_name, {'T_FK': 'modified', 'OTHER_FK': 'missing_in_target', 'NEW_FK': 'missing_in_source'})
+
+    def test_whitespace_is_not_a_difference(self):
+        self.assertEqual(diff_constraints(PK, {'constraint_name': 'T_PK', 'columns': ' ID '},
+                                          [FK], [dict(FK, columns='PARENT_ID ')]), [])
+
+
+class CompareSchemaCatalogsTest(unittest.TestCase):
+
+    def test_added_removed_and_modified_tables(self):
+        source = {
+            'SAME': table([column('ID')], PK),
+            'CHANGED': table([column('ID')], PK, [FK]),
+            'DROPPED': table([column('ID')])
+        }
+        target = {
+            'SAME': table([column('ID')], PK),
+            'CHANGED': table([column('ID'), column('NOTE', 'VARCHAR2', 10)], PK),
+            'CREATED': table([column('ID')])
+        }
+        result = compare_schema_catalogs(source, target)
+        summary = result['summary']
+        self.assertEqual(result['missing_in_target'], ['DROPPED'])
+        self.assertEqual(result['missing_in_source'], ['CREATED'])
+        self.assertEqual([entry['table_name'] for entry in result['modified']], ['CHANGED'])
+        differences = result['modified'][0]['differences']
+        self.assertEqual((len(differences['structure']), len(differences['constraints'])), (1, 1))
+        self.assertEqual((summary['identical'], summary['modified']), (1, 1))
+        self.assertEqual(summary['total_differences'], 4)
+
+    def test_failed_category_is_not_a_difference(self):
+        source = table([column('ID')], PK, [FK])
+        target = table([column('ID')], PK)
+        del target['foreign_keys']
+        result = compare_schema_catalogs({'T': source}, {'T': target})
+        self.assertEqual(result['modified'], [])
+        self.assertEqual(result['summary']['identical'], 1)
+
+    def test_equal_fingerprints_skip_the_diff(self):
+        # Metadata that was never loaded (None) is not read when the fingerprints match
+        result = compare_schema_catalogs({'T': None, 'U': table([column('ID')])},
+                                         {'T': None, 'U': table([column('ID', 'DATE')])},
+                                         source_fingerprints={'T': 'abc', 'U': 'x'},
+                                         target_fingerprints={'T': 'abc', 'U': 'y'})
+        self.assertEqual(result['summary']['fingerprint_matches'], 1)
+        self.assertEqual([entry['table_name'] for entry in result['modified']], ['U'])
+
+    def test_categories_limit_the_diff(self):
+        source = table([column('ID')], PK, indexes=[{'index_name': 'T_IX'}])
+        target = table([column('ID', 'DATE')], {})
+        differences = diff_tables(source, target, ['indexes'])
+        self.assertEqual(differences['total_count'], 1)
+        self.assertEqual(differences['indexes'][0]['status'], 'missing_in_target')
+        self.assertEqual((differences['structure'], differences['constraints']), ([], []))
+
+
+class FakeSide:
+    """SchemaSide stand-in with fixed tables and stored fingerprints, recording which tables it loads"""
+
+    def __init__(self, schema, tables, fingerprints):
+        self.schema = schema
+        self.all_tables = tables
+        self.table_names = []
+        self.fingerprints = {}
+        self.stored = fingerprints
+        self.tables = {}
+        self.tracks_snapshots = False
+        self.loaded = []
+
+    def discover(self, pattern, categories):
+        self.table_names = sorted(self.all_tables)
+        self.fingerprints = dict(self.stored)
+
+    def load(self, table_names, categories):
+        self.loaded.extend(table_names)
+        for table_name in table_names:
+            self.tables[table_name] = self.all_tables[table_name]
+            self.fingerprints[table_name] = table_fingerprint(self.all_tables[table_name], categories)
+
+    def commit_baseline(self, categories):
+        pass
+
+    def baseline_summary(self):
+        return {'loaded_tables': len(self.loaded)}
+
+
+class CompareSchemaSidesTest(unittest.TestCase):
+
+    def test_unchanged_pairs_are_not_loaded(self):
+        same = table([column('ID')], PK)
+        fingerprint = table_fingerprint(same, SCHEMA_COMPARE_CATEGORIES)
+        source = FakeSide('APP', {'SAME': same, 'CHANGED': table([column('ID')]), 'ONLY_SOURCE': same},
+                          {'SAME': fingerprint})
+        target = FakeSide('APP', {'SAME': same, 'CHANGED': table([column('ID', 'DATE')])},
+                          {'SAME': fingerprint})
+
+        result = compare_schema_sides(source, target)
+        self.assertEqual((source.loaded, target.loaded), (['CHANGED'], ['CHANGED']))
+        summary = result['summary']
+        self.assertEqual((summary['unchanged_skipped'], summary['fingerprint_matches']), (1, 1))
+        self.assertEqual([entry['table_name'] for entry in result['modified']], ['CHANGED'])
+        self.assertEqual(result['missing_in_target'], ['ONLY_SOURCE'])
+        self.assertEqual(result['baseline']['source'], {'loaded_tables': 1})
+
+
+if __name__ == '__main__':
+    unittest.main()